@@ -1,4 +1,41 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from config import cache_utils
+
+from .models import User
+
+# Left out of the cached snapshot: never needed to authorize a request, and
+# deferred fields are loaded on access but not written back by a plain save().
+SNAPSHOT_DEFERRED = ("password", "last_login")
+
+
+def get_cached_user(user_id) -> User:
+    """The user with this id, from the snapshot cache when possible.
+
+    Raises User.DoesNotExist. Saves and deletes invalidate the snapshot
+    (account.signals); a QuerySet.update() must call
+    cache_utils.invalidate_user() itself.
+    """
+    snapshot, version = cache_utils.get_user_snapshot(user_id)
+    if snapshot is not None:
+        field_names, values = snapshot
+        return User.from_db(DEFAULT_DB_ALIAS, field_names, values)
+
+    user = User.objects.defer(*SNAPSHOT_DEFERRED).get(pk=user_id)
+    field_names = [
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname not in SNAPSHOT_DEFERRED
+    ]
+    cache_utils.set_user_snapshot(
+        user_id, version, (field_names, [getattr(user, f) for f in field_names])
+    )
+    return user
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -9,3 +46,33 @@ class CookieJWTAuthentication(JWTAuthentication):
 
         validated_token = self.get_validated_token(raw_token)
         return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        try:
+            user = get_cached_user(user_id)
+        except User.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if user.is_blocked:
+            raise AuthenticationFailed(_("User is blocked"), code="user_blocked")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,32 @@
+"""
+Keep the cached user snapshots (account.authentication.get_cached_user) in
+step with the table: any save or delete of a User — API, admin, shell,
+management command — bumps that user's snapshot version once the
+transaction commits. QuerySet.update() sends no signals; call
+cache_utils.invalidate_user() after one.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config import cache_utils
+
+from .authentication import SNAPSHOT_DEFERRED
+from .models import User
+
+
+def _invalidate_on_commit(user_id) -> None:
+    transaction.on_commit(lambda: cache_utils.invalidate_user(user_id))
+
+
+@receiver(post_save, sender=User, dispatch_uid="account.invalidate_user_on_save")
+def invalidate_user_on_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= set(SNAPSHOT_DEFERRED):
+        return  # e.g. last_login on every login; not part of the snapshot
+    _invalidate_on_commit(instance.pk)
+
+
+@receiver(post_delete, sender=User, dispatch_uid="account.invalidate_user_on_delete")
+def invalidate_user_on_delete(sender, instance, **kwargs):
+    _invalidate_on_commit(instance.pk)
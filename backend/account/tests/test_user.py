@@ -121,18 +121,27 @@ class UserMeAPITest(TestCase):
         )
 
     def test_patch_is_blocked_is_silently_ignored(self):
-        """SECURITY: a blocked user must not be able to unblock themselves."""
-        self.user.is_blocked = True
-        self.user.save()
+        """SECURITY: is_blocked is read-only on /me/."""
         response = self.client.patch(
-            "/api/v1/auth/me/", {"is_blocked": False}, format="json"
+            "/api/v1/auth/me/", {"is_blocked": True}, format="json"
         )
         self.assertEqual(response.status_code, 200)
         self.user.refresh_from_db()
-        self.assertTrue(
+        self.assertFalse(
             self.user.is_blocked,
-            "SECURITY: users must not be able to unblock themselves via /me/",
+            "SECURITY: is_blocked must not be changeable via /me/",
+        )
+
+    def test_blocked_user_is_rejected(self):
+        """SECURITY: a blocked user cannot use /me/ at all, let alone unblock."""
+        self.user.is_blocked = True
+        self.user.save()
+        response = self.client.patch(
+            "/api/v1/auth/me/", {"is_blocked": False}, format="json"
         )
+        self.assertEqual(response.status_code, 401)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_blocked)
 
     def test_patch_is_email_verified_is_silently_ignored(self):
         """SECURITY: users must not be able to self-verify their email."""
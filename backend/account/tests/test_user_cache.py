@@ -0,0 +1,135 @@
+"""
+Authenticated User Snapshot Tests
+=================================
+Covers: CookieJWTAuthentication serving the user from the snapshot cache,
+is_active / is_blocked checks, invalidation on every save / delete after
+commit, deferred password on snapshot users, SSE token validation.
+"""
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account.authentication import get_cached_user
+from account.models import User
+from config import cache_utils
+from notification.consumers import NotificationSSEConsumer
+
+from .helpers import authenticate, make_user
+
+URL = "/api/v1/auth/me/"
+
+
+class UserSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+
+    def test_repeat_requests_skip_the_user_query(self):
+        self.client.get(URL)
+        with self.assertNumQueries(0):
+            response = self.client.get(URL)
+        self.assertEqual(response.data["email"], self.user.email)
+
+    def test_snapshot_leaves_password_deferred(self):
+        get_cached_user(self.user.pk)
+        with self.assertNumQueries(0):
+            cached = get_cached_user(self.user.pk)
+        self.assertEqual(cached.get_deferred_fields(), {"password", "last_login"})
+        self.assertTrue(cached.check_password("pass123!"))
+
+    def test_saving_a_snapshot_user_keeps_the_password(self):
+        get_cached_user(self.user.pk)
+        cached = get_cached_user(self.user.pk)
+        cached.first_name = "Renamed"
+        cached.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Renamed")
+        self.assertTrue(self.user.check_password("pass123!"))
+
+    def test_profile_patch_invalidates(self):
+        self.client.get(URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(URL, {"first_name": "Olena"}, format="json")
+        self.assertEqual(self.client.get(URL).data["first_name"], "Olena")
+
+    def test_block_is_enforced_once_invalidated(self):
+        self.client.get(URL)
+        User.objects.filter(pk=self.user.pk).update(is_blocked=True)
+        self.assertEqual(self.client.get(URL).status_code, 200)  # stale snapshot
+
+        cache_utils.invalidate_user(self.user.pk)
+        self.assertEqual(self.client.get(URL).status_code, 401)
+
+    def test_inactive_user_is_rejected(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(URL).status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        self.user.delete()
+        self.assertEqual(self.client.get(URL).status_code, 401)
+
+    def test_stale_write_after_invalidation_is_never_read(self):
+        snapshot, version = cache_utils.get_user_snapshot(self.user.pk)
+        self.assertIsNone(snapshot)
+        cache_utils.invalidate_user(self.user.pk)
+        cache_utils.set_user_snapshot(self.user.pk, version, "stale")
+        self.assertIsNone(cache_utils.get_user_snapshot(self.user.pk)[0])
+
+
+class UserSignalInvalidationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.client.get(URL)
+
+    def test_any_save_invalidates_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.is_blocked = True
+            self.user.save()
+        self.assertEqual(self.client.get(URL).status_code, 200)  # not committed yet
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(URL).status_code, 401)
+
+    def test_deactivate_and_delete_invalidate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save(update_fields=["is_active"])
+        self.assertEqual(self.client.get(URL).status_code, 401)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.client.get(URL).status_code, 401)
+
+    def test_last_login_update_keeps_the_snapshot(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            update_last_login(None, self.user)
+        self.assertEqual(callbacks, [])
+
+
+class SSETokenValidationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def _validate(self, token):
+        return async_to_sync(NotificationSSEConsumer()._validate_token)(token)
+
+    def test_valid_token_resolves_the_user(self):
+        self.assertEqual(self._validate(self.token).pk, self.user.pk)
+
+    def test_blocked_user_and_bad_token_are_rejected(self):
+        self.assertIsNone(self._validate("not-a-token"))
+        User.objects.filter(pk=self.user.pk).update(is_blocked=True)
+        cache_utils.invalidate_user(self.user.pk)
+        self.assertIsNone(self._validate(self.token))
@@ -0,0 +1,90 @@
+"""
+Hot / cold storage for append-only logs.
+========================================
+Each archived log has a twin "<Model>Archive" table with the same columns
+and ids. move_to_archive() shifts rows older than a cutoff across in
+keyset batches — one INSERT ... SELECT and one DELETE per batch, each batch
+its own transaction — so the hot table (and its indexes and vacuum work)
+stays proportional to the retention window rather than to the fleet's age.
+
+History list endpoints read the hot table; ?tier=archive switches them to
+the cold one (HistoryTierMixin).
+"""
+
+from django.db import connection, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+TIERS = ("hot", "archive")
+
+
+def _copy_sql(rows, archive_model) -> tuple[str, tuple]:
+    """INSERT INTO <archive> (...) SELECT ... for the rows of a queryset."""
+    fields = archive_model._meta.concrete_fields
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    target = connection.ops.quote_name(archive_model._meta.db_table)
+    select, params = (
+        rows.order_by()
+        .values_list(*(field.attname for field in fields))
+        .query.sql_with_params()
+    )
+    return f"INSERT INTO {target} ({columns}) {select}", params
+
+
+def move_to_archive(
+    model,
+    archive_model,
+    date_field: str,
+    cutoff,
+    *,
+    batch_size: int = 5000,
+    filters: Q | None = None,
+) -> int:
+    """Move rows with `date_field` < cutoff (and matching `filters`) into
+    archive_model; returns the count."""
+    old = model.objects.filter(**{f"{date_field}__lt": cutoff})
+    if filters is not None:
+        old = old.filter(filters)
+    moved = 0
+    while True:
+        # Moved rows are gone from the hot table, so each batch starts at its head.
+        pks = list(old.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return moved
+        batch = old.filter(pk__lte=pks[-1])
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(*_copy_sql(batch, archive_model))
+            deleted, _ = batch.delete()
+        moved += deleted
+
+
+class HistoryTierMixin:
+    """?tier=archive on a history list reads the cold table instead.
+
+    Views set history_model / archive_model / archive_serializer_class and
+    build their queryset from get_history_model().
+    """
+
+    history_model = None
+    archive_model = None
+    archive_serializer_class = None
+
+    def get_tier(self) -> str:
+        if self.request.method not in SAFE_METHODS:
+            return "hot"
+        tier = self.request.query_params.get("tier", "hot")
+        if tier not in TIERS:
+            raise ValidationError({"tier": f"Must be one of: {', '.join(TIERS)}."})
+        return tier
+
+    def get_history_model(self):
+        if self.get_tier() == "archive":
+            return self.archive_model
+        return self.history_model
+
+    def get_serializer_class(self):
+        if self.get_tier() == "archive":
+            return self.archive_serializer_class
+        return super().get_serializer_class()
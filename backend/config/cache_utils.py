@@ -16,6 +16,7 @@ Key anatomy:
 
 import hashlib
 import logging
+import time
 
 from django.conf import settings
 from django.core.cache import cache
@@ -34,12 +35,20 @@ _REG_PLAN_TTL = getattr(settings, "CACHE_TTL_REGULATION_PLAN", 300)
 _EQUIPMENT_TTL = getattr(settings, "CACHE_TTL_EQUIPMENT", 300)
 _EXPENSE_LIST_TTL = getattr(settings, "CACHE_TTL_EXPENSE_LIST", 300)
 _EXPENSE_DETAIL_TTL = getattr(settings, "CACHE_TTL_EXPENSE_DETAIL", 300)
+_DUE_BOARD_TTL = getattr(settings, "CACHE_TTL_DUE_BOARD", 300)
+_CALENDAR_TTL = getattr(settings, "CACHE_TTL_CALENDAR", 600)
+_TRANSLATION_TTL = getattr(settings, "CACHE_TTL_TRANSLATION", 86400)
+_UNREAD_COUNT_TTL = getattr(settings, "CACHE_TTL_UNREAD_COUNT", 3600)
+_USER_SNAPSHOT_TTL = getattr(settings, "CACHE_TTL_USER_SNAPSHOT", 60)
 
 # ── Version-key names ────────────────────────────────────────────────────────
 _VK_VEHICLE = "v:vehicle"
 _VK_DRIVER = "v:driver"
 _VK_SCHEMA = "v:schema"
 _VK_EXPENSE = "v:expense"
+_VK_DUE_BOARD = "v:due-board"
+_VK_CALENDAR = "v:calendar"
+_VK_NOTIFICATION = "v:notification"
 
 
 # ── Internal helpers ─────────────────────────────────────────────────────────
@@ -139,6 +148,21 @@ def invalidate_vehicle(vehicle_id=None) -> None:
         keys_to_delete.append(f"vehicle:detail:{vehicle_id}")
         keys_to_delete.append(f"vehicle:delete-check:{vehicle_id}")
     _safe_delete(*keys_to_delete)
+    invalidate_calendar()
+
+
+def invalidate_vehicles(vehicle_ids) -> None:
+    """
+    Bulk variant of invalidate_vehicle(): one version bump and a single
+    delete_many for every affected detail / delete-check key.
+    """
+    _bump_version(_VK_VEHICLE)
+    keys_to_delete = ["vehicle:archive:list"]
+    for vehicle_id in set(vehicle_ids):
+        keys_to_delete.append(f"vehicle:detail:{vehicle_id}")
+        keys_to_delete.append(f"vehicle:delete-check:{vehicle_id}")
+    _safe_delete(*keys_to_delete)
+    invalidate_calendar()
 
 
 # ── Vehicle Archive ──────────────────────────────────────────────────────────
@@ -240,6 +264,66 @@ def set_regulation_plan(vehicle_id, data) -> None:
 
 def invalidate_regulation_plan(vehicle_id) -> None:
     _safe_delete(f"regulation:plan:{vehicle_id}")
+    invalidate_due_board()
+
+
+def invalidate_regulation_plans(vehicle_ids) -> None:
+    """Bulk variant of invalidate_regulation_plan(): a single delete_many."""
+    keys = [f"regulation:plan:{vehicle_id}" for vehicle_id in set(vehicle_ids)]
+    if keys:
+        _safe_delete(*keys)
+        invalidate_due_board()
+
+
+# ── Fleet Maintenance Due Board ───────────────────────────────────────────────
+# One payload for the whole fleet. Entry changes bump it through the plan
+# invalidators above; km changes call invalidate_due_board() directly.
+
+
+def get_due_board() -> list | None:
+    v = _get_version(_VK_DUE_BOARD)
+    return _safe_get(f"regulation:due-board:v{v}")
+
+
+def set_due_board(data) -> None:
+    v = _get_version(_VK_DUE_BOARD)
+    _safe_set(f"regulation:due-board:v{v}", data, _DUE_BOARD_TTL)
+
+
+def invalidate_due_board() -> None:
+    _bump_version(_VK_DUE_BOARD)
+    invalidate_calendar()
+
+
+# ── Fleet Calendar ────────────────────────────────────────────────────────────
+# One bucket per month ("YYYY-MM"). Inspections and service plans are written
+# through vehicle views, so invalidate_vehicle(s) bumps the version; predicted
+# regulation dates follow the due board.
+
+
+def get_calendar_months(months) -> dict:
+    """Return {month: bucket} for every cached month of `months`."""
+    v = _get_version(_VK_CALENDAR)
+    keys = {f"calendar:v{v}:{month}": month for month in months}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception:
+        logger.warning("cache GET failed", extra={"keys": list(keys)}, exc_info=True)
+        return {}
+    return {keys[key]: bucket for key, bucket in found.items()}
+
+
+def set_calendar_months(buckets: dict) -> None:
+    v = _get_version(_VK_CALENDAR)
+    data = {f"calendar:v{v}:{month}": bucket for month, bucket in buckets.items()}
+    try:
+        cache.set_many(data, timeout=_CALENDAR_TTL)
+    except Exception:
+        logger.warning("cache SET failed", extra={"keys": list(data)}, exc_info=True)
+
+
+def invalidate_calendar() -> None:
+    _bump_version(_VK_CALENDAR)
 
 
 # ── Equipment List ────────────────────────────────────────────────────────────
@@ -257,6 +341,188 @@ def invalidate_equipment(vehicle_id) -> None:
     _safe_delete(f"equipment:{vehicle_id}")
 
 
+def invalidate_equipments(vehicle_ids) -> None:
+    """
+    Fan-out variant: equipment lists and vehicle detail / delete-check keys of
+    every vehicle go in a single delete_many, with one vehicle version bump.
+    """
+    _bump_version(_VK_VEHICLE)
+    keys_to_delete = ["vehicle:archive:list"]
+    for vehicle_id in set(vehicle_ids):
+        keys_to_delete.append(f"equipment:{vehicle_id}")
+        keys_to_delete.append(f"vehicle:detail:{vehicle_id}")
+        keys_to_delete.append(f"vehicle:delete-check:{vehicle_id}")
+    _safe_delete(*keys_to_delete)
+
+
+# ── Notification unread counters ─────────────────────────────────────────────
+# Per-user badge counts, adjusted on the user's own read-state changes. A new
+# notification bumps the version instead of touching every user's key; each
+# user recounts once (index-only) on the next read. Keys also expire after
+# CACHE_TTL_UNREAD_COUNT, so any drift heals on its own.
+
+
+def _unread_key(user_id) -> str:
+    v = _get_version(_VK_NOTIFICATION)
+    return f"notification:unread:v{v}:{user_id}"
+
+
+def get_unread_count(user_id) -> int | None:
+    return _safe_get(_unread_key(user_id))
+
+
+def set_unread_count(user_id, count: int) -> None:
+    _safe_set(_unread_key(user_id), count, _UNREAD_COUNT_TTL)
+
+
+def adjust_unread_count(user_id, delta: int) -> None:
+    """Atomic +/- delta; a missing key is left missing (the next read counts)."""
+    key = _unread_key(user_id)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        pass
+    except Exception:
+        logger.warning("cache INCR failed", extra={"key": key}, exc_info=True)
+
+
+def invalidate_unread_count(user_id) -> None:
+    _safe_delete(_unread_key(user_id))
+
+
+def invalidate_unread_counts() -> None:
+    _bump_version(_VK_NOTIFICATION)
+
+
+# ── User snapshots ───────────────────────────────────────────────────────────
+# The authenticated user behind each API request / SSE stream. Keys carry a
+# per-user version: invalidate_user() bumps it, so a snapshot loaded before
+# the change and written after it lands under a version nobody reads.
+
+
+def _user_version_key(user_id) -> str:
+    return f"v:user:{user_id}"
+
+
+def get_user_snapshot(user_id) -> tuple:
+    """(snapshot or None, version) — pass the version back to set_user_snapshot."""
+    v = _get_version(_user_version_key(user_id))
+    return _safe_get(f"user:snapshot:v{v}:{user_id}"), v
+
+
+def set_user_snapshot(user_id, version: int, data) -> None:
+    _safe_set(f"user:snapshot:v{version}:{user_id}", data, _USER_SNAPSHOT_TTL)
+
+
+def invalidate_user(user_id) -> None:
+    _bump_version(_user_version_key(user_id))
+
+
+# ── SSE connections ──────────────────────────────────────────────────────────
+# Per-user count of open notification streams, shared by all ASGI workers.
+# The key expires unless a live stream refreshes it (touch_sse_slots), so
+# counts leaked by a killed worker do not block the user for long.
+
+
+def _sse_key(user_id) -> str:
+    return f"sse:connections:{user_id}"
+
+
+def acquire_sse_slot(user_id, limit: int, ttl: int) -> bool:
+    """Count one more open stream for the user; False (and nothing counted)
+    when the user already has `limit` open. Fails open if the cache is down.
+    """
+    key = _sse_key(user_id)
+    try:
+        cache.add(key, 0, timeout=ttl)
+        count = cache.incr(key)
+    except Exception:
+        logger.warning("SSE slot acquire failed", extra={"key": key}, exc_info=True)
+        return True
+    if count > limit:
+        release_sse_slot(user_id)
+        return False
+    return True
+
+
+def release_sse_slot(user_id) -> None:
+    key = _sse_key(user_id)
+    try:
+        cache.decr(key)
+    except ValueError:
+        pass  # expired meanwhile
+    except Exception:
+        logger.warning("SSE slot release failed", extra={"key": key}, exc_info=True)
+
+
+def touch_sse_slots(user_id, ttl: int) -> None:
+    try:
+        cache.touch(_sse_key(user_id), ttl)
+    except Exception:
+        logger.warning("SSE slot touch failed", exc_info=True)
+
+
+# ── Notification digest ──────────────────────────────────────────────────────
+# The first live push for a (vehicle, type) opens a window; repeats inside it
+# are held and pushed as one digest once it closes (notification.scheduler).
+# The cached value is the time the window closes.
+
+
+def _digest_key(vehicle_id, notification_type: str) -> str:
+    return f"notification:digest:{vehicle_id}:{notification_type}"
+
+
+def claim_digest_windows(groups, window: int) -> dict:
+    """Open a window for every (vehicle_id, type) group that has none.
+
+    Returns {group: closes_at timestamp} for the groups whose window was
+    already open; the rest are claimed. Fails open (everything claimed) if
+    the cache is down.
+    """
+    held = {}
+    closes_at = time.time() + window
+    for group in groups:
+        key = _digest_key(*group)
+        try:
+            if not cache.add(key, closes_at, timeout=window):
+                # Expired between add and get: flush on the next tick.
+                held[group] = cache.get(key) or time.time()
+        except Exception:
+            logger.warning("cache ADD failed", extra={"key": key}, exc_info=True)
+    return held
+
+
+# ── Translation memory ───────────────────────────────────────────────────────
+# Front cache for fleet_management.TranslationMemory rows; entries never change
+# once stored, so there is nothing to invalidate.
+
+
+def _translation_key(source: str, target: str, digest: str) -> str:
+    return f"translation:{source}:{target}:{digest}"
+
+
+def get_translations(source: str, lookups) -> dict:
+    """{(target, digest): text} for the cached subset of (target, digest) pairs."""
+    keys = {_translation_key(source, *lookup): lookup for lookup in lookups}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception:
+        logger.warning("cache GET failed", extra={"keys": list(keys)}, exc_info=True)
+        return {}
+    return {keys[key]: text for key, text in found.items()}
+
+
+def set_translations(source: str, translations: dict) -> None:
+    """Store {(target, digest): text} in one set_many."""
+    data = {
+        _translation_key(source, *lookup): text for lookup, text in translations.items()
+    }
+    try:
+        cache.set_many(data, timeout=_TRANSLATION_TTL)
+    except Exception:
+        logger.warning("cache SET failed", extra={"keys": list(data)}, exc_info=True)
+
+
 # ── Expense ──────────────────────────────────────────────────────────────────
 
 
@@ -286,6 +552,14 @@ def invalidate_expense(expense_id=None) -> None:
         _safe_delete(f"expense:detail:{expense_id}")
 
 
+def invalidate_expenses(expense_ids) -> None:
+    """Bulk variant of invalidate_expense(): one bump, one delete_many."""
+    _bump_version(_VK_EXPENSE)
+    keys = [f"expense:detail:{expense_id}" for expense_id in set(expense_ids)]
+    if keys:
+        _safe_delete(*keys)
+
+
 # ── Expense Category ─────────────────────────────────────────────────────────
 
 _CATEGORY_LIST_TTL = 600
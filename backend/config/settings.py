@@ -262,6 +262,26 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Replay log behind Last-Event-ID on the notification SSE stream
+NOTIFICATION_STREAM_BACKEND = os.getenv(
+    "NOTIFICATION_STREAM_BACKEND", "notification.stream.RedisEventStream"
+)
+NOTIFICATION_STREAM_MAXLEN = int(os.getenv("NOTIFICATION_STREAM_MAXLEN", "10000"))
+
+# Live pushes collapse repeats per (vehicle, type) within this many seconds;
+# repeats are held and pushed as one digest when the window closes (by
+# run_notification_scheduler). 0 sends every notification.
+NOTIFICATION_DIGEST_WINDOW_SECONDS = int(
+    os.getenv("NOTIFICATION_DIGEST_WINDOW_SECONDS", "0")
+)
+
+# Notification SSE: keepalive comment interval, per-connection send queue
+# (a slow client past this many pending frames gets one "reset" instead),
+# and open streams allowed per user across all workers.
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+SSE_MAX_CONNECTIONS_PER_USER = int(os.getenv("SSE_MAX_CONNECTIONS_PER_USER", "5"))
+
 # Per-entity TTLs (seconds) — consumed by config.cache_utils
 CACHE_TTL_VEHICLE_LIST = int(os.getenv("CACHE_TTL_VEHICLE_LIST", "30"))
 CACHE_TTL_VEHICLE_DETAIL = int(os.getenv("CACHE_TTL_VEHICLE_DETAIL", "60"))
@@ -272,6 +292,84 @@ CACHE_TTL_REGULATION_PLAN = int(os.getenv("CACHE_TTL_REGULATION_PLAN", "300"))
 CACHE_TTL_EQUIPMENT = int(os.getenv("CACHE_TTL_EQUIPMENT", "300"))
 CACHE_TTL_EXPENSE_LIST = int(os.getenv("CACHE_TTL_EXPENSE_LIST", "30"))
 CACHE_TTL_EXPENSE_DETAIL = int(os.getenv("CACHE_TTL_EXPENSE_DETAIL", "60"))
+CACHE_TTL_DUE_BOARD = int(os.getenv("CACHE_TTL_DUE_BOARD", "300"))
+CACHE_TTL_CALENDAR = int(os.getenv("CACHE_TTL_CALENDAR", "600"))
+CACHE_TTL_TRANSLATION = int(os.getenv("CACHE_TTL_TRANSLATION", "86400"))
+CACHE_TTL_UNREAD_COUNT = int(os.getenv("CACHE_TTL_UNREAD_COUNT", "3600"))
+CACHE_TTL_USER_SNAPSHOT = int(os.getenv("CACHE_TTL_USER_SNAPSHOT", "60"))
+
+# ── Fleet jobs ────────────────────────────────────────────────────────────────
+# Fleet jobs run in the `manage.py run_fleet_jobs --loop` worker (the
+# fleet-jobs compose service). Eager runs them inside the enqueueing request
+# right after commit — for tests and one-off local setups without a worker.
+FLEET_JOBS_EAGER = os.getenv("FLEET_JOBS_EAGER", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+FLEET_JOBS_CHUNK_SIZE = int(os.getenv("FLEET_JOBS_CHUNK_SIZE", "500"))
+
+# ── Notification retries ──────────────────────────────────────────────────────
+# `manage.py run_notification_scheduler --loop` re-sends notifications whose
+# retry_at is due. Pending ones are rescheduled with exponential backoff
+# (base interval, doubled per attempt, capped) until resolved or out of
+# attempts; everything else is sent once more and cleared.
+NOTIFICATION_RETRY_BATCH_SIZE = int(os.getenv("NOTIFICATION_RETRY_BATCH_SIZE", "100"))
+NOTIFICATION_RETRY_INTERVAL_SECONDS = int(
+    os.getenv("NOTIFICATION_RETRY_INTERVAL_SECONDS", "3600")
+)
+NOTIFICATION_RETRY_MAX_INTERVAL_SECONDS = int(
+    os.getenv("NOTIFICATION_RETRY_MAX_INTERVAL_SECONDS", "86400")
+)
+NOTIFICATION_RETRY_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_RETRY_MAX_ATTEMPTS", "5"))
+
+# ── Telegram ──────────────────────────────────────────────────────────────────
+# Driver-facing notifications go to the driver's Telegram chat through an
+# outbound queue drained by `manage.py run_telegram_outbox --loop`, within
+# Telegram's limits (about 30 messages/s per bot, 1 message/s per chat).
+# Empty token disables the channel.
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_OUTBOX_BACKEND = os.getenv(
+    "TELEGRAM_OUTBOX_BACKEND", "notification.telegram.RedisOutbox"
+)
+TELEGRAM_GLOBAL_PER_SECOND = float(os.getenv("TELEGRAM_GLOBAL_PER_SECOND", "30"))
+TELEGRAM_CHAT_PER_SECOND = float(os.getenv("TELEGRAM_CHAT_PER_SECOND", "1"))
+TELEGRAM_BATCH_SIZE = int(os.getenv("TELEGRAM_BATCH_SIZE", "100"))
+TELEGRAM_MAX_ATTEMPTS = int(os.getenv("TELEGRAM_MAX_ATTEMPTS", "5"))
+TELEGRAM_TIMEOUT_SECONDS = int(os.getenv("TELEGRAM_TIMEOUT_SECONDS", "10"))
+# Unacknowledged claims (a worker died mid-tick) are re-queued after this;
+# keep it above the longest tick (batch size × request timeout at worst).
+TELEGRAM_CLAIM_TIMEOUT_SECONDS = int(os.getenv("TELEGRAM_CLAIM_TIMEOUT_SECONDS", "300"))
+
+# ── Notification retention ────────────────────────────────────────────────────
+# Days a notification stays in the hot table, per type, before
+# `manage.py archive_notifications` moves it to NotificationArchive. Pending
+# notifications and ones with a retry scheduled are kept until settled.
+# NOTIFICATION_RETENTION_DAYS_<TYPE> overrides one type, e.g.
+# NOTIFICATION_RETENTION_DAYS_MILEAGE_SUBMITTED=90.
+NOTIFICATION_RETENTION_DAYS = {
+    notification_type: int(
+        os.getenv(f"NOTIFICATION_RETENTION_DAYS_{notification_type.upper()}", days)
+    )
+    for notification_type, days in {
+        "regulation_approaching": "30",
+        "regulation_overdue": "90",
+        "mileage_submitted": "90",
+        "service_report": "180",
+        "expense_approval": "90",
+    }.items()
+}
+
+# ── Translation ───────────────────────────────────────────────────────────────
+# Dotted path to a fleet_management.translation.TranslationBackend subclass.
+TRANSLATION_BACKEND = os.getenv(
+    "TRANSLATION_BACKEND", "fleet_management.translation.GoogleBackend"
+)
+
+# ── History archival ──────────────────────────────────────────────────────────
+# Log rows older than this move to the *Archive tables (manage.py archive_history).
+HISTORY_HOT_DAYS = int(os.getenv("HISTORY_HOT_DAYS", "365"))
 
 # ── Logging ───────────────────────────────────────────────────────────────────
 LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG else "INFO")
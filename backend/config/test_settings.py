@@ -4,6 +4,8 @@ Test-specific Django settings.
 Overrides:
 - Cache: LocMemCache instead of Redis (redis package not required)
 - Throttling: disabled to prevent rate-limit failures during automated tests
+- Notification stream: MemoryEventStream instead of a Redis stream
+- Translation: StubBackend instead of Google (no network)
 """
 
 from config.settings import *  # noqa: F403
@@ -30,6 +32,13 @@ CHANNEL_LAYERS = {
     },
 }
 
+# In-process notification replay log — no Redis required for tests
+NOTIFICATION_STREAM_BACKEND = "notification.stream.MemoryEventStream"
+
+# In-process Telegram outbox; the channel stays off unless a test sets a token
+TELEGRAM_OUTBOX_BACKEND = "notification.telegram.MemoryOutbox"
+TELEGRAM_BOT_TOKEN = ""
+
 # Keep throttle rates very high so tests never hit the limit.
 # ScopedRateThrottle on LoginView/RefreshView requires 'auth' scope to exist.
 # Force local file storage — tests must not depend on S3
@@ -42,5 +51,11 @@ REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {
     "auth": "10000/minute",
 }
 
+# Fleet jobs run in-process right after commit (no worker in tests)
+FLEET_JOBS_EAGER = True
+
+# Offline translator — tests never call Google
+TRANSLATION_BACKEND = "fleet_management.translation.StubBackend"
+
 # Force unmanaged models to be managed during test DB creation
 TEST_RUNNER = "config.test_runner.UnmanagedModelTestRunner"
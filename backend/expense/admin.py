@@ -2,7 +2,9 @@ from django.contrib import admin
 
 from .models import (
     Expense,
+    ExpenseApprovalLog,
     ExpenseCategory,
+    ExpenseImportBatch,
     ExpensePart,
     FineExpenseDetail,
     FuelExpenseDetail,
@@ -131,3 +133,40 @@ class ExpenseAdmin(admin.ModelAdmin):
             return []
         code = obj.category.code if obj.category_id else None
         return _CODE_INLINES.get(code, [])
+
+
+# ── Approval audit admin ──
+
+
+@admin.register(ExpenseApprovalLog)
+class ExpenseApprovalLogAdmin(admin.ModelAdmin):
+    list_display = ["expense", "from_status", "to_status", "changed_by", "changed_at"]
+    list_filter = ["to_status"]
+    readonly_fields = [
+        "expense",
+        "from_status",
+        "to_status",
+        "batch_id",
+        "changed_by",
+        "changed_at",
+    ]
+
+
+# ── CSV import admin ──
+
+
+@admin.register(ExpenseImportBatch)
+class ExpenseImportBatchAdmin(admin.ModelAdmin):
+    list_display = [
+        "source_name",
+        "status",
+        "total_rows",
+        "valid_rows",
+        "duplicate_rows",
+        "error_rows",
+        "imported_rows",
+        "created_by",
+        "created_at",
+    ]
+    list_filter = ["status"]
+    readonly_fields = ["id", "created_at", "committed_at"]
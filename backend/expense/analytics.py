@@ -0,0 +1,440 @@
+"""
+Vehicle analytics: fuel consumption and cost-of-ownership series.
+=================================================================
+Fuel consumption is measured fill-to-fill: the liters of a fuel expense are what
+was burned since the previous fill, and the distance is the difference between
+the odometer readings (nearest MileageLog on or before each fill date).
+Mileage is read from both tiers — archive_history moves old logs into
+MileageLogArchive, and a full rebuild still needs them.
+
+Intervals are materialized in FuelConsumption and rebuilt incrementally:
+a change to a fuel expense or a mileage log dated D can only affect
+intervals ending on or after D, so only that tail is recomputed — starting
+from the last fill before D, which the window function needs as the anchor.
+
+Cost series follow the same rule: VehicleCostDaily keeps running totals on
+event days (expense or mileage log), so a change on day D rebuilds only the
+rows from D on, seeded from the last row before D. VehicleCostMonthly is a
+dense per-vehicle month series derived from the daily rows, so fleet trend
+charts are a single GROUP BY month over an indexed table.
+"""
+
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+import logging
+from statistics import median
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    When,
+    Window,
+)
+from django.db.models.functions import Lag, TruncDate
+from django.utils import timezone
+
+from vehicle.models import MileageLog, MileageLogArchive
+
+from .models import Expense, FuelConsumption, VehicleCostDaily, VehicleCostMonthly
+
+logger = logging.getLogger(__name__)
+
+FUEL_CODE = "FUEL"
+
+# Modified z-score (Iglewicz & Hoaglin) — robust for the small per-vehicle samples.
+OUTLIER_Z = Decimal("3.5")
+# Ignore deviations smaller than this share of the median (also covers MAD == 0).
+OUTLIER_MIN_DEVIATION = Decimal("0.2")
+OUTLIER_MIN_SAMPLES = 4
+
+_MAX_RATE = Decimal("9999.99")
+_CENT = Decimal("0.01")
+
+MILEAGE_TIERS = (MileageLog, MileageLogArchive)
+
+
+def _latest_log(model, field: str) -> Subquery:
+    """`field` of the vehicle's latest log in `model` on or before fill_date."""
+    return Subquery(
+        model.objects.filter(
+            vehicle_id=OuterRef("vehicle_id"),
+            recorded_at__lte=OuterRef("fill_date"),
+        )
+        .order_by("-recorded_at", "-created_at")
+        .values(field)[:1]
+    )
+
+
+def _fill_points(vehicle_id, since: date | None):
+    """Fuel fills with their odometer reading and the previous fill's reading.
+
+    One query: the odometer is a correlated subquery, the previous fill is a
+    LAG() window over the same rows.
+    """
+    fills = Expense.objects.filter(
+        vehicle_id=vehicle_id,
+        category__code=FUEL_CODE,
+        fuel_detail__liters__gt=0,
+    )
+    if since is not None:
+        anchor = fills.filter(expense_date__date__lt=since).aggregate(
+            d=Max("expense_date")
+        )["d"]
+        if anchor is not None:
+            fills = fills.filter(expense_date__gte=anchor)
+
+    # The nearer of the latest hot and the latest archived log.
+    odometer = Case(
+        When(
+            Q(hot_day__isnull=True) | Q(cold_day__gt=F("hot_day")),
+            then=F("cold_km"),
+        ),
+        default=F("hot_km"),
+    )
+    order = [F("expense_date").asc(), F("created_at").asc()]
+    return (
+        fills.annotate(fill_date=TruncDate("expense_date"))
+        .annotate(
+            hot_day=_latest_log(MileageLog, "recorded_at"),
+            hot_km=_latest_log(MileageLog, "km"),
+            cold_day=_latest_log(MileageLogArchive, "recorded_at"),
+            cold_km=_latest_log(MileageLogArchive, "km"),
+        )
+        .annotate(odometer=odometer)
+        .filter(odometer__isnull=False)
+        .annotate(
+            prev_km=Window(Lag("odometer"), order_by=order),
+            prev_date=Window(Lag("fill_date"), order_by=order),
+        )
+        .order_by(*order)
+        .values(
+            "id", "fill_date", "odometer", "prev_km", "prev_date", "fuel_detail__liters"
+        )
+    )
+
+
+def _rate(liters: Decimal, distance: int) -> Decimal:
+    rate = (liters * 100 / distance).quantize(_CENT, rounding=ROUND_HALF_UP)
+    return min(rate, _MAX_RATE)
+
+
+def _flag_outliers(vehicle_id) -> None:
+    qs = FuelConsumption.objects.filter(vehicle_id=vehicle_id)
+    values = list(qs.values_list("id", "l_per_100km"))
+    outliers = set()
+    if len(values) >= OUTLIER_MIN_SAMPLES:
+        med = median(v for _, v in values)
+        mad = median(abs(v - med) for _, v in values)
+        for pk, value in values:
+            deviation = abs(value - med)
+            if deviation <= med * OUTLIER_MIN_DEVIATION:
+                continue
+            if mad == 0 or Decimal("0.6745") * deviation / mad > OUTLIER_Z:
+                outliers.add(pk)
+
+    qs.filter(pk__in=outliers, is_outlier=False).update(is_outlier=True)
+    qs.filter(is_outlier=True).exclude(pk__in=outliers).update(is_outlier=False)
+
+
+@transaction.atomic
+def refresh_fuel_consumption(vehicle_id, since: date | None = None) -> int:
+    """Rebuild consumption intervals ending on/after ``since`` (all if None).
+
+    Returns the number of intervals written.
+    """
+    stale = FuelConsumption.objects.filter(vehicle_id=vehicle_id)
+    if since is not None:
+        stale = stale.filter(period_end__gte=since)
+    stale.delete()
+
+    intervals = []
+    for point in _fill_points(vehicle_id, since):
+        if point["prev_km"] is None or point["odometer"] <= point["prev_km"]:
+            continue
+        if since is not None and point["fill_date"] < since:
+            continue
+        distance = point["odometer"] - point["prev_km"]
+        liters = point["fuel_detail__liters"]
+        intervals.append(
+            FuelConsumption(
+                vehicle_id=vehicle_id,
+                expense_id=point["id"],
+                period_start=point["prev_date"],
+                period_end=point["fill_date"],
+                start_km=point["prev_km"],
+                end_km=point["odometer"],
+                liters=liters,
+                l_per_100km=_rate(liters, distance),
+            )
+        )
+    FuelConsumption.objects.bulk_create(intervals)
+    _flag_outliers(vehicle_id)
+
+    logger.info(
+        "Fuel consumption refreshed",
+        extra={
+            "operation_type": "FUEL_CONSUMPTION_REFRESH",
+            "service": "DJANGO",
+            "vehicle_id": str(vehicle_id),
+            "since": since.isoformat() if since else None,
+            "intervals": len(intervals),
+        },
+    )
+    return len(intervals)
+
+
+def _earliest(by_vehicle: dict, vehicle_id, day: date) -> None:
+    current = by_vehicle.get(vehicle_id)
+    by_vehicle[vehicle_id] = day if current is None else min(current, day)
+
+
+def refresh_for_expenses(changes) -> None:
+    """Refresh analytics after expenses changed.
+
+    ``changes`` is an iterable of (vehicle_id, category_code, expense_date).
+    Each vehicle is refreshed once from its earliest affected date; fuel
+    consumption only when a FUEL expense is involved.
+    """
+    cost_since: dict = {}
+    fuel_since: dict = {}
+    for vehicle_id, code, expense_date in changes:
+        if vehicle_id is None or expense_date is None:
+            continue
+        day = timezone.localdate(expense_date)
+        _earliest(cost_since, vehicle_id, day)
+        if code == FUEL_CODE:
+            _earliest(fuel_since, vehicle_id, day)
+    for vehicle_id, since in fuel_since.items():
+        refresh_fuel_consumption(vehicle_id, since=since)
+    for vehicle_id, since in cost_since.items():
+        refresh_vehicle_costs(vehicle_id, since=since)
+
+
+def refresh_for_mileage(vehicle_id, since: date | None) -> None:
+    """Refresh analytics after a mileage log dated ``since`` was recorded,
+    edited or deleted (everything if None)."""
+    refresh_fuel_consumption(vehicle_id, since=since)
+    refresh_vehicle_costs(vehicle_id, since=since)
+
+
+def refresh_for_mileage_logs(changes) -> None:
+    """Bulk variant of refresh_for_mileage(): ``changes`` is an iterable of
+    (vehicle_id, recorded_at); each vehicle is refreshed once from its
+    earliest affected date."""
+    since: dict = {}
+    for vehicle_id, recorded_at in changes:
+        _earliest(since, vehicle_id, recorded_at)
+    for vehicle_id, day in since.items():
+        refresh_for_mileage(vehicle_id, since=day)
+
+
+def fleet_consumption_summary(date_from=None, date_to=None):
+    """Per-vehicle consumption over the materialized intervals.
+
+    The average is distance-weighted (total liters / total km) and leaves
+    outlier intervals out; they are only counted.
+    """
+    qs = FuelConsumption.objects.all()
+    if date_from:
+        qs = qs.filter(period_end__gte=date_from)
+    if date_to:
+        qs = qs.filter(period_end__lte=date_to)
+    normal = Q(is_outlier=False)
+    return (
+        qs.values(
+            "vehicle_id",
+            "vehicle__car_number",
+            "vehicle__manufacturer",
+            "vehicle__model",
+        )
+        .annotate(
+            intervals=Count("id"),
+            outliers=Count("id", filter=Q(is_outlier=True)),
+            liters=Sum("liters", filter=normal),
+            distance_km=Sum(F("end_km") - F("start_km"), filter=normal),
+            last_fill=Max("period_end"),
+        )
+        .order_by("vehicle__car_number")
+    )
+
+
+# ── Cost of ownership ────────────────────────────────────────────────────────
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _rebuild_daily(vehicle_id, since: date | None) -> None:
+    daily = VehicleCostDaily.objects.filter(vehicle_id=vehicle_id)
+    expenses = Expense.objects.filter(vehicle_id=vehicle_id, exclude_from_cost=False)
+    tiers = [model.objects.filter(vehicle_id=vehicle_id) for model in MILEAGE_TIERS]
+    lowest = [logs.aggregate(m=Min("km"))["m"] for logs in tiers]
+    base_km = min((km for km in lowest if km is not None), default=None)
+
+    previous = None
+    if since is not None:
+        previous = daily.filter(day__lt=since).order_by("-day").first()
+        daily = daily.filter(day__gte=since)
+        expenses = expenses.filter(expense_date__date__gte=since)
+        tiers = [logs.filter(recorded_at__gte=since) for logs in tiers]
+    daily.delete()
+
+    spent = dict(
+        expenses.annotate(day=TruncDate("expense_date"))
+        .values("day")
+        .annotate(total=Sum("amount"))
+        .order_by()
+        .values_list("day", "total")
+    )
+    odometer = {}
+    for logs in tiers:
+        for day, km in (
+            logs.values("recorded_at")
+            .annotate(km=Max("km"))
+            .order_by()
+            .values_list("recorded_at", "km")
+        ):
+            odometer[day] = max(km, odometer.get(day, km))
+
+    cumulative = previous.cumulative_expenses if previous else Decimal("0")
+    km = previous.odometer_km if previous else None
+    rows = []
+    for day in sorted(spent.keys() | odometer.keys()):
+        amount = spent.get(day) or Decimal("0")
+        cumulative += amount
+        km = odometer.get(day, km)
+        rows.append(
+            VehicleCostDaily(
+                vehicle_id=vehicle_id,
+                day=day,
+                expenses=amount,
+                cumulative_expenses=cumulative,
+                odometer_km=km,
+                km_driven=km - base_km if km is not None else 0,
+            )
+        )
+    VehicleCostDaily.objects.bulk_create(rows)
+
+
+def _rebuild_monthly(vehicle_id, since: date | None, until: date) -> None:
+    monthly = VehicleCostMonthly.objects.filter(vehicle_id=vehicle_id)
+    days = VehicleCostDaily.objects.filter(vehicle_id=vehicle_id).order_by("day")
+
+    start = _month_start(since) if since is not None else None
+    previous = None
+    if start is not None:
+        monthly = monthly.filter(month__gte=start)
+        previous = days.filter(day__lt=start).last()
+        days = days.filter(day__gte=start)
+    monthly.delete()
+
+    days = list(days)
+    if previous is None and not days:
+        return
+    month = start or _month_start(days[0].day)
+    last = previous
+    rows = []
+    pos = 0
+    while month <= until:
+        next_month = _next_month(month)
+        spent = Decimal("0")
+        while pos < len(days) and days[pos].day < next_month:
+            spent += days[pos].expenses
+            last = days[pos]
+            pos += 1
+        if last is not None:
+            rows.append(
+                VehicleCostMonthly(
+                    vehicle_id=vehicle_id,
+                    month=month,
+                    expenses=spent,
+                    cumulative_expenses=last.cumulative_expenses,
+                    odometer_km=last.odometer_km,
+                    km_driven=last.km_driven,
+                )
+            )
+        month = next_month
+    VehicleCostMonthly.objects.bulk_create(rows)
+
+
+@transaction.atomic
+def refresh_vehicle_costs(vehicle_id, since: date | None = None) -> None:
+    """Rebuild daily rows from ``since`` and monthly rows from its month
+    up to the current month (full rebuild if ``since`` is None)."""
+    _rebuild_daily(vehicle_id, since)
+    _rebuild_monthly(vehicle_id, since, _month_start(timezone.localdate()))
+    logger.info(
+        "Vehicle cost series refreshed",
+        extra={
+            "operation_type": "VEHICLE_COST_REFRESH",
+            "service": "DJANGO",
+            "vehicle_id": str(vehicle_id),
+            "since": since.isoformat() if since else None,
+        },
+    )
+
+
+def extend_monthly_series(until: date | None = None) -> int:
+    """Carry every vehicle's last monthly row forward to ``until`` (current
+    month by default) so fleet trends have no trailing gaps. Run monthly."""
+    until = _month_start(until or timezone.localdate())
+    last_month = (
+        VehicleCostMonthly.objects.filter(vehicle_id=OuterRef("vehicle_id"))
+        .order_by("-month")
+        .values("month")[:1]
+    )
+    rows = []
+    for last in VehicleCostMonthly.objects.filter(
+        month=Subquery(last_month), month__lt=until
+    ):
+        month = _next_month(last.month)
+        while month <= until:
+            rows.append(
+                VehicleCostMonthly(
+                    vehicle_id=last.vehicle_id,
+                    month=month,
+                    expenses=Decimal("0"),
+                    cumulative_expenses=last.cumulative_expenses,
+                    odometer_km=last.odometer_km,
+                    km_driven=last.km_driven,
+                )
+            )
+            month = _next_month(month)
+    VehicleCostMonthly.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def fleet_cost_trend(group_by: str, date_from=None, date_to=None):
+    """Monthly fleet totals per manufacturer (or manufacturer + model)."""
+    qs = VehicleCostMonthly.objects.filter(vehicle__is_archived=False)
+    if date_from:
+        qs = qs.filter(month__gte=_month_start(date_from))
+    if date_to:
+        qs = qs.filter(month__lte=date_to)
+    group = ["month", "vehicle__manufacturer"]
+    if group_by == "model":
+        group.append("vehicle__model")
+    return (
+        qs.values(*group)
+        .annotate(
+            vehicles=Count("vehicle_id"),
+            expenses=Sum("expenses"),
+            cumulative_expenses=Sum("cumulative_expenses"),
+            purchase_cost=Sum("vehicle__cost"),
+            km_driven=Sum("km_driven"),
+        )
+        .order_by(*group)
+    )
@@ -37,3 +37,23 @@ class ApprovalStatus(models.TextChoices):
     SENT = "SENT", "Sent"
     REVIEW = "REVIEW", "Review"
     APPROVED = "APPROVED", "Approved"
+
+
+# Allowed approval_status moves: current → targets. SENT → DRAFT is "reject".
+APPROVAL_TRANSITIONS = {
+    ApprovalStatus.DRAFT: [ApprovalStatus.SENT],
+    ApprovalStatus.SENT: [ApprovalStatus.REVIEW, ApprovalStatus.DRAFT],
+    ApprovalStatus.REVIEW: [ApprovalStatus.APPROVED],
+}
+
+
+class ImportBatchStatus(models.TextChoices):
+    STAGED = "STAGED", "Staged"
+    COMMITTED = "COMMITTED", "Committed"
+
+
+class ImportRowStatus(models.TextChoices):
+    VALID = "VALID", "Valid"
+    DUPLICATE = "DUPLICATE", "Duplicate"
+    ERROR = "ERROR", "Error"
+    IMPORTED = "IMPORTED", "Imported"
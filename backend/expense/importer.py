@@ -0,0 +1,419 @@
+"""
+Bulk expense import from CSV files (fuel-card exports, bank statements).
+
+Pipeline
+--------
+1. stage_csv()    → stream the file in chunks; each chunk is parsed, then
+                    validated with set-based lookups (one query for vehicles,
+                    one for duplicate candidates) and written to
+                    ExpenseImportRow with bulk_create.
+2. build report   → ExpenseImportBatchSerializer (dry-run: nothing is imported).
+3. commit_batch() → VALID rows become Expense + detail rows (DETAIL_MAP) via
+                    bulk_create, one chunk at a time, in a single transaction.
+
+Expected columns (header names are case-insensitive):
+    car_number, category, expense_date, amount          — required
+    payment_method, expense_for                         — optional
+    any scalar detail field from DETAIL_MAP             — optional
+"""
+
+from collections import defaultdict
+import csv
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+import io
+from itertools import chain, islice
+import logging
+import re
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from config import cache_utils
+from vehicle.models import Vehicle
+
+from . import analytics
+from .constants import (
+    FuelType,
+    ImportBatchStatus,
+    ImportRowStatus,
+    PayerType,
+    PaymentMethod,
+    SupplierType,
+    WashType,
+)
+from .models import (
+    Expense,
+    ExpenseCategory,
+    ExpenseImportBatch,
+    ExpenseImportRow,
+    FineExpenseDetail,
+)
+from .serializers import DETAIL_MAP
+from .services import attribute_fine_drivers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+REQUIRED_COLUMNS = ("car_number", "category", "expense_date", "amount")
+
+# Relations and files can't come from a CSV cell — they are filled in later.
+_NON_SCALAR_DETAIL_FIELDS = {"service", "driver_at_time", "registration_certificate"}
+
+_DATE_FIELDS = {"fine_date", "inspection_date", "next_inspection_date"}
+# Detail decimal field → max_digits of its model column (2 decimal places).
+_DECIMAL_FIELDS = {"official_cost": 10, "additional_cost": 10, "liters": 8}
+_CHOICE_FIELDS = {
+    "wash_type": {c.value for c in WashType},
+    "supplier_type": {c.value for c in SupplierType},
+}
+_FUEL_TYPES = {c.value for c in FuelType}
+_LIST_SEPARATORS = re.compile(r"[;|/]")
+
+
+# ── Parsing helpers ──────────────────────────────────────────────────────────
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _text_stream(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(
+        getattr(stream, "file", stream), encoding="utf-8-sig", newline=""
+    )
+
+
+def _parse_date(value: str) -> date:
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+    for fmt in ("%d.%m.%Y", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value!r}.")
+
+
+def _parse_decimal(value: str, max_digits: int = 10) -> Decimal:
+    """A non-negative amount that fits a DecimalField(max_digits, 2) column.
+
+    Raises ValueError rather than rounding: "12.345" or "1,234" (read as
+    1.234) are row errors, not 12.34 / 1.23.
+    """
+    cleaned = value.strip().replace("\xa0", "").replace(" ", "")
+    # With both separators the last one is the decimal point:
+    # "1,234.56" and "1.234,56" are both 1234.56.
+    if cleaned.rfind(",") > cleaned.rfind("."):
+        cleaned = cleaned.replace(".", "").replace(",", ".")
+    else:
+        cleaned = cleaned.replace(",", "")
+    try:
+        number = Decimal(cleaned)
+    except InvalidOperation:
+        raise ValueError(f"Invalid number: {value!r}.") from None
+    if not number.is_finite():
+        raise ValueError(f"Invalid number: {value!r}.")
+    if number < 0:
+        raise ValueError("Must be >= 0.")
+    if number and number.adjusted() >= max_digits - 2:
+        raise ValueError(f"At most {max_digits - 2} digits before the decimal point.")
+    if number != number.quantize(Decimal("0.01")):
+        raise ValueError("At most 2 decimal places.")
+    return number.quantize(Decimal("0.01"))
+
+
+def _detail_fields(code: str | None) -> list[str]:
+    cfg = DETAIL_MAP.get(code)
+    if cfg is None:
+        return []
+    return [f for f in cfg["fields"] if f not in _NON_SCALAR_DETAIL_FIELDS]
+
+
+def _parse_detail(code: str, raw: dict, errors: list) -> dict:
+    """Parse detail columns into a JSON-safe dict (dates/decimals as strings)."""
+    detail = {}
+    for field in _detail_fields(code):
+        value = (raw.get(field) or "").strip()
+        if not value:
+            continue
+        try:
+            if field == "fuel_types":
+                types = [t.strip().upper() for t in _LIST_SEPARATORS.split(value)]
+                invalid = [t for t in types if t not in _FUEL_TYPES]
+                if invalid:
+                    raise ValueError(f"Invalid fuel types: {', '.join(invalid)}")
+                detail[field] = types
+            elif field in _DATE_FIELDS:
+                detail[field] = _parse_date(value).isoformat()
+            elif field in _DECIMAL_FIELDS:
+                detail[field] = str(_parse_decimal(value, _DECIMAL_FIELDS[field]))
+            elif field in _CHOICE_FIELDS:
+                if value.upper() not in _CHOICE_FIELDS[field]:
+                    raise ValueError(f"Invalid value: {value!r}.")
+                detail[field] = value.upper()
+            else:
+                detail[field] = value
+        except (ValueError, InvalidOperation) as e:
+            errors.append(f"{field}: {e}")
+
+    for field in DETAIL_MAP.get(code, {}).get("required", []):
+        if field not in detail and field not in _NON_SCALAR_DETAIL_FIELDS:
+            errors.append(f"{field}: Required for {code} expenses.")
+    return detail
+
+
+def _parse_row(number: int, raw: dict, categories: dict) -> ExpenseImportRow:
+    """Per-row parsing only — no queries. Lookups happen per chunk."""
+    raw = {(k or "").strip().lower(): (v or "").strip() for k, v in raw.items()}
+    errors = []
+    row = ExpenseImportRow(row_number=number, raw=raw, errors=errors)
+
+    code = raw.get("category", "").upper()
+    row.category = categories.get(code)
+    if row.category is None:
+        errors.append(f"category: Unknown category code {code!r}.")
+
+    try:
+        day = _parse_date(raw.get("expense_date", ""))
+        row.expense_date = timezone.make_aware(datetime.combine(day, time.min))
+    except ValueError as e:
+        errors.append(f"expense_date: {e}")
+
+    try:
+        row.amount = _parse_decimal(raw.get("amount", ""))
+    except (ValueError, InvalidOperation) as e:
+        errors.append(f"amount: {e}")
+
+    method = raw.get("payment_method", "").upper()
+    if method:
+        if method in PaymentMethod.values:
+            row.payment_method = method
+        else:
+            errors.append(f"payment_method: Invalid value {method!r}.")
+    row.expense_for = raw.get("expense_for", "")[:200]
+
+    if row.category is not None:
+        row.detail = _parse_detail(code, raw, errors)
+
+    # Stash the normalized plate for the chunk-level vehicle lookup.
+    row._car_number = raw.get("car_number", "").replace(" ", "").upper()
+    if not row._car_number:
+        errors.append("car_number: Required.")
+    return row
+
+
+# ── Staging ──────────────────────────────────────────────────────────────────
+
+
+def _duplicate_key(vehicle_id, expense_date: datetime, amount: Decimal):
+    return (vehicle_id, timezone.localdate(expense_date), amount)
+
+
+def _existing_keys(rows: list[ExpenseImportRow]) -> set:
+    """One query: all expenses that could collide with any row in the chunk."""
+    candidates = [r for r in rows if not r.errors]
+    if not candidates:
+        return set()
+    days = [timezone.localdate(r.expense_date) for r in candidates]
+    existing = Expense.objects.filter(
+        vehicle_id__in={r.vehicle_id for r in candidates},
+        amount__in={r.amount for r in candidates},
+        expense_date__date__gte=min(days),
+        expense_date__date__lte=max(days),
+    ).values_list("vehicle_id", "expense_date", "amount")
+    return {_duplicate_key(*values) for values in existing}
+
+
+def _stage_chunk(batch, chunk, categories: dict, seen: set) -> None:
+    rows = [_parse_row(number, raw, categories) for number, raw in chunk]
+
+    plates = {r._car_number for r in rows if r._car_number}
+    vehicles = dict(
+        Vehicle.objects.filter(car_number__in=plates).values_list("car_number", "id")
+    )
+    for row in rows:
+        row.batch = batch
+        row.vehicle_id = vehicles.get(row._car_number)
+        if row._car_number and row.vehicle_id is None:
+            row.errors.append(f"car_number: Vehicle {row._car_number!r} not found.")
+
+    existing = _existing_keys(rows)
+    for row in rows:
+        if row.errors:
+            row.status = ImportRowStatus.ERROR
+            continue
+        key = _duplicate_key(row.vehicle_id, row.expense_date, row.amount)
+        if key in existing or key in seen:
+            row.status = ImportRowStatus.DUPLICATE
+            row.errors.append("Duplicate of an existing expense (vehicle/date/amount).")
+        else:
+            row.status = ImportRowStatus.VALID
+            seen.add(key)
+
+    ExpenseImportRow.objects.bulk_create(rows)
+
+
+def _refresh_counters(batch: ExpenseImportBatch) -> None:
+    counts = dict(batch.rows.values_list("status").annotate(n=Count("id")).order_by())
+    batch.valid_rows = counts.get(ImportRowStatus.VALID, 0)
+    batch.duplicate_rows = counts.get(ImportRowStatus.DUPLICATE, 0)
+    batch.error_rows = counts.get(ImportRowStatus.ERROR, 0)
+    batch.imported_rows = counts.get(ImportRowStatus.IMPORTED, 0)
+    batch.total_rows = sum(counts.values())
+
+
+@transaction.atomic
+def stage_csv(
+    stream, *, user=None, source_name: str = "", chunk_size=DEFAULT_CHUNK_SIZE
+) -> ExpenseImportBatch:
+    """Parse and validate a CSV stream into a new STAGED batch (dry run).
+
+    Raises ValueError when the header is missing required columns. A failure
+    part-way through (e.g. UnicodeDecodeError) leaves no partial batch behind.
+    """
+    stream = _text_stream(stream)
+    header = stream.readline()
+    delimiter = max(",;\t", key=header.count)
+    reader = csv.DictReader(chain([header], stream), delimiter=delimiter)
+    columns = {(name or "").strip().lower() for name in reader.fieldnames or []}
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    categories = {
+        c.code: c
+        for c in ExpenseCategory.objects.filter(is_active=True, code__isnull=False)
+    }
+    batch = ExpenseImportBatch.objects.create(
+        source_name=source_name[:255], created_by=user
+    )
+    seen: set = set()
+    for chunk in _chunks(enumerate(reader, start=2), chunk_size):
+        _stage_chunk(batch, chunk, categories, seen)
+
+    _refresh_counters(batch)
+    batch.save(
+        update_fields=[
+            "total_rows",
+            "valid_rows",
+            "duplicate_rows",
+            "error_rows",
+            "imported_rows",
+        ]
+    )
+    logger.info(
+        "Expense import staged",
+        extra={
+            "operation_type": "EXPENSE_IMPORT_STAGE",
+            "service": "DJANGO",
+            "batch_id": str(batch.id),
+            "total_rows": batch.total_rows,
+            "valid_rows": batch.valid_rows,
+            "duplicate_rows": batch.duplicate_rows,
+            "error_rows": batch.error_rows,
+        },
+    )
+    return batch
+
+
+# ── Commit ───────────────────────────────────────────────────────────────────
+
+
+def _build_detail(expense: Expense, code: str | None, data: dict):
+    cfg = DETAIL_MAP.get(code)
+    if cfg is None:
+        return None
+    model_cls = cfg["model"]
+    kwargs = {
+        field: model_cls._meta.get_field(field).to_python(value)
+        for field, value in data.items()
+        if field in _detail_fields(code)
+    }
+    return model_cls(expense=expense, **kwargs)
+
+
+@transaction.atomic
+def commit_batch(
+    batch: ExpenseImportBatch, *, user=None, chunk_size=DEFAULT_CHUNK_SIZE
+) -> ExpenseImportBatch:
+    """Turn every VALID staged row into an Expense (+ detail row).
+
+    Imported expenses are COMPANY-paid. INSPECTION rows do not create a linked
+    TechnicalInspection — attach one from the UI if needed.
+    """
+    batch = ExpenseImportBatch.objects.select_for_update().get(pk=batch.pk)
+    if batch.status != ImportBatchStatus.STAGED:
+        raise ValueError("Import batch is already committed.")
+
+    rows = (
+        batch.rows.filter(status=ImportRowStatus.VALID)
+        .select_related("category")
+        .order_by("row_number")
+    )
+    vehicle_ids = set()
+    fuel_changes = []
+    for chunk in _chunks(rows.iterator(chunk_size=chunk_size), chunk_size):
+        expenses = []
+        details = defaultdict(list)
+        for row in chunk:
+            expense = Expense(
+                vehicle_id=row.vehicle_id,
+                category=row.category,
+                expense_date=row.expense_date,
+                amount=row.amount,
+                payment_method=row.payment_method,
+                payer_type=PayerType.COMPANY,
+                expense_for=row.expense_for,
+                created_by=user,
+                edited_by=user,
+            )
+            expenses.append(expense)
+            detail = _build_detail(expense, row.category.code, row.detail)
+            if detail is not None:
+                details[type(detail)].append(detail)
+            row.expense = expense
+            row.status = ImportRowStatus.IMPORTED
+            vehicle_ids.add(row.vehicle_id)
+            fuel_changes.append((row.vehicle_id, row.category.code, row.expense_date))
+
+        Expense.objects.bulk_create(expenses)
+        # Fines get their driver from the ownership intervals (one query per chunk).
+        attribute_fine_drivers(details.get(FineExpenseDetail, []))
+        for model_cls, objs in details.items():
+            model_cls.objects.bulk_create(objs)
+        ExpenseImportRow.objects.bulk_update(chunk, ["expense", "status"])
+
+    # One refresh per vehicle, from the earliest imported fill.
+    analytics.refresh_for_expenses(fuel_changes)
+
+    _refresh_counters(batch)
+    batch.status = ImportBatchStatus.COMMITTED
+    batch.committed_at = timezone.now()
+    batch.save(update_fields=["status", "committed_at", "valid_rows", "imported_rows"])
+
+    def _invalidate():
+        cache_utils.invalidate_expense()
+        cache_utils.invalidate_vehicles(vehicle_ids)
+
+    transaction.on_commit(_invalidate)
+    logger.info(
+        "Expense import committed",
+        extra={
+            "operation_type": "EXPENSE_IMPORT_COMMIT",
+            "service": "DJANGO",
+            "batch_id": str(batch.id),
+            "imported_rows": batch.imported_rows,
+            "user_id": str(user.id) if user else None,
+        },
+    )
+    return batch
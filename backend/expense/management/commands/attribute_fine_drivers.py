@@ -0,0 +1,34 @@
+"""
+Fill FineExpenseDetail.driver_at_time from vehicle ownership history for
+fines that have no driver yet. New fines are attributed on save/import;
+run this after back-filling OwnerHistory.
+Use: python manage.py attribute_fine_drivers [--chunk-size 1000]
+"""
+
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from expense.models import FineExpenseDetail
+from expense.services import attribute_fine_drivers
+
+
+class Command(BaseCommand):
+    help = "Attribute drivers to fines from ownership history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        details = (
+            FineExpenseDetail.objects.filter(driver_at_time__isnull=True)
+            .select_related("expense")
+            .iterator(chunk_size=chunk_size)
+        )
+        total = 0
+        while chunk := list(islice(details, chunk_size)):
+            attributed = attribute_fine_drivers(chunk)
+            FineExpenseDetail.objects.bulk_update(attributed, ["driver_at_time"])
+            total += len(attributed)
+        self.stdout.write(self.style.SUCCESS(f"Attributed {total} fines."))
@@ -0,0 +1,73 @@
+"""
+Import expenses from a CSV file (fuel-card export, bank statement).
+Without --commit only a dry-run report is printed; the staged batch can be
+committed later via --batch or POST /api/v1/expense/import/<id>/commit/.
+Use: python manage.py import_expenses statement.csv [--commit]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expense.constants import ImportRowStatus
+from expense.importer import DEFAULT_CHUNK_SIZE, commit_batch, stage_csv
+from expense.models import ExpenseImportBatch
+
+
+class Command(BaseCommand):
+    help = "Stage (dry run) or import expenses from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", type=str, help="Path to CSV file")
+        parser.add_argument(
+            "--commit",
+            action="store_true",
+            help="Import valid rows after staging.",
+        )
+        parser.add_argument(
+            "--batch",
+            type=str,
+            help="Commit an already staged batch by id instead of reading a file.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        if options.get("batch"):
+            batch = ExpenseImportBatch.objects.filter(pk=options["batch"]).first()
+            if batch is None:
+                raise CommandError(f"Import batch {options['batch']} not found.")
+        elif options.get("path"):
+            try:
+                with open(options["path"], encoding="utf-8-sig", newline="") as f:
+                    batch = stage_csv(
+                        f, source_name=options["path"], chunk_size=chunk_size
+                    )
+            except (OSError, ValueError) as e:
+                raise CommandError(str(e)) from e
+            self._print_report(batch)
+            if not options["commit"]:
+                self.stdout.write(
+                    self.style.WARNING(f"Dry run only. Commit with: --batch {batch.id}")
+                )
+                return
+        else:
+            raise CommandError("Give a CSV path or --batch <id>.")
+
+        try:
+            batch = commit_batch(batch, chunk_size=chunk_size)
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {batch.imported_rows} expenses.")
+        )
+
+    def _print_report(self, batch):
+        self.stdout.write(
+            f"Batch {batch.id}: {batch.total_rows} rows — "
+            f"{batch.valid_rows} valid, {batch.duplicate_rows} duplicates, "
+            f"{batch.error_rows} errors."
+        )
+        problems = batch.rows.filter(
+            status__in=[ImportRowStatus.ERROR, ImportRowStatus.DUPLICATE]
+        ).values_list("row_number", "errors")[:50]
+        for row_number, errors in problems:
+            self.stdout.write(f"  row {row_number}: {'; '.join(errors)}")
@@ -0,0 +1,33 @@
+"""
+Rebuild materialized fuel consumption intervals from scratch.
+Day-to-day refreshes are incremental; run this once after deploy or after
+bulk data fixes done outside the API.
+Use: python manage.py refresh_fuel_consumption [--vehicle <uuid>]
+"""
+
+from django.core.management.base import BaseCommand
+
+from expense.analytics import FUEL_CODE, refresh_fuel_consumption
+from expense.models import Expense
+
+
+class Command(BaseCommand):
+    help = "Rebuild fuel consumption intervals (L/100km) for all or one vehicle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vehicle", type=str, help="Vehicle id")
+
+    def handle(self, *args, **options):
+        vehicle_ids = (
+            Expense.objects.filter(category__code=FUEL_CODE)
+            .values_list("vehicle_id", flat=True)
+            .distinct()
+            .order_by()
+        )
+        if options.get("vehicle"):
+            vehicle_ids = [options["vehicle"]]
+
+        total = 0
+        for vehicle_id in vehicle_ids:
+            total += refresh_fuel_consumption(vehicle_id)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} intervals."))
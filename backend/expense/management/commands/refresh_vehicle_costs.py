@@ -0,0 +1,39 @@
+"""
+Rebuild or extend the cost-of-ownership series.
+Day-to-day refreshes are incremental. Run with --extend from cron at the
+start of each month so vehicles without new events still appear in the
+fleet trend for the new month; run without flags once after deploy.
+Use: python manage.py refresh_vehicle_costs [--vehicle <uuid>] [--extend]
+"""
+
+from django.core.management.base import BaseCommand
+
+from expense.analytics import extend_monthly_series, refresh_vehicle_costs
+from vehicle.models import Vehicle
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or carry forward) daily/monthly vehicle cost series."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vehicle", type=str, help="Vehicle id")
+        parser.add_argument(
+            "--extend",
+            action="store_true",
+            help="Only carry monthly rows forward to the current month.",
+        )
+
+    def handle(self, *args, **options):
+        if options["extend"]:
+            created = extend_monthly_series()
+            self.stdout.write(self.style.SUCCESS(f"Added {created} monthly rows."))
+            return
+
+        vehicle_ids = Vehicle.objects.values_list("id", flat=True)
+        if options.get("vehicle"):
+            vehicle_ids = [options["vehicle"]]
+        count = 0
+        for vehicle_id in vehicle_ids:
+            refresh_vehicle_costs(vehicle_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} vehicles."))
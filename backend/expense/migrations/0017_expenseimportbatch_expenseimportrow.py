@@ -0,0 +1,160 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:33
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expense", "0016_expense_exclude_from_cost"),
+        ("vehicle", "0016_alter_vehicle_fuel_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExpenseImportBatch",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("source_name", models.CharField(blank=True, max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("STAGED", "Staged"), ("COMMITTED", "Committed")],
+                        default="STAGED",
+                        max_length=20,
+                    ),
+                ),
+                ("total_rows", models.PositiveIntegerField(default=0)),
+                ("valid_rows", models.PositiveIntegerField(default=0)),
+                ("duplicate_rows", models.PositiveIntegerField(default=0)),
+                ("error_rows", models.PositiveIntegerField(default=0)),
+                ("imported_rows", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("committed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="expense_import_batches",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ExpenseImportRow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row_number", models.PositiveIntegerField()),
+                ("raw", models.JSONField(default=dict)),
+                ("expense_date", models.DateTimeField(blank=True, null=True)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, max_digits=10, null=True),
+                ),
+                (
+                    "payment_method",
+                    models.CharField(
+                        choices=[("CASH", "Cash"), ("CASHLESS", "Cashless")],
+                        default="CASHLESS",
+                        max_length=20,
+                    ),
+                ),
+                ("expense_for", models.CharField(blank=True, max_length=200)),
+                (
+                    "detail",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Category detail fields (see DETAIL_MAP).",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("VALID", "Valid"),
+                            ("DUPLICATE", "Duplicate"),
+                            ("ERROR", "Error"),
+                            ("IMPORTED", "Imported"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("errors", models.JSONField(default=list)),
+                (
+                    "batch",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rows",
+                        to="expense.expenseimportbatch",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="expense.expensecategory",
+                    ),
+                ),
+                (
+                    "expense",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="expense.expense",
+                    ),
+                ),
+                (
+                    "vehicle",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="vehicle.vehicle",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["batch", "row_number"],
+                "indexes": [
+                    models.Index(
+                        fields=["batch", "status"], name="idx_import_row_status"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("batch", "row_number"), name="unique_import_row_number"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expense", "0017_expenseimportbatch_expenseimportrow"),
+        ("vehicle", "0016_alter_vehicle_fuel_type"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FuelConsumption",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("period_end", models.DateField()),
+                ("start_km", models.PositiveIntegerField()),
+                ("end_km", models.PositiveIntegerField()),
+                ("liters", models.DecimalField(decimal_places=2, max_digits=8)),
+                ("l_per_100km", models.DecimalField(decimal_places=2, max_digits=6)),
+                ("is_outlier", models.BooleanField(default=False)),
+                (
+                    "expense",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fuel_consumption",
+                        to="expense.expense",
+                    ),
+                ),
+                (
+                    "vehicle",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fuel_consumption",
+                        to="vehicle.vehicle",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["period_end"],
+                "indexes": [
+                    models.Index(
+                        fields=["vehicle", "period_end"],
+                        name="idx_fuel_cons_vehicle_end",
+                    )
+                ],
+            },
+        ),
+    ]
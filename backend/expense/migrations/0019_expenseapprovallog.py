@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expense", "0018_fuelconsumption"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExpenseApprovalLog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "from_status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("DRAFT", "Draft"),
+                            ("SENT", "Sent"),
+                            ("REVIEW", "Review"),
+                            ("APPROVED", "Approved"),
+                        ],
+                        max_length=20,
+                        null=True,
+                    ),
+                ),
+                (
+                    "to_status",
+                    models.CharField(
+                        choices=[
+                            ("DRAFT", "Draft"),
+                            ("SENT", "Sent"),
+                            ("REVIEW", "Review"),
+                            ("APPROVED", "Approved"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("batch_id", models.UUIDField(blank=True, db_index=True, null=True)),
+                ("changed_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "changed_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="expense_approval_logs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "expense",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="approval_logs",
+                        to="expense.expense",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-changed_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["expense", "-changed_at"],
+                        name="idx_approval_log_expense",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expense", "0019_expenseapprovallog"),
+        ("vehicle", "0017_ownerhistory_idx_owner_history_interval"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VehicleCostDaily",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "expenses",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "cumulative_expenses",
+                    models.DecimalField(decimal_places=2, max_digits=14),
+                ),
+                ("odometer_km", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "km_driven",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Km since the vehicle's first mileage log."
+                    ),
+                ),
+                (
+                    "vehicle",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cost_daily",
+                        to="vehicle.vehicle",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["vehicle", "day"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("vehicle", "day"), name="unique_vehicle_cost_day"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="VehicleCostMonthly",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(help_text="First day of the month.")),
+                (
+                    "expenses",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "cumulative_expenses",
+                    models.DecimalField(decimal_places=2, max_digits=14),
+                ),
+                ("odometer_km", models.PositiveIntegerField(blank=True, null=True)),
+                ("km_driven", models.PositiveIntegerField(default=0)),
+                (
+                    "vehicle",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cost_monthly",
+                        to="vehicle.vehicle",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["vehicle", "month"],
+                "indexes": [
+                    models.Index(fields=["month"], name="idx_vehicle_cost_month")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("vehicle", "month"), name="unique_vehicle_cost_month"
+                    )
+                ],
+            },
+        ),
+    ]
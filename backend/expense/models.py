@@ -7,6 +7,8 @@ from django.db import models
 from .constants import (
     ALLOWED_INVOICE_EXTENSIONS,
     ApprovalStatus,
+    ImportBatchStatus,
+    ImportRowStatus,
     PayerType,
     PaymentMethod,
     SupplierType,
@@ -323,3 +325,229 @@ class ServiceItem(models.Model):
 
     def __str__(self) -> str:
         return f"{self.name} — {self.price}"
+
+
+# ── Approval audit trail ──
+
+
+class ExpenseApprovalLog(models.Model):
+    """One approval_status change. Bulk actions share a batch_id."""
+
+    expense = models.ForeignKey(
+        Expense, on_delete=models.CASCADE, related_name="approval_logs"
+    )
+    from_status = models.CharField(
+        max_length=20, choices=ApprovalStatus.choices, null=True, blank=True
+    )
+    to_status = models.CharField(max_length=20, choices=ApprovalStatus.choices)
+    batch_id = models.UUIDField(null=True, blank=True, db_index=True)
+    changed_by = models.ForeignKey(
+        "account.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="expense_approval_logs",
+    )
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-changed_at"]
+        indexes = [
+            models.Index(
+                fields=["expense", "-changed_at"], name="idx_approval_log_expense"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.expense_id}: {self.from_status} → {self.to_status}"
+
+
+# ── CSV import staging ──
+
+
+class ExpenseImportBatch(models.Model):
+    """One uploaded CSV file. Rows are staged here before they become expenses."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    source_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=ImportBatchStatus.choices,
+        default=ImportBatchStatus.STAGED,
+    )
+    total_rows = models.PositiveIntegerField(default=0)
+    valid_rows = models.PositiveIntegerField(default=0)
+    duplicate_rows = models.PositiveIntegerField(default=0)
+    error_rows = models.PositiveIntegerField(default=0)
+    imported_rows = models.PositiveIntegerField(default=0)
+    created_by = models.ForeignKey(
+        "account.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="expense_import_batches",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    committed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"Import {self.source_name or self.id} ({self.status})"
+
+
+class ExpenseImportRow(models.Model):
+    """A parsed CSV row. Lookups are resolved at staging time, in bulk."""
+
+    batch = models.ForeignKey(
+        ExpenseImportBatch, on_delete=models.CASCADE, related_name="rows"
+    )
+    row_number = models.PositiveIntegerField()
+    raw = models.JSONField(default=dict)
+    vehicle = models.ForeignKey(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    category = models.ForeignKey(
+        ExpenseCategory,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    expense_date = models.DateTimeField(null=True, blank=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    payment_method = models.CharField(
+        max_length=20,
+        choices=PaymentMethod.choices,
+        default=PaymentMethod.CASHLESS,
+    )
+    expense_for = models.CharField(max_length=200, blank=True)
+    detail = models.JSONField(
+        default=dict, help_text="Category detail fields (see DETAIL_MAP)."
+    )
+    status = models.CharField(max_length=20, choices=ImportRowStatus.choices)
+    errors = models.JSONField(default=list)
+    expense = models.ForeignKey(
+        Expense,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    class Meta:
+        ordering = ["batch", "row_number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["batch", "row_number"], name="unique_import_row_number"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["batch", "status"], name="idx_import_row_status"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Row {self.row_number} [{self.status}]"
+
+
+# ── Analytics (materialized, see expense/analytics.py) ──
+
+
+class FuelConsumption(models.Model):
+    """Fill-to-fill consumption interval closed by one fuel expense.
+
+    Rows are rebuilt incrementally by expense.analytics — never edit by hand.
+    """
+
+    vehicle = models.ForeignKey(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        related_name="fuel_consumption",
+    )
+    expense = models.OneToOneField(
+        Expense, on_delete=models.CASCADE, related_name="fuel_consumption"
+    )
+    period_start = models.DateField()
+    period_end = models.DateField()
+    start_km = models.PositiveIntegerField()
+    end_km = models.PositiveIntegerField()
+    liters = models.DecimalField(max_digits=8, decimal_places=2)
+    l_per_100km = models.DecimalField(max_digits=6, decimal_places=2)
+    is_outlier = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["period_end"]
+        indexes = [
+            models.Index(
+                fields=["vehicle", "period_end"], name="idx_fuel_cons_vehicle_end"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.vehicle_id} {self.period_end}: {self.l_per_100km} L/100km"
+
+    @property
+    def distance_km(self) -> int:
+        return self.end_km - self.start_km
+
+
+class VehicleCostDaily(models.Model):
+    """Running cost/mileage totals on days where a vehicle had an expense or
+    a mileage log (sparse). Maintained by expense.analytics."""
+
+    vehicle = models.ForeignKey(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        related_name="cost_daily",
+    )
+    day = models.DateField()
+    expenses = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    cumulative_expenses = models.DecimalField(max_digits=14, decimal_places=2)
+    odometer_km = models.PositiveIntegerField(null=True, blank=True)
+    km_driven = models.PositiveIntegerField(
+        default=0, help_text="Km since the vehicle's first mileage log."
+    )
+
+    class Meta:
+        ordering = ["vehicle", "day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vehicle", "day"], name="unique_vehicle_cost_day"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.vehicle_id} {self.day}: {self.cumulative_expenses}"
+
+
+class VehicleCostMonthly(models.Model):
+    """Dense month-by-month series (no gaps) so fleet trends are a plain
+    GROUP BY month. Maintained by expense.analytics."""
+
+    vehicle = models.ForeignKey(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        related_name="cost_monthly",
+    )
+    month = models.DateField(help_text="First day of the month.")
+    expenses = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    cumulative_expenses = models.DecimalField(max_digits=14, decimal_places=2)
+    odometer_km = models.PositiveIntegerField(null=True, blank=True)
+    km_driven = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["vehicle", "month"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vehicle", "month"], name="unique_vehicle_cost_month"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["month"], name="idx_vehicle_cost_month"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.vehicle_id} {self.month:%Y-%m}: {self.cumulative_expenses}"
@@ -7,12 +7,23 @@ from rest_framework import serializers
 
 from config.storage_utils import media_url
 
-from .constants import ALLOWED_INVOICE_EXTENSIONS, ApprovalStatus, FuelType, PayerType
+from .constants import (
+    ALLOWED_INVOICE_EXTENSIONS,
+    APPROVAL_TRANSITIONS,
+    ApprovalStatus,
+    FuelType,
+    ImportBatchStatus,
+    ImportRowStatus,
+    PayerType,
+)
+from .filters import ExpenseFilter
 from .models import (
     Expense,
     ExpenseCategory,
+    ExpenseImportBatch,
     ExpensePart,
     FineExpenseDetail,
+    FuelConsumption,
     FuelExpenseDetail,
     InspectionExpenseDetail,
     Invoice,
@@ -21,6 +32,7 @@ from .models import (
     ServiceItem,
     WashingExpenseDetail,
 )
+from .services import attribute_fine_drivers
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +41,7 @@ logger = logging.getLogger(__name__)
 DETAIL_MAP = {
     "FUEL": {
         "model": FuelExpenseDetail,
-        "fields": ["fuel_types"],
+        "fields": ["fuel_types", "liters"],
         "required": ["fuel_types"],
     },
     "SERVICE": {
@@ -187,6 +199,9 @@ class ExpenseSerializer(serializers.ModelSerializer):
     fuel_types = serializers.ListField(
         child=serializers.CharField(), required=False, allow_empty=True
     )
+    liters = serializers.DecimalField(
+        max_digits=8, decimal_places=2, required=False, allow_null=True
+    )
 
     # SERVICE detail fields
     service = serializers.PrimaryKeyRelatedField(
@@ -280,6 +295,7 @@ class ExpenseSerializer(serializers.ModelSerializer):
             "exclude_from_cost",
             # FUEL
             "fuel_types",
+            "liters",
             # SERVICE
             "service",
             "service_name",
@@ -498,13 +514,8 @@ class ExpenseSerializer(serializers.ModelSerializer):
         # ── Approval status transition validation ──
         new_status = data.get("approval_status")
         if self.instance and new_status and new_status != self.instance.approval_status:
-            allowed_transitions = {
-                ApprovalStatus.DRAFT: [ApprovalStatus.SENT],
-                ApprovalStatus.SENT: [ApprovalStatus.REVIEW, ApprovalStatus.DRAFT],
-                ApprovalStatus.REVIEW: [ApprovalStatus.APPROVED],
-            }
             old_status = self.instance.approval_status
-            allowed = allowed_transitions.get(old_status, [])
+            allowed = APPROVAL_TRANSITIONS.get(old_status, [])
             if new_status not in allowed:
                 raise serializers.ValidationError(
                     {
@@ -541,7 +552,12 @@ class ExpenseSerializer(serializers.ModelSerializer):
             return
         model_cls = cfg["model"]
         model_fields = {k: v for k, v in detail_data.items() if k in cfg["fields"]}
-        model_cls.objects.update_or_create(expense=expense, defaults=model_fields)
+        detail, _ = model_cls.objects.update_or_create(
+            expense=expense, defaults=model_fields
+        )
+        if code == "FINES" and detail.driver_at_time_id is None:
+            if attribute_fine_drivers([detail]):
+                detail.save(update_fields=["driver_at_time"])
 
     def _save_parts(self, expense, validated_data):
         parts_data = validated_data.pop("_parts", None)
@@ -832,3 +848,102 @@ class ExpenseSerializer(serializers.ModelSerializer):
             rep["service_name"] = ""
 
         return rep
+
+
+# ── Bulk approval ──
+
+
+class ExpenseBulkApprovalSerializer(serializers.Serializer):
+    """Target status plus either explicit ids or ExpenseFilter params."""
+
+    MAX_IDS = 1000
+
+    approval_status = serializers.ChoiceField(choices=ApprovalStatus.choices)
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_IDS,
+    )
+    filters = serializers.DictField(required=False, allow_empty=False)
+
+    def validate_filters(self, value):
+        # ExpenseFilter ignores unknown and blank params, so a typo would
+        # silently select every expense.
+        unknown = sorted(set(value) - set(ExpenseFilter.base_filters))
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown filter(s): {', '.join(unknown)}."
+            )
+        if all(param in (None, "") for param in value.values()):
+            raise serializers.ValidationError("Filters must narrow the selection.")
+        return value
+
+    def validate(self, data):
+        if ("ids" in data) == ("filters" in data):
+            raise serializers.ValidationError("Provide either ids or filters.")
+        return data
+
+
+# ── CSV import ──
+
+
+class ExpenseImportBatchSerializer(serializers.ModelSerializer):
+    """Import report: counters plus the first rows that will not be imported."""
+
+    PROBLEM_LIMIT = 200
+
+    dry_run = serializers.SerializerMethodField()
+    problems = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExpenseImportBatch
+        fields = [
+            "id",
+            "source_name",
+            "status",
+            "dry_run",
+            "total_rows",
+            "valid_rows",
+            "duplicate_rows",
+            "error_rows",
+            "imported_rows",
+            "problems",
+            "created_at",
+            "committed_at",
+        ]
+        read_only_fields = fields
+
+    def get_dry_run(self, obj):
+        return obj.status == ImportBatchStatus.STAGED
+
+    def get_problems(self, obj):
+        rows = obj.rows.filter(
+            status__in=[ImportRowStatus.ERROR, ImportRowStatus.DUPLICATE]
+        ).values("row_number", "status", "errors")[: self.PROBLEM_LIMIT]
+        return [
+            {"row": r["row_number"], "status": r["status"], "errors": r["errors"]}
+            for r in rows
+        ]
+
+
+# ── Analytics ──
+
+
+class FuelConsumptionSerializer(serializers.ModelSerializer):
+    distance_km = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = FuelConsumption
+        fields = [
+            "expense",
+            "period_start",
+            "period_end",
+            "start_km",
+            "end_km",
+            "distance_km",
+            "liters",
+            "l_per_100km",
+            "is_outlier",
+        ]
+        read_only_fields = fields
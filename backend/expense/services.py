@@ -0,0 +1,132 @@
+from datetime import datetime, time
+import logging
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from config import cache_utils
+from vehicle.ownership import resolve_drivers
+
+from .constants import APPROVAL_TRANSITIONS, PayerType
+from .models import Expense, ExpenseApprovalLog
+
+logger = logging.getLogger(__name__)
+
+# A fine_date has no time of day; assume midday when matching handovers.
+FINE_DEFAULT_TIME = time(12, 0)
+
+# Keep the SSE payload small — the UI refetches the list anyway.
+NOTIFICATION_ID_LIMIT = 100
+
+
+def bulk_set_approval_status(queryset, target: str, *, user) -> dict:
+    """Move every eligible client-paid expense in ``queryset`` to ``target``.
+
+    Eligibility follows APPROVAL_TRANSITIONS; everything else is skipped and
+    reported back. The status change is a single UPDATE, the audit trail a
+    single bulk_create, followed by one notification and one cache bump.
+    """
+    from notification.constants import NotificationType
+    from notification.services import create_notification
+
+    sources = [s for s, targets in APPROVAL_TRANSITIONS.items() if target in targets]
+    batch_id = uuid.uuid4()
+
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(payer_type=PayerType.CLIENT)
+            .select_for_update(of=("self",))
+            .values_list("id", "approval_status", "vehicle_id", "client_amount")
+            .order_by()
+        )
+        eligible = [r for r in rows if r[1] in sources]
+        skipped = [
+            {"id": str(pk), "approval_status": status}
+            for pk, status, _, _ in rows
+            if status not in sources
+        ]
+        ids = [r[0] for r in eligible]
+
+        updated = 0
+        if ids:
+            updated = Expense.objects.filter(
+                pk__in=ids, approval_status__in=sources
+            ).update(approval_status=target, edited_by=user, updated_at=timezone.now())
+            ExpenseApprovalLog.objects.bulk_create(
+                ExpenseApprovalLog(
+                    expense_id=pk,
+                    from_status=status,
+                    to_status=target,
+                    batch_id=batch_id,
+                    changed_by=user,
+                )
+                for pk, status, _, _ in eligible
+            )
+            create_notification(
+                notification_type=NotificationType.EXPENSE_APPROVAL,
+                payload={
+                    "batch_id": str(batch_id),
+                    "approval_status": target,
+                    "count": updated,
+                    "client_amount": str(sum(r[3] or 0 for r in eligible)),
+                    "expense_ids": [str(pk) for pk in ids[:NOTIFICATION_ID_LIMIT]],
+                    "changed_by": str(user.id) if user else None,
+                },
+            )
+            vehicle_ids = {r[2] for r in eligible}
+
+            def _invalidate():
+                cache_utils.invalidate_expenses(ids)
+                cache_utils.invalidate_vehicles(vehicle_ids)
+
+            transaction.on_commit(_invalidate)
+
+    logger.info(
+        "Expense approval bulk update",
+        extra={
+            "operation_type": "EXPENSE_APPROVAL_BULK",
+            "service": "DJANGO",
+            "batch_id": str(batch_id),
+            "approval_status": target,
+            "updated": updated,
+            "skipped": len(skipped),
+            "user_id": str(user.id) if user else None,
+        },
+    )
+    return {
+        "batch_id": str(batch_id),
+        "approval_status": target,
+        "updated": updated,
+        "skipped": skipped,
+    }
+
+
+def fine_moment(detail) -> datetime | None:
+    """Point in time a fine refers to: its fine_date, else the expense date."""
+    if detail.fine_date:
+        return timezone.make_aware(
+            datetime.combine(detail.fine_date, FINE_DEFAULT_TIME)
+        )
+    return detail.expense.expense_date
+
+
+def attribute_fine_drivers(details) -> list:
+    """Fill driver_at_time on FineExpenseDetail objects that have none.
+
+    Resolves the whole batch with one ownership query. Objects are modified
+    in place (not saved); the ones that got a driver are returned.
+    """
+    pending = [
+        (detail, detail.expense.vehicle_id, fine_moment(detail))
+        for detail in details
+        if detail.driver_at_time_id is None
+    ]
+    drivers = resolve_drivers((vehicle_id, at) for _, vehicle_id, at in pending)
+    attributed = []
+    for detail, vehicle_id, at in pending:
+        driver_id = drivers.get((vehicle_id, at))
+        if driver_id is not None:
+            detail.driver_at_time_id = driver_id
+            attributed.append(detail)
+    return attributed
@@ -0,0 +1,208 @@
+"""
+Bulk approval tests.
+====================
+Covers: POST /expense/approval/ by ids and by filters, transition rules
+(ineligible rows skipped), COMPANY expenses untouched, audit trail rows,
+single aggregated notification, single-expense PATCH audit entry.
+"""
+
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from expense.constants import ApprovalStatus, PayerType
+from expense.models import Expense, ExpenseApprovalLog, ExpenseCategory
+from notification.constants import NotificationType
+from notification.models import Notification
+
+from .helpers import authenticate, make_user, make_vehicle
+
+URL = "/api/v1/expense/approval/"
+
+
+class BulkApprovalTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.vehicle = make_vehicle()
+        self.category, _ = ExpenseCategory.objects.get_or_create(
+            code="OTHER", defaults={"name": "Other", "is_system": True, "order": 7}
+        )
+
+    def _expense(self, status, payer=PayerType.CLIENT):
+        return Expense.objects.create(
+            vehicle=self.vehicle,
+            category=self.category,
+            expense_date=timezone.now(),
+            amount=Decimal("100.00"),
+            company_amount=Decimal("40.00"),
+            client_amount=Decimal("60.00"),
+            payer_type=payer,
+            approval_status=status,
+        )
+
+    def test_approve_by_ids(self):
+        expenses = [self._expense(ApprovalStatus.REVIEW) for _ in range(3)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                URL,
+                {
+                    "approval_status": ApprovalStatus.APPROVED,
+                    "ids": [str(e.id) for e in expenses],
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["updated"], 3)
+        self.assertEqual(response.data["skipped"], [])
+        self.assertEqual(
+            Expense.objects.filter(approval_status=ApprovalStatus.APPROVED).count(), 3
+        )
+
+    def test_ineligible_rows_are_skipped(self):
+        review = self._expense(ApprovalStatus.REVIEW)
+        draft = self._expense(ApprovalStatus.DRAFT)
+
+        response = self.client.post(
+            URL,
+            {
+                "approval_status": ApprovalStatus.APPROVED,
+                "ids": [str(review.id), str(draft.id)],
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(
+            response.data["skipped"],
+            [{"id": str(draft.id), "approval_status": ApprovalStatus.DRAFT}],
+        )
+        draft.refresh_from_db()
+        self.assertEqual(draft.approval_status, ApprovalStatus.DRAFT)
+
+    def test_reject_sends_back_to_draft_by_filter(self):
+        sent = [self._expense(ApprovalStatus.SENT) for _ in range(2)]
+        untouched = self._expense(ApprovalStatus.REVIEW)
+
+        response = self.client.post(
+            URL,
+            {
+                "approval_status": ApprovalStatus.DRAFT,
+                "filters": {"approval_status": ApprovalStatus.SENT},
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.data["updated"], 2)
+        for expense in sent:
+            expense.refresh_from_db()
+            self.assertEqual(expense.approval_status, ApprovalStatus.DRAFT)
+        untouched.refresh_from_db()
+        self.assertEqual(untouched.approval_status, ApprovalStatus.REVIEW)
+
+    def test_company_expenses_are_ignored(self):
+        company = self._expense(ApprovalStatus.REVIEW, payer=PayerType.COMPANY)
+        response = self.client.post(
+            URL,
+            {"approval_status": ApprovalStatus.APPROVED, "ids": [str(company.id)]},
+            format="json",
+        )
+        self.assertEqual(response.data["updated"], 0)
+
+    def test_audit_trail_shares_batch_id(self):
+        expenses = [self._expense(ApprovalStatus.REVIEW) for _ in range(2)]
+        response = self.client.post(
+            URL,
+            {
+                "approval_status": ApprovalStatus.APPROVED,
+                "ids": [str(e.id) for e in expenses],
+            },
+            format="json",
+        )
+
+        logs = ExpenseApprovalLog.objects.filter(batch_id=response.data["batch_id"])
+        self.assertEqual(logs.count(), 2)
+        log = logs.first()
+        self.assertEqual(log.from_status, ApprovalStatus.REVIEW)
+        self.assertEqual(log.to_status, ApprovalStatus.APPROVED)
+        self.assertEqual(log.changed_by, self.user)
+
+    def test_one_aggregated_notification(self):
+        expenses = [self._expense(ApprovalStatus.REVIEW) for _ in range(5)]
+        self.client.post(
+            URL,
+            {
+                "approval_status": ApprovalStatus.APPROVED,
+                "ids": [str(e.id) for e in expenses],
+            },
+            format="json",
+        )
+
+        notification = Notification.objects.get(type=NotificationType.EXPENSE_APPROVAL)
+        self.assertEqual(notification.payload["count"], 5)
+        self.assertEqual(notification.payload["client_amount"], "300.00")
+
+    def test_nothing_eligible_creates_no_notification(self):
+        draft = self._expense(ApprovalStatus.DRAFT)
+        self.client.post(
+            URL,
+            {"approval_status": ApprovalStatus.APPROVED, "ids": [str(draft.id)]},
+            format="json",
+        )
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(ExpenseApprovalLog.objects.exists())
+
+    def test_ids_and_filters_are_exclusive(self):
+        response = self.client.post(
+            URL,
+            {
+                "approval_status": ApprovalStatus.APPROVED,
+                "ids": [str(self._expense(ApprovalStatus.REVIEW).id)],
+                "filters": {"approval_status": ApprovalStatus.REVIEW},
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_filter_returns_400(self):
+        response = self.client.post(
+            URL,
+            {"approval_status": ApprovalStatus.APPROVED, "filters": {"date_from": "x"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_or_blank_filters_return_400(self):
+        review = self._expense(ApprovalStatus.REVIEW)
+        for filters in ({"aproval_status": ApprovalStatus.REVIEW}, {"vehicle": ""}):
+            response = self.client.post(
+                URL,
+                {"approval_status": ApprovalStatus.APPROVED, "filters": filters},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 400, filters)
+        review.refresh_from_db()
+        self.assertEqual(review.approval_status, ApprovalStatus.REVIEW)
+
+    def test_requires_auth(self):
+        response = APIClient().post(
+            URL, {"approval_status": ApprovalStatus.APPROVED}, format="json"
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_single_patch_writes_audit_entry(self):
+        expense = self._expense(ApprovalStatus.DRAFT)
+        response = self.client.patch(
+            f"/api/v1/expense/{expense.id}/",
+            {"approval_status": ApprovalStatus.SENT},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+        log = ExpenseApprovalLog.objects.get(expense=expense)
+        self.assertEqual(log.from_status, ApprovalStatus.DRAFT)
+        self.assertIsNone(log.batch_id)
@@ -0,0 +1,206 @@
+"""
+Cost-of-ownership series tests.
+===============================
+Covers: daily running totals, exclude_from_cost, dense monthly series with
+carried-forward months, incremental refresh from expense/mileage hooks,
+month carry-forward, vehicle and fleet trend endpoints.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config.archive import move_to_archive
+from expense.analytics import extend_monthly_series, refresh_vehicle_costs
+from expense.models import (
+    Expense,
+    ExpenseCategory,
+    VehicleCostDaily,
+    VehicleCostMonthly,
+)
+from vehicle.models import MileageLog, MileageLogArchive
+
+from .helpers import authenticate, make_user, make_vehicle
+
+
+def _aware(day: date):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+class CostSeriesMixin:
+    def setUp(self):
+        self.user = make_user()
+        self.vehicle = make_vehicle(cost="20000.00")
+        self.category, _ = ExpenseCategory.objects.get_or_create(
+            code="OTHER", defaults={"name": "Other", "is_system": True, "order": 7}
+        )
+
+    def _expense(self, day, amount, vehicle=None, **kwargs):
+        return Expense.objects.create(
+            vehicle=vehicle or self.vehicle,
+            category=self.category,
+            expense_date=_aware(day),
+            amount=Decimal(amount),
+            **kwargs,
+        )
+
+    def _log(self, day, km, vehicle=None):
+        return MileageLog.objects.create(
+            vehicle=vehicle or self.vehicle, km=km, recorded_at=day
+        )
+
+    def _seed(self):
+        self._log(date(2026, 1, 1), 10000)
+        self._expense(date(2026, 1, 5), "100.00")
+        self._expense(date(2026, 1, 5), "50.00")
+        self._expense(date(2026, 1, 20), "999.00", exclude_from_cost=True)
+        self._log(date(2026, 3, 1), 12000)
+        self._expense(date(2026, 3, 10), "200.00")
+        refresh_vehicle_costs(self.vehicle.id)
+
+
+class RefreshVehicleCostsTest(CostSeriesMixin, TestCase):
+    def test_daily_running_totals(self):
+        self._seed()
+        days = list(VehicleCostDaily.objects.filter(vehicle=self.vehicle))
+
+        self.assertEqual(
+            [d.day for d in days],
+            [date(2026, 1, 1), date(2026, 1, 5), date(2026, 3, 1), date(2026, 3, 10)],
+        )
+        self.assertEqual(days[1].expenses, Decimal("150.00"))
+        self.assertEqual(days[-1].cumulative_expenses, Decimal("350.00"))
+        self.assertEqual(days[-1].km_driven, 2000)
+
+    def test_monthly_series_is_dense_up_to_current_month(self):
+        self._seed()
+        months = VehicleCostMonthly.objects.filter(vehicle=self.vehicle)
+
+        february = months.get(month=date(2026, 2, 1))
+        self.assertEqual(february.expenses, Decimal("0"))
+        self.assertEqual(february.cumulative_expenses, Decimal("150.00"))
+        self.assertEqual(months.last().month, timezone.localdate().replace(day=1))
+
+    def test_incremental_refresh_keeps_rows_before_since(self):
+        self._seed()
+        january = VehicleCostDaily.objects.get(day=date(2026, 1, 5))
+        self._expense(date(2026, 3, 15), "25.00")
+
+        refresh_vehicle_costs(self.vehicle.id, since=date(2026, 3, 15))
+
+        self.assertTrue(VehicleCostDaily.objects.filter(pk=january.pk).exists())
+        march = VehicleCostMonthly.objects.get(month=date(2026, 3, 1))
+        self.assertEqual(march.expenses, Decimal("225.00"))
+        self.assertEqual(march.cumulative_expenses, Decimal("375.00"))
+
+    def test_archived_logs_keep_the_km_baseline(self):
+        self._seed()
+        before = list(VehicleCostDaily.objects.values_list("day", "km_driven"))
+
+        move_to_archive(MileageLog, MileageLogArchive, "recorded_at", date(2026, 2, 1))
+        refresh_vehicle_costs(self.vehicle.id)
+
+        self.assertEqual(
+            list(VehicleCostDaily.objects.values_list("day", "km_driven")), before
+        )
+
+    def test_extend_carries_last_month_forward(self):
+        self._seed()
+        current = timezone.localdate().replace(day=1)
+        VehicleCostMonthly.objects.filter(month__gt=date(2026, 3, 1)).delete()
+
+        extend_monthly_series()
+
+        last = VehicleCostMonthly.objects.filter(vehicle=self.vehicle).last()
+        self.assertEqual(last.month, current)
+        self.assertEqual(last.cumulative_expenses, Decimal("350.00"))
+
+
+class CostSeriesHooksTest(CostSeriesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        authenticate(self.client, self.user)
+
+    def test_expense_api_create_refreshes(self):
+        response = self.client.post(
+            f"/api/v1/vehicle/{self.vehicle.id}/expenses/",
+            {
+                "category": str(self.category.id),
+                "amount": "80.00",
+                "expense_date": "2026-02-10",
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        row = VehicleCostDaily.objects.get(vehicle=self.vehicle)
+        self.assertEqual(row.cumulative_expenses, Decimal("80.00"))
+
+    def test_mileage_log_refreshes(self):
+        self._log(date(2026, 1, 1), 10000)
+        response = self.client.post(
+            f"/api/v1/vehicle/{self.vehicle.id}/mileage/",
+            {"km": 10700, "recorded_at": "2026-02-01"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        row = VehicleCostDaily.objects.get(day=date(2026, 2, 1))
+        self.assertEqual(row.km_driven, 700)
+
+
+class CostTrendAPITest(CostSeriesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        authenticate(self.client, self.user)
+        self._seed()
+
+    def test_vehicle_monthly_trend(self):
+        response = self.client.get(
+            f"/api/v1/vehicle/{self.vehicle.id}/cost-trend/",
+            {"date_from": "2026-01-01", "date_to": "2026-03-31"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["period"], "month")
+        march = response.data["results"][-1]
+        self.assertEqual(march["total_cost"], "20350.00")
+        self.assertEqual(march["cost_per_km"], "0.18")
+
+    def test_vehicle_daily_trend(self):
+        response = self.client.get(
+            f"/api/v1/vehicle/{self.vehicle.id}/cost-trend/", {"period": "day"}
+        )
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertIsNone(response.data["results"][0]["cost_per_km"])
+
+    def test_fleet_trend_by_model(self):
+        other = make_vehicle(
+            vin_number="OTHERVIN000000001", car_number="BB0000BB", cost="10000.00"
+        )
+        self._expense(date(2026, 3, 2), "50.00", vehicle=other)
+        refresh_vehicle_costs(other.id)
+
+        response = self.client.get(
+            "/api/v1/expense/cost-trend/",
+            {"group_by": "model", "date_from": "2026-03-01", "date_to": "2026-03-31"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        row = response.data[0]
+        self.assertEqual(row["model"], "Camry")
+        self.assertEqual(row["vehicles"], 2)
+        self.assertEqual(row["cumulative_expenses"], "400.00")
+        self.assertEqual(row["total_cost"], "30400.00")
+
+    def test_fleet_trend_rejects_unknown_group(self):
+        response = self.client.get("/api/v1/expense/cost-trend/", {"group_by": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bad_date_returns_400(self):
+        response = self.client.get(
+            f"/api/v1/vehicle/{self.vehicle.id}/cost-trend/", {"date_to": "03/2026"}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,114 @@
+"""
+Fine driver attribution tests.
+==============================
+Covers: FINES expense created via API gets driver_at_time from ownership
+history, manual driver is never overwritten, CSV import attributes fines
+in bulk, backfill command.
+"""
+
+from datetime import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from driver.models import Driver
+from expense.importer import commit_batch, stage_csv
+from expense.models import Expense, ExpenseCategory, FineExpenseDetail
+from vehicle.models import OwnerHistory
+
+from .helpers import authenticate, make_user, make_vehicle
+
+
+def _at(month, day, hour=0):
+    return timezone.make_aware(datetime(2026, month, day, hour))
+
+
+class FineAttributionTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.vehicle = make_vehicle()
+        self.fines_cat, _ = ExpenseCategory.objects.get_or_create(
+            code="FINES", defaults={"name": "Fines", "is_system": True, "order": 4}
+        )
+        self.driver = Driver.objects.create(
+            first_name="Jan", last_name="Kowalski", phone_number="48123456789"
+        )
+        OwnerHistory.objects.create(
+            vehicle=self.vehicle,
+            driver=self.driver,
+            assigned_at=_at(3, 1),
+            unassigned_at=_at(4, 1),
+        )
+
+    def _fine(self, fine_date=None, **detail):
+        expense = Expense.objects.create(
+            vehicle=self.vehicle,
+            category=self.fines_cat,
+            expense_date=_at(5, 20),
+            amount="200.00",
+        )
+        return FineExpenseDetail.objects.create(
+            expense=expense, violation_type="SPEEDING", fine_date=fine_date, **detail
+        )
+
+    def test_api_create_attributes_driver_by_fine_date(self):
+        response = self.client.post(
+            f"/api/v1/vehicle/{self.vehicle.id}/expenses/",
+            {
+                "category": str(self.fines_cat.id),
+                "amount": "200.00",
+                "expense_date": "2026-05-20",
+                "violation_type": "SPEEDING",
+                "fine_date": "2026-03-15",
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["driver_at_time"], str(self.driver.id))
+
+    def test_fine_outside_ownership_stays_empty(self):
+        response = self.client.post(
+            f"/api/v1/vehicle/{self.vehicle.id}/expenses/",
+            {
+                "category": str(self.fines_cat.id),
+                "amount": "200.00",
+                "expense_date": "2026-05-20",
+                "violation_type": "SPEEDING",
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(response.data["driver_at_time"])
+
+    def test_csv_import_attributes_fines(self):
+        csv_text = (
+            "car_number,category,expense_date,amount,violation_type,fine_date\n"
+            "AA6601BB,FINES,2026-05-20,200,SPEEDING,2026-03-10\n"
+            "AA6601BB,FINES,2026-05-21,150,PARKING,2026-05-01\n"
+        )
+        commit_batch(stage_csv(io.StringIO(csv_text)))
+
+        attributed = FineExpenseDetail.objects.get(fine_date="2026-03-10")
+        self.assertEqual(attributed.driver_at_time, self.driver)
+        self.assertIsNone(
+            FineExpenseDetail.objects.get(fine_date="2026-05-01").driver_at_time
+        )
+
+    def test_backfill_command_keeps_manual_driver(self):
+        other = Driver.objects.create(
+            first_name="Anna", last_name="Nowak", phone_number="48987654321"
+        )
+        manual = self._fine(fine_date="2026-03-10", driver_at_time=other)
+        missing = self._fine(fine_date="2026-03-11")
+
+        call_command("attribute_fine_drivers", stdout=io.StringIO())
+
+        manual.refresh_from_db()
+        missing.refresh_from_db()
+        self.assertEqual(manual.driver_at_time, other)
+        self.assertEqual(missing.driver_at_time, self.driver)
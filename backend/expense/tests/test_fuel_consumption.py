@@ -0,0 +1,239 @@
+"""
+Fuel consumption analytics tests.
+=================================
+Covers: fill-to-fill L/100km from the nearest mileage log, incremental
+refresh from expense and mileage changes, outlier flagging, vehicle and
+fleet endpoints.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+import json
+
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config.archive import move_to_archive
+from expense.analytics import refresh_fuel_consumption
+from expense.models import (
+    Expense,
+    ExpenseCategory,
+    FuelConsumption,
+    FuelExpenseDetail,
+)
+from vehicle.models import MileageLog, MileageLogArchive
+
+from .helpers import authenticate, make_user, make_vehicle
+
+
+def _aware(day: date):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+class FuelConsumptionMixin:
+    def setUp(self):
+        self.user = make_user()
+        self.vehicle = make_vehicle()
+        self.fuel_cat, _ = ExpenseCategory.objects.get_or_create(
+            code="FUEL", defaults={"name": "Fuel", "is_system": True, "order": 1}
+        )
+
+    def _log(self, day, km):
+        return MileageLog.objects.create(vehicle=self.vehicle, km=km, recorded_at=day)
+
+    def _fill(self, day, liters):
+        expense = Expense.objects.create(
+            vehicle=self.vehicle,
+            category=self.fuel_cat,
+            expense_date=_aware(day),
+            amount=Decimal("100.00"),
+        )
+        FuelExpenseDetail.objects.create(
+            expense=expense, liters=Decimal(liters), fuel_types=["DIESEL"]
+        )
+        return expense
+
+
+class RefreshFuelConsumptionTest(FuelConsumptionMixin, TestCase):
+    def test_fill_to_fill_rate(self):
+        self._log(date(2026, 3, 1), 10000)
+        self._log(date(2026, 3, 5), 10500)
+        self._log(date(2026, 3, 10), 11000)
+        self._fill(date(2026, 3, 1), "40")
+        closing = self._fill(date(2026, 3, 5), "35")
+        self._fill(date(2026, 3, 10), "40")
+
+        self.assertEqual(refresh_fuel_consumption(self.vehicle.id), 2)
+
+        first, second = FuelConsumption.objects.filter(vehicle=self.vehicle)
+        self.assertEqual(first.expense_id, closing.id)
+        self.assertEqual((first.start_km, first.end_km), (10000, 10500))
+        self.assertEqual(first.period_start, date(2026, 3, 1))
+        self.assertEqual(first.l_per_100km, Decimal("7.00"))
+        self.assertEqual(second.l_per_100km, Decimal("8.00"))
+
+    def test_uses_latest_log_on_or_before_fill(self):
+        self._log(date(2026, 3, 1), 10000)
+        self._log(date(2026, 3, 8), 10800)
+        self._fill(date(2026, 3, 2), "40")
+        self._fill(date(2026, 3, 9), "48")
+
+        refresh_fuel_consumption(self.vehicle.id)
+
+        interval = FuelConsumption.objects.get()
+        self.assertEqual(interval.distance_km, 800)
+        self.assertEqual(interval.l_per_100km, Decimal("6.00"))
+
+    def test_fills_without_km_progress_are_skipped(self):
+        self._log(date(2026, 3, 1), 10000)
+        self._fill(date(2026, 3, 2), "40")
+        self._fill(date(2026, 3, 3), "10")
+        self.assertEqual(refresh_fuel_consumption(self.vehicle.id), 0)
+
+    def test_incremental_refresh_keeps_older_intervals(self):
+        for day, km in [(1, 10000), (5, 10500), (10, 11000)]:
+            self._log(date(2026, 3, day), km)
+            self._fill(date(2026, 3, day), "40")
+        refresh_fuel_consumption(self.vehicle.id)
+        older = FuelConsumption.objects.get(period_end=date(2026, 3, 5))
+
+        refresh_fuel_consumption(self.vehicle.id, since=date(2026, 3, 10))
+
+        self.assertTrue(FuelConsumption.objects.filter(pk=older.pk).exists())
+        self.assertEqual(FuelConsumption.objects.count(), 2)
+
+    def test_archived_logs_still_anchor_intervals(self):
+        self._log(date(2026, 3, 1), 10000)
+        self._log(date(2026, 3, 5), 10500)
+        self._log(date(2026, 3, 10), 11000)
+        for day in (1, 5, 10):
+            self._fill(date(2026, 3, day), "40")
+        refresh_fuel_consumption(self.vehicle.id)
+        before = list(FuelConsumption.objects.values_list("start_km", "end_km"))
+
+        move_to_archive(MileageLog, MileageLogArchive, "recorded_at", date(2026, 3, 6))
+        refresh_fuel_consumption(self.vehicle.id)
+
+        self.assertEqual(
+            list(FuelConsumption.objects.values_list("start_km", "end_km")), before
+        )
+
+    def test_outlier_is_flagged(self):
+        km = 10000
+        for day, liters in enumerate(["40", "40", "41", "39", "40", "90"], start=1):
+            self._log(date(2026, 3, day), km)
+            self._fill(date(2026, 3, day), liters)
+            km += 500
+
+        refresh_fuel_consumption(self.vehicle.id)
+
+        flagged = FuelConsumption.objects.filter(is_outlier=True)
+        self.assertEqual(flagged.count(), 1)
+        self.assertEqual(flagged.get().l_per_100km, Decimal("18.00"))
+
+
+class FuelConsumptionHooksTest(FuelConsumptionMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        authenticate(self.client, self.user)
+
+    def test_mileage_log_creation_refreshes(self):
+        self._log(date(2026, 3, 1), 10000)
+        self._fill(date(2026, 3, 1), "40")
+        self._fill(date(2026, 3, 6), "30")
+        self.assertFalse(FuelConsumption.objects.exists())
+
+        response = self.client.post(
+            f"/api/v1/vehicle/{self.vehicle.id}/mileage/",
+            {"km": 10500, "recorded_at": "2026-03-05"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(FuelConsumption.objects.get().l_per_100km, Decimal("6.00"))
+
+    def test_mileage_log_edit_and_delete_refresh(self):
+        self._log(date(2026, 3, 1), 10000)
+        log = self._log(date(2026, 3, 5), 10500)
+        self._fill(date(2026, 3, 1), "40")
+        self._fill(date(2026, 3, 5), "30")
+        refresh_fuel_consumption(self.vehicle.id)
+        mileage_admin = site._registry[MileageLog]
+        request = RequestFactory().post("/")
+
+        log.km = 10600
+        mileage_admin.save_model(request, log, None, change=True)
+        self.assertEqual(FuelConsumption.objects.get().l_per_100km, Decimal("5.00"))
+
+        mileage_admin.delete_model(request, log)
+        self.assertFalse(FuelConsumption.objects.exists())
+
+    def test_fuel_expense_create_and_delete_refresh(self):
+        self._log(date(2026, 3, 1), 10000)
+        self._log(date(2026, 3, 5), 10400)
+        self._fill(date(2026, 3, 1), "40")
+
+        response = self.client.post(
+            f"/api/v1/vehicle/{self.vehicle.id}/expenses/",
+            {
+                "category": str(self.fuel_cat.id),
+                "amount": "100.00",
+                "expense_date": "2026-03-05",
+                "liters": "32",
+                "fuel_types": json.dumps(["DIESEL"]),
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(FuelConsumption.objects.get().l_per_100km, Decimal("8.00"))
+
+        self.client.delete(f"/api/v1/expense/{response.data['id']}/")
+        self.assertFalse(FuelConsumption.objects.exists())
+
+
+class FuelConsumptionAPITest(FuelConsumptionMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        authenticate(self.client, self.user)
+        for day, km in [(1, 10000), (5, 10500), (10, 11000)]:
+            self._log(date(2026, 3, day), km)
+        self._fill(date(2026, 3, 1), "40")
+        self._fill(date(2026, 3, 5), "35")
+        self._fill(date(2026, 3, 10), "40")
+        refresh_fuel_consumption(self.vehicle.id)
+
+    def test_vehicle_series(self):
+        response = self.client.get(
+            f"/api/v1/vehicle/{self.vehicle.id}/fuel-consumption/"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["average_l_per_100km"], "7.50")
+        self.assertEqual(response.data["outlier_count"], 0)
+
+    def test_vehicle_series_date_filter(self):
+        response = self.client.get(
+            f"/api/v1/vehicle/{self.vehicle.id}/fuel-consumption/",
+            {"date_from": "2026-03-06"},
+        )
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["average_l_per_100km"], "8.00")
+
+    def test_vehicle_series_bad_date_returns_400(self):
+        response = self.client.get(
+            f"/api/v1/vehicle/{self.vehicle.id}/fuel-consumption/",
+            {"date_from": "yesterday"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_fleet_summary(self):
+        response = self.client.get("/api/v1/expense/fuel-consumption/")
+        self.assertEqual(response.status_code, 200)
+        row = response.data[0]
+        self.assertEqual(row["car_number"], self.vehicle.car_number)
+        self.assertEqual(row["distance_km"], 1000)
+        self.assertEqual(row["average_l_per_100km"], "7.50")
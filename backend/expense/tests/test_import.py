@@ -0,0 +1,227 @@
+"""
+CSV expense import tests.
+=========================
+Covers: staging (dry run) report, per-row validation errors, duplicate
+detection against the DB and within the file, commit into Expense + detail
+rows, double-commit protection, management command.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+import io
+import os
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from expense.constants import ImportBatchStatus, ImportRowStatus
+from expense.importer import _parse_decimal, commit_batch, stage_csv
+from expense.models import (
+    Expense,
+    ExpenseCategory,
+    ExpenseImportBatch,
+    ExpenseImportRow,
+    FuelExpenseDetail,
+    WashingExpenseDetail,
+)
+
+from .helpers import authenticate, make_user, make_vehicle
+
+CSV = (
+    "car_number;category;expense_date;amount;fuel_types;liters;wash_type\n"
+    "AA6601BB;FUEL;01.03.2026;1 250,50;diesel|lpg;40,5;\n"
+    "AA6601BB;WASHING;2026-03-02;80;;;EXTERIOR\n"
+    "ZZ0000ZZ;FUEL;2026-03-03;100;DIESEL;;\n"
+    "AA6601BB;UNKNOWN;2026-03-04;abc;;;\n"
+    "AA6601BB;WASHING;2026-03-02;80;;;EXTERIOR\n"
+)
+
+
+def _upload(content=CSV, name="statement.csv"):
+    return SimpleUploadedFile(name, content.encode(), content_type="text/csv")
+
+
+class ImportSetupMixin:
+    def setUp(self):
+        self.user = make_user()
+        self.vehicle = make_vehicle()
+        for order, code in enumerate(["FUEL", "WASHING"], start=1):
+            ExpenseCategory.objects.get_or_create(
+                code=code,
+                defaults={"name": code.title(), "is_system": True, "order": order},
+            )
+
+
+class StageCsvTest(ImportSetupMixin, TestCase):
+    def test_stage_reports_valid_error_and_duplicate_rows(self):
+        batch = stage_csv(io.StringIO(CSV), user=self.user)
+
+        self.assertEqual(batch.status, ImportBatchStatus.STAGED)
+        self.assertEqual(batch.total_rows, 5)
+        self.assertEqual(batch.valid_rows, 2)
+        self.assertEqual(batch.error_rows, 2)
+        self.assertEqual(batch.duplicate_rows, 1)
+        self.assertFalse(Expense.objects.exists())
+
+    def test_row_values_are_normalized(self):
+        batch = stage_csv(io.StringIO(CSV))
+        row = batch.rows.get(row_number=2)
+        self.assertEqual(row.amount, Decimal("1250.50"))
+        self.assertEqual(timezone.localdate(row.expense_date).isoformat(), "2026-03-01")
+        self.assertEqual(
+            row.detail, {"fuel_types": ["DIESEL", "LPG"], "liters": "40.50"}
+        )
+
+    def test_last_separator_is_the_decimal_point(self):
+        for value in ("1.234,56", "1,234.56", "1 234,56", "1234.56", "1234,56"):
+            self.assertEqual(_parse_decimal(value), Decimal("1234.56"), value)
+        with self.assertRaises(ValueError):
+            _parse_decimal("1.234.56,7,8")
+
+    def test_out_of_range_or_over_precise_amounts_are_rejected(self):
+        self.assertEqual(_parse_decimal("12345678.5"), Decimal("12345678.50"))
+        self.assertEqual(_parse_decimal("12.500"), Decimal("12.50"))
+        for value in ("123456789012", "1" * 30, "12.345", "1,234", "NaN", "inf"):
+            with self.assertRaises(ValueError, msg=value):
+                _parse_decimal(value)
+        with self.assertRaises(ValueError):
+            _parse_decimal("1234567", max_digits=8)
+
+    def test_error_messages_name_the_column(self):
+        batch = stage_csv(io.StringIO(CSV))
+        errors = batch.rows.get(row_number=5).errors
+        self.assertTrue(any(e.startswith("category:") for e in errors))
+        self.assertTrue(any(e.startswith("amount:") for e in errors))
+        self.assertIn(
+            "car_number: Vehicle 'ZZ0000ZZ' not found.",
+            batch.rows.get(row_number=4).errors,
+        )
+
+    def test_existing_expense_is_flagged_duplicate(self):
+        Expense.objects.create(
+            vehicle=self.vehicle,
+            category=ExpenseCategory.objects.get(code="WASHING"),
+            expense_date=timezone.make_aware(datetime(2026, 3, 2, 15, 30)),
+            amount=Decimal("80.00"),
+        )
+        batch = stage_csv(io.StringIO(CSV))
+        self.assertEqual(batch.rows.get(row_number=3).status, ImportRowStatus.DUPLICATE)
+
+    def test_missing_required_column_raises(self):
+        with self.assertRaises(ValueError):
+            stage_csv(io.StringIO("car_number,amount\nAA6601BB,10\n"))
+        self.assertFalse(ExpenseImportBatch.objects.exists())
+
+    def test_failure_mid_stream_leaves_no_partial_batch(self):
+        rows = "".join(
+            f"AA6601BB;WASHING;2026-03-{day % 28 + 1:02d};{day};;;EXTERIOR\n"
+            for day in range(500)
+        )
+        content = CSV.splitlines(keepends=True)[0] + rows
+        with self.assertRaises(UnicodeDecodeError):
+            stage_csv(io.BytesIO(content.encode() + b"\xff\xfe;\n"), chunk_size=50)
+        self.assertFalse(ExpenseImportBatch.objects.exists())
+        self.assertFalse(ExpenseImportRow.objects.exists())
+
+    def test_small_chunks_still_catch_in_file_duplicates(self):
+        batch = stage_csv(io.StringIO(CSV), chunk_size=1)
+        self.assertEqual(batch.valid_rows, 2)
+        self.assertEqual(batch.duplicate_rows, 1)
+
+
+class CommitBatchTest(ImportSetupMixin, TestCase):
+    def test_commit_creates_expenses_with_details(self):
+        batch = commit_batch(stage_csv(io.StringIO(CSV)), user=self.user)
+
+        self.assertEqual(batch.status, ImportBatchStatus.COMMITTED)
+        self.assertEqual(batch.imported_rows, 2)
+        self.assertEqual(Expense.objects.filter(vehicle=self.vehicle).count(), 2)
+        fuel = FuelExpenseDetail.objects.get()
+        self.assertEqual(fuel.fuel_types, ["DIESEL", "LPG"])
+        self.assertEqual(fuel.liters, Decimal("40.50"))
+        self.assertEqual(WashingExpenseDetail.objects.get().wash_type, "EXTERIOR")
+        imported = batch.rows.filter(status=ImportRowStatus.IMPORTED)
+        self.assertEqual(imported.exclude(expense=None).count(), 2)
+
+    def test_commit_twice_raises(self):
+        batch = commit_batch(stage_csv(io.StringIO(CSV)))
+        with self.assertRaises(ValueError):
+            commit_batch(batch)
+        self.assertEqual(Expense.objects.count(), 2)
+
+
+class ExpenseImportAPITest(ImportSetupMixin, TestCase):
+    URL = "/api/v1/expense/import/"
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        authenticate(self.client, self.user)
+
+    def test_upload_returns_dry_run_report(self):
+        response = self.client.post(self.URL, {"file": _upload()}, format="multipart")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data["dry_run"])
+        self.assertEqual(response.data["valid_rows"], 2)
+        self.assertEqual(len(response.data["problems"]), 3)
+        self.assertFalse(Expense.objects.exists())
+
+    def test_upload_with_commit_imports(self):
+        response = self.client.post(
+            self.URL, {"file": _upload(), "commit": "true"}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data["dry_run"])
+        self.assertEqual(Expense.objects.count(), 2)
+
+    def test_commit_endpoint(self):
+        batch_id = self.client.post(
+            self.URL, {"file": _upload()}, format="multipart"
+        ).data["id"]
+
+        response = self.client.post(f"{self.URL}{batch_id}/commit/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["imported_rows"], 2)
+
+        again = self.client.post(f"{self.URL}{batch_id}/commit/")
+        self.assertEqual(again.status_code, 409)
+
+    def test_detail_endpoint(self):
+        batch = stage_csv(io.StringIO(CSV))
+        response = self.client.get(f"{self.URL}{batch.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_rows"], 5)
+
+    def test_missing_file_returns_400(self):
+        response = self.client.post(self.URL, {}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+
+    def test_bad_header_returns_400(self):
+        response = self.client.post(
+            self.URL, {"file": _upload("foo,bar\n1,2\n")}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_auth(self):
+        response = APIClient().post(self.URL, {"file": _upload()}, format="multipart")
+        self.assertEqual(response.status_code, 401)
+
+
+class ImportExpensesCommandTest(ImportSetupMixin, TestCase):
+    def test_command_dry_run_then_commit(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(CSV)
+        self.addCleanup(os.remove, f.name)
+        out = io.StringIO()
+        call_command("import_expenses", f.name, stdout=out)
+        self.assertIn("2 valid", out.getvalue())
+        self.assertFalse(Expense.objects.exists())
+
+        batch = ExpenseImportBatch.objects.get()
+        call_command("import_expenses", batch=str(batch.id), stdout=io.StringIO())
+        self.assertEqual(Expense.objects.count(), 2)
@@ -13,6 +13,32 @@ urlpatterns = [
         views.InvoiceSearchView.as_view(),
         name="invoice-search",
     ),
+    path(
+        "approval/",
+        views.ExpenseBulkApprovalView.as_view(),
+        name="expense-bulk-approval",
+    ),
+    path(
+        "cost-trend/",
+        views.FleetCostTrendView.as_view(),
+        name="fleet-cost-trend",
+    ),
+    path(
+        "fuel-consumption/",
+        views.FleetFuelConsumptionView.as_view(),
+        name="fleet-fuel-consumption",
+    ),
+    path("import/", views.ExpenseImportView.as_view(), name="expense-import"),
+    path(
+        "import/<uuid:pk>/",
+        views.ExpenseImportDetailView.as_view(),
+        name="expense-import-detail",
+    ),
+    path(
+        "import/<uuid:pk>/commit/",
+        views.ExpenseImportCommitView.as_view(),
+        name="expense-import-commit",
+    ),
     path("", views.ExpenseListCreateView.as_view(), name="expense-list-create"),
     path(
         "<uuid:pk>/",
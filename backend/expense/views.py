@@ -2,8 +2,9 @@ import logging
 
 from django.db.models import DecimalField, Sum, Value
 from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_date
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.filters import OrderingFilter
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
@@ -12,14 +13,30 @@ from rest_framework.views import APIView
 
 from config import cache_utils
 from config.filters import LayoutAwareSearchFilter as SearchFilter
+from vehicle.models import Vehicle
 
+from . import analytics
 from .filters import ExpenseFilter
-from .models import Expense, ExpenseCategory, Invoice
+from .importer import commit_batch, stage_csv
+from .models import (
+    Expense,
+    ExpenseApprovalLog,
+    ExpenseCategory,
+    ExpenseImportBatch,
+    FuelConsumption,
+    Invoice,
+    VehicleCostDaily,
+    VehicleCostMonthly,
+)
 from .serializers import (
+    ExpenseBulkApprovalSerializer,
     ExpenseCategorySerializer,
+    ExpenseImportBatchSerializer,
     ExpenseSerializer,
+    FuelConsumptionSerializer,
     InvoiceSearchSerializer,
 )
+from .services import bulk_set_approval_status
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +56,22 @@ def _expense_queryset():
     ).prefetch_related("parts", "service_items")
 
 
+def _date_range(query_params):
+    """Parse ?date_from=&date_to= (YYYY-MM-DD). Raises ValueError on bad input."""
+    bounds = []
+    for name in ("date_from", "date_to"):
+        raw = query_params.get(name)
+        value = parse_date(raw) if raw else None
+        if raw and value is None:
+            raise ValueError(f"{name}: expected YYYY-MM-DD.")
+        bounds.append(value)
+    return bounds
+
+
+def _per_km(amount, km):
+    return f"{amount / km:.2f}" if km else None
+
+
 class ExpenseCategoryListView(generics.ListAPIView):
     """GET /expense/categories/ — active categories for UI dropdown."""
 
@@ -87,6 +120,9 @@ class ExpenseListCreateView(generics.ListCreateAPIView):
         )
         cache_utils.invalidate_expense()
         cache_utils.invalidate_vehicle(instance.vehicle_id)
+        analytics.refresh_for_expenses(
+            [(instance.vehicle_id, instance.category.code, instance.expense_date)]
+        )
         logger.info(
             "Expense created",
             extra={
@@ -120,9 +156,25 @@ class ExpenseRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         return response
 
     def perform_update(self, serializer):
+        old = serializer.instance
+        before = (old.vehicle_id, old.category.code, old.expense_date)
+        old_status = old.approval_status
         instance = serializer.save(edited_by=self.request.user)
+        if instance.approval_status != old_status and instance.approval_status:
+            ExpenseApprovalLog.objects.create(
+                expense=instance,
+                from_status=old_status,
+                to_status=instance.approval_status,
+                changed_by=self.request.user,
+            )
         cache_utils.invalidate_expense(instance.id)
         cache_utils.invalidate_vehicle(instance.vehicle_id)
+        analytics.refresh_for_expenses(
+            [
+                before,
+                (instance.vehicle_id, instance.category.code, instance.expense_date),
+            ]
+        )
         logger.info(
             "Expense updated",
             extra={
@@ -136,6 +188,7 @@ class ExpenseRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     def perform_destroy(self, instance):
         expense_id = instance.id
         vehicle_id = instance.vehicle_id
+        fuel_change = (vehicle_id, instance.category.code, instance.expense_date)
         # Delete linked TechnicalInspection for INSPECTION expenses
         if instance.category.code == "INSPECTION":
             detail = getattr(instance, "inspection_detail", None)
@@ -144,6 +197,7 @@ class ExpenseRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
         cache_utils.invalidate_expense(expense_id)
         cache_utils.invalidate_vehicle(vehicle_id)
+        analytics.refresh_for_expenses([fuel_change])
         logger.info(
             "Expense deleted",
             extra={
@@ -155,6 +209,41 @@ class ExpenseRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         )
 
 
+class ExpenseBulkApprovalView(APIView):
+    """POST /expense/approval/ — move many client expenses to one approval status.
+
+    Body: {"approval_status": "APPROVED", "ids": [...]} or
+          {"approval_status": "APPROVED", "filters": {"approval_status": "REVIEW", ...}}
+    (filters take the same params as GET /expense/; unknown or all-blank
+    filters are a 400). Expenses that cannot make the transition are skipped
+    and listed in the response.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = ExpenseBulkApprovalSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if "ids" in data:
+            queryset = Expense.objects.filter(pk__in=data["ids"])
+        else:
+            filterset = ExpenseFilter(
+                data=data["filters"], queryset=Expense.objects.all()
+            )
+            if not filterset.is_valid():
+                return Response(
+                    {"filters": filterset.errors}, status=status.HTTP_400_BAD_REQUEST
+                )
+            queryset = filterset.qs
+
+        result = bulk_set_approval_status(
+            queryset, data["approval_status"], user=request.user
+        )
+        return Response(result)
+
+
 class InvoiceSearchView(generics.ListAPIView):
     """GET /expense/invoices/?search=FAK-123 — search invoices by number."""
 
@@ -177,6 +266,51 @@ class InvoiceSearchView(generics.ListAPIView):
         return Response(serializer.data)
 
 
+class ExpenseImportView(APIView):
+    """POST /expense/import/ — stage a CSV file (field: file) and return a
+    dry-run report. Pass commit=true to import the valid rows straight away."""
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": "Required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            batch = stage_csv(upload, user=request.user, source_name=upload.name)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if str(request.data.get("commit", "")).lower() in ("true", "1"):
+            batch = commit_batch(batch, user=request.user)
+        return Response(
+            ExpenseImportBatchSerializer(batch).data, status=status.HTTP_201_CREATED
+        )
+
+
+class ExpenseImportDetailView(generics.RetrieveAPIView):
+    """GET /expense/import/{id}/ — report for a staged or committed import."""
+
+    queryset = ExpenseImportBatch.objects.all()
+    serializer_class = ExpenseImportBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class ExpenseImportCommitView(APIView):
+    """POST /expense/import/{id}/commit/ — import the valid rows of a staged batch."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        batch = generics.get_object_or_404(ExpenseImportBatch, pk=pk)
+        try:
+            batch = commit_batch(batch, user=request.user)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(ExpenseImportBatchSerializer(batch).data)
+
+
 class VehicleExpenseListCreateView(generics.ListCreateAPIView):
     """GET /vehicle/{pk}/expenses/ — expenses for one vehicle.
     POST /vehicle/{pk}/expenses/ — create expense scoped to this vehicle."""
@@ -226,6 +360,9 @@ class VehicleExpenseListCreateView(generics.ListCreateAPIView):
         )
         cache_utils.invalidate_expense()
         cache_utils.invalidate_vehicle(self.kwargs["pk"])
+        analytics.refresh_for_expenses(
+            [(instance.vehicle_id, instance.category.code, instance.expense_date)]
+        )
         logger.info(
             "Vehicle expense created",
             extra={
@@ -285,3 +422,148 @@ class VehicleExpenseSummaryView(APIView):
                 "categories": categories,
             }
         )
+
+
+class VehicleFuelConsumptionView(APIView):
+    """GET /vehicle/{pk}/fuel-consumption/ — fill-to-fill L/100km series.
+
+    Optional ?date_from=&date_to= (YYYY-MM-DD) filter on the interval end.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            date_from, date_to = _date_range(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = FuelConsumption.objects.filter(vehicle_id=pk)
+        if date_from:
+            qs = qs.filter(period_end__gte=date_from)
+        if date_to:
+            qs = qs.filter(period_end__lte=date_to)
+        intervals = list(qs)
+
+        normal = [i for i in intervals if not i.is_outlier]
+        distance = sum(i.distance_km for i in normal)
+        average = (
+            f"{sum(i.liters for i in normal) * 100 / distance:.2f}"
+            if distance
+            else None
+        )
+        return Response(
+            {
+                "average_l_per_100km": average,
+                "outlier_count": len(intervals) - len(normal),
+                "results": FuelConsumptionSerializer(intervals, many=True).data,
+            }
+        )
+
+
+class FleetFuelConsumptionView(APIView):
+    """GET /expense/fuel-consumption/ — per-vehicle averages and outlier counts."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            date_from, date_to = _date_range(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        for row in analytics.fleet_consumption_summary(date_from, date_to):
+            distance = row["distance_km"] or 0
+            results.append(
+                {
+                    "vehicle_id": str(row["vehicle_id"]),
+                    "car_number": row["vehicle__car_number"],
+                    "manufacturer": row["vehicle__manufacturer"],
+                    "model": row["vehicle__model"],
+                    "intervals": row["intervals"],
+                    "outlier_count": row["outliers"],
+                    "distance_km": distance,
+                    "average_l_per_100km": (
+                        f"{row['liters'] * 100 / distance:.2f}" if distance else None
+                    ),
+                    "last_fill": row["last_fill"],
+                }
+            )
+        return Response(results)
+
+
+class VehicleCostTrendView(APIView):
+    """GET /vehicle/{pk}/cost-trend/?period=month|day — cumulative cost of
+    ownership (purchase cost + expenses) and operating cost per km."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        vehicle = generics.get_object_or_404(Vehicle.objects.only("cost"), pk=pk)
+        try:
+            date_from, date_to = _date_range(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get("period") == "day":
+            qs, field = VehicleCostDaily.objects.filter(vehicle_id=pk), "day"
+        else:
+            qs, field = VehicleCostMonthly.objects.filter(vehicle_id=pk), "month"
+        if date_from:
+            qs = qs.filter(**{f"{field}__gte": date_from})
+        if date_to:
+            qs = qs.filter(**{f"{field}__lte": date_to})
+
+        results = [
+            {
+                "date": getattr(row, field),
+                "expenses": str(row.expenses),
+                "cumulative_expenses": str(row.cumulative_expenses),
+                "total_cost": str(vehicle.cost + row.cumulative_expenses),
+                "odometer_km": row.odometer_km,
+                "km_driven": row.km_driven,
+                "cost_per_km": _per_km(row.cumulative_expenses, row.km_driven),
+            }
+            for row in qs.order_by(field)
+        ]
+        return Response(
+            {"purchase_cost": str(vehicle.cost), "period": field, "results": results}
+        )
+
+
+class FleetCostTrendView(APIView):
+    """GET /expense/cost-trend/?group_by=manufacturer|model — monthly fleet
+    cost of ownership per manufacturer (optionally per model)."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        group_by = request.query_params.get("group_by", "manufacturer")
+        if group_by not in ("manufacturer", "model"):
+            return Response(
+                {"group_by": "Expected 'manufacturer' or 'model'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            date_from, date_to = _date_range(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        for row in analytics.fleet_cost_trend(group_by, date_from, date_to):
+            cumulative = row["cumulative_expenses"]
+            results.append(
+                {
+                    "month": row["month"],
+                    "manufacturer": row["vehicle__manufacturer"],
+                    "model": row.get("vehicle__model"),
+                    "vehicles": row["vehicles"],
+                    "expenses": f"{row['expenses']:.2f}",
+                    "cumulative_expenses": f"{cumulative:.2f}",
+                    "total_cost": f"{row['purchase_cost'] + cumulative:.2f}",
+                    "km_driven": row["km_driven"],
+                    "cost_per_km": _per_km(cumulative, row["km_driven"]),
+                }
+            )
+        return Response(results)
@@ -0,0 +1,48 @@
+import hashlib
+import secrets
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import CalendarFeedToken
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_calendar_token(user) -> str:
+    """Create or rotate the user's feed token; the old URL stops working."""
+    token = secrets.token_urlsafe(32)
+    CalendarFeedToken.objects.update_or_create(
+        user=user, defaults={"token_hash": _hash(token)}
+    )
+    return token
+
+
+class CalendarFeedTokenAuthentication(BaseAuthentication):
+    """?token= on calendar.ics, for clients that cannot send the JWT cookie."""
+
+    def authenticate(self, request):
+        token = request.query_params.get("token")
+        if not token:
+            return None
+        try:
+            feed_token = CalendarFeedToken.objects.select_related("user").get(
+                token_hash=_hash(token)
+            )
+        except CalendarFeedToken.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("Invalid calendar token"), code="calendar_token_invalid"
+            ) from e
+
+        user = feed_token.user
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if user.is_blocked:
+            raise AuthenticationFailed(_("User is blocked"), code="user_blocked")
+        return user, None
+
+    def authenticate_header(self, request):
+        return "Bearer"
@@ -0,0 +1,361 @@
+"""
+Unified fleet calendar.
+=======================
+Merges three date sources into one feed over a [from, to) window:
+
+- inspection:   next_inspection_date of each vehicle's latest inspection
+- service_plan: ServicePlan.planned_at
+- regulation:   predicted due date of regulation entries (MileageVelocity)
+
+Events are built per calendar month and cached as versioned buckets
+(cache_utils.get_calendar_months), so a window only queries the months that
+are missing — one range query per source over the missing span, served by
+the date indexes on next_inspection_date / planned_at. Each bucket carries a
+digest; the window's ETag is derived from them, which lets polling clients
+and iCal subscriptions revalidate with a 304 instead of a full download.
+"""
+
+from datetime import UTC, date, timedelta
+import hashlib
+import json
+
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from config import cache_utils
+from vehicle.constants import VehicleStatus
+from vehicle.models import TechnicalInspection
+from vehicle.velocity import predict_due_date
+
+from .constants import CalendarEventKind
+from .models import FleetVehicleRegulationEntry, ServicePlan
+
+DEFAULT_MONTHS = 3
+MAX_WINDOW_DAYS = 366
+
+_VEHICLE_FIELDS = {
+    "car_number": "vehicle__car_number",
+    "manufacturer": "vehicle__manufacturer",
+    "model": "vehicle__model",
+}
+
+
+def latest_inspections():
+    """Latest inspection per vehicle (no newer row for the same vehicle)."""
+    newer = TechnicalInspection.objects.filter(
+        vehicle_id=OuterRef("vehicle_id"), id__gt=OuterRef("id")
+    )
+    return TechnicalInspection.objects.filter(~Exists(newer))
+
+
+# ── Month arithmetic ─────────────────────────────────────────────────────────
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _months(date_from: date, date_to: date) -> list[date]:
+    months = []
+    month = _month_start(date_from)
+    while month < date_to:
+        months.append(month)
+        month = _add_months(month, 1)
+    return months
+
+
+def _key(month: date) -> str:
+    return month.strftime("%Y-%m")
+
+
+# ── Sources ──────────────────────────────────────────────────────────────────
+
+
+def _vehicle(row: dict) -> dict:
+    return {
+        "vehicle_id": str(row.pop("vehicle_id")),
+        **{name: row.pop(name) for name in _VEHICLE_FIELDS},
+    }
+
+
+def _inspection_events(start: date, end: date) -> list[dict]:
+    rows = (
+        latest_inspections()
+        .filter(next_inspection_date__gte=start, next_inspection_date__lt=end)
+        .order_by()
+        .values(
+            "id",
+            "vehicle_id",
+            "next_inspection_date",
+            "created_at",
+            **{name: F(path) for name, path in _VEHICLE_FIELDS.items()},
+        )
+    )
+    return [
+        {
+            "uid": f"inspection-{row['id']}",
+            "kind": CalendarEventKind.INSPECTION.value,
+            "object_id": row["id"],
+            "date": row["next_inspection_date"],
+            "title": CalendarEventKind.INSPECTION.label,
+            "is_done": False,
+            "updated_at": row["created_at"],
+            **_vehicle(row),
+        }
+        for row in rows
+    ]
+
+
+def _service_plan_events(start: date, end: date) -> list[dict]:
+    rows = (
+        ServicePlan.objects.filter(planned_at__gte=start, planned_at__lt=end)
+        .order_by()
+        .values(
+            "id",
+            "vehicle_id",
+            "title",
+            "planned_at",
+            "is_done",
+            "updated_at",
+            **{name: F(path) for name, path in _VEHICLE_FIELDS.items()},
+        )
+    )
+    return [
+        {
+            "uid": f"service-plan-{row['id']}",
+            "kind": CalendarEventKind.SERVICE_PLAN.value,
+            "object_id": row["id"],
+            "date": row["planned_at"],
+            "title": row["title"],
+            "is_done": row["is_done"],
+            "updated_at": row["updated_at"],
+            **_vehicle(row),
+        }
+        for row in rows
+    ]
+
+
+def _regulation_events(start: date, end: date) -> list[dict]:
+    """Entries whose predicted due date falls in [start, end).
+
+    The prediction is computed, not stored, so the window is applied in
+    Python over entries that are not yet due and have a velocity estimate.
+    """
+    velocity = "regulation__vehicle__mileage_velocity"
+    rows = (
+        FleetVehicleRegulationEntry.objects.filter(
+            regulation__vehicle__is_archived=False,
+            next_due_km__gt=F(f"{velocity}__last_km"),
+        )
+        .exclude(regulation__vehicle__status=VehicleStatus.SOLD)
+        .order_by()
+        .values(
+            "id",
+            "next_due_km",
+            "updated_at",
+            vehicle_id=F("regulation__vehicle_id"),
+            title=F("item__title"),
+            km_per_day=F(f"{velocity}__km_per_day"),
+            velocity_km=F(f"{velocity}__last_km"),
+            velocity_at=F(f"{velocity}__last_recorded_at"),
+            velocity_updated_at=F(f"{velocity}__updated_at"),
+            **{
+                name: F(f"regulation__{path}") for name, path in _VEHICLE_FIELDS.items()
+            },
+        )
+    )
+    events = []
+    for row in rows:
+        due = predict_due_date(
+            row["next_due_km"],
+            row["km_per_day"],
+            row["velocity_km"],
+            row["velocity_at"],
+        )
+        if due is None or not start <= due < end:
+            continue
+        events.append(
+            {
+                "uid": f"regulation-{row['id']}",
+                "kind": CalendarEventKind.REGULATION.value,
+                "object_id": row["id"],
+                "date": due,
+                "title": row["title"],
+                "is_done": False,
+                "next_due_km": row["next_due_km"],
+                "updated_at": max(row["updated_at"], row["velocity_updated_at"]),
+                **_vehicle(row),
+            }
+        )
+    return events
+
+
+# ── Buckets ──────────────────────────────────────────────────────────────────
+
+
+def _digest(events: list[dict]) -> str:
+    raw = json.dumps(events, default=str, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _build_buckets(months: list[date]) -> dict:
+    """Query every source once over the span of `months` and split by month.
+
+    Months inside the span that were already cached are rebuilt as well.
+    """
+    start, end = months[0], _add_months(months[-1], 1)
+    events = (
+        _inspection_events(start, end)
+        + _service_plan_events(start, end)
+        + _regulation_events(start, end)
+    )
+    grouped = {_key(month): [] for month in _months(start, end)}
+    for event in events:
+        grouped[_key(event["date"])].append(event)
+    buckets = {}
+    for key, month_events in grouped.items():
+        month_events.sort(key=lambda event: (event["date"], event["uid"]))
+        buckets[key] = {"events": month_events, "digest": _digest(month_events)}
+    return buckets
+
+
+def month_buckets(months: list[date]) -> dict:
+    """{"YYYY-MM": bucket} for `months`, building only the cache misses."""
+    buckets = cache_utils.get_calendar_months([_key(month) for month in months])
+    missing = [month for month in months if _key(month) not in buckets]
+    if missing:
+        built = _build_buckets(missing)
+        cache_utils.set_calendar_months(built)
+        buckets.update(built)
+    return buckets
+
+
+def parse_window(
+    date_from: str | None, date_to: str | None, *, months: int = DEFAULT_MONTHS
+) -> tuple[date, date]:
+    """Parse ISO from/to; defaults to `months` months from this month's start.
+
+    Raises ValueError for bad dates or windows.
+    """
+    start = (
+        date.fromisoformat(date_from)
+        if date_from
+        else _month_start(timezone.localdate())
+    )
+    end = date.fromisoformat(date_to) if date_to else _add_months(start, months)
+    if end <= start:
+        raise ValueError("'to' must be after 'from'.")
+    if (end - start).days > MAX_WINDOW_DAYS:
+        raise ValueError(f"The window may span at most {MAX_WINDOW_DAYS} days.")
+    return start, end
+
+
+def build_calendar(date_from: date, date_to: date, kinds=None) -> dict:
+    """Events in [date_from, date_to), optionally limited to `kinds`."""
+    if kinds:
+        unknown = set(kinds) - set(CalendarEventKind.values)
+        if unknown:
+            raise ValueError(
+                f"kind must be one of: {', '.join(CalendarEventKind.values)}."
+            )
+    months = _months(date_from, date_to)
+    buckets = month_buckets(months)
+
+    results = []
+    digests = [date_from.isoformat(), date_to.isoformat(), *sorted(kinds or [])]
+    for key in map(_key, months):
+        bucket = buckets[key]
+        digests.append(bucket["digest"])
+        results.extend(
+            event
+            for event in bucket["events"]
+            if date_from <= event["date"] < date_to
+            and (not kinds or event["kind"] in kinds)
+        )
+    return {
+        "from": date_from,
+        "to": date_to,
+        "etag": hashlib.sha1("|".join(digests).encode()).hexdigest(),
+        "results": results,
+    }
+
+
+# ── iCalendar ────────────────────────────────────────────────────────────────
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """RFC 5545 line folding: at most 75 octets per physical line."""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while raw:
+        cut = min(limit, len(raw))
+        # Never split a UTF-8 sequence.
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(raw[:cut].decode())
+        raw = raw[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def _utc(moment) -> str:
+    return moment.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_ics(events: list[dict], *, host: str = "fleet") -> str:
+    """Render events as all-day VEVENTs with stable UIDs.
+
+    UID + LAST-MODIFIED let clients update changed events in place; predicted
+    regulation dates are TENTATIVE since they move with the mileage estimate.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Fleet//Fleet calendar//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:Fleet calendar",
+    ]
+    for event in events:
+        summary = " — ".join(filter(None, (event["car_number"], event["title"])))
+        description = " ".join(filter(None, (event["manufacturer"], event["model"])))
+        if event.get("next_due_km") is not None:
+            description += f"\nDue at {event['next_due_km']} km"
+        stamp = _utc(event["updated_at"])
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{event['uid']}@{host}",
+            f"DTSTAMP:{stamp}",
+            f"LAST-MODIFIED:{stamp}",
+            f"DTSTART;VALUE=DATE:{event['date']:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{event['date'] + timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{_escape(summary)}",
+            f"DESCRIPTION:{_escape(description.strip())}",
+            f"CATEGORIES:{event['kind'].upper()}",
+            "STATUS:"
+            + (
+                "TENTATIVE"
+                if event["kind"] == CalendarEventKind.REGULATION
+                else "CONFIRMED"
+            ),
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(map(_fold, lines)) + "\r\n"
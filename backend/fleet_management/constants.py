@@ -13,6 +13,31 @@ class EventType(models.TextChoices):
     NOTIFIED = "notified", "Notification Sent"
 
 
+# Predicted regulation work within this many days of a technical inspection
+# is flagged on the calendar so both can be booked in one visit.
+INSPECTION_CONFLICT_DAYS = 14
+
+
+class CalendarEventKind(models.TextChoices):
+    INSPECTION = "inspection", "Technical inspection"
+    SERVICE_PLAN = "service_plan", "Service plan"
+    REGULATION = "regulation", "Predicted regulation"
+
+
+class FleetJobKind(models.TextChoices):
+    ITEM_UPDATED = "item_updated", "Regulation item updated"
+    ITEM_ADDED = "item_added", "Regulation item added"
+    EQUIPMENT_ADDED = "equipment_added", "Default equipment added"
+    EQUIPMENT_REMOVED = "equipment_removed", "Default equipment removed"
+
+
+class FleetJobStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
 # ---------------------------------------------------------------------------
 # Default seed data — single source of truth
 # ---------------------------------------------------------------------------
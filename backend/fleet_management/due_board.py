@@ -0,0 +1,197 @@
+"""
+Fleet maintenance due board.
+============================
+Every regulation entry of active vehicles (not archived, not sold) that is
+overdue or within MAX_WINDOW_KM of its due point, computed in one query over
+entries × items × vehicles. Per-vehicle overrides are already folded into
+the stored effective_* / next_due_km columns, and each row carries the
+predicted due date from the vehicle's MileageVelocity.
+
+The row set is cached as a single versioned payload (cache_utils
+.get_due_board); filtering, ordering and keyset pagination run over it in
+memory, so dispatchers paging through the board never hit the database.
+"""
+
+import base64
+import binascii
+import json
+
+from django.db.models import F, Q
+
+from config import cache_utils
+from vehicle.constants import VehicleStatus
+from vehicle.velocity import predict_due_date
+
+from .models import FleetVehicleRegulationEntry
+
+# Widest window a caller may ask for; bounds the cached payload.
+MAX_WINDOW_KM = 20_000
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# ordering param → row key; ties are broken by entry id.
+ORDERINGS = {
+    "km_remaining": "km_remaining",
+    "next_due_km": "next_due_km",
+    "car_number": "car_number",
+}
+
+STATES = ("overdue", "due_soon")
+
+
+def _sort_value(row: dict, sort_key: str):
+    """The row's ordering value; a vehicle without a plate sorts as ""."""
+    value = row[sort_key]
+    return "" if value is None else value
+
+
+def _query_rows() -> list[dict]:
+    rows = (
+        FleetVehicleRegulationEntry.objects.filter(
+            regulation__vehicle__is_archived=False,
+        )
+        .exclude(regulation__vehicle__status=VehicleStatus.SOLD)
+        .annotate(
+            current_km=F("regulation__vehicle__initial_km"),
+            km_remaining=F("next_due_km") - F("regulation__vehicle__initial_km"),
+        )
+        .filter(
+            Q(km_remaining__lte=MAX_WINDOW_KM)
+            | Q(km_remaining__lte=F("effective_notify_before_km"))
+        )
+        .order_by()
+        .values(
+            "id",
+            "km_remaining",
+            "current_km",
+            "next_due_km",
+            "last_done_km",
+            "effective_every_km",
+            "effective_notify_before_km",
+            "item_id",
+            vehicle_id=F("regulation__vehicle_id"),
+            car_number=F("regulation__vehicle__car_number"),
+            manufacturer=F("regulation__vehicle__manufacturer"),
+            model=F("regulation__vehicle__model"),
+            vehicle_status=F("regulation__vehicle__status"),
+            title=F("item__title"),
+            title_pl=F("item__title_pl"),
+            title_uk=F("item__title_uk"),
+            title_en=F("item__title_en"),
+            km_per_day=F("regulation__vehicle__mileage_velocity__km_per_day"),
+            velocity_km=F("regulation__vehicle__mileage_velocity__last_km"),
+            velocity_at=F("regulation__vehicle__mileage_velocity__last_recorded_at"),
+        )
+    )
+    result = []
+    for row in rows:
+        row["vehicle_id"] = str(row["vehicle_id"])
+        row["predicted_due_date"] = predict_due_date(
+            row["next_due_km"],
+            row["km_per_day"],
+            row.pop("velocity_km"),
+            row.pop("velocity_at"),
+        )
+        result.append(row)
+    return result
+
+
+def board_rows() -> list[dict]:
+    """All candidate rows, served from the versioned cache when possible."""
+    rows = cache_utils.get_due_board()
+    if rows is None:
+        rows = _query_rows()
+        cache_utils.set_due_board(rows)
+    return rows
+
+
+def encode_cursor(key, entry_id) -> str:
+    raw = json.dumps([key, entry_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        key, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    return key, entry_id
+
+
+def build_board(
+    *,
+    within_km: int | None = None,
+    state: str | None = None,
+    vehicle_status: list[str] | None = None,
+    search: str = "",
+    ordering: str = "km_remaining",
+    cursor: str | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> dict:
+    """Filter, order and keyset-paginate the board.
+
+    within_km=None uses each entry's own notify_before_km as the "due soon"
+    window. Raises ValueError for bad parameters.
+    """
+    if within_km is not None and not 0 <= within_km <= MAX_WINDOW_KM:
+        raise ValueError(f"within_km must be between 0 and {MAX_WINDOW_KM}.")
+    if state is not None and state not in STATES:
+        raise ValueError(f"state must be one of: {', '.join(STATES)}.")
+    descending = ordering.startswith("-")
+    sort_key = ORDERINGS.get(ordering.lstrip("-"))
+    if sort_key is None:
+        raise ValueError(
+            f"ordering must be one of: {', '.join(ORDERINGS)} (prefix - to reverse)."
+        )
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    search = search.strip().upper()
+    summary = {"overdue": 0, "due_soon": 0}
+    selected = []
+    for row in board_rows():
+        window = (
+            within_km if within_km is not None else row["effective_notify_before_km"]
+        )
+        if row["km_remaining"] > window:
+            continue
+        if vehicle_status and row["vehicle_status"] not in vehicle_status:
+            continue
+        if search and search not in (row["car_number"] or "").upper():
+            continue
+        row_state = "overdue" if row["km_remaining"] <= 0 else "due_soon"
+        summary[row_state] += 1
+        if state is None or row_state == state:
+            selected.append({**row, "state": row_state})
+
+    selected.sort(
+        key=lambda row: (_sort_value(row, sort_key), row["id"]), reverse=descending
+    )
+
+    start = 0
+    if cursor:
+        after = decode_cursor(cursor)
+
+        def past_cursor(row) -> bool:
+            key = (_sort_value(row, sort_key), row["id"])
+            return key < after if descending else key > after
+
+        try:
+            start = next(
+                (i for i, row in enumerate(selected) if past_cursor(row)),
+                len(selected),
+            )
+        except TypeError as e:
+            raise ValueError("Invalid cursor.") from e
+
+    page = selected[start : start + page_size]
+    next_cursor = None
+    if start + page_size < len(selected):
+        last = page[-1]
+        next_cursor = encode_cursor(_sort_value(last, sort_key), last["id"])
+    return {
+        "count": len(selected),
+        "summary": summary,
+        "next": next_cursor,
+        "results": page,
+    }
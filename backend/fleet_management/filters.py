@@ -1,7 +1,7 @@
 import django_filters
 
 from .constants import EventType
-from .models import FleetVehicleRegulationHistory, FleetVehicleRegulationSchema
+from .models import FleetVehicleRegulationSchema
 
 
 class FleetVehicleRegulationSchemaFilter(django_filters.FilterSet):
@@ -22,6 +22,7 @@ class FleetVehicleRegulationSchemaFilter(django_filters.FilterSet):
 
 
 class RegulationHistoryFilter(django_filters.FilterSet):
+    # No Meta.model: the same filters apply to the hot and archive tables.
     created_after = django_filters.DateTimeFilter(
         field_name="created_at", lookup_expr="gte"
     )
@@ -29,7 +30,3 @@ class RegulationHistoryFilter(django_filters.FilterSet):
         field_name="created_at", lookup_expr="lte"
     )
     event_type = django_filters.ChoiceFilter(choices=EventType.choices)
-
-    class Meta:
-        model = FleetVehicleRegulationHistory
-        fields = ["event_type"]
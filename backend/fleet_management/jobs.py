@@ -0,0 +1,165 @@
+"""
+Resumable fleet-wide jobs.
+==========================
+A FleetJob walks its scope queryset in primary-key order, one chunk per
+transaction, and saves its cursor inside that same transaction — after a
+crash or deploy the job resumes from the last committed chunk.
+
+Jobs are run by the `manage.py run_fleet_jobs --loop` worker, so the
+enqueueing request returns at once and clients poll the job for progress.
+settings.FLEET_JOBS_EAGER (tests) instead runs the job in-process right
+after the enqueueing transaction commits. A RUNNING job whose heartbeat
+(updated_at) is older than STALE_AFTER is considered abandoned.
+"""
+
+from collections.abc import Callable
+from datetime import timedelta
+import logging
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import propagation
+from .constants import FleetJobKind, FleetJobStatus
+from .models import FleetJob
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER = timedelta(minutes=10)
+
+
+class JobHandler(NamedTuple):
+    scope: Callable  # job -> queryset walked in pk order
+    apply: Callable  # (job, pks) -> vehicle ids touched by the chunk
+    invalidate: Callable  # vehicle ids -> None, called after the chunk commits
+
+
+_HANDLERS = {
+    FleetJobKind.ITEM_UPDATED: JobHandler(
+        propagation.regulation_scope,
+        propagation.apply_item_updated,
+        propagation.invalidate_plans,
+    ),
+    FleetJobKind.ITEM_ADDED: JobHandler(
+        propagation.regulation_scope,
+        propagation.apply_item_added,
+        propagation.invalidate_plans,
+    ),
+    FleetJobKind.EQUIPMENT_ADDED: JobHandler(
+        propagation.active_vehicle_scope,
+        propagation.apply_equipment_added,
+        propagation.invalidate_equipment,
+    ),
+    FleetJobKind.EQUIPMENT_REMOVED: JobHandler(
+        propagation.active_vehicle_scope,
+        propagation.apply_equipment_removed,
+        propagation.invalidate_equipment,
+    ),
+}
+
+
+def enqueue(kind, payload: dict, *, user=None) -> FleetJob:
+    job = FleetJob.objects.create(kind=kind, payload=payload, created_by=user)
+    if settings.FLEET_JOBS_EAGER:
+        transaction.on_commit(lambda: run_job(job.pk))
+    return job
+
+
+def _runnable() -> Q:
+    stale = timezone.now() - STALE_AFTER
+    return Q(status=FleetJobStatus.PENDING) | Q(
+        status=FleetJobStatus.RUNNING, updated_at__lt=stale
+    )
+
+
+def _claim(job_id) -> bool:
+    """Atomically flip a runnable job to RUNNING; False if someone else has it."""
+    claimed = FleetJob.objects.filter(_runnable(), pk=job_id).update(
+        status=FleetJobStatus.RUNNING,
+        attempts=F("attempts") + 1,
+        updated_at=timezone.now(),
+    )
+    return claimed == 1
+
+
+def run_job(job_id, *, chunk_size: int | None = None) -> FleetJob | None:
+    """Run (or resume) one job to completion. Returns None if not claimable."""
+    if not _claim(job_id):
+        return None
+    job = FleetJob.objects.get(pk=job_id)
+    handler = _HANDLERS[job.kind]
+    chunk_size = chunk_size or settings.FLEET_JOBS_CHUNK_SIZE
+    if job.total is None:
+        # Counted once, so processed / total stays a stable progress ratio.
+        job.total = handler.scope(job).count()
+        job.save(update_fields=["total", "updated_at"])
+
+    try:
+        while True:
+            with transaction.atomic():
+                rows = handler.scope(job).order_by("pk")
+                if job.cursor:
+                    rows = rows.filter(pk__gt=job.cursor)
+                pks = list(rows.values_list("pk", flat=True)[:chunk_size])
+                if not pks:
+                    break
+                vehicle_ids = handler.apply(job, pks)
+                job.cursor = str(pks[-1])
+                job.processed += len(pks)
+                job.save(update_fields=["cursor", "processed", "updated_at"])
+            if vehicle_ids:
+                handler.invalidate(vehicle_ids)
+    except Exception as exc:
+        # update() rather than save(): the in-memory cursor may be ahead of
+        # the rolled-back chunk.
+        FleetJob.objects.filter(pk=job.pk).update(
+            status=FleetJobStatus.FAILED, error=str(exc), updated_at=timezone.now()
+        )
+        job.refresh_from_db()
+        logger.error(
+            "Fleet job failed",
+            extra={
+                "status_code": 500,
+                "status_message": "Internal Server Error",
+                "operation_type": "FLEET_JOB_FAILED",
+                "service": "DJANGO",
+                "job_id": job.pk,
+                "job_kind": job.kind,
+                "cursor": job.cursor,
+            },
+            exc_info=True,
+        )
+        return job
+
+    job.status = FleetJobStatus.DONE
+    job.error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+    logger.info(
+        "Fleet job finished",
+        extra={
+            "status_code": 200,
+            "status_message": "OK",
+            "operation_type": "FLEET_JOB_DONE",
+            "service": "DJANGO",
+            "job_id": job.pk,
+            "job_kind": job.kind,
+            "processed": job.processed,
+        },
+    )
+    return job
+
+
+def run_pending(*, chunk_size: int | None = None) -> int:
+    """Run every pending or stale job, oldest first. Returns jobs completed."""
+    done = 0
+    for job_id in list(
+        FleetJob.objects.filter(_runnable()).values_list("pk", flat=True)
+    ):
+        job = run_job(job_id, chunk_size=chunk_size)
+        if job is not None and job.status == FleetJobStatus.DONE:
+            done += 1
+    return done
@@ -0,0 +1,81 @@
+"""
+Move old rows of the append-only logs into their archive tables.
+Covers regulation history, vehicle status history and mileage logs; the
+history endpoints read them back with ?tier=archive. Run nightly.
+Use: python manage.py archive_history [--days 365] [--log mileage] [--dry-run]
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from config.archive import move_to_archive
+from fleet_management.models import (
+    FleetVehicleRegulationHistory,
+    FleetVehicleRegulationHistoryArchive,
+)
+from vehicle.models import (
+    MileageLog,
+    MileageLogArchive,
+    VehicleStatusHistory,
+    VehicleStatusHistoryArchive,
+)
+from vehicle.velocity import WINDOW_DAYS
+
+# name → (hot model, archive model, date field)
+LOGS = {
+    "regulation": (
+        FleetVehicleRegulationHistory,
+        FleetVehicleRegulationHistoryArchive,
+        "created_at",
+    ),
+    "status": (VehicleStatusHistory, VehicleStatusHistoryArchive, "changed_at"),
+    "mileage": (MileageLog, MileageLogArchive, "recorded_at"),
+}
+
+
+class Command(BaseCommand):
+    help = "Move log rows older than --days into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.HISTORY_HOT_DAYS,
+            help="Rows older than this many days are archived.",
+        )
+        parser.add_argument(
+            "--log", choices=sorted(LOGS), action="append", help="Repeatable."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count eligible rows."
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        names = options["log"] or list(LOGS)
+        if "mileage" in names and days < WINDOW_DAYS:
+            # Mileage velocity reads recent logs from the hot table only
+            # (expense.analytics reads both tiers).
+            raise CommandError(f"Mileage logs must stay hot for {WINDOW_DAYS} days.")
+        for name in names:
+            model, archive_model, date_field = LOGS[name]
+            if date_field == "recorded_at":
+                cutoff = timezone.localdate() - timedelta(days=days)
+            else:
+                cutoff = timezone.now() - timedelta(days=days)
+            if options["dry_run"]:
+                count = model.objects.filter(**{f"{date_field}__lt": cutoff}).count()
+                self.stdout.write(f"{name}: {count} rows older than {cutoff}")
+                continue
+            moved = move_to_archive(
+                model,
+                archive_model,
+                date_field,
+                cutoff,
+                batch_size=options["batch_size"],
+            )
+            self.stdout.write(self.style.SUCCESS(f"{name}: archived {moved} rows."))
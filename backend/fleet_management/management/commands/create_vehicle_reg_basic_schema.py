@@ -1,12 +1,18 @@
 from django.core.management.base import BaseCommand
 
 from config import cache_utils
-from fleet_management.constants import DEFAULT_EQUIPMENT, DEFAULT_REGULATION_SCHEMA
+from fleet_management import jobs
+from fleet_management.constants import (
+    DEFAULT_EQUIPMENT,
+    DEFAULT_REGULATION_SCHEMA,
+    FleetJobKind,
+)
 from fleet_management.models import (
     EquipmentDefaultItem,
     FleetVehicleRegulationItem,
     FleetVehicleRegulationSchema,
 )
+from fleet_management.propagation import PROPAGATED_ITEM_FIELDS
 
 
 class Command(BaseCommand):
@@ -88,12 +94,21 @@ class Command(BaseCommand):
                 title=item_data["title"],
                 defaults=fields,
             )
+            payload = {"schema_id": schema.id, "item_id": item.id}
             if was_created:
                 new += 1
+                # Vehicles already on this schema get the new item too.
+                jobs.enqueue(FleetJobKind.ITEM_ADDED, payload)
             else:
+                payload["changes"] = {
+                    f: [getattr(item, f), fields[f]]
+                    for f in PROPAGATED_ITEM_FIELDS
+                    if getattr(item, f) != fields[f]
+                }
                 for attr, val in fields.items():
                     setattr(item, attr, val)
                 item.save(update_fields=list(fields.keys()))
+                jobs.enqueue(FleetJobKind.ITEM_UPDATED, payload)
                 updated += 1
 
         cache_utils.invalidate_schema()
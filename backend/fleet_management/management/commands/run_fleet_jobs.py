@@ -0,0 +1,60 @@
+"""
+Run pending / interrupted fleet jobs (schema propagation etc.).
+With --loop this is the jobs worker (the fleet-jobs compose service); it
+also resumes anything a crash or deploy left behind.
+Use: python manage.py run_fleet_jobs [--job <id>] [--retry-failed] [--loop]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from fleet_management import jobs
+from fleet_management.constants import FleetJobStatus
+from fleet_management.models import FleetJob
+
+
+class Command(BaseCommand):
+    help = "Run pending, stale or (with --retry-failed) failed fleet jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--job", type=int, help="Run a single job by id.")
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Re-queue failed jobs; they resume from their saved cursor.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=None)
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep polling for new jobs."
+        )
+        parser.add_argument(
+            "--interval", type=int, default=5, help="Polling interval (seconds)."
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            requeued = FleetJob.objects.filter(status=FleetJobStatus.FAILED).update(
+                status=FleetJobStatus.PENDING
+            )
+            self.stdout.write(f"Re-queued {requeued} failed jobs.")
+
+        if options.get("job"):
+            job = jobs.run_job(options["job"], chunk_size=options["chunk_size"])
+            if job is None:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Job {options['job']} is not runnable (done or in progress)."
+                    )
+                )
+            else:
+                self.stdout.write(f"Job {job.pk}: {job.status}, {job.processed} rows.")
+            return
+
+        while True:
+            done = jobs.run_pending(chunk_size=options["chunk_size"])
+            if done or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Completed {done} jobs."))
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
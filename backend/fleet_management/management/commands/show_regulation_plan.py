@@ -66,10 +66,10 @@ class Command(BaseCommand):
             for entry in regulation.entries.all():
                 item = entry.item
                 title = (item.title_uk or item.title).strip() or item.title
-                next_km = entry.last_done_km + item.every_km
                 self.stdout.write(
-                    f"  {title}: кожні {item.every_km} км, "
-                    f"останній раз {entry.last_done_km} км, наступний {next_km} км"
+                    f"  {title}: кожні {entry.effective_every_km} км, "
+                    f"останній раз {entry.last_done_km} км, "
+                    f"наступний {entry.next_due_km} км"
                 )
             self.stdout.write("")
             self.stdout.write(
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:51
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_due_fields(apps, schema_editor):
+    Entry = apps.get_model("fleet_management", "FleetVehicleRegulationEntry")
+    Item = apps.get_model("fleet_management", "FleetVehicleRegulationItem")
+    item = Item.objects.filter(pk=OuterRef("item_id"))
+    every = Coalesce(F("every_km"), Subquery(item.values("every_km")[:1]))
+    Entry.objects.update(
+        effective_every_km=every,
+        effective_notify_before_km=Coalesce(
+            F("notify_before_km"), Subquery(item.values("notify_before_km")[:1])
+        ),
+        next_due_km=Coalesce(F("next_due_km_override"), F("last_done_km") + every),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("fleet_management", "0010_regulation_mile_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fleetvehicleregulationentry",
+            name="effective_every_km",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="fleetvehicleregulationentry",
+            name="effective_notify_before_km",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="fleetvehicleregulationentry",
+            name="next_due_km",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_due_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="fleetvehicleregulationentry",
+            index=models.Index(
+                fields=["regulation", "next_due_km"], name="idx_reg_entry_next_due"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fleetvehicleregulationentry",
+            index=models.Index(
+                fields=["next_due_km"], name="idx_reg_entry_next_due_km"
+            ),
+        ),
+    ]
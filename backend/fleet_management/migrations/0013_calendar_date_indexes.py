@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("fleet_management", "0012_fleet_job"),
+        ("vehicle", "0019_calendar_date_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="serviceplan",
+            index=models.Index(
+                fields=["planned_at"], name="idx_service_plan_planned_at"
+            ),
+        ),
+    ]
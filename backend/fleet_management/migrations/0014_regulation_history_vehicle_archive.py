@@ -0,0 +1,117 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_history_vehicle(apps, schema_editor):
+    History = apps.get_model("fleet_management", "FleetVehicleRegulationHistory")
+    Entry = apps.get_model("fleet_management", "FleetVehicleRegulationEntry")
+    entry = Entry.objects.filter(pk=OuterRef("entry_id"))
+    History.objects.filter(vehicle__isnull=True).update(
+        vehicle_id=Subquery(entry.values("regulation__vehicle_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("fleet_management", "0013_calendar_date_indexes"),
+        ("vehicle", "0020_history_archive"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FleetVehicleRegulationHistoryArchive",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("performed", "Service Performed"),
+                            ("km_updated", "KM Updated"),
+                            ("notified", "Notification Sent"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("km_at_event", models.PositiveIntegerField()),
+                ("km_remaining", models.IntegerField()),
+                ("note", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="fleetvehicleregulationhistory",
+            name="vehicle",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="regulation_history",
+                to="vehicle.vehicle",
+            ),
+        ),
+        migrations.RunPython(backfill_history_vehicle, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="fleetvehicleregulationhistory",
+            name="vehicle",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="regulation_history",
+                to="vehicle.vehicle",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fleetvehicleregulationhistory",
+            index=models.Index(
+                fields=["vehicle", "-created_at"], name="idx_reg_hist_vehicle_date"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fleetvehicleregulationhistory",
+            index=models.Index(fields=["created_at"], name="idx_reg_hist_created_at"),
+        ),
+        migrations.AddField(
+            model_name="fleetvehicleregulationhistoryarchive",
+            name="created_by",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="fleetvehicleregulationhistoryarchive",
+            name="entry",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="fleet_management.fleetvehicleregulationentry",
+            ),
+        ),
+        migrations.AddField(
+            model_name="fleetvehicleregulationhistoryarchive",
+            name="vehicle",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="vehicle.vehicle",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fleetvehicleregulationhistoryarchive",
+            index=models.Index(
+                fields=["vehicle", "-created_at"], name="idx_reg_hist_arch_vehicle_date"
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expense", "0020_vehiclecostdaily_vehiclecostmonthly"),
+        ("fleet_management", "0014_regulation_history_vehicle_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fleetvehicleregulationhistory",
+            name="expense",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="regulation_history",
+                to="expense.expense",
+            ),
+        ),
+        migrations.AddField(
+            model_name="fleetvehicleregulationhistoryarchive",
+            name="expense",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="expense.expense",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("fleet_management", "0015_regulation_history_expense"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fleetjob",
+            name="total",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Size of the scope, counted when the job first starts.",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="fleetjob",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("item_updated", "Regulation item updated"),
+                    ("item_added", "Regulation item added"),
+                    ("equipment_added", "Default equipment added"),
+                    ("equipment_removed", "Default equipment removed"),
+                ],
+                max_length=30,
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("fleet_management", "0016_fleet_job_total_equipment_kinds"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TranslationMemory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source_lang", models.CharField(max_length=5)),
+                ("target_lang", models.CharField(max_length=5)),
+                (
+                    "source_hash",
+                    models.CharField(
+                        help_text="SHA-1 of the normalized source text.", max_length=40
+                    ),
+                ),
+                ("source_text", models.TextField()),
+                ("translated_text", models.TextField()),
+                ("backend", models.CharField(max_length=30)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("source_hash", "source_lang", "target_lang"),
+                        name="unique_translation_memory",
+                    )
+                ],
+            },
+        ),
+    ]
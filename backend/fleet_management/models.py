@@ -1,6 +1,11 @@
 from django.db import models, transaction
 
-from .constants import EventType, RegulationNotificationStatus
+from .constants import (
+    EventType,
+    FleetJobKind,
+    FleetJobStatus,
+    RegulationNotificationStatus,
+)
 
 
 class FleetService(models.Model):
@@ -185,17 +190,51 @@ class FleetVehicleRegulationEntry(models.Model):
         blank=True,
         help_text="One-time override for next_due_km. Cleared on next mark-done.",
     )
+    # ── Derived, stored for SQL-side due queries ──
+    # Kept in sync by save() and, for item-level changes, by
+    # fleet_management.services.sync_entry_due_fields().
+    effective_every_km = models.PositiveIntegerField(default=0, editable=False)
+    effective_notify_before_km = models.PositiveIntegerField(default=0, editable=False)
+    next_due_km = models.PositiveIntegerField(default=0, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    DERIVED_FIELDS = ("effective_every_km", "effective_notify_before_km", "next_due_km")
+
     class Meta:
         unique_together = [("regulation", "item")]
+        indexes = [
+            models.Index(
+                fields=["regulation", "next_due_km"], name="idx_reg_entry_next_due"
+            ),
+            models.Index(fields=["next_due_km"], name="idx_reg_entry_next_due_km"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.item.title} → next at {self.next_due_km} km"
 
-    @property
-    def effective_every_km(self):
-        return self.every_km if self.every_km is not None else self.item.every_km
+    def save(self, *args, **kwargs):
+        self.sync_due_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *self.DERIVED_FIELDS}
+        super().save(*args, **kwargs)
+
+    def sync_due_fields(self) -> None:
+        """Recompute the stored effective_* / next_due_km values in memory."""
+        item = self.item
+        self.effective_every_km = (
+            self.every_km if self.every_km is not None else item.every_km
+        )
+        self.effective_notify_before_km = (
+            self.notify_before_km
+            if self.notify_before_km is not None
+            else item.notify_before_km
+        )
+        self.next_due_km = (
+            self.next_due_km_override
+            if self.next_due_km_override is not None
+            else self.last_done_km + self.effective_every_km
+        )
 
     @property
     def effective_every_mi(self):
@@ -203,26 +242,12 @@ class FleetVehicleRegulationEntry(models.Model):
             return self.every_mi
         return self.item.every_mi
 
-    @property
-    def effective_notify_before_km(self):
-        return (
-            self.notify_before_km
-            if self.notify_before_km is not None
-            else self.item.notify_before_km
-        )
-
     @property
     def effective_notify_before_mi(self):
         if self.notify_before_mi is not None:
             return self.notify_before_mi
         return self.item.notify_before_mi
 
-    @property
-    def next_due_km(self):
-        if self.next_due_km_override is not None:
-            return self.next_due_km_override
-        return self.last_done_km + self.effective_every_km
-
     def is_due(self, current_km: int) -> bool:
         return current_km >= self.next_due_km
 
@@ -238,10 +263,26 @@ class FleetVehicleRegulationHistory(models.Model):
         on_delete=models.CASCADE,
         related_name="history",
     )
+    # Denormalized from entry.regulation.vehicle: per-vehicle history reads
+    # hit one index instead of joining entry → regulation.
+    vehicle = models.ForeignKey(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        related_name="regulation_history",
+        db_index=False,
+    )
     event_type = models.CharField(max_length=20, choices=EventType.choices)
     km_at_event = models.PositiveIntegerField()
     km_remaining = models.IntegerField()
     note = models.TextField(blank=True)
+    # SERVICE expense of the visit that performed this item, if recorded.
+    expense = models.ForeignKey(
+        "expense.Expense",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="regulation_history",
+    )
     created_by = models.ForeignKey(
         "account.User",
         on_delete=models.SET_NULL,
@@ -252,6 +293,67 @@ class FleetVehicleRegulationHistory(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["vehicle", "-created_at"], name="idx_reg_hist_vehicle_date"
+            ),
+            models.Index(fields=["created_at"], name="idx_reg_hist_created_at"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.entry.item.title} [{self.event_type}] at {self.km_at_event} km"
+
+    def save(self, *args, **kwargs):
+        if self.vehicle_id is None:
+            self.vehicle_id = self.entry.regulation.vehicle_id
+        super().save(*args, **kwargs)
+
+
+class FleetVehicleRegulationHistoryArchive(models.Model):
+    """Cold tier of FleetVehicleRegulationHistory (see archive_history).
+
+    Same columns and ids as the hot table; rows only arrive via the mover.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    entry = models.ForeignKey(
+        FleetVehicleRegulationEntry,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    vehicle = models.ForeignKey(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+    )
+    event_type = models.CharField(max_length=20, choices=EventType.choices)
+    km_at_event = models.PositiveIntegerField()
+    km_remaining = models.IntegerField()
+    note = models.TextField(blank=True)
+    expense = models.ForeignKey(
+        "expense.Expense",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_by = models.ForeignKey(
+        "account.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["vehicle", "-created_at"],
+                name="idx_reg_hist_arch_vehicle_date",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.entry.item.title} [{self.event_type}] at {self.km_at_event} km"
@@ -295,9 +397,13 @@ class ServicePlan(models.Model):
         related_name="created_service_plans",
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("vehicle", "title")
+        indexes = [
+            models.Index(fields=["planned_at"], name="idx_service_plan_planned_at"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.vehicle} — {self.title}"
@@ -340,3 +446,88 @@ class EquipmentList(models.Model):
     def __str__(self) -> str:
         status = "yes" if self.is_equipped else "no"
         return f"{self.vehicle} - {self.equipment} [{status}]"
+
+
+class FleetJob(models.Model):
+    """Resumable fleet-wide job - walks its scope in pk order, one chunk per transaction."""
+
+    kind = models.CharField(max_length=30, choices=FleetJobKind.choices)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10,
+        choices=FleetJobStatus.choices,
+        default=FleetJobStatus.PENDING,
+    )
+    cursor = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Primary key of the last processed row; empty before the first chunk.",
+    )
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Size of the scope, counted when the job first starts.",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        "account.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="fleet_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="idx_fleet_job_status"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk} [{self.status}]"
+
+
+class TranslationMemory(models.Model):
+    """One stored translation of a normalized text (see translation.py)."""
+
+    source_lang = models.CharField(max_length=5)
+    target_lang = models.CharField(max_length=5)
+    source_hash = models.CharField(
+        max_length=40, help_text="SHA-1 of the normalized source text."
+    )
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    backend = models.CharField(max_length=30)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source_hash", "source_lang", "target_lang"],
+                name="unique_translation_memory",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.source_lang}→{self.target_lang}: {self.source_text[:40]}"
+
+
+class CalendarFeedToken(models.Model):
+    """Per-user secret for subscribing to calendar.ics from calendar clients,
+    which cannot send the session cookie. Only its SHA-256 is stored."""
+
+    user = models.OneToOneField(
+        "account.User",
+        on_delete=models.CASCADE,
+        related_name="calendar_feed_token",
+        primary_key=True,
+    )
+    token_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"Calendar feed token for {self.user_id}"
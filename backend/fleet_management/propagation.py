@@ -0,0 +1,201 @@
+"""
+Schema → vehicles propagation.
+==============================
+Pushes regulation-item edits and additions to every FleetVehicleRegulation
+on the item's schema, and default-equipment changes to every active
+vehicle. Runs as a FleetJob (see jobs.py); each call below handles one
+keyset chunk (regulation ids / vehicle ids) inside the chunk's transaction:
+
+- ITEM_UPDATED: one UPDATE re-deriving the stored due columns of entries
+  that inherit the changed item value, one INSERT ... SELECT of history.
+- ITEM_ADDED: one INSERT ... SELECT creating the missing entries (baseline:
+  the vehicle's initial_km), one INSERT ... SELECT of their history rows.
+- EQUIPMENT_ADDED: one INSERT ... SELECT ... ON CONFLICT DO NOTHING adding
+  the (unequipped) item to the chunk's vehicles.
+- EQUIPMENT_REMOVED: one DELETE of the item where it is still unequipped.
+
+The job cursor commits together with the chunk, so a resumed job never
+writes the same rows twice.
+"""
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from config import cache_utils
+from vehicle.constants import VehicleStatus
+from vehicle.models import Vehicle
+
+from .constants import EventType
+from .models import (
+    EquipmentList,
+    FleetVehicleRegulation,
+    FleetVehicleRegulationEntry,
+    FleetVehicleRegulationHistory,
+    FleetVehicleRegulationItem,
+)
+from .services import sync_entry_due_fields
+
+# Item fields whose change moves the due point of inheriting entries.
+PROPAGATED_ITEM_FIELDS = ("every_km", "notify_before_km")
+
+_LABELS = {"every_km": "interval", "notify_before_km": "notify"}
+
+
+def _table(model) -> str:
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _now():
+    return connection.ops.adapt_datetimefield_value(timezone.now())
+
+
+def regulation_scope(job):
+    return FleetVehicleRegulation.objects.filter(schema_id=job.payload["schema_id"])
+
+
+def invalidate_plans(vehicle_ids) -> None:
+    cache_utils.invalidate_regulation_plans(vehicle_ids)
+
+
+def _chunk_vehicle_ids(pks) -> list:
+    return list(
+        FleetVehicleRegulation.objects.filter(pk__in=pks).values_list(
+            "vehicle_id", flat=True
+        )
+    )
+
+
+def _insert_history(item_id, pks, *, where: str, note: str, user_id) -> None:
+    """INSERT ... SELECT one KM_UPDATED row per matching entry of the chunk."""
+    sql = f"""
+        INSERT INTO {_table(FleetVehicleRegulationHistory)}
+            (entry_id, vehicle_id, event_type, km_at_event, km_remaining, note,
+             created_by_id, created_at)
+        SELECT e.id, r.vehicle_id, %s, e.last_done_km,
+               e.next_due_km - e.last_done_km, %s, %s, %s
+        FROM {_table(FleetVehicleRegulationEntry)} e
+        JOIN {_table(FleetVehicleRegulation)} r ON r.id = e.regulation_id
+        WHERE e.item_id = %s AND e.regulation_id BETWEEN %s AND %s AND ({where})
+    """
+    user_pk = FleetVehicleRegulationHistory._meta.get_field("created_by").target_field
+    user_id = user_pk.get_db_prep_value(user_id, connection)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            [EventType.KM_UPDATED, note, user_id, _now(), item_id, pks[0], pks[-1]],
+        )
+
+
+def apply_item_updated(job, pks) -> list:
+    """Re-derive inheriting entries of one chunk after an item edit."""
+    item_id = job.payload["item_id"]
+    changes = {
+        field: values
+        for field, values in job.payload.get("changes", {}).items()
+        if field in PROPAGATED_ITEM_FIELDS
+    }
+    if changes:
+        inherits = Q()
+        for field in changes:
+            inherits |= Q(**{f"{field}__isnull": True})
+        sync_entry_due_fields(
+            FleetVehicleRegulationEntry.objects.filter(
+                inherits, item_id=item_id, regulation__pk__range=(pks[0], pks[-1])
+            )
+        )
+        _insert_history(
+            item_id,
+            pks,
+            where=" OR ".join(f"e.{field} IS NULL" for field in changes),
+            note="Schema update: "
+            + "; ".join(
+                f"{_LABELS[field]}: {old} → {new} km"
+                for field, (old, new) in changes.items()
+            ),
+            user_id=job.created_by_id,
+        )
+    # Titles are part of the cached plan too, so every chunk is invalidated.
+    return _chunk_vehicle_ids(pks)
+
+
+def apply_item_added(job, pks) -> list:
+    """Create the entry for a new schema item on every regulation of one chunk."""
+    item_id = job.payload["item_id"]
+    entry_table = _table(FleetVehicleRegulationEntry)
+    sql = f"""
+        INSERT INTO {entry_table}
+            (regulation_id, item_id, last_done_km, effective_every_km,
+             effective_notify_before_km, next_due_km, updated_at)
+        SELECT r.id, i.id, v.initial_km, i.every_km, i.notify_before_km,
+               v.initial_km + i.every_km, %s
+        FROM {_table(FleetVehicleRegulation)} r
+        JOIN {_table(Vehicle)} v ON v.id = r.vehicle_id
+        JOIN {_table(FleetVehicleRegulationItem)} i ON i.id = %s
+        WHERE r.schema_id = i.schema_id AND r.id BETWEEN %s AND %s
+          AND NOT EXISTS (
+              SELECT 1 FROM {entry_table} e
+              WHERE e.regulation_id = r.id AND e.item_id = i.id
+          )
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_now(), item_id, pks[0], pks[-1]])
+        if not cursor.rowcount:
+            return []
+
+    history_table = _table(FleetVehicleRegulationHistory)
+    _insert_history(
+        item_id,
+        pks,
+        where=f"NOT EXISTS (SELECT 1 FROM {history_table} h WHERE h.entry_id = e.id)",
+        note="Added from schema",
+        user_id=job.created_by_id,
+    )
+    return _chunk_vehicle_ids(pks)
+
+
+# ── Default equipment ────────────────────────────────────────────────────────
+
+
+def active_vehicle_scope(job):
+    return Vehicle.objects.filter(is_archived=False).exclude(status=VehicleStatus.SOLD)
+
+
+def invalidate_equipment(vehicle_ids) -> None:
+    cache_utils.invalidate_equipments(vehicle_ids)
+
+
+def apply_equipment_added(job, pks) -> list:
+    """Add a new default item to every vehicle of one chunk that lacks it."""
+    vehicle_pk = Vehicle._meta.pk
+    user_pk = EquipmentList._meta.get_field("created_by").target_field
+    sql = f"""
+        INSERT INTO {_table(EquipmentList)}
+            (vehicle_id, equipment, is_equipped, created_by_id, created_at)
+        SELECT v.id, %s, %s, %s, %s
+        FROM {_table(Vehicle)} v
+        WHERE v.id IN ({", ".join(["%s"] * len(pks))})
+        ON CONFLICT (vehicle_id, equipment) DO NOTHING
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            [
+                job.payload["equipment"],
+                False,
+                user_pk.get_db_prep_value(job.created_by_id, connection),
+                _now(),
+                *(vehicle_pk.get_db_prep_value(pk, connection) for pk in pks),
+            ],
+        )
+        if not cursor.rowcount:
+            return []
+    return pks
+
+
+def apply_equipment_removed(job, pks) -> list:
+    """Drop a deleted default item from the chunk's vehicles unless equipped."""
+    deleted, _ = EquipmentList.objects.filter(
+        vehicle_id__in=pks, equipment=job.payload["equipment"], is_equipped=False
+    ).delete()
+    return pks if deleted else []
@@ -1,18 +1,23 @@
 from rest_framework import serializers
 
 from vehicle.models import TechnicalInspection
+from vehicle.velocity import predict_for
 
+from .constants import INSPECTION_CONFLICT_DAYS
 from .models import (
     EquipmentDefaultItem,
     EquipmentList,
+    FleetJob,
     FleetService,
     FleetVehicleRegulation,
     FleetVehicleRegulationEntry,
     FleetVehicleRegulationHistory,
+    FleetVehicleRegulationHistoryArchive,
     FleetVehicleRegulationItem,
     FleetVehicleRegulationSchema,
     ServicePlan,
 )
+from .translation import LANG_MAP
 
 
 class FleetServiceSerializer(serializers.ModelSerializer):
@@ -132,6 +137,86 @@ class AssignRegulationSerializer(serializers.Serializer):
         return data
 
 
+class BulkAssignVehicleSerializer(serializers.Serializer):
+    vehicle_id = serializers.UUIDField()
+    last_done_km = serializers.DictField(
+        child=serializers.IntegerField(min_value=0), required=False, default=dict
+    )
+
+    def validate_last_done_km(self, value):
+        try:
+            return {int(item_id): km for item_id, km in value.items()}
+        except ValueError as e:
+            raise serializers.ValidationError("Keys must be item ids") from e
+
+
+class BulkAssignRegulationSerializer(serializers.Serializer):
+    schema_id = serializers.IntegerField()
+    vehicles = BulkAssignVehicleSerializer(many=True, allow_empty=False)
+
+    def validate_schema_id(self, value):
+        if not FleetVehicleRegulationSchema.objects.filter(pk=value).exists():
+            raise serializers.ValidationError(f"Schema {value} does not exist")
+        return value
+
+    def validate(self, data):
+        vehicle_ids = [v["vehicle_id"] for v in data["vehicles"]]
+        if len(vehicle_ids) != len(set(vehicle_ids)):
+            raise serializers.ValidationError("Duplicate vehicle_id in request")
+
+        schema_item_ids = set(
+            FleetVehicleRegulationItem.objects.filter(
+                schema_id=data["schema_id"]
+            ).values_list("id", flat=True)
+        )
+        provided = {item_id for v in data["vehicles"] for item_id in v["last_done_km"]}
+        invalid = provided - schema_item_ids
+        if invalid:
+            raise serializers.ValidationError(
+                f"Items {invalid} do not belong to schema"
+            )
+        return data
+
+
+class BatchEntryDoneSerializer(serializers.Serializer):
+    entry_id = serializers.IntegerField()
+    last_done_km = serializers.IntegerField(min_value=0, required=False)
+    every_km = serializers.IntegerField(min_value=1, required=False)
+    every_mi = serializers.IntegerField(min_value=1, required=False)
+    notify_before_km = serializers.IntegerField(min_value=0, required=False)
+    notify_before_mi = serializers.IntegerField(min_value=0, required=False)
+    next_due_km_override = serializers.IntegerField(min_value=1, required=False)
+    note = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, data):
+        if set(data) <= {"entry_id", "note"}:
+            raise serializers.ValidationError(
+                "Provide last_done_km and/or every_km / notify_before_km."
+            )
+        return data
+
+
+class BatchMarkDoneSerializer(serializers.Serializer):
+    entries = BatchEntryDoneSerializer(many=True, allow_empty=False)
+    expense_id = serializers.UUIDField(required=False, allow_null=True)
+    note = serializers.CharField(required=False, allow_blank=True, default="")
+
+    def validate_entries(self, value):
+        entry_ids = [entry["entry_id"] for entry in value]
+        if len(entry_ids) != len(set(entry_ids)):
+            raise serializers.ValidationError("Duplicate entry_id in request")
+        return value
+
+
+class TranslateBatchSerializer(serializers.Serializer):
+    texts = serializers.ListField(
+        child=serializers.CharField(max_length=1000),
+        allow_empty=False,
+        max_length=200,
+    )
+    source = serializers.ChoiceField(choices=list(LANG_MAP), default="uk")
+
+
 class AddRegulationEntrySerializer(serializers.Serializer):
     title = serializers.CharField(max_length=155)
     title_pl = serializers.CharField(max_length=155, required=False, default="")
@@ -144,6 +229,10 @@ class AddRegulationEntrySerializer(serializers.Serializer):
         min_value=0, required=False, default=None
     )
     last_done_km = serializers.IntegerField(min_value=0, default=0)
+    apply_to_all = serializers.BooleanField(
+        default=False,
+        help_text="Also add the item to every other vehicle on this schema.",
+    )
 
 
 class FleetVehicleRegulationSchemaUpdateSerializer(serializers.ModelSerializer):
@@ -211,6 +300,7 @@ class CalendarInspectionSerializer(serializers.ModelSerializer):
         source="vehicle.car_number", read_only=True
     )
     planned_at = serializers.DateField(source="next_inspection_date", read_only=True)
+    regulations_due_nearby = serializers.SerializerMethodField()
 
     class Meta:
         model = TechnicalInspection
@@ -219,15 +309,50 @@ class CalendarInspectionSerializer(serializers.ModelSerializer):
             "vehicle",
             "vehicle_car_number",
             "planned_at",
+            "regulations_due_nearby",
         ]
 
+    def get_regulations_due_nearby(self, obj):
+        """Entries predicted due within INSPECTION_CONFLICT_DAYS of the inspection."""
+        velocity = getattr(obj.vehicle, "mileage_velocity", None)
+        if velocity is None:
+            return []
+        nearby = []
+        for regulation in obj.vehicle.regulations.all():
+            for entry in regulation.entries.all():
+                predicted = predict_for(velocity, entry.next_due_km)
+                if predicted is None:
+                    continue
+                offset = (predicted - obj.next_inspection_date).days
+                if abs(offset) <= INSPECTION_CONFLICT_DAYS:
+                    nearby.append(
+                        {
+                            "entry_id": entry.id,
+                            "title": entry.item.title,
+                            "title_pl": entry.item.title_pl,
+                            "title_uk": entry.item.title_uk,
+                            "title_en": entry.item.title_en,
+                            "next_due_km": entry.next_due_km,
+                            "predicted_due_date": predicted,
+                            "days_from_inspection": offset,
+                        }
+                    )
+        return nearby
+
 
 class EquipmentDefaultItemSerializer(serializers.ModelSerializer):
+    apply_to_all = serializers.BooleanField(
+        default=False,
+        write_only=True,
+        help_text="Also add the item to every active vehicle.",
+    )
+
     class Meta:
         model = EquipmentDefaultItem
         fields = [
             "id",
             "equipment",
+            "apply_to_all",
             "created_by",
             "created_at",
         ]
@@ -264,6 +389,7 @@ class VehicleRegulationPlanEntrySerializer(serializers.ModelSerializer):
     effective_every_mi = serializers.IntegerField(read_only=True)
     effective_notify_before_km = serializers.IntegerField(read_only=True)
     effective_notify_before_mi = serializers.IntegerField(read_only=True)
+    predicted_due_date = serializers.SerializerMethodField()
 
     class Meta:
         model = FleetVehicleRegulationEntry
@@ -281,9 +407,14 @@ class VehicleRegulationPlanEntrySerializer(serializers.ModelSerializer):
             "effective_notify_before_km",
             "effective_notify_before_mi",
             "next_due_km",
+            "predicted_due_date",
             "updated_at",
         ]
 
+    def get_predicted_due_date(self, obj):
+        # Views pass the vehicle's MileageVelocity in context (may be None).
+        return predict_for(self.context.get("velocity"), obj.next_due_km)
+
 
 class _RegulationSchemaShortSerializer(serializers.ModelSerializer):
     class Meta:
@@ -318,7 +449,30 @@ class VehicleRegulationHistorySerializer(serializers.ModelSerializer):
             "km_at_event",
             "km_remaining",
             "note",
+            "expense",
             "created_by",
             "created_at",
         ]
         read_only_fields = fields
+
+
+class VehicleRegulationHistoryArchiveSerializer(VehicleRegulationHistorySerializer):
+    class Meta(VehicleRegulationHistorySerializer.Meta):
+        model = FleetVehicleRegulationHistoryArchive
+
+
+class FleetJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FleetJob
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "processed",
+            "total",
+            "error",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
@@ -1,8 +1,12 @@
 import logging
 
 from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from config import cache_utils
+from vehicle.models import Vehicle
 
 from .constants import EventType
 from .models import (
@@ -11,6 +15,7 @@ from .models import (
     FleetVehicleRegulation,
     FleetVehicleRegulationEntry,
     FleetVehicleRegulationHistory,
+    FleetVehicleRegulationItem,
 )
 
 logger = logging.getLogger(__name__)
@@ -92,6 +97,7 @@ def assign_regulation_to_vehicle(vehicle_pk, schema_id, entries_data, user):
         entry = FleetVehicleRegulationEntry.objects.create(**create_kwargs)
         FleetVehicleRegulationHistory.objects.create(
             entry=entry,
+            vehicle_id=regulation.vehicle_id,
             event_type=EventType.KM_UPDATED,
             km_at_event=entry_data["last_done_km"],
             km_remaining=entry.next_due_km - entry_data["last_done_km"],
@@ -105,3 +111,238 @@ def assign_regulation_to_vehicle(vehicle_pk, schema_id, entries_data, user):
         "schema": regulation.schema.title,
         "entries_created": len(created_entries),
     }
+
+
+BULK_ASSIGN_BATCH_SIZE = 1000
+
+
+@transaction.atomic
+def bulk_assign_regulation(
+    schema_id, vehicles_data, user, *, batch_size=BULK_ASSIGN_BATCH_SIZE
+):
+    """Assign one schema to many vehicles with a few bulk INSERTs.
+
+    vehicles_data: [{"vehicle_id": ..., "last_done_km": {item_id: km}}]. Every
+    schema item gets an entry; items missing from the map start at the
+    vehicle's initial_km. Vehicles that already have the schema are skipped.
+    """
+    items = list(FleetVehicleRegulationItem.objects.filter(schema_id=schema_id))
+    if not items:
+        raise ValueError("Schema has no items")
+
+    km_maps = {str(v["vehicle_id"]): v.get("last_done_km") or {} for v in vehicles_data}
+    initial_km = {
+        str(pk): km or 0
+        for pk, km in Vehicle.objects.filter(pk__in=km_maps).values_list(
+            "pk", "initial_km"
+        )
+    }
+    missing = set(km_maps) - set(initial_km)
+    if missing:
+        raise ValueError(f"Vehicles {sorted(missing)} do not exist")
+
+    assigned = {
+        str(pk)
+        for pk in FleetVehicleRegulation.objects.filter(
+            schema_id=schema_id, vehicle_id__in=km_maps
+        ).values_list("vehicle_id", flat=True)
+    }
+    targets = [vehicle_id for vehicle_id in km_maps if vehicle_id not in assigned]
+
+    regulations = FleetVehicleRegulation.objects.bulk_create(
+        [
+            FleetVehicleRegulation(
+                vehicle_id=vehicle_id, schema_id=schema_id, created_by=user
+            )
+            for vehicle_id in targets
+        ],
+        batch_size=batch_size,
+    )
+
+    entries = []
+    for regulation in regulations:
+        vehicle_id = str(regulation.vehicle_id)
+        km_map = km_maps[vehicle_id]
+        for item in items:
+            entry = FleetVehicleRegulationEntry(
+                regulation=regulation,
+                item=item,
+                last_done_km=km_map.get(item.id, initial_km[vehicle_id]),
+            )
+            # bulk_create() bypasses save(), so fill the stored columns here.
+            entry.sync_due_fields()
+            entries.append(entry)
+    FleetVehicleRegulationEntry.objects.bulk_create(entries, batch_size=batch_size)
+
+    FleetVehicleRegulationHistory.objects.bulk_create(
+        [
+            FleetVehicleRegulationHistory(
+                entry=entry,
+                vehicle_id=entry.regulation.vehicle_id,
+                event_type=EventType.KM_UPDATED,
+                km_at_event=entry.last_done_km,
+                km_remaining=entry.next_due_km - entry.last_done_km,
+                note="Initial assignment",
+                created_by=user,
+            )
+            for entry in entries
+        ],
+        batch_size=batch_size,
+    )
+
+    transaction.on_commit(lambda: cache_utils.invalidate_regulation_plans(targets))
+    logger.info(
+        "Regulation bulk-assigned to vehicles",
+        extra={
+            "status_code": 201,
+            "status_message": "Created",
+            "operation_type": "REGULATION_BULK_ASSIGN_SUCCESS",
+            "service": "DJANGO",
+            "schema_id": schema_id,
+            "regulations_created": len(regulations),
+            "entries_created": len(entries),
+            "skipped_count": len(assigned),
+        },
+    )
+    return {
+        "schema_id": schema_id,
+        "regulations_created": len(regulations),
+        "entries_created": len(entries),
+        "skipped_vehicle_ids": sorted(assigned),
+    }
+
+
+# Per-entry settings a batch mark-done may change, besides last_done_km.
+ENTRY_SETTING_FIELDS = (
+    "every_km",
+    "every_mi",
+    "notify_before_km",
+    "notify_before_mi",
+    "next_due_km_override",
+)
+
+
+@transaction.atomic
+def mark_entries_done(vehicle_pk, entries_data, user, *, expense_id=None, note=""):
+    """Apply one service visit to many entries of a vehicle.
+
+    entries_data: [{"entry_id", "last_done_km"?, <ENTRY_SETTING_FIELDS>?,
+    "note"?}]. Everything is validated before the first write; entries are
+    then saved with one bulk_update() and their history with one
+    bulk_create(). Raises ValueError for unknown entries or an expense that
+    is not a SERVICE expense of this vehicle.
+    """
+    if expense_id is not None:
+        from expense.models import Expense
+
+        if not Expense.objects.filter(
+            pk=expense_id, vehicle_id=vehicle_pk, category__code="SERVICE"
+        ).exists():
+            raise ValueError("Expense must be a SERVICE expense of this vehicle")
+
+    requested = {data["entry_id"]: data for data in entries_data}
+    entries = list(
+        FleetVehicleRegulationEntry.objects.select_for_update(of=("self",))
+        .select_related("item")
+        .filter(pk__in=requested, regulation__vehicle_id=vehicle_pk)
+        .order_by("pk")
+    )
+    missing = set(requested) - {entry.pk for entry in entries}
+    if missing:
+        raise ValueError(f"Entries {sorted(missing)} do not belong to this vehicle")
+
+    now = timezone.now()
+    update_fields = {"updated_at"}
+    history = []
+    for entry in entries:
+        data = requested[entry.pk]
+        entry.updated_at = now
+        old_every = entry.effective_every_km
+        old_notify = entry.effective_notify_before_km
+        for field in ENTRY_SETTING_FIELDS:
+            if data.get(field) is not None:
+                setattr(entry, field, data[field])
+                update_fields.add(field)
+        done_km = data.get("last_done_km")
+        if done_km is not None:
+            entry.last_done_km = done_km
+            update_fields.add("last_done_km")
+            # Mark-done consumes a one-time override unless a new one is given.
+            if data.get("next_due_km_override") is None:
+                entry.next_due_km_override = None
+                update_fields.add("next_due_km_override")
+        entry.sync_due_fields()
+
+        if done_km is not None:
+            event_type, km, entry_note = (
+                EventType.PERFORMED,
+                done_km,
+                data.get("note") or note,
+            )
+        else:
+            changes = []
+            if entry.effective_every_km != old_every:
+                changes.append(f"interval: {old_every} → {entry.effective_every_km} km")
+            if entry.effective_notify_before_km != old_notify:
+                changes.append(
+                    f"notify: {old_notify} → {entry.effective_notify_before_km} km"
+                )
+            if not changes:
+                continue
+            event_type, km, entry_note = (
+                EventType.KM_UPDATED,
+                entry.last_done_km,
+                "; ".join(changes),
+            )
+        history.append(
+            FleetVehicleRegulationHistory(
+                entry=entry,
+                vehicle_id=vehicle_pk,
+                event_type=event_type,
+                km_at_event=km,
+                km_remaining=entry.next_due_km - km,
+                note=entry_note,
+                expense_id=expense_id,
+                created_by=user,
+            )
+        )
+
+    # bulk_update() bypasses save(): the stored due columns are set above.
+    update_fields |= {"effective_every_km", "effective_notify_before_km", "next_due_km"}
+    FleetVehicleRegulationEntry.objects.bulk_update(entries, sorted(update_fields))
+    FleetVehicleRegulationHistory.objects.bulk_create(history)
+
+    transaction.on_commit(lambda: cache_utils.invalidate_regulation_plan(vehicle_pk))
+    logger.info(
+        "Regulation entries marked done",
+        extra={
+            "status_code": 200,
+            "status_message": "OK",
+            "operation_type": "REGULATION_ENTRY_BATCH_DONE",
+            "service": "DJANGO",
+            "vehicle_id": str(vehicle_pk),
+            "entries_updated": len(entries),
+            "expense_id": str(expense_id) if expense_id else None,
+            "user_id": str(user.id),
+        },
+    )
+    return {"entries_updated": len(entries), "history_created": len(history)}
+
+
+def sync_entry_due_fields(queryset=None) -> int:
+    """Recompute stored effective_* / next_due_km for many entries in one UPDATE.
+
+    Use after changing item-level every_km / notify_before_km, or after
+    bulk_update()/update() on entries (both bypass Entry.save()).
+    """
+    if queryset is None:
+        queryset = FleetVehicleRegulationEntry.objects.all()
+    item = FleetVehicleRegulationItem.objects.filter(pk=OuterRef("item_id"))
+    every = Coalesce(F("every_km"), Subquery(item.values("every_km")[:1]))
+    return queryset.update(
+        effective_every_km=every,
+        effective_notify_before_km=Coalesce(
+            F("notify_before_km"), Subquery(item.values("notify_before_km")[:1])
+        ),
+        next_due_km=Coalesce(F("next_due_km_override"), F("last_done_km") + every),
+    )
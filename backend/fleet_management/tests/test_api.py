@@ -1,7 +1,7 @@
 """
 Fleet Management API Tests
 ===========================
-Covers: AssignRegulationView, VehicleRegulationPlanView,
+Covers: AssignRegulationView, BulkAssignRegulationView, VehicleRegulationPlanView,
 VehicleRegulationEntryUpdate, ServicePlan CRUD, EquipmentToggle,
 EquipmentGrantOnVehicleCreation, RegulationSchema CRUD.
 """
@@ -19,6 +19,7 @@ from fleet_management.models import (
     EquipmentDefaultItem,
     EquipmentList,
     FleetVehicleRegulation,
+    FleetVehicleRegulationEntry,
     FleetVehicleRegulationHistory,
     ServicePlan,
 )
@@ -132,6 +133,114 @@ class AssignRegulationAPITest(BaseAPITest):
         self.assertEqual(response.status_code, 500)
 
 
+# ---------------------------------------------------------------------------
+# BulkAssignRegulationView
+# ---------------------------------------------------------------------------
+
+
+class BulkAssignRegulationAPITest(BaseAPITest):
+    url = "/api/v1/fleet/regulation/bulk-assign/"
+
+    def setUp(self):
+        super().setUp()
+        self.schema = make_schema(title="Basic Regulation", user=self.user)
+        self.item1 = make_item(self.schema, title="Oil Change", every_km=10_000)
+        self.item2 = make_item(self.schema, title="Air Filter", every_km=20_000)
+        self.vehicle2 = make_vehicle(
+            vin_number="2HGBH41JXMN109187", car_number="BB7702CC", initial_km=40_000
+        )
+
+    def _post(self, vehicles):
+        return self.client.post(
+            self.url,
+            {"schema_id": self.schema.id, "vehicles": vehicles},
+            format="json",
+        )
+
+    def test_assigns_every_schema_item_to_every_vehicle(self):
+        response = self._post(
+            [
+                {"vehicle_id": str(self.vehicle.id)},
+                {"vehicle_id": str(self.vehicle2.id)},
+            ]
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["regulations_created"], 2)
+        self.assertEqual(response.data["entries_created"], 4)
+        self.assertEqual(
+            FleetVehicleRegulationHistory.objects.filter(
+                entry__regulation__schema=self.schema
+            ).count(),
+            4,
+        )
+
+    def test_last_done_km_map_and_initial_km_fallback(self):
+        response = self._post(
+            [
+                {
+                    "vehicle_id": str(self.vehicle2.id),
+                    "last_done_km": {str(self.item1.id): 45_000},
+                }
+            ]
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        oil = FleetVehicleRegulationEntry.objects.get(
+            regulation__vehicle=self.vehicle2, item=self.item1
+        )
+        air = FleetVehicleRegulationEntry.objects.get(
+            regulation__vehicle=self.vehicle2, item=self.item2
+        )
+        self.assertEqual((oil.last_done_km, oil.next_due_km), (45_000, 55_000))
+        self.assertEqual((air.last_done_km, air.next_due_km), (40_000, 60_000))
+
+    def test_already_assigned_vehicle_is_skipped(self):
+        assign_regulation_to_vehicle(
+            vehicle_pk=self.vehicle.id,
+            schema_id=self.schema.id,
+            entries_data=[{"item_id": self.item1.id, "last_done_km": 0}],
+            user=self.user,
+        )
+        response = self._post(
+            [
+                {"vehicle_id": str(self.vehicle.id)},
+                {"vehicle_id": str(self.vehicle2.id)},
+            ]
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["regulations_created"], 1)
+        self.assertEqual(response.data["skipped_vehicle_ids"], [str(self.vehicle.id)])
+
+    def test_unknown_vehicle_returns_400_and_creates_nothing(self):
+        response = self._post(
+            [{"vehicle_id": str(self.vehicle.id)}, {"vehicle_id": str(uuid.uuid4())}]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(FleetVehicleRegulation.objects.exists())
+
+    def test_item_from_wrong_schema_returns_400(self):
+        foreign_item = make_item(make_schema(title="Other"), title="Brakes")
+        response = self._post(
+            [
+                {
+                    "vehicle_id": str(self.vehicle.id),
+                    "last_done_km": {str(foreign_item.id): 0},
+                }
+            ]
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_create_uses_constant_number_of_queries(self):
+        vehicles = [
+            make_vehicle(
+                vin_number=f"3HGBH41JXMN1091{i:02d}", car_number=f"CC{i:04d}AA"
+            )
+            for i in range(10)
+        ]
+        with self.assertNumQueries(11):
+            response = self._post([{"vehicle_id": str(v.id)} for v in vehicles])
+        self.assertEqual(response.data["entries_created"], 20)
+
+
 # ---------------------------------------------------------------------------
 # VehicleRegulationPlanView
 # ---------------------------------------------------------------------------
@@ -0,0 +1,154 @@
+"""
+History Archive Tests
+=====================
+Covers: denormalized vehicle on regulation history, move_to_archive batches,
+archive_history command, ?tier=archive on history endpoints.
+"""
+
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config.archive import move_to_archive
+from fleet_management.constants import EventType
+from fleet_management.models import (
+    FleetVehicleRegulation,
+    FleetVehicleRegulationEntry,
+    FleetVehicleRegulationHistory,
+    FleetVehicleRegulationHistoryArchive,
+)
+from vehicle.models import (
+    MileageLog,
+    MileageLogArchive,
+    VehicleStatusHistory,
+    VehicleStatusHistoryArchive,
+)
+
+from .helpers import authenticate, make_item, make_schema, make_user, make_vehicle
+
+
+class HistoryArchiveTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.vehicle = make_vehicle()
+        schema = make_schema()
+        regulation = FleetVehicleRegulation.objects.create(
+            vehicle=self.vehicle, schema=schema
+        )
+        self.entry = FleetVehicleRegulationEntry.objects.create(
+            regulation=regulation, item=make_item(schema), last_done_km=0
+        )
+        self.old = timezone.now() - timedelta(days=400)
+
+    def _history(self, count, created_at=None):
+        rows = [
+            FleetVehicleRegulationHistory.objects.create(
+                entry=self.entry,
+                event_type=EventType.KM_UPDATED,
+                km_at_event=i,
+                km_remaining=10_000 - i,
+            )
+            for i in range(count)
+        ]
+        if created_at:
+            FleetVehicleRegulationHistory.objects.filter(
+                pk__in=[r.pk for r in rows]
+            ).update(created_at=created_at)
+        return rows
+
+    def test_history_carries_vehicle(self):
+        (row,) = self._history(1)
+        self.assertEqual(row.vehicle_id, self.vehicle.id)
+
+    def test_move_in_batches_keeps_ids_and_columns(self):
+        old_rows = self._history(5, created_at=self.old)
+        (recent,) = self._history(1)
+
+        moved = move_to_archive(
+            FleetVehicleRegulationHistory,
+            FleetVehicleRegulationHistoryArchive,
+            "created_at",
+            timezone.now() - timedelta(days=365),
+            batch_size=2,
+        )
+
+        self.assertEqual(moved, 5)
+        self.assertEqual(
+            list(FleetVehicleRegulationHistory.objects.values_list("pk", flat=True)),
+            [recent.pk],
+        )
+        archived = FleetVehicleRegulationHistoryArchive.objects.order_by("pk")
+        self.assertEqual([a.pk for a in archived], [r.pk for r in old_rows])
+        self.assertEqual(archived[0].vehicle_id, self.vehicle.id)
+        self.assertEqual(archived[0].created_at, self.old)
+
+    def test_command_archives_all_logs(self):
+        self._history(2, created_at=self.old)
+        VehicleStatusHistory.objects.create(
+            vehicle=self.vehicle, new_status=self.vehicle.status
+        )
+        VehicleStatusHistory.objects.update(changed_at=self.old)
+        MileageLog.objects.create(
+            vehicle=self.vehicle, km=10, recorded_at=date(2020, 1, 1)
+        )
+        MileageLog.objects.create(
+            vehicle=self.vehicle, km=20, recorded_at=timezone.localdate()
+        )
+
+        out = StringIO()
+        call_command("archive_history", "--days", "365", stdout=out)
+
+        self.assertEqual(FleetVehicleRegulationHistoryArchive.objects.count(), 2)
+        self.assertEqual(VehicleStatusHistoryArchive.objects.count(), 1)
+        self.assertEqual(MileageLogArchive.objects.get().km, 10)
+        self.assertEqual(MileageLog.objects.get().km, 20)
+
+    def test_command_keeps_velocity_window_hot(self):
+        with self.assertRaises(CommandError):
+            call_command("archive_history", "--days", "30", "--log", "mileage")
+
+    def test_dry_run_moves_nothing(self):
+        self._history(2, created_at=self.old)
+        out = StringIO()
+        call_command("archive_history", "--dry-run", "--log", "regulation", stdout=out)
+        self.assertIn("regulation: 2 rows", out.getvalue())
+        self.assertEqual(FleetVehicleRegulationHistoryArchive.objects.count(), 0)
+
+    def test_history_endpoint_tiers(self):
+        self._history(2, created_at=self.old)
+        self._history(1)
+        call_command("archive_history", "--log", "regulation", stdout=StringIO())
+        url = f"/api/v1/fleet/vehicles/{self.vehicle.id}/regulation/history/"
+
+        hot = self.client.get(url)
+        cold = self.client.get(url, {"tier": "archive", "event_type": "km_updated"})
+
+        self.assertEqual(hot.status_code, 200)
+        self.assertEqual(len(hot.data["results"]), 1)
+        self.assertEqual(cold.status_code, 200)
+        self.assertEqual(len(cold.data["results"]), 2)
+        self.assertEqual(cold.data["results"][0]["item_title"], "Oil Change")
+        self.assertEqual(self.client.get(url, {"tier": "cold"}).status_code, 400)
+
+    def test_mileage_endpoint_archive_tier(self):
+        MileageLog.objects.create(
+            vehicle=self.vehicle, km=10, recorded_at=date(2020, 1, 1)
+        )
+        call_command("archive_history", "--log", "mileage", stdout=StringIO())
+        url = f"/api/v1/vehicle/{self.vehicle.id}/mileage/"
+
+        self.assertEqual(len(self.client.get(url).data["results"]), 0)
+        cold = self.client.get(url, {"tier": "archive"}).data["results"]
+        self.assertEqual([row["km"] for row in cold], [10])
+
+    def test_deleting_entry_removes_archived_history(self):
+        self._history(1, created_at=self.old)
+        call_command("archive_history", "--log", "regulation", stdout=StringIO())
+        self.entry.delete()
+        self.assertFalse(FleetVehicleRegulationHistoryArchive.objects.exists())
@@ -0,0 +1,177 @@
+"""
+Batch Mark-Done Tests
+=====================
+Covers: POST /fleet/vehicles/{pk}/regulation/entries/batch-done/ — up-front
+validation, bulk apply, history rows, SERVICE expense link, returned plan.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from expense.models import Expense, ExpenseCategory
+from fleet_management.constants import EventType
+from fleet_management.models import (
+    FleetVehicleRegulation,
+    FleetVehicleRegulationEntry,
+    FleetVehicleRegulationHistory,
+)
+
+from .helpers import authenticate, make_item, make_schema, make_user, make_vehicle
+
+
+class BatchMarkDoneAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.vehicle = make_vehicle(initial_km=20_000)
+        schema = make_schema()
+        regulation = FleetVehicleRegulation.objects.create(
+            vehicle=self.vehicle, schema=schema
+        )
+        self.oil, self.air, self.belt = (
+            FleetVehicleRegulationEntry.objects.create(
+                regulation=regulation,
+                item=make_item(schema, title=title, every_km=every_km),
+                last_done_km=0,
+            )
+            for title, every_km in (
+                ("Oil Change", 10_000),
+                ("Air Filter", 20_000),
+                ("Timing Belt", 60_000),
+            )
+        )
+        self.url = (
+            f"/api/v1/fleet/vehicles/{self.vehicle.id}/regulation/entries/batch-done/"
+        )
+
+    def _expense(self, code="SERVICE", vehicle=None):
+        category, _ = ExpenseCategory.objects.get_or_create(
+            code=code, defaults={"name": code.title()}
+        )
+        return Expense.objects.create(
+            vehicle=vehicle or self.vehicle,
+            category=category,
+            expense_date=timezone.make_aware(datetime(2026, 1, 10)),
+            amount=Decimal("350.00"),
+        )
+
+    def test_closes_entries_and_returns_plan(self):
+        # Warm the plan cache; the response must not serve it stale.
+        self.client.get(f"/api/v1/fleet/vehicles/{self.vehicle.id}/regulation/")
+        expense = self._expense()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url,
+                {
+                    "entries": [
+                        {"entry_id": self.oil.id, "last_done_km": 20_000},
+                        {"entry_id": self.air.id, "last_done_km": 20_000},
+                    ],
+                    "expense_id": str(expense.id),
+                    "note": "Spring service",
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["entries_updated"], 2)
+        plan = {e["id"]: e for e in response.data["plan"]["entries"]}
+        self.assertEqual(plan[self.oil.id]["next_due_km"], 30_000)
+        self.assertEqual(plan[self.air.id]["next_due_km"], 40_000)
+        self.assertEqual(plan[self.belt.id]["next_due_km"], 60_000)
+
+        history = FleetVehicleRegulationHistory.objects.filter(
+            event_type=EventType.PERFORMED
+        )
+        self.assertEqual(history.count(), 2)
+        self.assertTrue(
+            all(
+                h.expense_id == expense.id and h.note == "Spring service"
+                for h in history
+            )
+        )
+
+    def test_settings_only_change_logs_interval_and_keeps_override_rules(self):
+        self.oil.next_due_km_override = 12_000
+        self.oil.save()
+        response = self.client.post(
+            self.url,
+            {
+                "entries": [
+                    {"entry_id": self.oil.id, "last_done_km": 20_000},
+                    {"entry_id": self.belt.id, "every_km": 90_000},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+
+        self.oil.refresh_from_db()
+        self.belt.refresh_from_db()
+        self.assertIsNone(self.oil.next_due_km_override)
+        self.assertEqual(self.oil.next_due_km, 30_000)
+        self.assertEqual(self.belt.next_due_km, 90_000)
+        note = FleetVehicleRegulationHistory.objects.get(entry=self.belt).note
+        self.assertEqual(note, "interval: 60000 → 90000 km")
+
+    def test_runs_in_constant_queries(self):
+        entries = [
+            {"entry_id": e.id, "last_done_km": 20_000}
+            for e in (self.oil, self.air, self.belt)
+        ]
+        # auth, savepoint x2, entries, bulk_update, history insert,
+        # plan (regulation, entries, items, schema, velocity)
+        with self.assertNumQueries(11):
+            response = self.client.post(self.url, {"entries": entries}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def test_validation_happens_before_any_write(self):
+        other = make_vehicle(vin_number="1HGBH41JXMN100009", car_number="ZZ0009ZZ")
+        other_schema = make_schema(title="Other")
+        foreign = FleetVehicleRegulationEntry.objects.create(
+            regulation=FleetVehicleRegulation.objects.create(
+                vehicle=other, schema=other_schema
+            ),
+            item=make_item(other_schema),
+            last_done_km=0,
+        )
+        cases = [
+            {"entries": []},
+            {"entries": [{"entry_id": self.oil.id}]},
+            {"entries": [{"entry_id": self.oil.id, "last_done_km": -1}]},
+            {
+                "entries": [
+                    {"entry_id": self.oil.id, "last_done_km": 1},
+                    {"entry_id": self.oil.id, "last_done_km": 2},
+                ]
+            },
+            {
+                "entries": [
+                    {"entry_id": self.oil.id, "last_done_km": 20_000},
+                    {"entry_id": foreign.id, "last_done_km": 20_000},
+                ]
+            },
+            {
+                "entries": [{"entry_id": self.oil.id, "last_done_km": 20_000}],
+                "expense_id": str(self._expense(code="FUEL").id),
+            },
+            {
+                "entries": [{"entry_id": self.oil.id, "last_done_km": 20_000}],
+                "expense_id": str(self._expense(vehicle=other).id),
+            },
+        ]
+        for payload in cases:
+            response = self.client.post(self.url, payload, format="json")
+            self.assertEqual(response.status_code, 400, payload)
+
+        self.oil.refresh_from_db()
+        self.assertEqual(self.oil.last_done_km, 0)
+        self.assertFalse(FleetVehicleRegulationHistory.objects.exists())
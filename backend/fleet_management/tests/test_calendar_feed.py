@@ -0,0 +1,242 @@
+"""
+Fleet Calendar Feed Tests
+=========================
+Covers: GET /fleet/calendar/ and /fleet/calendar.ics — merged inspections,
+service plans and predicted regulation dates, [from, to) window, kind
+filter, month-bucket cache, ETag revalidation, iCal rendering, feed
+tokens for calendar clients.
+"""
+
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from account.models import User
+from fleet_management.calendar_feed import render_ics
+from fleet_management.models import (
+    CalendarFeedToken,
+    FleetVehicleRegulation,
+    FleetVehicleRegulationEntry,
+    ServicePlan,
+)
+from vehicle.models import MileageVelocity, TechnicalInspection
+
+from .helpers import authenticate, make_item, make_schema, make_user, make_vehicle
+
+URL = "/api/v1/fleet/calendar/"
+ICS_URL = "/api/v1/fleet/calendar.ics"
+TOKEN_URL = "/api/v1/fleet/calendar/token/"
+WINDOW = {"from": "2026-03-01", "to": "2026-05-01"}
+
+
+class FleetCalendarAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.vehicle = make_vehicle()
+        # Superseded inspection: only the latest one per vehicle is shown.
+        TechnicalInspection.objects.create(
+            vehicle=self.vehicle,
+            inspection_date=date(2025, 3, 1),
+            next_inspection_date=date(2026, 3, 2),
+        )
+        self.inspection = TechnicalInspection.objects.create(
+            vehicle=self.vehicle,
+            inspection_date=date(2025, 4, 10),
+            next_inspection_date=date(2026, 4, 10),
+        )
+        self.plan = ServicePlan.objects.create(
+            vehicle=self.vehicle,
+            title="Tyres, winter → summer",
+            planned_at=date(2026, 3, 15),
+        )
+        ServicePlan.objects.create(
+            vehicle=self.vehicle, title="Out of window", planned_at=date(2026, 6, 1)
+        )
+        schema = make_schema()
+        regulation = FleetVehicleRegulation.objects.create(
+            vehicle=self.vehicle, schema=schema
+        )
+        self.entry = FleetVehicleRegulationEntry.objects.create(
+            regulation=regulation, item=make_item(schema), last_done_km=0
+        )
+        # 100 km/day from 5 000 km on 2026-03-01 → 10 000 km on 2026-04-20.
+        MileageVelocity.objects.create(
+            vehicle=self.vehicle,
+            km_per_day=100,
+            last_km=5_000,
+            last_recorded_at=date(2026, 3, 1),
+        )
+
+    def _get(self, **params):
+        response = self.client.get(URL, {**WINDOW, **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def test_merges_sources_in_date_order(self):
+        results = self._get().data["results"]
+        self.assertEqual(
+            [(e["kind"], e["date"]) for e in results],
+            [
+                ("service_plan", date(2026, 3, 15)),
+                ("inspection", date(2026, 4, 10)),
+                ("regulation", date(2026, 4, 20)),
+            ],
+        )
+        self.assertEqual(results[1]["object_id"], self.inspection.id)
+        self.assertEqual(results[2]["next_due_km"], 10_000)
+
+    def test_window_is_half_open(self):
+        results = self._get(**{"from": "2026-03-16", "to": "2026-04-20"}).data[
+            "results"
+        ]
+        self.assertEqual([e["kind"] for e in results], ["inspection"])
+
+    def test_kind_filter(self):
+        results = self._get(kind="regulation,service_plan").data["results"]
+        self.assertEqual({e["kind"] for e in results}, {"regulation", "service_plan"})
+
+    def test_invalid_params_return_400(self):
+        for params in (
+            {"from": "2026-13-01"},
+            {"from": "2026-05-01", "to": "2026-04-01"},
+            {"from": "2026-01-01", "to": "2027-06-01"},
+            {"kind": "holiday"},
+        ):
+            response = self.client.get(URL, params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_months_are_served_from_cache(self):
+        self._get()
+        with self.assertNumQueries(0):  # user comes from the snapshot cache too
+            self._get(**{"from": "2026-04-01", "to": "2026-04-30"})
+
+    def test_etag_revalidation(self):
+        etag = self._get()["ETag"]
+        response = self.client.get(URL, WINDOW, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        created = self.client.post(
+            f"/api/v1/fleet/vehicles/{self.vehicle.id}/service-plans/",
+            {"title": "Alignment", "planned_at": "2026-04-02"},
+            format="json",
+        )
+        self.assertEqual(created.status_code, 201, created.data)
+        response = self.client.get(URL, WINDOW, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data["results"]), 4)
+
+    def test_ics_feed(self):
+        response = self.client.get(ICS_URL, WINDOW)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/calendar"))
+        body = response.content.decode()
+        self.assertEqual(body.count("BEGIN:VEVENT"), 3)
+        self.assertIn(f"UID:inspection-{self.inspection.id}@", body)
+        self.assertIn("DTSTART;VALUE=DATE:20260420", body)
+        self.assertIn("SUMMARY:AA6601BB — Tyres\\, winter → summer", body)
+
+        revalidated = self.client.get(
+            ICS_URL, WINDOW, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_ics_accepts_calendar_clients(self):
+        response = self.client.get(ICS_URL, WINDOW, HTTP_ACCEPT="text/calendar")
+        self.assertEqual(response.status_code, 200)
+
+    def test_service_plan_list_date_window(self):
+        response = self.client.get(
+            "/api/v1/fleet/service-plans/",
+            {"planned_at__gte": "2026-03-01", "planned_at__lt": "2026-04-01"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["id"] for p in response.data["results"]], [self.plan.id])
+
+    def test_plan_edit_moves_last_modified(self):
+        before = self.client.get(ICS_URL, WINDOW).content.decode()
+        ServicePlan.objects.filter(pk=self.plan.pk).update(
+            updated_at=self.plan.updated_at - timedelta(days=1)
+        )
+        cache.clear()
+        stale = self.client.get(ICS_URL, WINDOW).content.decode()
+        self.assertNotEqual(stale, before)
+
+        response = self.client.patch(
+            f"/api/v1/fleet/vehicles/{self.vehicle.id}/service-plans/{self.plan.id}/",
+            {"title": "Tyres"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.plan.refresh_from_db()
+        self.assertGreater(self.plan.updated_at, self.plan.created_at)
+        body = self.client.get(ICS_URL, WINDOW).content.decode()
+        self.assertIn(f"LAST-MODIFIED:{self.plan.updated_at:%Y%m%dT%H%M%SZ}", body)
+
+
+class CalendarFeedTokenTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.subscriber = APIClient()  # a calendar app: no session cookie
+
+    def _issue(self):
+        response = self.client.post(TOKEN_URL)
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def test_token_url_subscribes_without_a_session(self):
+        self.assertEqual(self.subscriber.get(ICS_URL).status_code, 401)
+        data = self._issue()
+        self.assertTrue(data["url"].endswith(f"{ICS_URL}?token={data['token']}"))
+        response = self.subscriber.get(ICS_URL, {"token": data["token"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/calendar"))
+
+    def test_rotate_and_revoke(self):
+        old = self._issue()["token"]
+        new = self._issue()["token"]
+        self.assertEqual(self.subscriber.get(ICS_URL, {"token": old}).status_code, 401)
+        self.assertEqual(self.subscriber.get(ICS_URL, {"token": new}).status_code, 200)
+
+        self.assertEqual(self.client.delete(TOKEN_URL).status_code, 204)
+        self.assertEqual(self.subscriber.get(ICS_URL, {"token": new}).status_code, 401)
+
+    def test_token_is_stored_hashed_and_only_opens_the_feed(self):
+        token = self._issue()["token"]
+        self.assertNotEqual(CalendarFeedToken.objects.get().token_hash, token)
+        self.assertEqual(self.subscriber.get(URL, {"token": token}).status_code, 401)
+
+    def test_blocked_user_token_is_rejected(self):
+        token = self._issue()["token"]
+        User.objects.filter(pk=self.user.pk).update(is_blocked=True)
+        self.assertEqual(
+            self.subscriber.get(ICS_URL, {"token": token}).status_code, 401
+        )
+
+
+class RenderICSTest(TestCase):
+    def test_long_lines_are_folded_on_character_boundaries(self):
+        event = {
+            "uid": "service-plan-1",
+            "kind": "service_plan",
+            "date": date(2026, 1, 1),
+            "title": "Заміна моторного масла та масляного фільтра; перевірка",
+            "car_number": "AA0001AA",
+            "manufacturer": "Toyota",
+            "model": "Camry",
+            "is_done": False,
+            "updated_at": make_vehicle().created_at,
+        }
+        body = render_ics([event])
+        for line in body.split("\r\n"):
+            self.assertLessEqual(len(line.encode()), 75)
+        unfolded = body.replace("\r\n ", "")
+        self.assertIn("масляного фільтра\\; перевірка", unfolded)
@@ -2,7 +2,8 @@
 CalendarInspections API Tests
 ==============================
 Covers: GET /fleet/calendar-inspections/ — returns the latest inspection
-per vehicle with non-null next_inspection_date, ordered ascending.
+per vehicle with non-null next_inspection_date, ordered ascending, with
+regulation work predicted near the inspection date.
 """
 
 from datetime import date
@@ -10,9 +11,10 @@ from datetime import date
 from django.test import TestCase
 from rest_framework.test import APIClient
 
-from vehicle.models import TechnicalInspection
+from fleet_management.models import FleetVehicleRegulation, FleetVehicleRegulationEntry
+from vehicle.models import MileageVelocity, TechnicalInspection
 
-from .helpers import authenticate, make_user, make_vehicle
+from .helpers import authenticate, make_item, make_schema, make_user, make_vehicle
 
 
 class CalendarInspectionsAPITest(TestCase):
@@ -104,3 +106,35 @@ class CalendarInspectionsAPITest(TestCase):
         response = self.client.get(self.URL)
 
         self.assertEqual(response.status_code, 401)
+
+    def test_flags_regulations_predicted_near_inspection(self):
+        schema = make_schema()
+        regulation = FleetVehicleRegulation.objects.create(
+            vehicle=self.vehicle, schema=schema
+        )
+        oil = make_item(schema, title="Oil Change", every_km=10_000)
+        brakes = make_item(schema, title="Brakes", every_km=30_000)
+        for item in (oil, brakes):
+            FleetVehicleRegulationEntry.objects.create(
+                regulation=regulation, item=item, last_done_km=0
+            )
+        # 100 km/day from 2026-01-01 at 5 000 km → oil due 2026-02-20.
+        MileageVelocity.objects.create(
+            vehicle=self.vehicle,
+            km_per_day=100,
+            last_km=5_000,
+            last_recorded_at=date(2026, 1, 1),
+        )
+        TechnicalInspection.objects.create(
+            vehicle=self.vehicle,
+            inspection_date=date(2025, 3, 1),
+            next_inspection_date=date(2026, 3, 1),
+            created_by=self.user,
+        )
+
+        response = self.client.get(self.URL)
+
+        nearby = response.data["results"][0]["regulations_due_nearby"]
+        self.assertEqual([n["title"] for n in nearby], ["Oil Change"])
+        self.assertEqual(nearby[0]["predicted_due_date"], date(2026, 2, 20))
+        self.assertEqual(nearby[0]["days_from_inspection"], -9)
@@ -0,0 +1,200 @@
+"""
+Fleet Due Board Tests
+=====================
+Covers: FleetDueBoardView — due state, overrides, filters, ordering, keyset
+pagination, versioned cache and its invalidation.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from fleet_management.models import FleetVehicleRegulationEntry
+from fleet_management.services import bulk_assign_regulation
+from vehicle.constants import VehicleStatus
+from vehicle.models import MileageVelocity
+
+from .helpers import authenticate, make_item, make_schema, make_user, make_vehicle
+
+URL = "/api/v1/fleet/regulation/due-board/"
+
+
+class FleetDueBoardAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.schema = make_schema(title="Basic")
+        self.oil = make_item(
+            self.schema, title="Oil Change", every_km=10_000, notify_before_km=500
+        )
+        self.brakes = make_item(
+            self.schema, title="Brakes", every_km=30_000, notify_before_km=2_000
+        )
+        # Baselines at 0 km; current km drives the due state.
+        self.overdue = make_vehicle(
+            vin_number="1HGBH41JXMN100001", car_number="AA0001AA", initial_km=10_500
+        )
+        self.soon = make_vehicle(
+            vin_number="1HGBH41JXMN100002", car_number="BB0002BB", initial_km=9_700
+        )
+        self.fine = make_vehicle(
+            vin_number="1HGBH41JXMN100003", car_number="CC0003CC", initial_km=1_000
+        )
+        bulk_assign_regulation(
+            self.schema.id,
+            [
+                {
+                    "vehicle_id": v.id,
+                    "last_done_km": {self.oil.id: 0, self.brakes.id: 0},
+                }
+                for v in (self.overdue, self.soon, self.fine)
+            ],
+            self.user,
+        )
+
+    def _get(self, **params):
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_default_window_uses_notify_before_km(self):
+        data = self._get()
+        rows = {(r["car_number"], r["title"]): r for r in data["results"]}
+        self.assertEqual(
+            set(rows), {("AA0001AA", "Oil Change"), ("BB0002BB", "Oil Change")}
+        )
+        self.assertEqual(rows[("AA0001AA", "Oil Change")]["state"], "overdue")
+        self.assertEqual(rows[("AA0001AA", "Oil Change")]["km_remaining"], -500)
+        self.assertEqual(rows[("BB0002BB", "Oil Change")]["state"], "due_soon")
+        self.assertEqual(data["summary"], {"overdue": 1, "due_soon": 1})
+
+    def test_sorted_by_urgency(self):
+        data = self._get()
+        self.assertEqual(
+            [r["car_number"] for r in data["results"]], ["AA0001AA", "BB0002BB"]
+        )
+
+    def test_within_km_widens_window(self):
+        # Three oil changes plus the overdue car's brakes (19 500 km left).
+        data = self._get(within_km=20_000)
+        self.assertEqual(data["count"], 4)
+
+    def test_entry_override_is_honoured(self):
+        entry = FleetVehicleRegulationEntry.objects.get(
+            regulation__vehicle=self.fine, item=self.oil
+        )
+        entry.next_due_km_override = 1_200
+        entry.save(update_fields=["next_due_km_override"])
+        data = self._get(search="CC0003")
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["results"][0]["km_remaining"], 200)
+
+    def test_state_and_vehicle_status_filters(self):
+        self.assertEqual(self._get(state="overdue")["count"], 1)
+        self.assertEqual(
+            self._get(vehicle_status=VehicleStatus.RENT, within_km=20_000)["count"], 0
+        )
+
+    def test_sold_and_archived_vehicles_are_excluded(self):
+        self.soon.status = VehicleStatus.SOLD
+        self.soon.save(update_fields=["status"])
+        self.overdue.is_archived = True
+        self.overdue.save(update_fields=["is_archived"])
+        cache.clear()
+        self.assertEqual(self._get()["count"], 0)
+
+    def test_keyset_pagination_walks_all_rows_once(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {"within_km": 20_000, "page_size": 2}
+            if cursor:
+                params["cursor"] = cursor
+            data = self._get(**params)
+            seen.extend(r["id"] for r in data["results"])
+            cursor = data["next"]
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(len(set(seen)), 4)
+
+    def test_descending_ordering_pagination(self):
+        first = self._get(within_km=20_000, ordering="-car_number", page_size=3)
+        rest = self._get(within_km=20_000, ordering="-car_number", cursor=first["next"])
+        cars = [r["car_number"] for r in first["results"] + rest["results"]]
+        self.assertEqual(cars, sorted(cars, reverse=True))
+        self.assertEqual(len(cars), 4)
+
+    def test_vehicle_without_plate_is_searched_and_ordered(self):
+        plateless = make_vehicle(
+            vin_number="1HGBH41JXMN100004", car_number=None, initial_km=10_200
+        )
+        bulk_assign_regulation(
+            self.schema.id,
+            [{"vehicle_id": plateless.id, "last_done_km": {self.oil.id: 0}}],
+            self.user,
+        )
+        cache.clear()
+        self.assertEqual(self._get(search="AA")["count"], 1)
+
+        first = self._get(within_km=20_000, ordering="car_number", page_size=2)
+        rest = self._get(within_km=20_000, ordering="car_number", cursor=first["next"])
+        cars = [r["car_number"] for r in first["results"] + rest["results"]]
+        self.assertEqual(cars[0], None)
+        self.assertEqual(len(cars), 5)
+
+    def test_invalid_params_return_400(self):
+        for params in (
+            {"ordering": "title"},
+            {"state": "late"},
+            {"within_km": "abc"},
+            {"within_km": 10**6},
+            {"cursor": "not-a-cursor"},
+        ):
+            response = self.client.get(URL, params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_board_is_served_from_cache(self):
+        self._get()
+        with self.assertNumQueries(0):  # user comes from the snapshot cache too
+            self._get(within_km=20_000, page_size=1)
+
+    def test_mileage_log_invalidates_board(self):
+        self.assertEqual(self._get(search="CC0003")["count"], 0)
+        response = self.client.post(
+            f"/api/v1/vehicle/{self.fine.id}/mileage/",
+            {"km": 9_800, "recorded_at": "2026-01-01"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self._get(search="CC0003")["count"], 1)
+
+    def test_entry_update_invalidates_board(self):
+        entry = FleetVehicleRegulationEntry.objects.get(
+            regulation__vehicle=self.soon, item=self.oil
+        )
+        self.assertEqual(self._get(search="BB0002")["count"], 1)
+        response = self.client.patch(
+            f"/api/v1/fleet/vehicles/{self.soon.id}/regulation/entries/{entry.id}/",
+            {"last_done_km": 9_700},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self._get(search="BB0002")["count"], 0)
+
+    def test_rows_carry_predicted_due_date(self):
+        last_day = timezone.localdate()
+        MileageVelocity.objects.create(
+            vehicle=self.soon, km_per_day=100, last_km=9_700, last_recorded_at=last_day
+        )
+        data = self._get()
+        rows = {r["car_number"]: r for r in data["results"]}
+        self.assertEqual(
+            rows["BB0002BB"]["predicted_due_date"], last_day + timedelta(days=3)
+        )
+        self.assertIsNone(rows["AA0001AA"]["predicted_due_date"])
@@ -0,0 +1,129 @@
+"""
+Default Equipment Fan-out Tests
+===============================
+Covers: POST / DELETE /fleet/equipment/defaults/ with apply_to_all — the
+EQUIPMENT_ADDED / EQUIPMENT_REMOVED jobs over active vehicles, equipped rows
+kept on removal, batched cache invalidation, GET /fleet/jobs/{pk}/ progress.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from config import cache_utils
+from fleet_management import jobs
+from fleet_management.constants import FleetJobKind, FleetJobStatus
+from fleet_management.models import EquipmentDefaultItem, EquipmentList, FleetJob
+from vehicle.constants import VehicleStatus
+
+from .helpers import authenticate, make_user, make_vehicle
+
+URL = "/api/v1/fleet/equipment/defaults/"
+
+
+class EquipmentFanOutTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        authenticate(self.client, self.user)
+        self.vehicles = [
+            make_vehicle(
+                vin_number=f"1HGBH41JXMN1091{i:02d}", car_number=f"AA{i:04d}BB"
+            )
+            for i in range(3)
+        ]
+        self.sold = make_vehicle(
+            vin_number="1HGBH41JXMN109199",
+            car_number="ZZ9999ZZ",
+            status=VehicleStatus.SOLD,
+        )
+
+    def _create(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                URL, {"equipment": "Fire extinguisher", **data}, format="json"
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response
+
+    def test_create_without_fan_out_touches_no_vehicle(self):
+        response = self._create()
+        self.assertNotIn("job_id", response.data)
+        self.assertFalse(EquipmentList.objects.exists())
+
+    def test_create_fans_out_to_active_vehicles(self):
+        EquipmentList.objects.create(
+            vehicle=self.vehicles[0], equipment="Fire extinguisher", is_equipped=True
+        )
+        response = self._create(apply_to_all=True)
+
+        rows = EquipmentList.objects.filter(equipment="Fire extinguisher")
+        self.assertEqual(
+            set(rows.values_list("vehicle_id", flat=True)),
+            {v.id for v in self.vehicles},
+        )
+        # The existing row is left alone (ON CONFLICT DO NOTHING).
+        self.assertTrue(rows.get(vehicle=self.vehicles[0]).is_equipped)
+        self.assertEqual(rows.get(vehicle=self.vehicles[1]).created_by, self.user)
+
+        job = self.client.get(f"/api/v1/fleet/jobs/{response.data['job_id']}/").data
+        self.assertEqual(job["kind"], FleetJobKind.EQUIPMENT_ADDED)
+        self.assertEqual(job["status"], FleetJobStatus.DONE)
+        self.assertEqual((job["processed"], job["total"]), (3, 3))
+
+    def test_without_eager_the_request_only_enqueues(self):
+        with self.settings(FLEET_JOBS_EAGER=False):
+            response = self._create(apply_to_all=True)
+        job_url = f"/api/v1/fleet/jobs/{response.data['job_id']}/"
+        self.assertEqual(
+            self.client.get(job_url).data["status"], FleetJobStatus.PENDING
+        )
+        self.assertFalse(EquipmentList.objects.exists())
+
+        self.assertEqual(jobs.run_pending(), 1)  # the run_fleet_jobs worker
+        self.assertEqual(self.client.get(job_url).data["status"], FleetJobStatus.DONE)
+        self.assertEqual(EquipmentList.objects.count(), 3)
+
+    def test_delete_fan_out_keeps_equipped_rows(self):
+        item = EquipmentDefaultItem.objects.create(equipment="First aid kit")
+        for vehicle in self.vehicles:
+            EquipmentList.objects.create(vehicle=vehicle, equipment="First aid kit")
+        EquipmentList.objects.filter(vehicle=self.vehicles[2]).update(is_equipped=True)
+        EquipmentList.objects.create(vehicle=self.sold, equipment="First aid kit")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"{URL}{item.id}/?apply_to_all=true")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(EquipmentDefaultItem.objects.exists())
+        self.assertEqual(
+            set(EquipmentList.objects.values_list("vehicle_id", flat=True)),
+            {self.vehicles[2].id, self.sold.id},
+        )
+        job = FleetJob.objects.get(pk=response.data["job_id"])
+        self.assertEqual(job.status, FleetJobStatus.DONE)
+
+    def test_plain_delete_returns_no_content(self):
+        item = EquipmentDefaultItem.objects.create(equipment="First aid kit")
+        response = self.client.delete(f"{URL}{item.id}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(FleetJob.objects.exists())
+
+    def test_chunks_resume_and_invalidate_caches(self):
+        for vehicle in self.vehicles:
+            cache_utils.set_equipment_list(vehicle.id, [])
+        job = FleetJob.objects.create(
+            kind=FleetJobKind.EQUIPMENT_ADDED,
+            payload={"equipment": "Warning triangle"},
+        )
+
+        jobs.run_job(job.pk, chunk_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual((job.processed, job.total), (3, 3))
+        self.assertEqual(
+            EquipmentList.objects.filter(equipment="Warning triangle").count(), 3
+        )
+        for vehicle in self.vehicles:
+            self.assertIsNone(cache_utils.get_equipment_list(vehicle.id))
@@ -145,6 +145,31 @@ class FleetVehicleRegulationEntryModelTest(TestCase):
         )
         self.assertEqual(entry.next_due_km, 5_000)
 
+    def test_next_due_km_is_stored_on_row(self):
+        row = FleetVehicleRegulationEntry.objects.filter(
+            next_due_km=15_000, effective_every_km=10_000
+        )
+        self.assertTrue(row.filter(pk=self.entry.pk).exists())
+
+    def test_partial_save_refreshes_stored_next_due_km(self):
+        self.entry.last_done_km = 12_000
+        self.entry.save(update_fields=["last_done_km"])
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.next_due_km, 22_000)
+
+    def test_next_due_km_override_wins_over_interval(self):
+        self.entry.next_due_km_override = 13_000
+        self.entry.save(update_fields=["next_due_km_override"])
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.next_due_km, 13_000)
+
+    def test_entry_every_km_overrides_item_interval(self):
+        self.entry.every_km = 7_000
+        self.entry.save(update_fields=["every_km"])
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.effective_every_km, 7_000)
+        self.assertEqual(self.entry.next_due_km, 12_000)
+
     # --- is_due() ---
 
     def test_is_due_at_exact_threshold(self):
@@ -0,0 +1,219 @@
+"""
+Schema Propagation Job Tests
+============================
+Covers: item edit / item addition propagation to every vehicle on a schema,
+chunked resume, failure + retry, stale-job reclaim, plan cache invalidation.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config import cache_utils
+from fleet_management import jobs
+from fleet_management.constants import FleetJobKind, FleetJobStatus
+from fleet_management.models import (
+    FleetJob,
+    FleetVehicleRegulation,
+    FleetVehicleRegulationEntry,
+    FleetVehicleRegulationHistory,
+)
+from fleet_management.services import bulk_assign_regulation
+
+from .helpers import authenticate, make_item, make_schema, make_user, make_vehicle
+
+
+class PropagationTestBase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.schema = make_schema(title="Basic")
+        self.oil = make_item(self.schema, title="Oil Change", every_km=10_000)
+        self.vehicles = [
+            make_vehicle(
+                vin_number=f"1HGBH41JXMN1091{i:02d}",
+                car_number=f"AA{i:04d}BB",
+                initial_km=i * 1_000,
+            )
+            for i in range(3)
+        ]
+        bulk_assign_regulation(
+            self.schema.id,
+            [{"vehicle_id": v.id} for v in self.vehicles],
+            self.user,
+        )
+        self.regulations = list(
+            FleetVehicleRegulation.objects.filter(schema=self.schema).order_by("pk")
+        )
+
+    def _entry(self, vehicle, item):
+        return FleetVehicleRegulationEntry.objects.get(
+            regulation__vehicle=vehicle, item=item
+        )
+
+
+class ItemUpdatePropagationTest(PropagationTestBase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        authenticate(self.client, self.user)
+        # Vehicle 0 keeps its own interval.
+        pinned = self._entry(self.vehicles[0], self.oil)
+        pinned.every_km = 7_000
+        pinned.save(update_fields=["every_km"])
+
+    def _patch_item(self, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(
+                f"/api/v1/fleet/regulation/items/{self.oil.id}/", data, format="json"
+            )
+
+    def test_inheriting_entries_get_new_interval(self):
+        response = self._patch_item({"every_km": 20_000})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self._entry(self.vehicles[1], self.oil).next_due_km, 21_000)
+        self.assertEqual(self._entry(self.vehicles[2], self.oil).next_due_km, 22_000)
+
+    def test_entry_override_is_untouched(self):
+        self._patch_item({"every_km": 20_000})
+        self.assertEqual(self._entry(self.vehicles[0], self.oil).next_due_km, 7_000)
+
+    def test_history_written_only_for_inheriting_entries(self):
+        self._patch_item({"every_km": 20_000})
+        rows = FleetVehicleRegulationHistory.objects.filter(
+            note__startswith="Schema update"
+        )
+        self.assertEqual(rows.count(), 2)
+        row = rows.get(entry__regulation__vehicle=self.vehicles[2])
+        self.assertEqual(row.note, "Schema update: interval: 10000 → 20000 km")
+        self.assertEqual(row.km_remaining, 20_000)
+        self.assertEqual(row.created_by, self.user)
+
+    def test_plan_caches_of_schema_vehicles_are_invalidated(self):
+        other = make_vehicle(vin_number="9HGBH41JXMN109199", car_number="ZZ9999ZZ")
+        for v in [*self.vehicles, other]:
+            cache_utils.set_regulation_plan(v.id, {"stale": True})
+        self._patch_item({"title_en": "Oil"})
+        for v in self.vehicles:
+            self.assertIsNone(cache_utils.get_regulation_plan(v.id))
+        self.assertIsNotNone(cache_utils.get_regulation_plan(other.id))
+
+    def test_job_recorded_as_done(self):
+        self._patch_item({"every_km": 20_000})
+        job = FleetJob.objects.get()
+        self.assertEqual(job.kind, FleetJobKind.ITEM_UPDATED)
+        self.assertEqual(job.status, FleetJobStatus.DONE)
+        self.assertEqual(job.processed, 3)
+        self.assertEqual(job.payload["changes"], {"every_km": [10_000, 20_000]})
+
+    def test_patch_returns_before_propagation_without_eager(self):
+        with self.settings(FLEET_JOBS_EAGER=False):
+            response = self._patch_item({"every_km": 20_000})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(FleetJob.objects.get().status, FleetJobStatus.PENDING)
+        self.assertEqual(self._entry(self.vehicles[1], self.oil).next_due_km, 11_000)
+
+        jobs.run_pending()
+        self.assertEqual(self._entry(self.vehicles[1], self.oil).next_due_km, 21_000)
+
+
+class ItemAddPropagationTest(PropagationTestBase):
+    def setUp(self):
+        super().setUp()
+        self.brakes = make_item(self.schema, title="Brakes", every_km=30_000)
+
+    def _enqueue(self):
+        return FleetJob.objects.create(
+            kind=FleetJobKind.ITEM_ADDED,
+            payload={"schema_id": self.schema.id, "item_id": self.brakes.id},
+            created_by=self.user,
+        )
+
+    def test_entry_created_for_every_regulation_in_chunks(self):
+        job = jobs.run_job(self._enqueue().pk, chunk_size=1)
+        self.assertEqual(job.status, FleetJobStatus.DONE)
+        self.assertEqual(job.cursor, str(self.regulations[-1].pk))
+        for v in self.vehicles:
+            entry = self._entry(v, self.brakes)
+            self.assertEqual(entry.last_done_km, v.initial_km)
+            self.assertEqual(entry.next_due_km, v.initial_km + 30_000)
+            self.assertEqual(entry.effective_notify_before_km, 500)
+            self.assertEqual(entry.history.get().note, "Added from schema")
+
+    def test_rerun_does_not_duplicate(self):
+        jobs.run_job(self._enqueue().pk)
+        jobs.run_job(self._enqueue().pk)
+        self.assertEqual(self.brakes.entries.count(), 3)
+        self.assertEqual(
+            FleetVehicleRegulationHistory.objects.filter(
+                entry__item=self.brakes
+            ).count(),
+            3,
+        )
+
+    def test_resume_skips_committed_chunks(self):
+        job = self._enqueue()
+        job.cursor = str(self.regulations[0].pk)
+        job.save(update_fields=["cursor"])
+        jobs.run_job(job.pk)
+        self.assertFalse(
+            self.brakes.entries.filter(regulation=self.regulations[0]).exists()
+        )
+        self.assertEqual(self.brakes.entries.count(), 2)
+
+    def test_failure_keeps_last_committed_cursor_and_retry_resumes(self):
+        job = self._enqueue()
+        real = jobs._HANDLERS[FleetJobKind.ITEM_ADDED]
+        calls = []
+
+        def flaky(job, pks):
+            calls.append(pks)
+            if len(calls) == 2:
+                raise RuntimeError("db went away")
+            return real.apply(job, pks)
+
+        with patch.dict(
+            jobs._HANDLERS, {FleetJobKind.ITEM_ADDED: real._replace(apply=flaky)}
+        ):
+            failed = jobs.run_job(job.pk, chunk_size=1)
+        self.assertEqual(failed.status, FleetJobStatus.FAILED)
+        self.assertEqual(failed.cursor, str(self.regulations[0].pk))
+        self.assertIn("db went away", failed.error)
+
+        call_command("run_fleet_jobs", "--retry-failed", stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, FleetJobStatus.DONE)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(self.brakes.entries.count(), 3)
+
+    def test_running_job_is_not_claimed_twice_until_stale(self):
+        job = self._enqueue()
+        FleetJob.objects.filter(pk=job.pk).update(status=FleetJobStatus.RUNNING)
+        self.assertIsNone(jobs.run_job(job.pk))
+
+        FleetJob.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - jobs.STALE_AFTER - timedelta(seconds=1)
+        )
+        self.assertEqual(jobs.run_job(job.pk).status, FleetJobStatus.DONE)
+
+    def test_add_entry_view_apply_to_all(self):
+        client = APIClient()
+        authenticate(client, self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(
+                f"/api/v1/fleet/vehicles/{self.vehicles[0].id}/regulation/entries/",
+                {"title": "Coolant", "every_km": 60_000, "apply_to_all": True},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        coolant = FleetVehicleRegulationEntry.objects.filter(item__title="Coolant")
+        self.assertEqual(coolant.count(), 3)
+        # The originating vehicle keeps its manual entry (single history row).
+        origin = coolant.get(regulation__vehicle=self.vehicles[0])
+        self.assertEqual(origin.history.get().note, "Added manually")
@@ -1,7 +1,8 @@
 """
 Fleet Management Service Layer Tests
 =====================================
-Covers: grant_equipment_to_vehicle, assign_regulation_to_vehicle.
+Covers: grant_equipment_to_vehicle, assign_regulation_to_vehicle,
+sync_entry_due_fields.
 """
 
 from django.core.exceptions import ObjectDoesNotExist
@@ -13,11 +14,14 @@ from fleet_management.models import (
     EquipmentDefaultItem,
     EquipmentList,
     FleetVehicleRegulation,
+    FleetVehicleRegulationEntry,
     FleetVehicleRegulationHistory,
+    FleetVehicleRegulationItem,
 )
 from fleet_management.services import (
     assign_regulation_to_vehicle,
     grant_equipment_to_vehicle,
+    sync_entry_due_fields,
 )
 
 from .helpers import make_item, make_schema, make_user, make_vehicle
@@ -205,3 +209,45 @@ class AssignRegulationToVehicleServiceTest(TestCase):
             )
         except Exception:
             pass
+
+
+class SyncEntryDueFieldsServiceTest(TestCase):
+    def setUp(self):
+        self.vehicle = make_vehicle()
+        self.schema = make_schema(title="Basic")
+        self.item = make_item(self.schema, every_km=10_000, notify_before_km=500)
+        self.regulation = FleetVehicleRegulation.objects.create(
+            vehicle=self.vehicle, schema=self.schema
+        )
+        self.entry = FleetVehicleRegulationEntry.objects.create(
+            regulation=self.regulation, item=self.item, last_done_km=5_000
+        )
+
+    def test_item_interval_change_is_propagated(self):
+        FleetVehicleRegulationItem.objects.filter(pk=self.item.pk).update(
+            every_km=20_000, notify_before_km=1_000
+        )
+        updated = sync_entry_due_fields(self.item.entries.all())
+        self.assertEqual(updated, 1)
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.effective_every_km, 20_000)
+        self.assertEqual(self.entry.effective_notify_before_km, 1_000)
+        self.assertEqual(self.entry.next_due_km, 25_000)
+
+    def test_entry_level_interval_is_preserved(self):
+        self.entry.every_km = 7_000
+        self.entry.save(update_fields=["every_km"])
+        FleetVehicleRegulationItem.objects.filter(pk=self.item.pk).update(
+            every_km=20_000
+        )
+        sync_entry_due_fields()
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.next_due_km, 12_000)
+
+    def test_override_is_preserved(self):
+        FleetVehicleRegulationEntry.objects.filter(pk=self.entry.pk).update(
+            next_due_km_override=9_000, last_done_km=8_000
+        )
+        sync_entry_due_fields()
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.next_due_km, 9_000)
@@ -0,0 +1,124 @@
+"""
+Translation Memory Tests
+========================
+Covers: translate_many cache → DB → backend resolution, dedupe, failed calls
+not stored; POST /fleet/translate/ and /fleet/translate/batch/.
+"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from fleet_management.models import TranslationMemory
+from fleet_management.translation import StubBackend, translate_many
+
+from .helpers import authenticate, make_user
+
+
+class CountingBackend(StubBackend):
+    calls = []
+
+    def translate(self, text, src, tgt):
+        self.calls.append((text, tgt))
+        return super().translate(text, src, tgt)
+
+
+class TranslateManyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        CountingBackend.calls = []
+        patcher = patch(
+            "fleet_management.translation.get_backend", return_value=CountingBackend()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_dedupes_and_normalizes(self):
+        result = translate_many(
+            ["Oil Change", "  Oil   Change ", "Air Filter"], "en", ["uk", "pl", "en"]
+        )
+        self.assertEqual(list(result), ["Oil Change", "Air Filter"])
+        self.assertEqual(
+            result["Oil Change"],
+            {"en": "Oil Change", "uk": "[uk] Oil Change", "pl": "[pl] Oil Change"},
+        )
+        self.assertEqual(len(CountingBackend.calls), 4)
+        self.assertEqual(TranslationMemory.objects.count(), 4)
+
+    def test_second_call_is_served_from_memory(self):
+        translate_many(["Oil Change"], "en", ["uk"])
+        CountingBackend.calls = []
+
+        with self.assertNumQueries(0):
+            translate_many(["Oil Change"], "en", ["uk"])
+        cache.clear()
+        with self.assertNumQueries(1):
+            result = translate_many(["Oil Change"], "en", ["uk"])
+
+        self.assertEqual(result["Oil Change"]["uk"], "[uk] Oil Change")
+        self.assertEqual(CountingBackend.calls, [])
+
+    def test_only_misses_reach_the_backend(self):
+        translate_many(["Oil Change"], "en", ["uk"])
+        CountingBackend.calls = []
+        translate_many(["Oil Change", "Air Filter"], "en", ["uk", "pl"])
+        self.assertEqual(
+            sorted(CountingBackend.calls),
+            [("Air Filter", "pl"), ("Air Filter", "uk"), ("Oil Change", "pl")],
+        )
+
+    def test_failed_translation_falls_back_and_is_not_stored(self):
+        with patch.object(CountingBackend, "translate", return_value=None):
+            result = translate_many(["Oil Change"], "en", ["uk"])
+        self.assertEqual(result["Oil Change"]["uk"], "Oil Change")
+        self.assertFalse(TranslationMemory.objects.exists())
+
+
+class TranslateAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        authenticate(self.client, make_user())
+
+    def test_single_text(self):
+        response = self.client.post(
+            "/api/v1/fleet/translate/",
+            {"text": "Заміна масла", "source": "uk"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data,
+            {
+                "uk": "Заміна масла",
+                "pl": "[pl] Заміна масла",
+                "en": "[en] Заміна масла",
+            },
+        )
+
+    def test_batch_keeps_input_order(self):
+        response = self.client.post(
+            "/api/v1/fleet/translate/batch/",
+            {"texts": ["Apteczka", "Gaśnica", "Apteczka"], "source": "pl"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            [row["en"] for row in response.data["results"]],
+            ["[en] Apteczka", "[en] Gaśnica", "[en] Apteczka"],
+        )
+        self.assertEqual(TranslationMemory.objects.count(), 4)
+
+    def test_batch_validation(self):
+        for payload in (
+            {"texts": []},
+            {"texts": ["ok"], "source": "de"},
+            {"texts": ["   "]},
+            {"texts": ["x"] * 201},
+        ):
+            response = self.client.post(
+                "/api/v1/fleet/translate/batch/", payload, format="json"
+            )
+            self.assertEqual(response.status_code, 400, payload)
@@ -1,8 +1,33 @@
-import asyncio
+"""
+Translation memory.
+===================
+Every translation is stored once per (normalized text, source, target) in
+TranslationMemory and fronted by the cache (cache_utils.get_translations),
+so regulation item titles and equipment names reach the translator only
+the first time they are seen.
+
+translate_many() dedupes a batch and resolves it cache → DB → backend; only
+the remaining misses go to the backend, concurrently on a small thread pool.
+A failed backend call falls back to the source text and is not stored, so
+it is retried on the next request.
+
+The backend is pluggable: settings.TRANSLATION_BACKEND is a dotted path to a
+TranslationBackend subclass — GoogleBackend in production, StubBackend for
+offline development and tests.
+"""
+
 from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import logging
+import unicodedata
 
 from deep_translator import GoogleTranslator
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from config import cache_utils
+
+from .models import TranslationMemory
 
 logger = logging.getLogger(__name__)
 
@@ -15,32 +40,126 @@ LANG_MAP = {
 _executor = ThreadPoolExecutor(max_workers=3)
 
 
-def _translate_one(text: str, src: str, tgt: str) -> str:
-    try:
-        return GoogleTranslator(source=src, target=tgt).translate(text) or text
-    except Exception:
-        logger.warning(
-            "Translation %s→%s failed for '%s'", src, tgt, text, exc_info=True
+class TranslationBackend:
+    name = ""
+
+    def translate(self, text: str, src: str, tgt: str) -> str | None:
+        """Return the translation, or None if the call failed."""
+        raise NotImplementedError
+
+
+class GoogleBackend(TranslationBackend):
+    name = "google"
+
+    def translate(self, text: str, src: str, tgt: str) -> str | None:
+        try:
+            return GoogleTranslator(source=src, target=tgt).translate(text) or None
+        except Exception:
+            logger.warning(
+                "Translation %s→%s failed for '%s'", src, tgt, text, exc_info=True
+            )
+            return None
+
+
+class StubBackend(TranslationBackend):
+    """Deterministic offline backend: "[pl] Oil Change"."""
+
+    name = "stub"
+
+    def translate(self, text: str, src: str, tgt: str) -> str | None:
+        return f"[{tgt}] {text}"
+
+
+def get_backend() -> TranslationBackend:
+    return import_string(settings.TRANSLATION_BACKEND)()
+
+
+def normalize(text: str) -> str:
+    """NFC with runs of whitespace collapsed — the translation memory key."""
+    return unicodedata.normalize("NFC", " ".join(text.split()))
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _from_memory(source: str, lookups: dict) -> dict:
+    """{(target, digest): text} found in the cache, then in the DB."""
+    found = cache_utils.get_translations(source, lookups)
+    missing = [lookup for lookup in lookups if lookup not in found]
+    if not missing:
+        return found
+    stored = {
+        (target, digest): text
+        for target, digest, text in TranslationMemory.objects.filter(
+            source_lang=source,
+            target_lang__in={target for target, _ in missing},
+            source_hash__in={digest for _, digest in missing},
+        ).values_list("target_lang", "source_hash", "translated_text")
+        if (target, digest) in lookups
+    }
+    if stored:
+        cache_utils.set_translations(source, stored)
+    return {**found, **stored}
+
+
+def _from_backend(source: str, lookups: dict) -> dict:
+    """Translate the misses concurrently and store the successful ones."""
+    backend = get_backend()
+    src = LANG_MAP.get(source, "uk")
+    futures = {
+        lookup: _executor.submit(
+            backend.translate, text, src, LANG_MAP.get(lookup[0], lookup[0])
+        )
+        for lookup, text in lookups.items()
+    }
+    translated = {}
+    for lookup, future in futures.items():
+        text = future.result()
+        if text is not None:
+            translated[lookup] = text
+    if translated:
+        TranslationMemory.objects.bulk_create(
+            [
+                TranslationMemory(
+                    source_lang=source,
+                    target_lang=target,
+                    source_hash=digest,
+                    source_text=lookups[(target, digest)],
+                    translated_text=text,
+                    backend=backend.name,
+                )
+                for (target, digest), text in translated.items()
+            ],
+            ignore_conflicts=True,
         )
-        return text
+        cache_utils.set_translations(source, translated)
+    return translated
 
 
-async def translate_text_async(
-    text: str, source_lang: str, target_langs: list[str]
-) -> dict[str, str]:
-    """Translate *text* from *source_lang* to each *target_langs* concurrently."""
-    src = LANG_MAP.get(source_lang, "uk")
-    loop = asyncio.get_event_loop()
+def translate_many(
+    texts: list[str], source_lang: str, target_langs: list[str]
+) -> dict[str, dict[str, str]]:
+    """Translate *texts* to each of *target_langs*.
 
-    tasks = {}
-    for lang in target_langs:
-        tgt = LANG_MAP.get(lang, lang)
-        if tgt == src:
-            continue
-        tasks[lang] = loop.run_in_executor(_executor, _translate_one, text, src, tgt)
+    Returns {normalized text: {lang: translation}}, including the source
+    language; identical texts are translated once.
+    """
+    unique = list(dict.fromkeys(filter(None, map(normalize, texts))))
+    targets = [lang for lang in target_langs if lang != source_lang]
+    lookups = {(target, _digest(text)): text for text in unique for target in targets}
 
-    results: dict[str, str] = {source_lang: text}
-    for lang, task in tasks.items():
-        results[lang] = await task
+    translations = _from_memory(source_lang, lookups)
+    missing = {
+        lookup: text for lookup, text in lookups.items() if lookup not in translations
+    }
+    if missing:
+        translations.update(_from_backend(source_lang, missing))
 
+    results = {}
+    for text in unique:
+        digest = _digest(text)
+        results[text] = {source_lang: text}
+        for target in targets:
+            results[text][target] = translations.get((target, digest), text)
     return results
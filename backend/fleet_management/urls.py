@@ -4,11 +4,17 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     AllServicePlansAPIView,
     AssignRegulationView,
+    BulkAssignRegulationView,
     CalendarInspectionsAPIView,
     EquipmentDefaultItemViewSet,
     EquipmentItemDestroyAPIView,
     EquipmentItemToggleAPIView,
     EquipmentListAPIView,
+    FleetCalendarICSView,
+    FleetCalendarTokenView,
+    FleetCalendarView,
+    FleetDueBoardView,
+    FleetJobDetailView,
     FleetServiceViewSet,
     FleetVehicleRegulationItemDetailAPIView,
     FleetVehicleRegulationSchemaDetailAPIView,
@@ -16,8 +22,10 @@ from .views import (
     ServicePlanDetailAPIView,
     ServicePlanListCreateAPIView,
     ServicePlanMarkDoneAPIView,
+    TranslateBatchView,
     TranslateTextView,
     VehicleRegulationEntryAddView,
+    VehicleRegulationEntryBatchDoneView,
     VehicleRegulationEntryDeleteView,
     VehicleRegulationEntryUpdate,
     VehicleRegulationHistoryView,
@@ -35,12 +43,21 @@ router.register(
 urlpatterns = [
     path("", include(router.urls)),
     path("translate/", TranslateTextView.as_view(), name="translate-text"),
+    path("translate/batch/", TranslateBatchView.as_view(), name="translate-batch"),
     path("service-plans/", AllServicePlansAPIView.as_view(), name="all-service-plans"),
     path(
         "calendar-inspections/",
         CalendarInspectionsAPIView.as_view(),
         name="calendar-inspections",
     ),
+    path("calendar/", FleetCalendarView.as_view(), name="fleet-calendar"),
+    path("calendar.ics", FleetCalendarICSView.as_view(), name="fleet-calendar-ics"),
+    path(
+        "calendar/token/",
+        FleetCalendarTokenView.as_view(),
+        name="fleet-calendar-token",
+    ),
+    path("jobs/<int:pk>/", FleetJobDetailView.as_view(), name="fleet-job-detail"),
     # Regulation schemas
     path(
         "regulation/schemas/",
@@ -67,6 +84,16 @@ urlpatterns = [
         AssignRegulationView.as_view(),
         name="regulation-assign-entry",
     ),
+    path(
+        "regulation/due-board/",
+        FleetDueBoardView.as_view(),
+        name="regulation-due-board",
+    ),
+    path(
+        "regulation/bulk-assign/",
+        BulkAssignRegulationView.as_view(),
+        name="regulation-bulk-assign",
+    ),
     path(
         "vehicles/<uuid:vehicle_pk>/regulation/history/",
         VehicleRegulationHistoryView.as_view(),
@@ -77,6 +104,11 @@ urlpatterns = [
         VehicleRegulationEntryAddView.as_view(),
         name="regulation-entry-add",
     ),
+    path(
+        "vehicles/<uuid:vehicle_pk>/regulation/entries/batch-done/",
+        VehicleRegulationEntryBatchDoneView.as_view(),
+        name="vehicle-regulation-entry-batch-done",
+    ),
     path(
         "vehicles/<uuid:vehicle_pk>/regulation/entries/<int:entry_pk>/",
         VehicleRegulationEntryUpdate.as_view(),
@@ -1,5 +1,9 @@
 import logging
+from urllib.parse import urlencode
 
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status, viewsets
 from rest_framework.filters import OrderingFilter
@@ -7,41 +11,58 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from account.authentication import CookieJWTAuthentication
 from config import cache_utils
+from config.archive import HistoryTierMixin
 from config.filters import LayoutAwareSearchFilter as SearchFilter
-from vehicle.models import TechnicalInspection
+from vehicle.models import MileageVelocity
 
-from .constants import EventType
+from . import calendar_feed, due_board, jobs
+from .authentication import CalendarFeedTokenAuthentication, issue_calendar_token
+from .constants import EventType, FleetJobKind
 from .filters import FleetVehicleRegulationSchemaFilter, RegulationHistoryFilter
 from .models import (
+    CalendarFeedToken,
     EquipmentDefaultItem,
     EquipmentList,
+    FleetJob,
     FleetService,
     FleetVehicleRegulation,
     FleetVehicleRegulationEntry,
     FleetVehicleRegulationHistory,
+    FleetVehicleRegulationHistoryArchive,
     FleetVehicleRegulationItem,
     FleetVehicleRegulationSchema,
     ServicePlan,
 )
+from .propagation import PROPAGATED_ITEM_FIELDS
 from .serializers import (
     AddRegulationEntrySerializer,
     AssignRegulationSerializer,
+    BatchMarkDoneSerializer,
+    BulkAssignRegulationSerializer,
     CalendarInspectionSerializer,
     EquipmentDefaultItemSerializer,
     EquipmentListSerializer,
+    FleetJobSerializer,
     FleetServiceSerializer,
     FleetVehicleRegulationItemSerializer,
     FleetVehicleRegulationSchemaSerializer,
     FleetVehicleRegulationSchemaUpdateSerializer,
     ServicePlanSerializer,
     ServicePlanWithVehicleSerializer,
+    TranslateBatchSerializer,
+    VehicleRegulationHistoryArchiveSerializer,
     VehicleRegulationHistorySerializer,
     VehicleRegulationPlanEntrySerializer,
     VehicleRegulationPlanSerializer,
 )
-from .services import assign_regulation_to_vehicle
-from .translation import translate_text_async
+from .services import (
+    assign_regulation_to_vehicle,
+    bulk_assign_regulation,
+    mark_entries_done,
+)
+from .translation import LANG_MAP, normalize, translate_many
 
 logger = logging.getLogger(__name__)
 
@@ -222,7 +243,24 @@ class FleetVehicleRegulationItemDetailAPIView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def perform_update(self, serializer):
+        old = {f: getattr(serializer.instance, f) for f in PROPAGATED_ITEM_FIELDS}
         instance = serializer.save()
+        changes = {
+            f: [old[f], getattr(instance, f)]
+            for f in PROPAGATED_ITEM_FIELDS
+            if getattr(instance, f) != old[f]
+        }
+        # Entries without a vehicle-level override inherit the item values;
+        # push the edit (and fresh plan caches) to every vehicle on the schema.
+        jobs.enqueue(
+            FleetJobKind.ITEM_UPDATED,
+            {
+                "schema_id": instance.schema_id,
+                "item_id": instance.id,
+                "changes": changes,
+            },
+            user=self.request.user,
+        )
         # Item belongs to a schema — bust the schema caches so detail reflects change.
         cache_utils.invalidate_schema(instance.schema_id)
 
@@ -256,6 +294,27 @@ class AssignRegulationView(APIView):
         return Response(result, status=status.HTTP_201_CREATED)
 
 
+class BulkAssignRegulationView(APIView):
+    """POST: assign one schema to many vehicles in a single call."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkAssignRegulationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            result = bulk_assign_regulation(
+                schema_id=serializer.validated_data["schema_id"],
+                vehicles_data=serializer.validated_data["vehicles"],
+                user=request.user,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
 class VehicleRegulationEntryUpdate(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -365,6 +424,7 @@ class VehicleRegulationEntryUpdate(APIView):
             km = int(km_raw)
             FleetVehicleRegulationHistory.objects.create(
                 entry=entry,
+                vehicle_id=vehicle_pk,
                 event_type=EventType.PERFORMED,
                 km_at_event=km,
                 km_remaining=entry.next_due_km - km,
@@ -374,6 +434,7 @@ class VehicleRegulationEntryUpdate(APIView):
         elif history_parts:
             FleetVehicleRegulationHistory.objects.create(
                 entry=entry,
+                vehicle_id=vehicle_pk,
                 event_type=EventType.KM_UPDATED,
                 km_at_event=entry.last_done_km,
                 km_remaining=entry.next_due_km - entry.last_done_km,
@@ -452,6 +513,7 @@ class VehicleRegulationEntryAddView(APIView):
 
         FleetVehicleRegulationHistory.objects.create(
             entry=entry,
+            vehicle_id=vehicle_pk,
             event_type=EventType.KM_UPDATED,
             km_at_event=d["last_done_km"],
             km_remaining=entry.next_due_km - d["last_done_km"],
@@ -459,6 +521,13 @@ class VehicleRegulationEntryAddView(APIView):
             created_by=request.user,
         )
 
+        if d["apply_to_all"]:
+            jobs.enqueue(
+                FleetJobKind.ITEM_ADDED,
+                {"schema_id": regulation.schema_id, "item_id": item.id},
+                user=request.user,
+            )
+
         cache_utils.invalidate_regulation_plan(vehicle_pk)
         cache_utils.invalidate_schema(regulation.schema_id)
         logger.info(
@@ -501,33 +570,107 @@ class VehicleRegulationEntryDeleteView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def _regulation_plan(vehicle_pk, *, refresh=False) -> dict:
+    """Serialized regulation plan of a vehicle, through the plan cache.
+
+    refresh=True rebuilds and re-caches it (right after a write).
+    """
+    cached = None if refresh else cache_utils.get_regulation_plan(vehicle_pk)
+    if cached is not None:
+        return cached
+
+    regulation = (
+        FleetVehicleRegulation.objects.filter(vehicle_id=vehicle_pk)
+        .prefetch_related("entries__item", "schema")
+        .first()
+    )
+    if not regulation:
+        data = {"assigned": False}
+    else:
+        velocity = MileageVelocity.objects.filter(vehicle_id=vehicle_pk).first()
+        data = {
+            "assigned": True,
+            **VehicleRegulationPlanSerializer(
+                regulation, context={"velocity": velocity}
+            ).data,
+        }
+
+    cache_utils.set_regulation_plan(vehicle_pk, data)
+    return data
+
+
 class VehicleRegulationPlanView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, vehicle_pk):
-        cached = cache_utils.get_regulation_plan(vehicle_pk)
-        if cached is not None:
-            return Response(cached)
+        return Response(_regulation_plan(vehicle_pk))
 
-        regulation = (
-            FleetVehicleRegulation.objects.filter(vehicle_id=vehicle_pk)
-            .prefetch_related("entries__item", "schema")
-            .first()
-        )
-        if not regulation:
-            data = {"assigned": False}
-        else:
-            data = {
-                "assigned": True,
-                **VehicleRegulationPlanSerializer(regulation).data,
-            }
 
-        cache_utils.set_regulation_plan(vehicle_pk, data)
+class VehicleRegulationEntryBatchDoneView(APIView):
+    """POST: close many regulation entries of one service visit at once.
+
+    Body: {"entries": [{"entry_id", "last_done_km"?, "every_km"?, ...,
+    "note"?}], "expense_id"?: <SERVICE expense uuid>, "note"?: ""}.
+    Responds with the recomputed plan.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, vehicle_pk):
+        serializer = BatchMarkDoneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        d = serializer.validated_data
+        try:
+            result = mark_entries_done(
+                vehicle_pk,
+                d["entries"],
+                request.user,
+                expense_id=d.get("expense_id"),
+                note=d["note"],
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({**result, "plan": _regulation_plan(vehicle_pk, refresh=True)})
+
+
+class FleetDueBoardView(APIView):
+    """GET: fleet-wide list of overdue / due-soon regulation items.
+
+    Query params: within_km (default: each item's notify_before_km),
+    state=overdue|due_soon, vehicle_status (comma-separated), search
+    (car number), ordering=km_remaining|next_due_km|car_number (prefix -),
+    page_size, cursor (from the previous page's "next").
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            within_km = params.get("within_km")
+            data = due_board.build_board(
+                within_km=int(within_km) if within_km not in (None, "") else None,
+                state=params.get("state") or None,
+                vehicle_status=[
+                    s for s in params.get("vehicle_status", "").split(",") if s
+                ],
+                search=params.get("search", ""),
+                ordering=params.get("ordering") or "km_remaining",
+                cursor=params.get("cursor") or None,
+                page_size=int(params.get("page_size", due_board.DEFAULT_PAGE_SIZE)),
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(data)
 
 
-class VehicleRegulationHistoryView(generics.ListAPIView):
+class VehicleRegulationHistoryView(HistoryTierMixin, generics.ListAPIView):
+    """GET: regulation history of one vehicle; ?tier=archive for older events."""
+
     serializer_class = VehicleRegulationHistorySerializer
+    archive_serializer_class = VehicleRegulationHistoryArchiveSerializer
+    history_model = FleetVehicleRegulationHistory
+    archive_model = FleetVehicleRegulationHistoryArchive
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = RegulationHistoryFilter
@@ -535,9 +678,11 @@ class VehicleRegulationHistoryView(generics.ListAPIView):
     ordering = ["created_at"]
 
     def get_queryset(self):
-        return FleetVehicleRegulationHistory.objects.filter(
-            entry__regulation__vehicle_id=self.kwargs["vehicle_pk"]
-        ).select_related("entry__item", "created_by")
+        return (
+            self.get_history_model()
+            .objects.filter(vehicle_id=self.kwargs["vehicle_pk"])
+            .select_related("entry__item", "created_by")
+        )
 
 
 class ServicePlanListCreateAPIView(generics.ListCreateAPIView):
@@ -558,6 +703,7 @@ class ServicePlanListCreateAPIView(generics.ListCreateAPIView):
             instance = serializer.save(
                 vehicle_id=self.kwargs["vehicle_pk"], created_by=self.request.user
             )
+            cache_utils.invalidate_calendar()
             logger.info(
                 "Service plan created successfully",
                 extra={
@@ -593,7 +739,7 @@ class AllServicePlansAPIView(generics.ListAPIView):
     serializer_class = ServicePlanWithVehicleSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ["is_done"]
+    filterset_fields = {"is_done": ["exact"], "planned_at": ["gte", "lt"]}
     ordering_fields = ["planned_at", "created_at"]
     ordering = ["planned_at"]
 
@@ -608,21 +754,119 @@ class CalendarInspectionsAPIView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        from django.db.models import Max, Subquery
-
-        latest_ids = (
-            TechnicalInspection.objects.values("vehicle")
-            .annotate(latest_id=Max("id"))
-            .values("latest_id")
-        )
         return (
-            TechnicalInspection.objects.filter(id__in=Subquery(latest_ids))
-            .select_related("vehicle")
+            calendar_feed.latest_inspections()
+            .select_related("vehicle", "vehicle__mileage_velocity")
+            .prefetch_related("vehicle__regulations__entries__item")
             .exclude(next_inspection_date__isnull=True)
             .order_by("next_inspection_date")
         )
 
 
+def _etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match", "")
+    candidates = {
+        tag.strip().removeprefix("W/").strip('"') for tag in header.split(",")
+    }
+    return etag in candidates or "*" in candidates
+
+
+class FleetCalendarView(APIView):
+    """GET /fleet/calendar/ — inspections, service plans and predicted
+    regulation dates in one [from, to) window.
+
+    Query params: from, to (ISO dates; default: 3 months from this month's
+    start), kind (comma-separated). Supports If-None-Match → 304.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            date_from, date_to = calendar_feed.parse_window(
+                params.get("from"), params.get("to")
+            )
+            data = calendar_feed.build_calendar(
+                date_from,
+                date_to,
+                kinds=[k for k in params.get("kind", "").split(",") if k],
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        headers = {"ETag": f'"{data["etag"]}"', "Cache-Control": "private, no-cache"}
+        if _etag_matches(request, data["etag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(data, headers=headers)
+
+
+class FleetCalendarICSView(APIView):
+    """GET /fleet/calendar.ics — the same feed as an iCalendar subscription.
+
+    Calendar clients authenticate with ?token= (see FleetCalendarTokenView);
+    the session cookie works too. Defaults to a 12-month window; clients
+    revalidate with If-None-Match and get a 304 while nothing in the window
+    changed.
+    """
+
+    authentication_classes = [
+        CalendarFeedTokenAuthentication,
+        CookieJWTAuthentication,
+    ]
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Calendar clients send Accept: text/calendar; errors still go out as JSON.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            date_from, date_to = calendar_feed.parse_window(
+                params.get("from"), params.get("to"), months=12
+            )
+            data = calendar_feed.build_calendar(
+                date_from,
+                date_to,
+                kinds=[k for k in params.get("kind", "").split(",") if k],
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if _etag_matches(request, data["etag"]):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                calendar_feed.render_ics(data["results"], host=request.get_host()),
+                content_type="text/calendar; charset=utf-8",
+            )
+            response["Content-Disposition"] = 'inline; filename="fleet.ics"'
+        response["ETag"] = f'"{data["etag"]}"'
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+class FleetCalendarTokenView(APIView):
+    """POST /fleet/calendar/token/ — issue (or rotate) the caller's feed
+    token and return the subscription URL; DELETE revokes it.
+
+    Only a hash is stored, so the URL is shown once.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        token = issue_calendar_token(request.user)
+        url = request.build_absolute_uri(reverse("fleet-calendar-ics"))
+        return Response(
+            {"token": token, "url": f"{url}?{urlencode({'token': token})}"},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def delete(self, request):
+        CalendarFeedToken.objects.filter(user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class ServicePlanDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ServicePlanSerializer
     permission_classes = [IsAuthenticated]
@@ -659,7 +903,7 @@ class ServicePlanMarkDoneAPIView(APIView):
         plan = generics.get_object_or_404(ServicePlan, pk=pk, vehicle_id=vehicle_pk)
         try:
             plan.is_done = True
-            plan.save(update_fields=["is_done"])
+            plan.save(update_fields=["is_done", "updated_at"])
             cache_utils.invalidate_vehicle(vehicle_pk)
         except Exception:
             logger.error(
@@ -699,9 +943,25 @@ class EquipmentDefaultItemViewSet(viewsets.ModelViewSet):
     filter_backends = [SearchFilter]
     search_fields = ["equipment"]
 
+    fan_out_job = None
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        if self.fan_out_job is not None:
+            response.data["job_id"] = self.fan_out_job.pk
+        return response
+
     def perform_create(self, serializer):
+        apply_to_all = serializer.validated_data.pop("apply_to_all")
         try:
-            instance = serializer.save(created_by=self.request.user)
+            with transaction.atomic():
+                instance = serializer.save(created_by=self.request.user)
+                if apply_to_all:
+                    self.fan_out_job = jobs.enqueue(
+                        FleetJobKind.EQUIPMENT_ADDED,
+                        {"equipment": instance.equipment},
+                        user=self.request.user,
+                    )
             logger.info(
                 "Default equipment item created",
                 extra={
@@ -711,6 +971,7 @@ class EquipmentDefaultItemViewSet(viewsets.ModelViewSet):
                     "service": "DJANGO",
                     "item_id": instance.id,
                     "equipment": instance.equipment,
+                    "job_id": getattr(self.fan_out_job, "pk", None),
                     "user_id": str(self.request.user.id),
                 },
             )
@@ -728,6 +989,23 @@ class EquipmentDefaultItemViewSet(viewsets.ModelViewSet):
             )
             raise
 
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        with transaction.atomic():
+            if request.query_params.get("apply_to_all") == "true":
+                # Vehicles keep the item where it is already equipped.
+                self.fan_out_job = jobs.enqueue(
+                    FleetJobKind.EQUIPMENT_REMOVED,
+                    {"equipment": instance.equipment},
+                    user=request.user,
+                )
+            self.perform_destroy(instance)
+        if self.fan_out_job is not None:
+            return Response(
+                {"job_id": self.fan_out_job.pk}, status=status.HTTP_202_ACCEPTED
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     def perform_destroy(self, instance):
         logger.info(
             "Default equipment item deleted",
@@ -738,12 +1016,21 @@ class EquipmentDefaultItemViewSet(viewsets.ModelViewSet):
                 "service": "DJANGO",
                 "item_id": instance.id,
                 "equipment": instance.equipment,
+                "job_id": getattr(self.fan_out_job, "pk", None),
                 "user_id": str(self.request.user.id),
             },
         )
         instance.delete()
 
 
+class FleetJobDetailView(generics.RetrieveAPIView):
+    """Progress of a fleet-wide job: status, processed / total."""
+
+    queryset = FleetJob.objects.all()
+    serializer_class = FleetJobSerializer
+    permission_classes = [IsAuthenticated]
+
+
 class EquipmentListAPIView(generics.ListCreateAPIView):
     serializer_class = EquipmentListSerializer
     permission_classes = [IsAuthenticated]
@@ -851,15 +1138,15 @@ class EquipmentItemToggleAPIView(APIView):
 class TranslateTextView(APIView):
     """POST {"text": "...", "source": "uk"} → {"uk": "...", "pl": "...", "en": "..."}
 
-    Translations run concurrently in a thread-pool so the response is fast.
+    Served from the translation memory; only unseen texts reach the translator.
     """
 
     permission_classes = [IsAuthenticated]
 
-    ALL_LANGS = ["uk", "pl", "en"]
+    ALL_LANGS = list(LANG_MAP)
 
-    async def post(self, request):
-        text = (request.data.get("text") or "").strip()
+    def post(self, request):
+        text = normalize(request.data.get("text") or "")
         source = request.data.get("source", "uk")
 
         if not text:
@@ -872,6 +1159,35 @@ class TranslateTextView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        target_langs = [lang for lang in self.ALL_LANGS if lang != source]
-        translations = await translate_text_async(text, source, target_langs)
-        return Response(translations)
+        translations = translate_many([text], source, self.ALL_LANGS)
+        return Response(translations[text])
+
+
+class TranslateBatchView(APIView):
+    """POST {"texts": [...], "source": "uk"} → {"results": [{"uk": ..., ...}]}
+
+    Results follow the order of `texts`; duplicates are translated once.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = TranslateBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        d = serializer.validated_data
+        texts = [normalize(text) for text in d["texts"]]
+
+        translations = translate_many(texts, d["source"], list(LANG_MAP))
+        logger.info(
+            "Batch translation served",
+            extra={
+                "status_code": 200,
+                "status_message": "OK",
+                "operation_type": "TRANSLATE_BATCH",
+                "service": "DJANGO",
+                "texts": len(texts),
+                "unique_texts": len(translations),
+                "user_id": str(request.user.id),
+            },
+        )
+        return Response({"results": [translations[text] for text in texts]})
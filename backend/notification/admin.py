@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Notification
+from .models import Notification, NotificationReadState
 
 
 @admin.register(Notification)
@@ -10,13 +10,19 @@ class NotificationAdmin(admin.ModelAdmin):
         "status",
         "vehicle",
         "driver",
-        "is_read",
         "sent_to",
         "sent_at",
         "retry_at",
+        "retry_count",
         "created_at",
     ]
-    list_filter = ["type", "status", "is_read", "sent_to"]
+    list_filter = ["type", "status", "sent_to"]
     search_fields = ["vehicle__car_number", "driver__first_name", "driver__last_name"]
-    readonly_fields = ["id", "created_at", "read_at", "resolved_at", "sent_at"]
+    readonly_fields = ["id", "created_at", "resolved_at", "sent_at"]
     raw_id_fields = ["vehicle", "driver", "resolved_by"]
+
+
+@admin.register(NotificationReadState)
+class NotificationReadStateAdmin(admin.ModelAdmin):
+    list_display = ["user", "read_up_to", "updated_at"]
+    raw_id_fields = ["user"]
@@ -6,6 +6,7 @@ class NotificationType(models.TextChoices):
     REGULATION_OVERDUE = "regulation_overdue", "Regulation Overdue"
     MILEAGE_SUBMITTED = "mileage_submitted", "Mileage Submitted"
     SERVICE_REPORT = "service_report", "Service Report"
+    EXPENSE_APPROVAL = "expense_approval", "Expense Approval"
 
 
 class NotificationStatus(models.TextChoices):
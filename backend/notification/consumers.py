@@ -1,10 +1,26 @@
+import asyncio
+import contextlib
 import json
 import logging
+from urllib.parse import parse_qs
 
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
+from channels.exceptions import StopConsumer
 from channels.generic.http import AsyncHttpConsumer
+from django.conf import settings
 
-from .services import MANAGERS_GROUP
+from account.authentication import CookieJWTAuthentication
+from config import cache_utils
+
+from .metrics import (
+    SSE_DROPPED_EVENTS,
+    SSE_OPEN_STREAMS,
+    SSE_QUEUE_DEPTH,
+    SSE_REJECTED_STREAMS,
+)
+from .services import MANAGERS_GROUP, unread_count
+from .stream import get_stream, parse_id
 
 logger = logging.getLogger(__name__)
 
@@ -12,10 +28,37 @@ logger = logging.getLogger(__name__)
 class NotificationSSEConsumer(AsyncHttpConsumer):
     """Server-Sent Events consumer for real-time notifications.
 
-    Managers connect to this endpoint and receive notification events
-    pushed via the channel layer.
+    Managers connect to this endpoint and receive "notifications" events
+    pushed via the channel layer — one per committed transaction, carrying
+    {"notifications": [...]} with a "repeats" count per item. Events carry
+    their stream id; on reconnect the client's Last-Event-ID (header, or
+    ?last_event_id= for clients that cannot set it) replays what was missed,
+    or sends "reset" if the gap has already been trimmed from the stream.
+
+    Live frames go through a bounded per-connection queue drained by a writer
+    task, so a slow client cannot pile up pending sends: on overflow the
+    queued events are dropped and replaced by a single "reset". A heartbeat
+    comment keeps idle proxies from closing the stream, and each user may
+    hold at most SSE_MAX_CONNECTIONS_PER_USER streams across all workers.
     """
 
+    HEARTBEAT_FRAME = b": ping\n\n"
+
+    replayed_up_to = None
+    user_id = None
+    queue = None
+    tasks = ()
+
+    async def http_request(self, message):
+        """Hand the request to handle() but keep the consumer (and its group
+        subscription) alive afterwards — the base class stops it as soon as
+        handle() returns. The stream ends on http.disconnect.
+        """
+        if "body" in message:
+            self.body.append(message["body"])
+        if not message.get("more_body"):
+            await self.handle(b"".join(self.body))
+
     async def handle(self, body):
         user = await self._authenticate()
         if user is None:
@@ -24,7 +67,21 @@ class NotificationSSEConsumer(AsyncHttpConsumer):
                 b"Unauthorized",
                 headers=[(b"Content-Type", b"text/plain")],
             )
-            return
+            raise StopConsumer()
+
+        acquired = await sync_to_async(cache_utils.acquire_sse_slot)(
+            user.id, settings.SSE_MAX_CONNECTIONS_PER_USER, self._slot_ttl()
+        )
+        if not acquired:
+            SSE_REJECTED_STREAMS.inc()
+            await self.send_response(
+                429,
+                b"Too many open notification streams",
+                headers=[(b"Content-Type", b"text/plain")],
+            )
+            raise StopConsumer()
+        self.user_id = user.id
+        SSE_OPEN_STREAMS.inc()
 
         await self.send_headers(
             status=200,
@@ -40,23 +97,116 @@ class NotificationSSEConsumer(AsyncHttpConsumer):
         await self.channel_layer.group_add(self.group_name, self.channel_name)
 
         # Send initial unread count so the client can render badge immediately
-        unread_count = await self._get_unread_count()
+        unread_count = await self._get_unread_count(user)
         await self._send_sse_event(
             "init",
             {"unread_count": unread_count},
         )
+        await self._replay()
+
+        self.queue = asyncio.Queue()
+        self.tasks = (
+            asyncio.create_task(self._writer()),
+            asyncio.create_task(self._heartbeat()),
+        )
 
     async def disconnect(self):
+        for task in self.tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        if self.queue is not None:
+            SSE_QUEUE_DEPTH.dec(self.queue.qsize())
+        if self.user_id is not None:
+            SSE_OPEN_STREAMS.dec()
+            await sync_to_async(cache_utils.release_sse_slot)(self.user_id)
         if hasattr(self, "group_name"):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
     async def notification_event(self, event):
         """Handler for messages sent to the group with type 'notification.event'."""
-        await self._send_sse_event("notification", event["data"])
+        event_id = parse_id(event.get("id"))
+        if event_id is not None and self.replayed_up_to is not None:
+            if event_id <= self.replayed_up_to:
+                return  # already delivered by the replay
+        self._enqueue(
+            self._format_event("notifications", event["data"], event.get("id"))
+        )
 
-    async def _send_sse_event(self, event_type: str, data: dict) -> None:
+    def _enqueue(self, frame: bytes) -> None:
+        if self.queue.qsize() >= settings.SSE_QUEUE_SIZE:
+            # Slow client: coalesce everything pending (and this frame) into
+            # one reset — the client reloads, or replays from its last id.
+            dropped = 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                dropped += 1
+            SSE_QUEUE_DEPTH.dec(dropped - 1)
+            SSE_DROPPED_EVENTS.inc(dropped)
+            frame = self._format_event("reset", {})
+        self.queue.put_nowait(frame)
+        SSE_QUEUE_DEPTH.inc()
+
+    async def _writer(self) -> None:
+        while True:
+            frame = await self.queue.get()
+            SSE_QUEUE_DEPTH.dec()
+            await self.send_body(frame, more_body=True)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SSE_HEARTBEAT_SECONDS)
+            if self.queue.empty():
+                self._enqueue(self.HEARTBEAT_FRAME)
+            await sync_to_async(cache_utils.touch_sse_slots)(
+                self.user_id, self._slot_ttl()
+            )
+
+    def _slot_ttl(self) -> int:
+        return max(1, round(settings.SSE_HEARTBEAT_SECONDS * 4))
+
+    async def _replay(self) -> None:
+        """Send the events published after the client's Last-Event-ID."""
+        last_id = self._requested_last_event_id()
+        if last_id is None:
+            return
+        try:
+            events = await sync_to_async(get_stream().since)(last_id)
+        except Exception:
+            logger.warning("Failed to replay notification stream", exc_info=True)
+            events = None
+        if events is None:
+            await self._send_sse_event("reset", {})
+            return
+        # Only the replay moves this mark: live events may arrive out of
+        # stream order, and a lower id seen live is not a duplicate.
+        self.replayed_up_to = parse_id(last_id)
+        for event_id, data in events:
+            await self._send_sse_event("notifications", data, event_id)
+            self.replayed_up_to = parse_id(event_id)
+
+    def _requested_last_event_id(self) -> str | None:
+        headers = dict(self.scope.get("headers", []))
+        raw = headers.get(b"last-event-id", b"").decode()
+        if not raw:
+            query = parse_qs(self.scope.get("query_string", b"").decode())
+            raw = query.get("last_event_id", [""])[0]
+        return raw if parse_id(raw) is not None else None
+
+    def _format_event(
+        self, event_type: str, data: dict, event_id: str | None = None
+    ) -> bytes:
         payload = f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
-        await self.send_body(payload.encode("utf-8"), more_body=True)
+        if event_id:
+            payload = f"id: {event_id}\n{payload}"
+        return payload.encode("utf-8")
+
+    async def _send_sse_event(
+        self, event_type: str, data: dict, event_id: str | None = None
+    ) -> None:
+        """Send directly, bypassing the queue (init and replay only)."""
+        frame = self._format_event(event_type, data, event_id)
+        await self.send_body(frame, more_body=True)
 
     async def _authenticate(self):
         """Extract and validate JWT from cookies."""
@@ -80,19 +230,15 @@ class NotificationSSEConsumer(AsyncHttpConsumer):
 
     @database_sync_to_async
     def _validate_token(self, raw_token: str):
+        """The token's user, or None; served from the user snapshot cache."""
+        authentication = CookieJWTAuthentication()
         try:
-            from rest_framework_simplejwt.tokens import AccessToken
-
-            validated = AccessToken(raw_token)
-            from django.contrib.auth import get_user_model
-
-            user_model = get_user_model()
-            return user_model.objects.get(id=validated["user_id"])
+            return authentication.get_user(
+                authentication.get_validated_token(raw_token)
+            )
         except Exception:
             return None
 
     @database_sync_to_async
-    def _get_unread_count(self) -> int:
-        from .models import Notification
-
-        return Notification.objects.filter(is_read=False).count()
+    def _get_unread_count(self, user) -> int:
+        return unread_count(user)
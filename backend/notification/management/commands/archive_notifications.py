@@ -0,0 +1,44 @@
+"""
+Move notifications past their per-type retention into NotificationArchive.
+Retention comes from settings.NOTIFICATION_RETENTION_DAYS; the list endpoint
+reads archived rows back with ?tier=archive. Run nightly.
+Use: python manage.py archive_notifications [--type mileage_submitted] [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+
+from notification.constants import NotificationType
+from notification.retention import archive_expired, cutoffs, expired
+
+
+class Command(BaseCommand):
+    help = "Archive notifications older than their type's retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--type",
+            choices=NotificationType.values,
+            action="append",
+            help="Repeatable.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count eligible rows."
+        )
+
+    def handle(self, *args, **options):
+        types = options["type"]
+        if options["dry_run"]:
+            for notification_type, cutoff in cutoffs().items():
+                if types and notification_type not in types:
+                    continue
+                count = expired(notification_type, cutoff).count()
+                self.stdout.write(
+                    f"{notification_type}: {count} rows older than {cutoff}"
+                )
+            return
+        moved = archive_expired(types, batch_size=options["batch_size"])
+        for notification_type, count in moved.items():
+            self.stdout.write(
+                self.style.SUCCESS(f"{notification_type}: archived {count} rows.")
+            )
@@ -0,0 +1,20 @@
+"""
+Create due / approaching regulation notifications for the whole active fleet.
+Already-notified entries (same due cycle) are skipped by the dedup_key index,
+so the sweep is safe to run as often as needed (cron).
+Use: python manage.py check_regulation_notifications
+"""
+
+from django.core.management.base import BaseCommand
+
+from notification.services import check_fleet_regulation_notifications
+
+
+class Command(BaseCommand):
+    help = "Create regulation notifications for every active vehicle."
+
+    def handle(self, *args, **options):
+        created = check_fleet_regulation_notifications()
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {len(created)} regulation notifications.")
+        )
@@ -0,0 +1,19 @@
+"""
+Drop every user's cached unread-notification counter.
+Counters are adjusted on every read-state change and recounted per user on
+a miss; run this periodically (cron) to bound drift from writes that bypass
+notification.services.
+Use: python manage.py reconcile_unread_count
+"""
+
+from django.core.management.base import BaseCommand
+
+from notification.services import reconcile_unread_count
+
+
+class Command(BaseCommand):
+    help = "Invalidate the cached per-user unread notification counters."
+
+    def handle(self, *args, **options):
+        reconcile_unread_count()
+        self.stdout.write(self.style.SUCCESS("Unread counters invalidated."))
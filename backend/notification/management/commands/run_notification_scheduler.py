@@ -0,0 +1,37 @@
+"""
+Re-send notifications whose retry_at is due and flush pushes held by closed
+digest windows (see notification.scheduler).
+Safe to run on several workers at once — due rows are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED.
+Use: python manage.py run_notification_scheduler [--batch-size N] [--loop]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from notification.scheduler import run_due
+
+
+class Command(BaseCommand):
+    help = "Re-deliver notifications whose retry_at has passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep polling for due notifications."
+        )
+        parser.add_argument(
+            "--interval", type=int, default=5, help="Polling interval (seconds)."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = run_due(options["batch_size"])
+            if sent or not options["loop"]:
+                self.stdout.write(
+                    self.style.SUCCESS(f"Re-delivered {sent} notifications.")
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,40 @@
+"""
+Send queued Telegram messages to drivers (see notification.telegram).
+Rate limits are shared through Redis, so several workers can run at once.
+Use: python manage.py run_telegram_outbox [--batch-size N] [--loop]
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from notification.telegram import drain
+
+
+class Command(BaseCommand):
+    help = "Drain the Telegram outbound queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep polling for queued messages."
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Pause between empty polls (seconds).",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.TELEGRAM_BOT_TOKEN:
+            raise CommandError("TELEGRAM_BOT_TOKEN is not set.")
+        while True:
+            sent = drain(options["batch_size"])
+            if sent or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Sent {sent} messages."))
+            if not options["loop"]:
+                return
+            if not sent:
+                time.sleep(options["interval"])
@@ -0,0 +1,44 @@
+"""Prometheus metrics for the notification SSE stream, retry scheduler and
+Telegram outbox (exported on /metrics)."""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+SSE_OPEN_STREAMS = Gauge(
+    "fleet_sse_open_streams",
+    "Open notification SSE streams.",
+    multiprocess_mode="livesum",
+)
+SSE_QUEUE_DEPTH = Gauge(
+    "fleet_sse_queue_depth",
+    "Frames waiting in SSE send queues.",
+    multiprocess_mode="livesum",
+)
+SSE_DROPPED_EVENTS = Counter(
+    "fleet_sse_dropped_events",
+    "Events dropped from a slow client's send queue (replaced by one reset).",
+)
+SSE_REJECTED_STREAMS = Counter(
+    "fleet_sse_rejected_streams",
+    "Streams refused because the user hit SSE_MAX_CONNECTIONS_PER_USER.",
+)
+RETRY_LAG = Histogram(
+    "fleet_notification_retry_lag_seconds",
+    "Delay between a notification's retry_at and its re-delivery.",
+    buckets=(1, 5, 15, 30, 60, 300, 900, 3600),
+)
+RETRY_REDELIVERED = Counter(
+    "fleet_notification_redelivered",
+    "Notifications re-delivered by the retry scheduler.",
+)
+TELEGRAM_SENT = Counter(
+    "fleet_telegram_sent",
+    "Notifications delivered to drivers through Telegram.",
+)
+TELEGRAM_THROTTLED = Counter(
+    "fleet_telegram_throttled",
+    "Telegram messages put back by the per-chat or global rate limit.",
+)
+TELEGRAM_DROPPED = Counter(
+    "fleet_telegram_dropped",
+    "Telegram messages given up on (blocked bot, bad chat, out of attempts).",
+)
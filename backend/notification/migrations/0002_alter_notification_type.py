@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="type",
+            field=models.CharField(
+                choices=[
+                    ("regulation_approaching", "Regulation Approaching"),
+                    ("regulation_overdue", "Regulation Overdue"),
+                    ("mileage_submitted", "Mileage Submitted"),
+                    ("service_report", "Service Report"),
+                    ("expense_approval", "Expense Approval"),
+                ],
+                db_index=True,
+                max_length=30,
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0002_alter_notification_type"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="is_read",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["-created_at"],
+                name="idx_notification_unread",
+            ),
+        ),
+    ]
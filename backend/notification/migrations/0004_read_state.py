@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:03
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def carry_over_read_flags(apps, schema_editor):
+    """Seed every user's read state from the old global is_read flag.
+
+    The watermark goes just below the oldest unread notification; read ones
+    created after it become read_ids, so each user starts with today's badge.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Notification = apps.get_model("notification", "Notification")
+    NotificationReadState = apps.get_model("notification", "NotificationReadState")
+
+    oldest_unread = (
+        Notification.objects.filter(is_read=False)
+        .order_by("created_at")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    if oldest_unread is None:
+        read_up_to, read_ids = timezone.now(), []
+    else:
+        read_up_to = oldest_unread - timedelta(microseconds=1)
+        read_ids = [
+            str(pk)
+            for pk in Notification.objects.filter(
+                is_read=True, created_at__gt=read_up_to
+            ).values_list("pk", flat=True)
+        ]
+    NotificationReadState.objects.bulk_create(
+        [
+            NotificationReadState(user_id=pk, read_up_to=read_up_to, read_ids=read_ids)
+            for pk in User.objects.values_list("pk", flat=True)
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0003_notification_unread_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationReadState",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="notification_read_state",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("read_up_to", models.DateTimeField(blank=True, null=True)),
+                ("read_ids", models.JSONField(blank=True, default=list)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(carry_over_read_flags, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="idx_notification_unread",
+        ),
+        migrations.RemoveField(
+            model_name="notification",
+            name="is_read",
+        ),
+        migrations.RemoveField(
+            model_name="notification",
+            name="read_at",
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["created_at", "id"], name="idx_notification_created"
+            ),
+        ),
+    ]
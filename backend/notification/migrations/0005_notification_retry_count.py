@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0004_read_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="retry_count",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="Re-sends so far (notification.scheduler)."
+            ),
+        ),
+    ]
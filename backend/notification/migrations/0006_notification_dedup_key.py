@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+REGULATION_TYPES = ("regulation_overdue", "regulation_approaching")
+
+
+def backfill_regulation_keys(apps, schema_editor):
+    """Key existing regulation notifications so the next check does not
+    re-create them; only the newest one per key gets it."""
+    Notification = apps.get_model("notification", "Notification")
+    seen = set()
+    keyed = []
+    rows = (
+        Notification.objects.filter(type__in=REGULATION_TYPES, vehicle__isnull=False)
+        .order_by("-created_at")
+        .only("pk", "type", "vehicle_id", "payload")
+    )
+    for notification in rows.iterator():
+        payload = notification.payload or {}
+        if "entry_id" not in payload or "next_due_km" not in payload:
+            continue
+        key = (
+            f"{notification.type}:{notification.vehicle_id}:"
+            f"{payload['entry_id']}:{payload['next_due_km']}"
+        )
+        if key in seen:
+            continue
+        seen.add(key)
+        notification.dedup_key = key
+        keyed.append(notification)
+    Notification.objects.bulk_update(keyed, ["dedup_key"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0005_notification_retry_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="dedup_key",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Notifications sharing a key are created once "
+                "(e.g. regulation type:vehicle:entry:due_km).",
+                max_length=120,
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_regulation_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="notification",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("dedup_key__isnull", False)),
+                fields=("dedup_key",),
+                name="unique_notification_dedup_key",
+            ),
+        ),
+    ]
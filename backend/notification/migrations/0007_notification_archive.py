@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("driver", "0002_drivervehicledeal"),
+        ("notification", "0006_notification_dedup_key"),
+        ("vehicle", "0020_history_archive"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationArchive",
+            fields=[
+                ("id", models.UUIDField(primary_key=True, serialize=False)),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("regulation_approaching", "Regulation Approaching"),
+                            ("regulation_overdue", "Regulation Overdue"),
+                            ("mileage_submitted", "Mileage Submitted"),
+                            ("service_report", "Service Report"),
+                            ("expense_approval", "Expense Approval"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("approved", "Approved"),
+                            ("rejected", "Rejected"),
+                            ("info", "Info"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("payload", models.JSONField(default=dict)),
+                ("created_at", models.DateTimeField()),
+                ("resolved_at", models.DateTimeField(null=True)),
+                ("sent_at", models.DateTimeField(null=True)),
+                ("sent_to", models.CharField(blank=True, max_length=50)),
+                (
+                    "driver",
+                    models.ForeignKey(
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="driver.driver",
+                    ),
+                ),
+                (
+                    "resolved_by",
+                    models.ForeignKey(
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "vehicle",
+                    models.ForeignKey(
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="vehicle.vehicle",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["type", "-created_at"],
+                        name="idx_notification_arch_type",
+                    ),
+                    models.Index(
+                        fields=["vehicle", "-created_at"],
+                        name="idx_notification_arch_vehicle",
+                    ),
+                ],
+            },
+        ),
+    ]
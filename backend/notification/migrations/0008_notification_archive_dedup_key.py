@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0007_notification_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationarchive",
+            name="dedup_key",
+            field=models.CharField(editable=False, max_length=120, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="notificationarchive",
+            index=models.Index(
+                condition=models.Q(("dedup_key__isnull", False)),
+                fields=["dedup_key"],
+                name="idx_notification_arch_dedup",
+            ),
+        ),
+    ]
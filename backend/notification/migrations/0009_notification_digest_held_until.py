@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notification", "0008_notification_archive_dedup_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="digest_held_until",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                help_text="Live push held by an open digest window; flushed after this.",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.db.models import Q
 
 from .constants import NotificationStatus, NotificationType
 
@@ -35,10 +36,16 @@ class Notification(models.Model):
     )
 
     payload = models.JSONField(default=dict)
+    dedup_key = models.CharField(
+        max_length=120,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Notifications sharing a key are created once "
+        "(e.g. regulation type:vehicle:entry:due_km).",
+    )
 
-    is_read = models.BooleanField(default=False, db_index=True)
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
-    read_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
 
     resolved_at = models.DateTimeField(null=True, blank=True)
     resolved_by = models.ForeignKey(
@@ -62,9 +69,126 @@ class Notification(models.Model):
         db_index=True,
         help_text="When to re-send this notification. Null means no repeat.",
     )
+    retry_count = models.PositiveSmallIntegerField(
+        default=0, help_text="Re-sends so far (notification.scheduler)."
+    )
+    digest_held_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Live push held by an open digest window; flushed after this.",
+    )
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Per-user unread = created_at past the user's watermark minus a
+            # few ids — answerable from this index alone.
+            models.Index(fields=["created_at", "id"], name="idx_notification_created"),
+        ]
+        constraints = [
+            # Partial: only keyed notifications are indexed, and the insert
+            # itself (ON CONFLICT DO NOTHING) does the deduplication.
+            models.UniqueConstraint(
+                fields=["dedup_key"],
+                condition=Q(dedup_key__isnull=False),
+                name="unique_notification_dedup_key",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"[{self.type}] {self.vehicle or '—'} ({self.status})"
+
+
+class NotificationArchive(models.Model):
+    """Cold tier of Notification (see notification.retention).
+
+    Same ids and columns minus the retry and digest bookkeeping. dedup_key comes along
+    and create_notifications() checks it here too, so archiving a regulation
+    notification does not let the same due cycle notify again.
+    """
+
+    id = models.UUIDField(primary_key=True)
+    type = models.CharField(max_length=30, choices=NotificationType.choices)
+    status = models.CharField(max_length=20, choices=NotificationStatus.choices)
+    vehicle = models.ForeignKey(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+        db_index=False,
+    )
+    driver = models.ForeignKey(
+        "driver.Driver",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        db_index=False,
+    )
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True)
+    resolved_by = models.ForeignKey(
+        "account.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        db_index=False,
+    )
+    sent_at = models.DateTimeField(null=True)
+    sent_to = models.CharField(max_length=50, blank=True)
+    dedup_key = models.CharField(max_length=120, null=True, editable=False)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["type", "-created_at"], name="idx_notification_arch_type"
+            ),
+            models.Index(
+                fields=["dedup_key"],
+                condition=Q(dedup_key__isnull=False),
+                name="idx_notification_arch_dedup",
+            ),
+            models.Index(
+                fields=["vehicle", "-created_at"], name="idx_notification_arch_vehicle"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"[{self.type}] {self.vehicle_id or '—'} ({self.status}, archived)"
+
+
+class NotificationReadState(models.Model):
+    """Per-user read state: a watermark plus the ids read individually past it.
+
+    Everything created at or before read_up_to is read; after it, only the
+    notifications listed in read_ids. "Mark all read" moves the watermark and
+    empties the list — a single-row write.
+    """
+
+    user = models.OneToOneField(
+        "account.User",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_read_state",
+    )
+    read_up_to = models.DateTimeField(null=True, blank=True)
+    read_ids = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.user} read up to {self.read_up_to} (+{len(self.read_ids)})"
+
+    def is_read(self, notification: Notification) -> bool:
+        if self.read_up_to is not None and notification.created_at <= self.read_up_to:
+            return True
+        return str(notification.pk) in self.read_ids
+
+    def unread_q(self) -> Q:
+        q = Q()
+        if self.read_up_to is not None:
+            q &= Q(created_at__gt=self.read_up_to)
+        if self.read_ids:
+            q &= ~Q(pk__in=self.read_ids)
+        return q
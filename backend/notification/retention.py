@@ -0,0 +1,60 @@
+"""
+Notification retention.
+=======================
+Notifications are kept hot for a per-type number of days
+(settings.NOTIFICATION_RETENTION_DAYS) and then moved, in keyset batches,
+to NotificationArchive with config.archive.move_to_archive. Pending rows
+and rows with a retry scheduled stay hot until settled, whatever their age.
+
+The list endpoint reads the archive with ?tier=archive.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from config import cache_utils
+from config.archive import move_to_archive
+
+from .constants import NotificationStatus
+from .models import Notification, NotificationArchive
+
+# Never archived, whatever the age.
+SETTLED = ~Q(status=NotificationStatus.PENDING) & Q(retry_at__isnull=True)
+
+
+def cutoffs(now=None) -> dict:
+    """{type: created_at cutoff} for every type with a retention period."""
+    now = now or timezone.now()
+    return {
+        notification_type: now - timedelta(days=days)
+        for notification_type, days in settings.NOTIFICATION_RETENTION_DAYS.items()
+    }
+
+
+def expired(notification_type: str, cutoff):
+    return Notification.objects.filter(
+        SETTLED, type=notification_type, created_at__lt=cutoff
+    )
+
+
+def archive_expired(types=None, *, batch_size: int = 5000, now=None) -> dict[str, int]:
+    """Archive every expired notification; returns {type: rows moved}."""
+    moved = {}
+    for notification_type, cutoff in cutoffs(now).items():
+        if types and notification_type not in types:
+            continue
+        moved[notification_type] = move_to_archive(
+            Notification,
+            NotificationArchive,
+            "created_at",
+            cutoff,
+            batch_size=batch_size,
+            filters=SETTLED & Q(type=notification_type),
+        )
+    if any(moved.values()):
+        # Unread badges may have counted archived rows.
+        cache_utils.invalidate_unread_counts()
+    return moved
@@ -0,0 +1,109 @@
+"""
+Notification retry scheduler.
+=============================
+Re-sends notifications whose retry_at has passed. Each tick claims up to
+NOTIFICATION_RETRY_BATCH_SIZE due rows, oldest retry_at first, with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+`manage.py run_notification_scheduler --loop` workers can run side by side:
+a row locked by one worker is skipped by the others, and it is rescheduled
+(or cleared) in the same transaction, so it is never picked up twice.
+
+Re-delivery goes through the regular delivery batch (services._queue_delivery)
+— one channel-layer event for the whole tick, sent after commit.
+
+A notification still awaiting a decision (PENDING) is rescheduled with
+exponential backoff until it is resolved or NOTIFICATION_RETRY_MAX_ATTEMPTS
+is reached; any other notification is re-sent once and its retry_at cleared.
+
+Each tick also flushes live pushes held by a digest window that has since
+closed (digest_held_until), as one digest event to the managers.
+"""
+
+from datetime import timedelta
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .constants import NotificationStatus
+from .metrics import RETRY_LAG, RETRY_REDELIVERED
+from .models import Notification
+from .services import _load_for_delivery, _push_to_managers, _queue_delivery
+
+logger = logging.getLogger(__name__)
+
+
+def next_retry_at(notification: Notification, now):
+    """When to re-send next, or None to stop."""
+    if notification.status != NotificationStatus.PENDING:
+        return None
+    if notification.retry_count >= settings.NOTIFICATION_RETRY_MAX_ATTEMPTS:
+        return None
+    delay = min(
+        settings.NOTIFICATION_RETRY_INTERVAL_SECONDS * 2**notification.retry_count,
+        settings.NOTIFICATION_RETRY_MAX_INTERVAL_SECONDS,
+    )
+    return now + timedelta(seconds=delay)
+
+
+@transaction.atomic
+def deliver_due(batch_size: int | None = None) -> int:
+    """Claim one batch of due notifications and re-send it. Returns the count."""
+    now = timezone.now()
+    due = list(
+        Notification.objects.select_for_update(skip_locked=True)
+        .filter(retry_at__lte=now)
+        .order_by("retry_at")[: batch_size or settings.NOTIFICATION_RETRY_BATCH_SIZE]
+    )
+    if not due:
+        return 0
+
+    for notification in due:
+        RETRY_LAG.observe((now - notification.retry_at).total_seconds())
+        notification.retry_count += 1
+        notification.retry_at = next_retry_at(notification, now)
+        _queue_delivery(notification, push=True, created=False)
+    Notification.objects.bulk_update(due, ["retry_at", "retry_count"])
+    RETRY_REDELIVERED.inc(len(due))
+
+    logger.info(
+        "Notifications re-delivered",
+        extra={
+            "status_code": 200,
+            "status_message": "OK",
+            "operation_type": "NOTIFICATION_RETRY",
+            "service": "DJANGO",
+            "count": len(due),
+        },
+    )
+    return len(due)
+
+
+@transaction.atomic
+def flush_digests(batch_size: int | None = None) -> int:
+    """Claim one batch of held notifications whose digest window has closed
+    and push them to the managers after commit. Returns the count."""
+    held = list(
+        Notification.objects.select_for_update(skip_locked=True)
+        .filter(digest_held_until__lte=timezone.now())
+        .order_by("digest_held_until")
+        .values_list("pk", flat=True)[
+            : batch_size or settings.NOTIFICATION_RETRY_BATCH_SIZE
+        ]
+    )
+    if not held:
+        return 0
+    Notification.objects.filter(pk__in=held).update(digest_held_until=None)
+    transaction.on_commit(lambda: _push_to_managers(_load_for_delivery(held)))
+    return len(held)
+
+
+def run_due(batch_size: int | None = None) -> int:
+    """Drain everything currently due, one batch (transaction) at a time."""
+    total = 0
+    while True:
+        sent = deliver_due(batch_size) + flush_digests(batch_size)
+        total += sent
+        if not sent:
+            return total
@@ -1,11 +1,12 @@
 from rest_framework import serializers
 
-from .models import Notification
+from .models import Notification, NotificationArchive
 
 
 class NotificationSerializer(serializers.ModelSerializer):
     vehicle_display = serializers.SerializerMethodField()
     driver_display = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
@@ -20,7 +21,6 @@ class NotificationSerializer(serializers.ModelSerializer):
             "payload",
             "is_read",
             "created_at",
-            "read_at",
             "resolved_at",
             "resolved_by",
             "sent_at",
@@ -39,6 +39,35 @@ class NotificationSerializer(serializers.ModelSerializer):
             return str(obj.driver)
         return None
 
+    def get_is_read(self, obj) -> bool:
+        """Read state of the requesting user; unread when there is none
+        (e.g. the broadcast copy pushed to every manager)."""
+        state = self.context.get("read_state")
+        return bool(state and state.is_read(obj))
+
+
+class NotificationArchiveSerializer(NotificationSerializer):
+    is_read = None
+
+    class Meta:
+        model = NotificationArchive
+        fields = [
+            "id",
+            "type",
+            "status",
+            "vehicle",
+            "driver",
+            "vehicle_display",
+            "driver_display",
+            "payload",
+            "created_at",
+            "resolved_at",
+            "resolved_by",
+            "sent_at",
+            "sent_to",
+        ]
+        read_only_fields = fields
+
 
 class MileageSubmitSerializer(serializers.Serializer):
     vehicle_id = serializers.UUIDField()
@@ -1,38 +1,169 @@
+from datetime import UTC, datetime, timedelta
 import logging
+import threading
+import weakref
 
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.conf import settings
 from django.db import transaction
+from django.db.models import F, Subquery
 from django.utils import timezone
 
+from config import cache_utils
+
+from . import telegram
 from .constants import NotificationStatus, NotificationType
-from .models import Notification
+from .models import Notification, NotificationArchive, NotificationReadState
+from .stream import get_stream
 
 logger = logging.getLogger(__name__)
 
 MANAGERS_GROUP = "notifications_managers"
 
+# read_ids longer than this get folded into the watermark.
+READ_IDS_COMPACT_AT = 200
+
+# The open delivery batch per database alias. Only on_commit holds a strong
+# reference, so a batch dropped by a rollback disappears from here as well.
+_batches = threading.local()
+
 
-def _push_to_managers(notification: Notification) -> None:
-    """Send notification event to all connected managers via channel layer."""
+def _append_to_stream(data: dict) -> str | None:
+    """Record the event for Last-Event-ID replay; None if the stream is down."""
+    try:
+        return get_stream().append(data)
+    except Exception:
+        logger.warning("Failed to append notification to event stream", exc_info=True)
+        return None
+
+
+class _DeliveryBatch:
+    """Notifications touched in one transaction, delivered together on commit."""
+
+    def __init__(self):
+        self.push_ids = []
+        self.created = False
+        self.delivered = False
+
+    def __call__(self):
+        self.delivered = True
+        if self.created:
+            cache_utils.invalidate_unread_counts()
+        if self.push_ids:
+            notifications = _load_for_delivery(self.push_ids)
+            _push_to_managers(notifications)
+            telegram.enqueue_notifications(notifications)
+
+
+def _queue_delivery(notification: Notification, *, push: bool, created: bool) -> None:
+    """Add the notification to the transaction's delivery batch.
+
+    The first call in a transaction registers the batch with on_commit; later
+    ones only append to it. Outside a transaction the batch runs at once. A
+    rolled-back transaction or savepoint releases the batch with its callback,
+    and the next call starts a new one.
+    """
+    connection = transaction.get_connection()
+    if not hasattr(_batches, "open"):
+        _batches.open = weakref.WeakValueDictionary()
+    batch = _batches.open.get(connection.alias)
+    fresh = batch is None or batch.delivered
+    if fresh:
+        batch = _DeliveryBatch()
+        _batches.open[connection.alias] = batch
+    if push:
+        batch.push_ids.append(notification.pk)
+    batch.created |= created
+    if fresh:
+        transaction.on_commit(batch, using=connection.alias)
+
+
+def _digest(notifications: list[Notification]) -> tuple[list, list, dict]:
+    """Collapse repeats per (vehicle, type) when a digest window is set.
+
+    Returns (delivered, entries, held): every notification the push accounts
+    for, (latest notification, repeats) per entry to send, and {closes_at:
+    notifications} for groups whose window is still open from an earlier
+    push — those are held until it closes, then flushed as one entry.
+    Notifications without a vehicle are never collapsed.
+    """
+    window = settings.NOTIFICATION_DIGEST_WINDOW_SECONDS
+    if not window:
+        return notifications, [(n, 1) for n in notifications], {}
+    groups = {}
+    for notification in notifications:
+        key = (
+            (notification.vehicle_id, notification.type)
+            if notification.vehicle_id
+            else notification.pk
+        )
+        groups.setdefault(key, []).append(notification)
+    open_windows = cache_utils.claim_digest_windows(
+        [key for key in groups if isinstance(key, tuple)], window
+    )
+    delivered, entries, held = [], [], {}
+    for key, group in groups.items():
+        if key in open_windows:
+            closes_at = datetime.fromtimestamp(open_windows[key], tz=UTC)
+            held.setdefault(closes_at, []).extend(group)
+        else:
+            delivered.extend(group)
+            entries.append((group[-1], len(group)))
+    return delivered, entries, held
+
+
+def _load_for_delivery(notification_ids: list) -> list[Notification]:
+    """Re-read the batch after commit, dropping rows rolled back with a
+    savepoint; one query with everything the web and Telegram channels need."""
+    return list(
+        Notification.objects.filter(pk__in=notification_ids)
+        .select_related("vehicle", "driver", "vehicle__current_owner__driver")
+        .order_by("created_at")
+    )
+
+
+def _push_to_managers(notifications: list[Notification]) -> None:
+    """Send one batched event for the notifications to all connected managers.
+
+    Appends the batch to the replay stream, sends it with a single group_send
+    and stamps delivery with a single UPDATE.
+    """
     try:
         channel_layer = get_channel_layer()
         if channel_layer is None:
             return
         from .serializers import NotificationSerializer
 
-        data = NotificationSerializer(notification).data
+        delivered, entries, held = _digest(notifications)
+        for closes_at, group in held.items():
+            Notification.objects.filter(pk__in=[n.pk for n in group]).update(
+                digest_held_until=closes_at
+            )
+        if not entries:
+            return
+        items = []
+        for notification, repeats in entries:
+            item = NotificationSerializer(notification).data
+            item["repeats"] = repeats
+            items.append(item)
+        data = {"notifications": items}
         async_to_sync(channel_layer.group_send)(
             MANAGERS_GROUP,
-            {"type": "notification.event", "data": data},
+            {
+                "type": "notification.event",
+                "id": _append_to_stream(data),
+                "data": data,
+            },
         )
         # Track delivery
-        Notification.objects.filter(pk=notification.pk).update(
+        Notification.objects.filter(pk__in=[n.pk for n in delivered]).update(
             sent_at=timezone.now(),
             sent_to="web",
+            digest_held_until=None,
         )
     except Exception:
-        logger.warning("Failed to push notification via channel layer", exc_info=True)
+        logger.warning("Failed to push notifications via channel layer", exc_info=True)
 
 
 def create_notification(
@@ -45,7 +176,11 @@ def create_notification(
     push: bool = True,
     retry_at=None,
 ) -> Notification:
-    """Create a notification and optionally push it to connected managers."""
+    """Create a notification and optionally push it to connected managers.
+
+    The push is batched with every other notification of the transaction
+    and sent on commit.
+    """
     notification = Notification.objects.create(
         type=notification_type,
         status=status,
@@ -54,70 +189,209 @@ def create_notification(
         payload=payload or {},
         retry_at=retry_at,
     )
-    if push:
-        transaction.on_commit(lambda: _push_to_managers(notification))
+    _queue_delivery(notification, push=push, created=True)
     return notification
 
 
+def create_notifications(
+    notifications: list[Notification], *, push: bool = True
+) -> list[Notification]:
+    """Insert unsaved notifications in one INSERT ... ON CONFLICT DO NOTHING.
+
+    Rows whose dedup_key already exists are skipped by the database, and
+    keys already archived by retention are dropped beforehand (one indexed
+    lookup); returns the ones actually inserted (one follow-up SELECT).
+    """
+    keys = [n.dedup_key for n in notifications if n.dedup_key]
+    if keys:
+        archived = set(
+            NotificationArchive.objects.filter(dedup_key__in=keys).values_list(
+                "dedup_key", flat=True
+            )
+        )
+        notifications = [n for n in notifications if n.dedup_key not in archived]
+    if not notifications:
+        return []
+    Notification.objects.bulk_create(notifications, ignore_conflicts=True)
+    inserted = set(
+        Notification.objects.filter(pk__in=[n.pk for n in notifications]).values_list(
+            "pk", flat=True
+        )
+    )
+    created = [n for n in notifications if n.pk in inserted]
+    for notification in created:
+        _queue_delivery(notification, push=push, created=True)
+    return created
+
+
+def get_read_state(user) -> NotificationReadState:
+    """The user's read state; an unsaved empty one if they never read anything."""
+    state = NotificationReadState.objects.filter(user=user).first()
+    return state or NotificationReadState(user=user)
+
+
+def unread_notifications(user, state: NotificationReadState | None = None):
+    state = state or get_read_state(user)
+    return Notification.objects.filter(state.unread_q())
+
+
+def unread_count(user) -> int:
+    """Unread notifications for the user's badge, from the cached counter.
+
+    A miss (first read, a new notification, expiry) recounts with an
+    index-only query on (created_at, id).
+    """
+    count = cache_utils.get_unread_count(user.pk)
+    if count is None:
+        count = unread_notifications(user).count()
+        cache_utils.set_unread_count(user.pk, count)
+    return max(count, 0)
+
+
+def reconcile_unread_count() -> None:
+    """Drop every user's cached counter; each recounts on its next read."""
+    cache_utils.invalidate_unread_counts()
+
+
+def _newest_created_at() -> Subquery:
+    """The watermark for "everything read": the newest notification the user
+    could have seen. created_at is stamped at INSERT, so wall-clock now would
+    also cover rows inserted before the click but committed after it."""
+    return Subquery(
+        Notification.objects.order_by("-created_at").values("created_at")[:1]
+    )
+
+
+def _compact(state: NotificationReadState) -> None:
+    """Move the watermark up to the oldest notification still unread, so
+    read_ids only keeps the ids read after it."""
+    oldest_unread = (
+        Notification.objects.filter(state.unread_q())
+        .order_by("created_at")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    if oldest_unread is None:
+        state.read_up_to = _newest_created_at()
+        state.read_ids = []
+        return
+    state.read_up_to = oldest_unread - timedelta(microseconds=1)
+    state.read_ids = [
+        str(pk)
+        for pk in Notification.objects.filter(
+            pk__in=state.read_ids, created_at__gte=oldest_unread
+        ).values_list("pk", flat=True)
+    ]
+
+
+@transaction.atomic
+def mark_read(notification: Notification, user) -> bool:
+    """Mark one notification read for `user`; False if it already was."""
+    state, _ = NotificationReadState.objects.select_for_update().get_or_create(
+        user=user
+    )
+    if state.is_read(notification):
+        return False
+    state.read_ids.append(str(notification.pk))
+    if len(state.read_ids) > READ_IDS_COMPACT_AT:
+        _compact(state)
+    state.save()
+    transaction.on_commit(lambda: cache_utils.adjust_unread_count(user.pk, -1))
+    return True
+
+
+def mark_all_read(user) -> int:
+    """Read everything for `user` with one row write; returns how many were unread."""
+    count = unread_count(user)
+    NotificationReadState.objects.update_or_create(
+        user=user, defaults={"read_up_to": _newest_created_at(), "read_ids": []}
+    )
+    transaction.on_commit(lambda: cache_utils.invalidate_unread_count(user.pk))
+    return count
+
+
+def regulation_dedup_key(n_type: str, entry) -> str:
+    """One regulation notification per type, vehicle, entry and due cycle."""
+    return f"{n_type}:{entry.regulation.vehicle_id}:{entry.id}:{entry.next_due_km}"
+
+
+def _build_regulation_notification(entry, vehicle) -> Notification | None:
+    current_km = vehicle.initial_km
+    remaining = entry.km_remaining(current_km)
+    notify_before = entry.effective_notify_before_km
+
+    if remaining <= 0:
+        n_type = NotificationType.REGULATION_OVERDUE
+        payload = {
+            "entry_id": entry.id,
+            "item_title": entry.item.title,
+            "every_km": entry.effective_every_km,
+            "overdue_by_km": abs(remaining),
+            "next_due_km": entry.next_due_km,
+            "current_km": current_km,
+        }
+    elif remaining <= notify_before:
+        n_type = NotificationType.REGULATION_APPROACHING
+        payload = {
+            "entry_id": entry.id,
+            "item_title": entry.item.title,
+            "every_km": entry.effective_every_km,
+            "km_remaining": remaining,
+            "next_due_km": entry.next_due_km,
+            "current_km": current_km,
+        }
+    else:
+        return None
+
+    return Notification(
+        type=n_type,
+        vehicle=vehicle,
+        payload=payload,
+        dedup_key=regulation_dedup_key(n_type, entry),
+    )
+
+
 def check_regulation_notifications(vehicle) -> list[Notification]:
     """Check all regulation entries for a vehicle and create notifications if needed.
 
     Called after vehicle.initial_km is updated.
-    Skips creation if an unread notification for the same entry+type already exists.
+    Duplicates (same entry+type within the entry's current due cycle) are
+    skipped by the dedup_key unique index, not by pre-check queries.
     """
     from fleet_management.models import FleetVehicleRegulationEntry
 
-    current_km = vehicle.initial_km
+    # Only entries inside their notify window — filtered in SQL on stored columns.
     entries = FleetVehicleRegulationEntry.objects.filter(
         regulation__vehicle=vehicle,
+        next_due_km__lte=vehicle.initial_km + F("effective_notify_before_km"),
     ).select_related("item", "regulation")
 
-    created = []
-    for entry in entries:
-        remaining = entry.km_remaining(current_km)
-        notify_before = entry.item.notify_before_km
-
-        if remaining <= 0:
-            n_type = NotificationType.REGULATION_OVERDUE
-            payload = {
-                "entry_id": entry.id,
-                "item_title": entry.item.title,
-                "every_km": entry.item.every_km,
-                "overdue_by_km": abs(remaining),
-                "next_due_km": entry.next_due_km,
-                "current_km": current_km,
-            }
-        elif remaining <= notify_before:
-            n_type = NotificationType.REGULATION_APPROACHING
-            payload = {
-                "entry_id": entry.id,
-                "item_title": entry.item.title,
-                "every_km": entry.item.every_km,
-                "km_remaining": remaining,
-                "next_due_km": entry.next_due_km,
-                "current_km": current_km,
-            }
-        else:
-            continue
-
-        # Deduplicate: skip if unread notification for same entry+type exists
-        already_exists = Notification.objects.filter(
-            type=n_type,
-            vehicle=vehicle,
-            is_read=False,
-            payload__entry_id=entry.id,
-        ).exists()
-        if already_exists:
-            continue
-
-        notification = create_notification(
-            notification_type=n_type,
-            vehicle=vehicle,
-            payload=payload,
-        )
-        created.append(notification)
+    built = (_build_regulation_notification(entry, vehicle) for entry in entries)
+    return create_notifications([n for n in built if n is not None])
 
-    return created
+
+def check_fleet_regulation_notifications(vehicles=None) -> list[Notification]:
+    """check_regulation_notifications for many vehicles (default: all active
+    ones) with one SELECT for the due entries and one bulk INSERT."""
+    from fleet_management.models import FleetVehicleRegulationEntry
+    from vehicle.constants import VehicleStatus
+    from vehicle.models import Vehicle
+
+    if vehicles is None:
+        vehicles = Vehicle.objects.filter(is_archived=False).exclude(
+            status=VehicleStatus.SOLD
+        )
+    entries = FleetVehicleRegulationEntry.objects.filter(
+        regulation__vehicle__in=vehicles,
+        next_due_km__lte=F("regulation__vehicle__initial_km")
+        + F("effective_notify_before_km"),
+    ).select_related("item", "regulation__vehicle")
+
+    built = (
+        _build_regulation_notification(entry, entry.regulation.vehicle)
+        for entry in entries
+    )
+    return create_notifications([n for n in built if n is not None])
 
 
 @transaction.atomic
@@ -148,8 +422,11 @@ def resolve_notification(notification: Notification, action: str, user) -> Notif
     else:
         raise ValueError(f"Unknown action: {action}")
 
+    notification.retry_at = None  # nothing left to remind about
     notification.save()
-    transaction.on_commit(lambda: _push_to_managers(notification))
+    # Acting on a notification reads it for the resolver.
+    mark_read(notification, user)
+    _queue_delivery(notification, push=True, created=False)
     return notification
 
 
@@ -157,8 +434,10 @@ def _approve_mileage(notification: Notification, user) -> None:
     """Create MileageLog and update vehicle km after manager approval."""
     from django.utils import timezone
 
-    from config.cache_utils import invalidate_vehicle
+    from config.cache_utils import invalidate_regulation_plan, invalidate_vehicle
+    from expense.analytics import refresh_for_mileage
     from vehicle.models import MileageLog, Vehicle
+    from vehicle.velocity import record_mileage
 
     vehicle = notification.vehicle
     submitted_km = notification.payload.get("submitted_km")
@@ -171,7 +450,7 @@ def _approve_mileage(notification: Notification, user) -> None:
             f"Submitted km ({submitted_km}) is not greater than current ({current_km})."
         )
 
-    MileageLog.objects.create(
+    log = MileageLog.objects.create(
         vehicle=vehicle,
         km=submitted_km,
         recorded_at=timezone.now().date(),
@@ -180,6 +459,9 @@ def _approve_mileage(notification: Notification, user) -> None:
     )
     Vehicle.objects.filter(pk=vehicle.pk).update(initial_km=submitted_km)
     vehicle.refresh_from_db()
+    refresh_for_mileage(vehicle.pk, since=log.recorded_at)
+    record_mileage(vehicle.pk, log.km, log.recorded_at)
 
     transaction.on_commit(lambda: invalidate_vehicle(vehicle.pk))
+    transaction.on_commit(lambda: invalidate_regulation_plan(vehicle.pk))
     check_regulation_notifications(vehicle)
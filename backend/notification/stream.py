@@ -0,0 +1,128 @@
+"""
+Replayable notification event log.
+==================================
+Every event pushed to managers is first appended to a capped stream; its
+stream id travels with the live message and is emitted as the SSE `id:`
+field. A client that reconnects with Last-Event-ID gets everything after
+that id from one range read instead of reloading the notification list.
+
+Ids are Redis stream ids ("<ms>-<seq>"), monotonic across publishers. A
+replay is refused when the cap has already trimmed events newer than the
+client's id (max-deleted-entry-id, Redis 7+).
+settings.NOTIFICATION_STREAM_BACKEND selects the implementation:
+RedisEventStream (XADD MAXLEN ~ / XRANGE) in production, MemoryEventStream
+for tests and single-process development.
+"""
+
+from collections import deque
+import functools
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+import redis
+
+STREAM_KEY = "fleet:notifications:stream"
+
+
+def parse_id(raw) -> tuple[int, int] | None:
+    """Parse a "<ms>-<seq>" id into (ms, seq); None for anything else."""
+    try:
+        ms, seq = str(raw).split("-")
+        return int(ms), int(seq)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_id(parsed: tuple[int, int]) -> str:
+    return f"{parsed[0]}-{parsed[1]}"
+
+
+class EventStream:
+    def __init__(self, maxlen: int | None = None):
+        self.maxlen = maxlen or settings.NOTIFICATION_STREAM_MAXLEN
+
+    def append(self, data: dict) -> str:
+        """Append one event; returns its id."""
+        raise NotImplementedError
+
+    def since(self, last_id: str) -> list[tuple[str, dict]] | None:
+        """Events after last_id, oldest first.
+
+        None when events after last_id have already been trimmed — the gap
+        cannot be replayed and the client has to reload.
+        """
+        raise NotImplementedError
+
+
+class RedisEventStream(EventStream):
+    def __init__(self, maxlen: int | None = None):
+        super().__init__(maxlen)
+        self.client = redis.Redis.from_url(settings.REDIS_URL)
+
+    def append(self, data: dict) -> str:
+        event_id = self.client.xadd(
+            STREAM_KEY,
+            {"data": json.dumps(data, default=str)},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+        return event_id.decode()
+
+    def since(self, last_id: str) -> list[tuple[str, dict]] | None:
+        after = parse_id(last_id)
+        try:
+            info = self.client.xinfo_stream(STREAM_KEY)
+        except redis.ResponseError:  # stream not created yet
+            return []
+        trimmed = info.get("max-deleted-entry-id") or b"0-0"
+        if parse_id(trimmed.decode()) > after:
+            return None
+        rows = self.client.xrange(
+            STREAM_KEY, min=f"({format_id(after)}", count=self.maxlen
+        )
+        return [
+            (event_id.decode(), json.loads(fields[b"data"]))
+            for event_id, fields in rows
+        ]
+
+
+class MemoryEventStream(EventStream):
+    """In-process stand-in with the same id scheme and trimming."""
+
+    def __init__(self, maxlen: int | None = None):
+        super().__init__(maxlen)
+        self._events = deque(maxlen=self.maxlen)
+        self._last = (0, 0)
+        self._trimmed = (0, 0)  # highest id dropped by the cap
+        self._lock = threading.Lock()
+
+    def append(self, data: dict) -> str:
+        with self._lock:
+            ms = int(time.time() * 1000)
+            if ms > self._last[0]:
+                self._last = (ms, 0)
+            else:
+                self._last = (self._last[0], self._last[1] + 1)
+            if len(self._events) == self.maxlen:
+                self._trimmed = self._events[0][0]
+            # Round-trip through JSON like the Redis backend does.
+            self._events.append((self._last, json.loads(json.dumps(data, default=str))))
+            return format_id(self._last)
+
+    def since(self, last_id: str) -> list[tuple[str, dict]] | None:
+        after = parse_id(last_id)
+        with self._lock:
+            events = list(self._events)
+            if self._trimmed > after:
+                return None
+        return [
+            (format_id(event_id), data) for event_id, data in events if event_id > after
+        ]
+
+
+@functools.cache
+def get_stream() -> EventStream:
+    return import_string(settings.NOTIFICATION_STREAM_BACKEND)()
@@ -0,0 +1,397 @@
+"""
+Telegram delivery channel.
+==========================
+Driver-facing notifications (mileage approved / rejected, regulation
+approaching / overdue) are sent to the driver's telegram_id through the Bot
+API. Delivery never happens inside the request: after commit the delivery
+batch renders one message per recipient into an outbound queue, and
+`manage.py run_telegram_outbox --loop` drains it.
+
+The drain respects Telegram's limits with token buckets shared by all
+workers — TELEGRAM_GLOBAL_PER_SECOND for the bot overall and
+TELEGRAM_CHAT_PER_SECOND per chat. Messages for the same chat popped in one
+tick are joined into as few messages as fit Telegram's 4096-character limit;
+each one takes a chat token. A 429 is retried after the retry_after Telegram
+asks for, network / 5xx errors back off exponentially up to
+TELEGRAM_MAX_ATTEMPTS, and 400 / 403 (chat gone, bot blocked) are dropped.
+
+Popping a message only claims it: it moves to an in-flight set until the
+drain acknowledges it (sent, pushed back or dropped). Claims not acknowledged
+within TELEGRAM_CLAIM_TIMEOUT_SECONDS — the worker died mid-tick — go back to
+the queue on the next pop. Delivery is therefore at-least-once: a crash
+between a send and its acknowledgement sends that message again.
+
+settings.TELEGRAM_OUTBOX_BACKEND selects the queue: RedisOutbox (sorted sets
+scored by not-before time / claim deadline, buckets in Lua) in production,
+MemoryOutbox for tests. TELEGRAM_API_URL can point at a local fake Bot API server.
+Without TELEGRAM_BOT_TOKEN the channel is off.
+"""
+
+from collections import defaultdict
+import functools
+import heapq
+import json
+import logging
+import threading
+import time
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+import redis
+
+from .constants import NotificationStatus, NotificationType
+from .metrics import TELEGRAM_DROPPED, TELEGRAM_SENT, TELEGRAM_THROTTLED
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_KEY = "fleet:telegram:outbox"
+INFLIGHT_KEY = "fleet:telegram:inflight"
+CLAIMS_KEY = "fleet:telegram:claims"
+BUCKET_KEY = "fleet:telegram:bucket:{}"
+MAX_TEXT_LENGTH = 4096
+SEPARATOR = "\n\n"
+
+
+# ── Bot API client ──────────────────────────────────────────────────────────
+
+
+class TelegramError(Exception):
+    def __init__(self, status: int | None, description: str, retry_after=None):
+        super().__init__(f"{status}: {description}")
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def permanent(self) -> bool:
+        """Retrying cannot help (bad request, bot blocked, chat not found)."""
+        return self.status in (400, 403)
+
+
+def send_message(chat_id: int, text: str) -> dict:
+    url = f"{settings.TELEGRAM_API_URL}/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
+    request = Request(
+        url,
+        data=json.dumps({"chat_id": chat_id, "text": text}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urlopen(request, timeout=settings.TELEGRAM_TIMEOUT_SECONDS) as response:
+            return json.load(response)
+    except HTTPError as exc:
+        try:
+            body = json.load(exc)
+        except ValueError:
+            body = {}
+        raise TelegramError(
+            exc.code,
+            body.get("description", exc.reason),
+            body.get("parameters", {}).get("retry_after"),
+        ) from exc
+    except (URLError, OSError) as exc:
+        raise TelegramError(None, str(exc)) from exc
+
+
+# ── Outbound queue ──────────────────────────────────────────────────────────
+
+
+class Outbox:
+    def push(self, messages: list[dict], not_before: float = 0) -> None:
+        raise NotImplementedError
+
+    def pop_due(self, limit: int, now: float) -> list[dict]:
+        """Claim and return up to `limit` messages due at `now`, oldest first.
+
+        Expired claims are re-queued first; a claim lasts until
+        now + TELEGRAM_CLAIM_TIMEOUT_SECONDS unless acknowledged.
+        """
+        raise NotImplementedError
+
+    def ack(self, messages: list[dict]) -> None:
+        """Release the claims on messages that were handled."""
+        raise NotImplementedError
+
+    def take(self, key: str, rate: float, capacity: float, now: float) -> bool:
+        """Take one token from the bucket; False if it is empty."""
+        raise NotImplementedError
+
+
+class RedisOutbox(Outbox):
+    POP_DUE = """
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+    for _, id in ipairs(expired) do
+        local body = redis.call('HGET', KEYS[3], id)
+        if body then redis.call('ZADD', KEYS[1], ARGV[1], body) end
+    end
+    if #expired > 0 then
+        redis.call('ZREM', KEYS[2], unpack(expired))
+        redis.call('HDEL', KEYS[3], unpack(expired))
+    end
+    local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+    for _, item in ipairs(items) do
+        local id = cjson.decode(item)['id']
+        redis.call('ZADD', KEYS[2], ARGV[3], id)
+        redis.call('HSET', KEYS[3], id, item)
+    end
+    if #items > 0 then redis.call('ZREM', KEYS[1], unpack(items)) end
+    return items
+    """
+    TAKE = """
+    local rate, capacity, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local taken = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        taken = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return taken
+    """
+
+    def __init__(self):
+        self.client = redis.Redis.from_url(settings.REDIS_URL)
+        self._pop_due = self.client.register_script(self.POP_DUE)
+        self._take = self.client.register_script(self.TAKE)
+
+    def push(self, messages: list[dict], not_before: float = 0) -> None:
+        if messages:
+            self.client.zadd(
+                OUTBOX_KEY, {json.dumps(message): not_before for message in messages}
+            )
+
+    def pop_due(self, limit: int, now: float) -> list[dict]:
+        deadline = now + settings.TELEGRAM_CLAIM_TIMEOUT_SECONDS
+        return [
+            json.loads(item)
+            for item in self._pop_due(
+                keys=[OUTBOX_KEY, INFLIGHT_KEY, CLAIMS_KEY],
+                args=[now, limit, deadline],
+            )
+        ]
+
+    def ack(self, messages: list[dict]) -> None:
+        ids = [message["id"] for message in messages]
+        if ids:
+            pipe = self.client.pipeline()
+            pipe.zrem(INFLIGHT_KEY, *ids)
+            pipe.hdel(CLAIMS_KEY, *ids)
+            pipe.execute()
+
+    def take(self, key: str, rate: float, capacity: float, now: float) -> bool:
+        return bool(self._take(keys=[key], args=[rate, capacity, now]))
+
+
+class MemoryOutbox(Outbox):
+    """In-process stand-in with the same ordering and bucket semantics."""
+
+    def __init__(self):
+        self._heap = []
+        self._claims = {}
+        self._buckets = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def push(self, messages: list[dict], not_before: float = 0) -> None:
+        with self._lock:
+            for message in messages:
+                self._seq += 1
+                heapq.heappush(self._heap, (not_before, self._seq, message))
+
+    def pop_due(self, limit: int, now: float) -> list[dict]:
+        with self._lock:
+            for message_id, (deadline, message) in list(self._claims.items()):
+                if deadline <= now:
+                    del self._claims[message_id]
+                    self._seq += 1
+                    heapq.heappush(self._heap, (now, self._seq, message))
+            deadline = now + settings.TELEGRAM_CLAIM_TIMEOUT_SECONDS
+            due = []
+            while self._heap and len(due) < limit and self._heap[0][0] <= now:
+                message = heapq.heappop(self._heap)[2]
+                self._claims[message["id"]] = (deadline, dict(message))
+                due.append(message)
+            return due
+
+    def ack(self, messages: list[dict]) -> None:
+        with self._lock:
+            for message in messages:
+                self._claims.pop(message["id"], None)
+
+    def take(self, key: str, rate: float, capacity: float, now: float) -> bool:
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0, now - ts) * rate)
+            taken = tokens >= 1
+            self._buckets[key] = (tokens - 1 if taken else tokens, now)
+            return taken
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+@functools.cache
+def get_outbox() -> Outbox:
+    return import_string(settings.TELEGRAM_OUTBOX_BACKEND)()
+
+
+# ── Rendering ───────────────────────────────────────────────────────────────
+
+
+def recipient(notification: Notification):
+    """The driver a notification concerns, or None."""
+    if notification.driver is not None:
+        return notification.driver
+    owner = getattr(notification.vehicle, "current_owner", None)
+    return owner.driver if owner is not None else None
+
+
+def render(notification: Notification) -> str | None:
+    """Message text for a driver, or None if the driver need not know."""
+    payload = notification.payload
+    vehicle = notification.vehicle or ""
+    if notification.type == NotificationType.MILEAGE_SUBMITTED:
+        km = payload.get("submitted_km")
+        if notification.status == NotificationStatus.APPROVED:
+            return f"✅ Пробіг {km} км для {vehicle} підтверджено."
+        if notification.status == NotificationStatus.REJECTED:
+            return f"❌ Пробіг {km} км для {vehicle} відхилено."
+    elif notification.type == NotificationType.REGULATION_APPROACHING:
+        return (
+            f"🔧 {vehicle}: «{payload.get('item_title')}» "
+            f"через {payload.get('km_remaining')} км."
+        )
+    elif notification.type == NotificationType.REGULATION_OVERDUE:
+        return (
+            f"⚠️ {vehicle}: «{payload.get('item_title')}» "
+            f"прострочено на {payload.get('overdue_by_km')} км."
+        )
+    return None
+
+
+def enqueue_notifications(notifications: list[Notification]) -> int:
+    """Queue the driver-facing ones; returns how many messages were queued."""
+    if not settings.TELEGRAM_BOT_TOKEN:
+        return 0
+    messages = []
+    for notification in notifications:
+        driver = recipient(notification)
+        text = render(notification)
+        if driver is None or driver.telegram_id is None or text is None:
+            continue
+        messages.append(
+            {
+                "id": uuid.uuid4().hex,
+                "chat_id": driver.telegram_id,
+                "text": text,
+                "notification_ids": [str(notification.pk)],
+                "attempts": 0,
+            }
+        )
+    try:
+        get_outbox().push(messages)
+    except Exception:
+        logger.warning("Failed to queue Telegram messages", exc_info=True)
+        return 0
+    return len(messages)
+
+
+# ── Drain ───────────────────────────────────────────────────────────────────
+
+
+def _chunks(group: list[dict]) -> list[list[dict]]:
+    """Split a chat's messages into runs whose joined text fits one message."""
+    chunks, size = [], 0
+    for message in group:
+        length = len(message["text"])
+        if chunks and size + len(SEPARATOR) + length <= MAX_TEXT_LENGTH:
+            chunks[-1].append(message)
+            size += len(SEPARATOR) + length
+        else:
+            chunks.append([message])
+            size = length
+    return chunks
+
+
+def drain(limit: int | None = None, now: float | None = None) -> int:
+    """Send one tick's worth of due messages; returns how many were sent."""
+    outbox = get_outbox()
+    now = time.time() if now is None else now
+    limit = limit or settings.TELEGRAM_BATCH_SIZE
+    global_rate = settings.TELEGRAM_GLOBAL_PER_SECOND
+    chat_rate = settings.TELEGRAM_CHAT_PER_SECOND
+
+    by_chat = defaultdict(list)
+    for message in outbox.pop_due(limit, now):
+        by_chat[message["chat_id"]].append(message)
+
+    sent, sent_ids = 0, []
+    for chat_id, group in by_chat.items():
+        chunks = _chunks(group)
+        for i, chunk in enumerate(chunks):
+            pending = [message for rest in chunks[i:] for message in rest]
+            if not outbox.take(BUCKET_KEY.format(chat_id), chat_rate, 1, now):
+                TELEGRAM_THROTTLED.inc(len(pending))
+                outbox.push(pending, now + 1 / chat_rate)
+                outbox.ack(pending)
+                break
+            if not outbox.take(
+                BUCKET_KEY.format("global"), global_rate, global_rate, now
+            ):
+                TELEGRAM_THROTTLED.inc(len(pending))
+                outbox.push(pending, now + 1 / global_rate)
+                outbox.ack(pending)
+                break
+            text = SEPARATOR.join(message["text"] for message in chunk)
+            try:
+                send_message(chat_id, text[:MAX_TEXT_LENGTH])
+            except TelegramError as exc:
+                _retry_or_drop(outbox, pending, exc, now)
+                outbox.ack(pending)
+                break
+            outbox.ack(chunk)
+            sent += len(chunk)
+            sent_ids.extend(
+                pk for message in chunk for pk in message["notification_ids"]
+            )
+
+    if sent_ids:
+        TELEGRAM_SENT.inc(sent)
+        Notification.objects.filter(pk__in=sent_ids).update(
+            sent_at=timezone.now(), sent_to="telegram"
+        )
+    return sent
+
+
+def _retry_or_drop(outbox: Outbox, group: list[dict], exc: TelegramError, now):
+    if exc.retry_after:
+        # Flood control: Telegram says exactly when to come back.
+        outbox.push(group, now + exc.retry_after)
+        return
+    retry = []
+    for message in group:
+        message["attempts"] += 1
+        if exc.permanent or message["attempts"] >= settings.TELEGRAM_MAX_ATTEMPTS:
+            TELEGRAM_DROPPED.inc()
+            logger.warning(
+                "Telegram message dropped",
+                extra={
+                    "status_code": exc.status or 503,
+                    "status_message": str(exc),
+                    "operation_type": "TELEGRAM_SEND_FAILED",
+                    "service": "DJANGO",
+                    "chat_id": message["chat_id"],
+                    "attempts": message["attempts"],
+                },
+            )
+        else:
+            retry.append(message)
+    for message in retry:
+        outbox.push([message], now + 2 ** message["attempts"])
@@ -1,3 +1,8 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+from asgiref.testing import ApplicationCommunicator
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -71,3 +76,77 @@ def make_regulation(vehicle, user=None, every_km=10_000, notify_before_km=500):
 def authenticate(client: APIClient, user: User) -> None:
     refresh = RefreshToken.for_user(user)
     client.cookies["access_token"] = str(refresh.access_token)
+
+
+class SSEClientMixin:
+    """Drive NotificationSSEConsumer directly over ASGI (async tests)."""
+
+    async def _connect(self, headers=(), query=b"", status=200):
+        from notification.consumers import NotificationSSEConsumer
+
+        communicator = ApplicationCommunicator(
+            NotificationSSEConsumer.as_asgi(),
+            {
+                "type": "http",
+                "method": "GET",
+                "path": "/api/v1/notifications/stream/",
+                "headers": list(headers),
+                "query_string": query,
+            },
+        )
+        await communicator.send_input({"type": "http.request", "body": b""})
+        start = await communicator.receive_output(1)
+        self.assertEqual(start["status"], status)
+        return communicator
+
+    async def _frame(self, communicator) -> str:
+        return (await communicator.receive_output(1))["body"].decode()
+
+    async def _close(self, communicator):
+        await communicator.send_input({"type": "http.disconnect"})
+        await communicator.wait(1)
+
+
+class FakeBotAPI:
+    """Local stand-in for the Telegram Bot API (sendMessage only).
+
+    Records every request as (chat_id, text); replies with the queued
+    (status, body) responses, then with 200 ok.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests.append((body["chat_id"], body["text"]))
+                status, reply = (
+                    fake.responses.pop(0)
+                    if fake.responses
+                    else (200, {"ok": True, "result": {"message_id": 1}})
+                )
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -4,11 +4,13 @@ Notification API Tests
 Covers: list, unread-count, mark-read, read-all, resolve, mileage-submit.
 """
 
+from django.core.cache import cache
 from django.test import TestCase
 from rest_framework.test import APIClient
 
 from notification.constants import NotificationStatus, NotificationType
 from notification.models import Notification
+from notification.services import mark_read
 
 from .helpers import authenticate, make_driver, make_user, make_vehicle
 
@@ -44,14 +46,30 @@ class NotificationListTest(TestCase):
         self.assertEqual(len(response.data["results"]), 1)
 
     def test_filter_by_is_read(self):
-        Notification.objects.create(
-            type=NotificationType.REGULATION_OVERDUE, is_read=False
+        unread = Notification.objects.create(type=NotificationType.REGULATION_OVERDUE)
+        read = Notification.objects.create(type=NotificationType.REGULATION_OVERDUE)
+        mark_read(read, self.user)
+
+        response = self.client.get(BASE_URL, {"is_read": "false"})
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [str(unread.id)]
         )
-        Notification.objects.create(
-            type=NotificationType.REGULATION_OVERDUE, is_read=True
+        response = self.client.get(BASE_URL, {"is_read": "true"})
+        self.assertEqual(
+            [(row["id"], row["is_read"]) for row in response.data["results"]],
+            [(str(read.id), True)],
         )
+
+    def test_filter_by_is_read_before_reading_anything(self):
+        notification = Notification.objects.create(
+            type=NotificationType.REGULATION_OVERDUE
+        )
+        response = self.client.get(BASE_URL, {"is_read": "true"})
+        self.assertEqual(response.data["results"], [])
         response = self.client.get(BASE_URL, {"is_read": "false"})
-        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [str(notification.id)]
+        )
 
     def test_unauthenticated_returns_401(self):
         response = APIClient().get(BASE_URL)
@@ -60,17 +78,15 @@ class NotificationListTest(TestCase):
 
 class UnreadCountTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = make_user()
         authenticate(self.client, self.user)
 
     def test_returns_correct_count(self):
-        Notification.objects.create(
-            type=NotificationType.REGULATION_OVERDUE, is_read=False
-        )
-        Notification.objects.create(
-            type=NotificationType.REGULATION_OVERDUE, is_read=True
-        )
+        Notification.objects.create(type=NotificationType.REGULATION_OVERDUE)
+        read = Notification.objects.create(type=NotificationType.REGULATION_OVERDUE)
+        mark_read(read, self.user)
         response = self.client.get(f"{BASE_URL}unread-count/")
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data["unread_count"], 1)
@@ -78,6 +94,7 @@ class UnreadCountTest(TestCase):
 
 class MarkReadTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = make_user()
         authenticate(self.client, self.user)
@@ -86,13 +103,21 @@ class MarkReadTest(TestCase):
         n = Notification.objects.create(type=NotificationType.REGULATION_OVERDUE)
         response = self.client.patch(f"{BASE_URL}{n.id}/read/")
         self.assertEqual(response.status_code, 200)
-        n.refresh_from_db()
-        self.assertTrue(n.is_read)
-        self.assertIsNotNone(n.read_at)
+        self.assertTrue(response.data["is_read"])
+
+    def test_read_state_is_per_user(self):
+        n = Notification.objects.create(type=NotificationType.REGULATION_OVERDUE)
+        self.client.patch(f"{BASE_URL}{n.id}/read/")
+
+        other = APIClient()
+        authenticate(other, make_user(email="other@example.com", username="other"))
+        response = other.get(BASE_URL)
+        self.assertFalse(response.data["results"][0]["is_read"])
 
 
 class MarkAllReadTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = make_user()
         authenticate(self.client, self.user)
@@ -103,7 +128,8 @@ class MarkAllReadTest(TestCase):
         response = self.client.post(f"{BASE_URL}read-all/")
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data["updated"], 2)
-        self.assertEqual(Notification.objects.filter(is_read=False).count(), 0)
+        response = self.client.get(BASE_URL, {"is_read": "false"})
+        self.assertEqual(response.data["results"], [])
 
 
 class ResolveNotificationTest(TestCase):
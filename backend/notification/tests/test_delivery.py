@@ -0,0 +1,177 @@
+"""
+Notification Delivery Tests
+===========================
+Covers: per-transaction delivery batches (one group_send, one stream entry,
+one sent_at UPDATE), savepoint rollbacks, push=False, per-vehicle/type
+digest windows and the flush of held repeats.
+"""
+
+import asyncio
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from config import cache_utils
+from notification.constants import NotificationType
+from notification.models import Notification
+from notification.scheduler import flush_digests
+from notification.services import MANAGERS_GROUP, create_notification
+from notification.stream import get_stream
+
+from .helpers import make_vehicle
+
+
+class DeliveryBatchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_stream.cache_clear()
+        self.layer = get_channel_layer()
+        async_to_sync(self.layer.flush)()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(MANAGERS_GROUP, self.channel)
+        self.vehicle = make_vehicle()
+
+    def _create(self, notification_type=NotificationType.REGULATION_OVERDUE, **kwargs):
+        return create_notification(
+            notification_type=notification_type, vehicle=self.vehicle, **kwargs
+        )
+
+    def _receive_all(self):
+        """Every message waiting on the test channel."""
+
+        async def drain():
+            messages = []
+            while True:
+                try:
+                    messages.append(
+                        await asyncio.wait_for(self.layer.receive(self.channel), 0.05)
+                    )
+                except TimeoutError:
+                    return messages
+
+        return async_to_sync(drain)()
+
+    def test_one_event_and_update_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            created = [self._create() for _ in range(5)]
+        self.assertEqual(len(callbacks), 1)
+
+        (message,) = self._receive_all()
+        self.assertEqual(
+            [item["id"] for item in message["data"]["notifications"]],
+            [str(n.id) for n in created],
+        )
+        self.assertEqual(len(get_stream().since("0-0")), 1)
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+
+    def test_push_costs_two_queries_regardless_of_size(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for _ in range(20):
+                self._create()
+        with self.assertNumQueries(2):  # re-read + sent_at UPDATE
+            callbacks[0]()
+
+    def test_rolled_back_savepoint_is_not_pushed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            kept = self._create()
+            try:
+                with transaction.atomic():
+                    self._create()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        (message,) = self._receive_all()
+        self.assertEqual(
+            [item["id"] for item in message["data"]["notifications"]], [str(kept.id)]
+        )
+
+    def test_batch_opened_in_rolled_back_savepoint_is_replaced(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self._create()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            kept = self._create()
+
+        self.assertEqual(len(callbacks), 1)
+        (message,) = self._receive_all()
+        self.assertEqual(
+            [item["id"] for item in message["data"]["notifications"]], [str(kept.id)]
+        )
+
+    def test_unpushed_notifications_still_invalidate_the_badge(self):
+        cache_utils.set_unread_count(1, 0)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self._create(push=False)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._receive_all(), [])
+        self.assertIsNone(cache_utils.get_unread_count(1))
+
+    def test_digest_collapses_repeats_per_vehicle_and_type(self):
+        with self.settings(NOTIFICATION_DIGEST_WINDOW_SECONDS=60):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._create()
+                latest = self._create()
+                approaching = self._create(NotificationType.REGULATION_APPROACHING)
+            with self.captureOnCommitCallbacks(execute=True):
+                repeat = self._create()
+
+        (message,) = self._receive_all()
+        self.assertEqual(
+            [
+                (item["id"], item["repeats"])
+                for item in message["data"]["notifications"]
+            ],
+            [(str(latest.id), 2), (str(approaching.id), 1)],
+        )
+        repeat.refresh_from_db()
+        self.assertIsNone(repeat.sent_at)
+        self.assertIsNotNone(repeat.digest_held_until)  # held, not dropped
+
+    def test_held_repeats_flush_as_one_digest_when_the_window_closes(self):
+        with self.settings(NOTIFICATION_DIGEST_WINDOW_SECONDS=60):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._create()
+            with self.captureOnCommitCallbacks(execute=True):
+                self._create()
+                latest = self._create()
+            self._receive_all()
+            self.assertEqual(flush_digests(), 0)  # window still open
+
+            cache.clear()
+            Notification.objects.filter(digest_held_until__isnull=False).update(
+                digest_held_until=timezone.now()
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(flush_digests(), 2)
+
+        (message,) = self._receive_all()
+        self.assertEqual(
+            [
+                (item["id"], item["repeats"])
+                for item in message["data"]["notifications"]
+            ],
+            [(str(latest.id), 2)],
+        )
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+        self.assertFalse(
+            Notification.objects.filter(digest_held_until__isnull=False).exists()
+        )
+
+    def test_notifications_without_a_vehicle_are_not_collapsed(self):
+        with self.settings(NOTIFICATION_DIGEST_WINDOW_SECONDS=60):
+            for _ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    create_notification(
+                        notification_type=NotificationType.MILEAGE_SUBMITTED
+                    )
+
+        self.assertEqual(len(self._receive_all()), 2)
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
@@ -0,0 +1,140 @@
+"""
+Notification Retention Tests
+============================
+Covers: per-type retention cutoffs, pending / retrying rows kept hot,
+batched move into NotificationArchive, archived dedup keys,
+archive_notifications command, ?tier=archive on the notification list.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notification.constants import NotificationStatus, NotificationType
+from notification.models import Notification, NotificationArchive
+from notification.retention import archive_expired
+from notification.services import create_notifications
+
+from .helpers import authenticate, make_user, make_vehicle
+
+BASE_URL = "/api/v1/notifications/"
+
+
+@override_settings(
+    NOTIFICATION_RETENTION_DAYS={
+        NotificationType.MILEAGE_SUBMITTED: 90,
+        NotificationType.REGULATION_OVERDUE: 30,
+    }
+)
+class ArchiveExpiredTest(TestCase):
+    def setUp(self):
+        self.vehicle = make_vehicle()
+
+    def _notification(self, n_type, days_old, **kwargs):
+        notification = Notification.objects.create(
+            type=n_type, vehicle=self.vehicle, **kwargs
+        )
+        Notification.objects.filter(pk=notification.pk).update(
+            created_at=timezone.now() - timedelta(days=days_old)
+        )
+        return notification
+
+    def test_per_type_cutoffs(self):
+        old_mileage = self._notification(
+            NotificationType.MILEAGE_SUBMITTED, 100, status=NotificationStatus.APPROVED
+        )
+        self._notification(
+            NotificationType.MILEAGE_SUBMITTED, 60, status=NotificationStatus.APPROVED
+        )
+        old_regulation = self._notification(NotificationType.REGULATION_OVERDUE, 40)
+        self._notification(NotificationType.SERVICE_REPORT, 1000)  # no policy
+
+        moved = archive_expired(batch_size=1)
+
+        self.assertEqual(
+            moved,
+            {
+                NotificationType.MILEAGE_SUBMITTED: 1,
+                NotificationType.REGULATION_OVERDUE: 1,
+            },
+        )
+        self.assertEqual(
+            set(NotificationArchive.objects.values_list("pk", flat=True)),
+            {old_mileage.pk, old_regulation.pk},
+        )
+        self.assertEqual(Notification.objects.count(), 2)
+        archived = NotificationArchive.objects.get(pk=old_mileage.pk)
+        self.assertEqual(archived.vehicle_id, self.vehicle.pk)
+        self.assertEqual(archived.status, NotificationStatus.APPROVED)
+
+    def test_unsettled_rows_stay_hot(self):
+        self._notification(
+            NotificationType.MILEAGE_SUBMITTED, 100, status=NotificationStatus.PENDING
+        )
+        self._notification(
+            NotificationType.REGULATION_OVERDUE, 100, retry_at=timezone.now()
+        )
+        self.assertEqual(sum(archive_expired().values()), 0)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_archived_dedup_key_still_blocks_a_repeat(self):
+        self._notification(
+            NotificationType.REGULATION_OVERDUE, 40, dedup_key="overdue:v:e:10000"
+        )
+        archive_expired()
+        self.assertEqual(
+            NotificationArchive.objects.get().dedup_key, "overdue:v:e:10000"
+        )
+
+        repeat = Notification(
+            type=NotificationType.REGULATION_OVERDUE,
+            vehicle=self.vehicle,
+            dedup_key="overdue:v:e:10000",
+        )
+        self.assertEqual(create_notifications([repeat], push=False), [])
+        self.assertFalse(Notification.objects.exists())
+
+    def test_command(self):
+        self._notification(NotificationType.REGULATION_OVERDUE, 40)
+
+        out = StringIO()
+        call_command("archive_notifications", "--dry-run", stdout=out)
+        self.assertIn("regulation_overdue: 1 rows", out.getvalue())
+        self.assertFalse(NotificationArchive.objects.exists())
+
+        out = StringIO()
+        call_command(
+            "archive_notifications", "--type", "regulation_overdue", stdout=out
+        )
+        self.assertIn("regulation_overdue: archived 1 rows.", out.getvalue())
+        self.assertNotIn("mileage_submitted", out.getvalue())
+
+
+@override_settings(
+    NOTIFICATION_RETENTION_DAYS={NotificationType.REGULATION_OVERDUE: 30}
+)
+class ArchiveTierAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        authenticate(self.client, make_user())
+
+    def test_archive_tier(self):
+        old = Notification.objects.create(type=NotificationType.REGULATION_OVERDUE)
+        Notification.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+        recent = Notification.objects.create(type=NotificationType.REGULATION_OVERDUE)
+        archive_expired()
+
+        hot = self.client.get(BASE_URL).data["results"]
+        self.assertEqual([row["id"] for row in hot], [str(recent.id)])
+        cold = self.client.get(
+            BASE_URL, {"tier": "archive", "type": "regulation_overdue"}
+        ).data["results"]
+        self.assertEqual([row["id"] for row in cold], [str(old.id)])
+        self.assertNotIn("is_read", cold[0])
+        self.assertEqual(self.client.get(BASE_URL, {"tier": "cold"}).status_code, 400)
@@ -0,0 +1,128 @@
+"""
+Notification Retry Scheduler Tests
+==================================
+Covers: deliver_due batching by retry_at, backoff rescheduling of pending
+notifications, clearing after the last attempt / for info notifications,
+one channel-layer event per tick, run_notification_scheduler command,
+retry metrics. (SKIP LOCKED itself needs PostgreSQL.)
+"""
+
+import asyncio
+from datetime import timedelta
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from notification.constants import NotificationStatus, NotificationType
+from notification.models import Notification
+from notification.scheduler import deliver_due
+from notification.services import MANAGERS_GROUP
+from notification.stream import get_stream
+
+
+@override_settings(
+    NOTIFICATION_RETRY_INTERVAL_SECONDS=60,
+    NOTIFICATION_RETRY_MAX_INTERVAL_SECONDS=300,
+    NOTIFICATION_RETRY_MAX_ATTEMPTS=3,
+)
+class DeliverDueTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_stream.cache_clear()
+        self.layer = get_channel_layer()
+        async_to_sync(self.layer.flush)()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(MANAGERS_GROUP, self.channel)
+        self.now = timezone.now()
+
+    def _notification(self, minutes_ago, **kwargs):
+        return Notification.objects.create(
+            type=NotificationType.MILEAGE_SUBMITTED,
+            retry_at=self.now - timedelta(minutes=minutes_ago),
+            **kwargs,
+        )
+
+    def _receive_all(self):
+        async def drain():
+            messages = []
+            while True:
+                try:
+                    messages.append(
+                        await asyncio.wait_for(self.layer.receive(self.channel), 0.05)
+                    )
+                except TimeoutError:
+                    return messages
+
+        return async_to_sync(drain)()
+
+    def test_oldest_due_first_in_one_event(self):
+        newest = self._notification(1)
+        oldest = self._notification(10)
+        self._notification(-10)  # not due yet
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(deliver_due(batch_size=1), 1)
+            self.assertEqual(deliver_due(batch_size=5), 1)
+            self.assertEqual(deliver_due(batch_size=5), 0)
+
+        (message,) = self._receive_all()
+        self.assertEqual(
+            {item["id"] for item in message["data"]["notifications"]},
+            {str(oldest.id), str(newest.id)},
+        )
+
+    def test_pending_is_rescheduled_with_backoff(self):
+        notification = self._notification(1, status=NotificationStatus.PENDING)
+        notification.retry_count = 1
+        notification.save(update_fields=["retry_count"])
+
+        deliver_due()
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.retry_count, 2)
+        # 60s * 2**2 = 240s, under the 300s cap
+        self.assertAlmostEqual(
+            (notification.retry_at - self.now).total_seconds(), 240, delta=5
+        )
+
+    def test_cleared_after_last_attempt_or_when_not_pending(self):
+        exhausted = self._notification(1, status=NotificationStatus.PENDING)
+        exhausted.retry_count = 2
+        exhausted.save(update_fields=["retry_count"])
+        info = self._notification(1)
+
+        deliver_due()
+
+        for notification in (exhausted, info):
+            notification.refresh_from_db()
+            self.assertIsNone(notification.retry_at)
+        self.assertEqual(deliver_due(), 0)
+
+    def test_metrics(self):
+        before = REGISTRY.get_sample_value("fleet_notification_redelivered_total") or 0
+        self._notification(1)
+        self._notification(2)
+        deliver_due()
+        self.assertEqual(
+            REGISTRY.get_sample_value("fleet_notification_redelivered_total"),
+            before + 2,
+        )
+        self.assertIsNotNone(
+            REGISTRY.get_sample_value("fleet_notification_retry_lag_seconds_count")
+        )
+
+    def test_command_drains_everything_due(self):
+        for minutes in range(5):
+            self._notification(minutes + 1)
+
+        out = StringIO()
+        call_command("run_notification_scheduler", "--batch-size", "2", stdout=out)
+
+        self.assertIn("Re-delivered 5 notifications.", out.getvalue())
+        self.assertFalse(Notification.objects.filter(retry_at__isnull=False).exists())
@@ -1,14 +1,19 @@
 """
 Notification Services Tests
 ============================
-Covers: create_notification, check_regulation_notifications, resolve_notification.
+Covers: create_notification, check_regulation_notifications (dedup_key),
+check_fleet_regulation_notifications, resolve_notification.
 """
 
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
 from notification.constants import NotificationStatus, NotificationType
 from notification.models import Notification
 from notification.services import (
+    check_fleet_regulation_notifications,
     check_regulation_notifications,
     create_notification,
     resolve_notification,
@@ -36,7 +41,6 @@ class CreateNotificationTest(TestCase):
         self.assertEqual(n.vehicle, self.vehicle)
         self.assertEqual(n.driver, self.driver)
         self.assertEqual(n.payload["submitted_km"], 5000)
-        self.assertFalse(n.is_read)
 
     def test_defaults_to_info_status(self):
         n = create_notification(
@@ -82,8 +86,8 @@ class CheckRegulationNotificationsTest(TestCase):
         created = check_regulation_notifications(self.vehicle)
         self.assertEqual(len(created), 0)
 
-    def test_deduplicates_unread_notifications(self):
-        """Does not create duplicate if unread notification for same entry+type exists."""
+    def test_deduplicates_within_due_cycle(self):
+        """Does not create a duplicate for the same entry+type and due cycle."""
         self.vehicle.initial_km = 10_500
         self.vehicle.save(update_fields=["initial_km"])
 
@@ -92,19 +96,68 @@ class CheckRegulationNotificationsTest(TestCase):
         self.assertEqual(len(created_second), 0)
         self.assertEqual(Notification.objects.count(), 1)
 
-    def test_creates_new_after_read(self):
-        """Creates new notification if previous one was marked as read."""
+    def test_creates_new_for_next_due_cycle(self):
+        """Creates a new notification once the entry is due again."""
         self.vehicle.initial_km = 10_500
         self.vehicle.save(update_fields=["initial_km"])
+        check_regulation_notifications(self.vehicle)
 
-        created = check_regulation_notifications(self.vehicle)
-        created[0].is_read = True
-        created[0].save(update_fields=["is_read"])
+        self.entry.last_done_km = 10_500
+        self.entry.save(update_fields=["last_done_km"])
+        self.vehicle.initial_km = 21_000
+        self.vehicle.save(update_fields=["initial_km"])
 
         created_again = check_regulation_notifications(self.vehicle)
         self.assertEqual(len(created_again), 1)
+        self.assertEqual(created_again[0].payload["next_due_km"], 20_500)
         self.assertEqual(Notification.objects.count(), 2)
 
+    def test_dedup_key_without_pre_check_queries(self):
+        self.vehicle.initial_km = 10_500
+        self.vehicle.save(update_fields=["initial_km"])
+        check_regulation_notifications(self.vehicle)
+        self.assertEqual(
+            Notification.objects.get().dedup_key,
+            f"regulation_overdue:{self.vehicle.pk}:{self.entry.pk}:10000",
+        )
+        # Due entries SELECT + archived keys SELECT + INSERT ... ON CONFLICT
+        # DO NOTHING + inserted-ids SELECT
+        with self.assertNumQueries(4):
+            self.assertEqual(check_regulation_notifications(self.vehicle), [])
+
+
+class CheckFleetRegulationNotificationsTest(TestCase):
+    def setUp(self):
+        self.vehicles = [
+            make_vehicle(
+                initial_km=km,
+                vin_number=f"1HGBH41JXMN10918{n}",
+                car_number=f"AA66{n}0BB",
+            )
+            for n, km in enumerate((10_500, 9_600, 1_000))
+        ]
+        for vehicle in self.vehicles:
+            make_regulation(vehicle, every_km=10_000, notify_before_km=500)
+
+    def test_whole_fleet_in_constant_queries(self):
+        with self.assertNumQueries(4):
+            created = check_fleet_regulation_notifications()
+        self.assertEqual(
+            sorted((n.vehicle_id, n.type) for n in created),
+            sorted(
+                [
+                    (self.vehicles[0].pk, NotificationType.REGULATION_OVERDUE),
+                    (self.vehicles[1].pk, NotificationType.REGULATION_APPROACHING),
+                ]
+            ),
+        )
+        self.assertEqual(check_fleet_regulation_notifications(), [])
+
+    def test_command(self):
+        out = StringIO()
+        call_command("check_regulation_notifications", stdout=out)
+        self.assertIn("Created 2 regulation notifications.", out.getvalue())
+
 
 class ResolveNotificationTest(TestCase):
     def setUp(self):
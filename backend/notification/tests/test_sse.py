@@ -0,0 +1,73 @@
+"""
+Notification SSE Flow-Control Tests
+===================================
+Covers: heartbeat comments, per-user connection limit, bounded send queue
+coalescing into "reset", Prometheus stream / queue / drop metrics.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+
+from notification.consumers import NotificationSSEConsumer
+
+from .helpers import SSEClientMixin
+
+
+def _metric(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+@patch.object(NotificationSSEConsumer, "_get_unread_count", AsyncMock(return_value=0))
+@patch.object(
+    NotificationSSEConsumer,
+    "_authenticate",
+    AsyncMock(return_value=SimpleNamespace(id=7)),
+)
+class SSEFlowControlTest(SSEClientMixin, SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        async_to_sync(get_channel_layer().flush)()
+
+    async def test_heartbeat_comment_when_idle(self):
+        with self.settings(SSE_HEARTBEAT_SECONDS=0.05):
+            communicator = await self._connect()
+            await self._frame(communicator)  # init
+            self.assertEqual(await self._frame(communicator), ": ping\n\n")
+            await self._close(communicator)
+
+    async def test_connection_limit_per_user(self):
+        open_before = _metric("fleet_sse_open_streams")
+        with self.settings(SSE_MAX_CONNECTIONS_PER_USER=1):
+            first = await self._connect()
+            self.assertEqual(_metric("fleet_sse_open_streams"), open_before + 1)
+            rejected = await self._connect(status=429)
+            await rejected.wait(1)
+
+            await self._close(first)
+            self.assertEqual(_metric("fleet_sse_open_streams"), open_before)
+            again = await self._connect()
+            await self._close(again)
+
+    async def test_slow_client_gets_one_reset(self):
+        consumer = NotificationSSEConsumer()
+        consumer.queue = asyncio.Queue()
+        dropped_before = _metric("fleet_sse_dropped_events_total")
+        depth_before = _metric("fleet_sse_queue_depth")
+
+        with self.settings(SSE_QUEUE_SIZE=3):
+            for n in range(4):
+                await consumer.notification_event(
+                    {"id": f"1-{n}", "data": {"n": n}, "type": "notification.event"}
+                )
+
+        self.assertEqual(consumer.queue.qsize(), 1)
+        self.assertIn(b"event: reset", consumer.queue.get_nowait())
+        self.assertEqual(_metric("fleet_sse_dropped_events_total"), dropped_before + 4)
+        self.assertEqual(_metric("fleet_sse_queue_depth"), depth_before + 1)
@@ -0,0 +1,147 @@
+"""
+Notification Stream Replay Tests
+================================
+Covers: event log ids and trimming, _push_to_managers appending to the log,
+SSE `id:` fields and Last-Event-ID replay / reset in NotificationSSEConsumer.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from notification.consumers import NotificationSSEConsumer
+from notification.services import MANAGERS_GROUP, _push_to_managers
+from notification.stream import MemoryEventStream, get_stream, parse_id
+
+from .helpers import SSEClientMixin, make_vehicle
+
+
+class MemoryEventStreamTest(SimpleTestCase):
+    def test_ids_are_monotonic(self):
+        stream = MemoryEventStream(maxlen=10)
+        ids = [parse_id(stream.append({"n": i})) for i in range(5)]
+        self.assertEqual(ids, sorted(set(ids)))
+
+    def test_since_returns_later_events(self):
+        stream = MemoryEventStream(maxlen=10)
+        first = stream.append({"n": 1})
+        second = stream.append({"n": 2})
+        self.assertEqual(stream.since(first), [(second, {"n": 2})])
+        self.assertEqual(stream.since(second), [])
+
+    def test_trimmed_gap_cannot_be_replayed(self):
+        stream = MemoryEventStream(maxlen=2)
+        first = stream.append({"n": 1})
+        second = stream.append({"n": 2})
+        third = stream.append({"n": 3})
+        self.assertIsNone(stream.since("0-0"))
+        # Only `first` was trimmed; a client that saw it loses nothing.
+        self.assertEqual([i for i, _ in stream.since(first)], [second, third])
+
+
+class PushToStreamTest(TestCase):
+    def setUp(self):
+        get_stream.cache_clear()
+        async_to_sync(get_channel_layer().flush)()
+
+    def test_push_appends_and_sends_id(self):
+        from notification.models import Notification
+
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(MANAGERS_GROUP, channel)
+        notification = Notification.objects.create(
+            type="regulation_overdue", vehicle=make_vehicle()
+        )
+
+        _push_to_managers([notification])
+
+        message = async_to_sync(layer.receive)(channel)
+        ((event_id, data),) = get_stream().since("0-0")
+        self.assertEqual(event_id, message["id"])
+        self.assertEqual(data["notifications"][0]["id"], str(notification.id))
+
+
+@patch.object(NotificationSSEConsumer, "_get_unread_count", AsyncMock(return_value=3))
+@patch.object(
+    NotificationSSEConsumer,
+    "_authenticate",
+    AsyncMock(return_value=SimpleNamespace(id=1)),
+)
+class SSEReplayTest(SSEClientMixin, SimpleTestCase):
+    def setUp(self):
+        get_stream.cache_clear()
+        self.stream = get_stream()
+        async_to_sync(get_channel_layer().flush)()
+        cache.clear()
+
+    async def test_replays_events_after_last_event_id(self):
+        first = self.stream.append({"n": 1})
+        second = self.stream.append({"n": 2})
+        third = self.stream.append({"n": 3})
+
+        communicator = await self._connect(headers=[(b"last-event-id", first.encode())])
+        self.assertIn("event: init", await self._frame(communicator))
+        self.assertEqual(
+            await self._frame(communicator),
+            f'id: {second}\nevent: notifications\ndata: {{"n": 2}}\n\n',
+        )
+        self.assertTrue((await self._frame(communicator)).startswith(f"id: {third}"))
+
+        # A live copy of an already replayed event is not sent twice.
+        layer = get_channel_layer()
+        await layer.group_send(
+            MANAGERS_GROUP, {"type": "notification.event", "id": third, "data": {}}
+        )
+        self.assertTrue(await communicator.receive_nothing(0.2))
+        await self._close(communicator)
+
+    async def test_query_param_fallback(self):
+        first = self.stream.append({"n": 1})
+        second = self.stream.append({"n": 2})
+        communicator = await self._connect(query=f"last_event_id={first}".encode())
+        await self._frame(communicator)  # init
+        self.assertTrue((await self._frame(communicator)).startswith(f"id: {second}"))
+        await self._close(communicator)
+
+    async def test_trimmed_gap_sends_reset(self):
+        with self.settings(NOTIFICATION_STREAM_MAXLEN=1):
+            get_stream.cache_clear()
+            stream = get_stream()
+        first = stream.append({"n": 1})
+        stream.append({"n": 2})  # trims {"n": 1}, which the client has seen
+        stream.append({"n": 3})  # trims {"n": 2}
+        communicator = await self._connect(headers=[(b"last-event-id", first.encode())])
+        await self._frame(communicator)  # init
+        self.assertIn("event: reset", await self._frame(communicator))
+        await self._close(communicator)
+
+    async def test_live_events_carry_ids(self):
+        communicator = await self._connect()
+        await self._frame(communicator)  # init
+        event_id = self.stream.append({"n": 1})
+        await get_channel_layer().group_send(
+            MANAGERS_GROUP,
+            {"type": "notification.event", "id": event_id, "data": {"n": 1}},
+        )
+        self.assertTrue((await self._frame(communicator)).startswith(f"id: {event_id}"))
+        await self._close(communicator)
+
+    async def test_out_of_order_live_events_are_all_sent(self):
+        communicator = await self._connect()
+        await self._frame(communicator)  # init
+        first = self.stream.append({"n": 1})
+        second = self.stream.append({"n": 2})
+        layer = get_channel_layer()
+        for event_id in (second, first):  # two publishers, racing
+            await layer.group_send(
+                MANAGERS_GROUP,
+                {"type": "notification.event", "id": event_id, "data": {}},
+            )
+        self.assertTrue((await self._frame(communicator)).startswith(f"id: {second}"))
+        self.assertTrue((await self._frame(communicator)).startswith(f"id: {first}"))
+        await self._close(communicator)
@@ -0,0 +1,192 @@
+"""
+Telegram Channel Tests
+======================
+Covers: driver-facing rendering and recipients, enqueue from the delivery
+batch, token-bucket throttling (per chat / global), per-chat batching,
+429 retry_after / permanent errors / backoff, in-flight claims and their
+expiry, sent_at stamping, against a local fake Bot API server.
+"""
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from notification.constants import NotificationStatus, NotificationType
+from notification.services import create_notification, resolve_notification
+from notification.telegram import MemoryOutbox, drain, get_outbox
+from vehicle.models import VehicleOwner
+
+from .helpers import FakeBotAPI, make_driver, make_user, make_vehicle
+
+NOW = 1_000_000.0
+
+
+@override_settings(
+    TELEGRAM_BOT_TOKEN="123:abc",
+    TELEGRAM_GLOBAL_PER_SECOND=30,
+    TELEGRAM_CHAT_PER_SECOND=1,
+    TELEGRAM_MAX_ATTEMPTS=3,
+)
+class TelegramTest(TestCase):
+    def setUp(self):
+        get_outbox.cache_clear()
+        self.outbox = get_outbox()
+        self.user = make_user()
+        self.driver = make_driver(telegram_id=555)
+        self.vehicle = make_vehicle()
+        VehicleOwner.objects.create(vehicle=self.vehicle, driver=self.driver)
+        self.bot = FakeBotAPI().__enter__()
+        self.addCleanup(self.bot.__exit__)
+        patcher = override_settings(TELEGRAM_API_URL=self.bot.url)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+    def _regulation(self, **payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_notification(
+                notification_type=NotificationType.REGULATION_OVERDUE,
+                vehicle=self.vehicle,
+                payload={"item_title": "Oil Change", "overdue_by_km": 500, **payload},
+            )
+
+    def _message(self, chat_id, text="hi"):
+        return {
+            "id": text,
+            "chat_id": chat_id,
+            "text": text,
+            "notification_ids": [],
+            "attempts": 0,
+        }
+
+    def test_regulation_goes_to_vehicle_owner(self):
+        notification = self._regulation()
+        self.assertEqual(len(self.outbox), 1)
+
+        self.assertEqual(drain(now=NOW), 1)
+        ((chat_id, text),) = self.bot.requests
+        self.assertEqual(chat_id, 555)
+        self.assertIn("Oil Change", text)
+        notification.refresh_from_db()
+        self.assertEqual(notification.sent_to, "telegram")
+
+    def test_mileage_only_once_resolved(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = create_notification(
+                notification_type=NotificationType.MILEAGE_SUBMITTED,
+                vehicle=self.vehicle,
+                driver=self.driver,
+                status=NotificationStatus.PENDING,
+                payload={"submitted_km": 12_000},
+            )
+        self.assertEqual(len(self.outbox), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resolve_notification(notification, "reject", self.user)
+        drain(now=NOW)
+        self.assertIn("12000", self.bot.requests[0][1])
+
+    def test_no_token_or_no_telegram_id_queues_nothing(self):
+        with self.settings(TELEGRAM_BOT_TOKEN=""):
+            self._regulation()
+        self.driver.telegram_id = None
+        self.driver.save(update_fields=["telegram_id"])
+        self._regulation(next_due_km=1)
+        self.assertEqual(len(self.outbox), 0)
+
+    def test_same_chat_is_batched_and_rate_limited(self):
+        self.outbox.push([self._message(1, "a"), self._message(1, "b")])
+        self.outbox.push([self._message(1, "c")], NOW + 0.5)
+
+        self.assertEqual(drain(now=NOW), 2)
+        self.assertEqual(self.bot.requests, [(1, "a\n\nb")])
+        # Second message for the chat within the same second waits its turn.
+        self.assertEqual(drain(now=NOW + 0.5), 0)
+        self.assertEqual(drain(now=NOW + 1.5), 1)
+
+    def test_long_batches_are_split_not_cut(self):
+        texts = [letter * 3000 for letter in "abc"]
+        self.outbox.push([self._message(1, text) for text in texts])
+
+        self.assertEqual(drain(now=NOW), 1)
+        self.assertEqual(self.bot.requests, [(1, texts[0])])
+        # The rest waits for the chat bucket instead of being truncated away.
+        self.assertEqual(len(self.outbox), 2)
+        self.assertEqual(drain(now=NOW + 1), 1)
+        self.assertEqual(drain(now=NOW + 2), 1)
+        self.assertEqual([text for _, text in self.bot.requests], texts)
+
+    def test_drain_acknowledges_every_claim(self):
+        self.bot.responses.append((502, {"ok": False, "description": "bad"}))
+        self.outbox.push([self._message(1, "a"), self._message(2, "b")])
+        self.outbox.push([self._message(1, "c")], NOW + 0.5)
+        drain(now=NOW)
+        drain(now=NOW + 0.5)  # "c" throttled and pushed back
+        self.assertEqual(self.outbox._claims, {})
+
+    def test_global_bucket(self):
+        with self.settings(TELEGRAM_GLOBAL_PER_SECOND=2):
+            self.outbox.push([self._message(chat) for chat in range(5)])
+            self.assertEqual(drain(now=NOW), 2)
+            self.assertEqual(len(self.outbox), 3)
+            self.assertEqual(drain(now=NOW + 1), 2)
+
+    def test_flood_control_retry_after(self):
+        self.bot.responses.append(
+            (
+                429,
+                {
+                    "ok": False,
+                    "description": "Too Many Requests",
+                    "parameters": {"retry_after": 7},
+                },
+            )
+        )
+        self.outbox.push([self._message(1)])
+        self.assertEqual(drain(now=NOW), 0)
+        self.assertEqual(drain(now=NOW + 6), 0)
+        self.assertEqual(drain(now=NOW + 8), 1)
+
+    def test_blocked_bot_is_dropped_and_errors_back_off(self):
+        self.bot.responses.append((403, {"ok": False, "description": "blocked"}))
+        self.outbox.push([self._message(1)])
+        drain(now=NOW)
+        self.assertEqual(len(self.outbox), 0)
+
+        self.bot.responses.extend([(502, {"ok": False, "description": "bad"})] * 3)
+        self.outbox.push([self._message(2)])
+        drain(now=NOW)  # attempt 1 → retry in 2s
+        self.assertEqual(drain(now=NOW + 1), 0)
+        drain(now=NOW + 3)  # attempt 2 → retry in 4s
+        drain(now=NOW + 8)  # attempt 3 → out of attempts
+        self.assertEqual(len(self.outbox), 0)
+        self.assertEqual(len(self.bot.requests), 4)
+
+    def test_command_requires_token(self):
+        with self.settings(TELEGRAM_BOT_TOKEN=""):
+            with self.assertRaises(CommandError):
+                call_command("run_telegram_outbox")
+
+
+class MemoryOutboxTest(SimpleTestCase):
+    def test_token_bucket_refills(self):
+        outbox = MemoryOutbox()
+        self.assertTrue(outbox.take("k", 1, 1, NOW))
+        self.assertFalse(outbox.take("k", 1, 1, NOW + 0.5))
+        self.assertTrue(outbox.take("k", 1, 1, NOW + 1))
+
+    def test_pop_due_in_order(self):
+        outbox = MemoryOutbox()
+        outbox.push([{"id": "2"}], NOW + 2)
+        outbox.push([{"id": "1"}], NOW + 1)
+        outbox.push([{"id": "3"}], NOW + 3)
+        self.assertEqual(outbox.pop_due(10, NOW + 2), [{"id": "1"}, {"id": "2"}])
+
+    @override_settings(TELEGRAM_CLAIM_TIMEOUT_SECONDS=60)
+    def test_unacknowledged_claims_are_requeued(self):
+        outbox = MemoryOutbox()
+        outbox.push([{"id": "lost"}, {"id": "handled"}])
+        claimed = outbox.pop_due(10, NOW)
+        outbox.ack(claimed[1:])  # the worker dies before handling "lost"
+
+        self.assertEqual(outbox.pop_due(10, NOW + 59), [])
+        self.assertEqual(outbox.pop_due(10, NOW + 60), [{"id": "lost"}])
@@ -0,0 +1,147 @@
+"""
+Unread Counter / Read State Tests
+=================================
+Covers: per-user NotificationReadState (watermark + read_ids, compaction,
+single-row mark-all-read), cached per-user unread counters and their
+invalidation from create / mark-read / resolve, reconcile_unread_count
+command, O(1) badge reads.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config import cache_utils
+from notification.constants import NotificationStatus, NotificationType
+from notification.models import Notification, NotificationReadState
+from notification.services import (
+    create_notification,
+    get_read_state,
+    mark_all_read,
+    mark_read,
+    resolve_notification,
+    unread_count,
+)
+
+from .helpers import authenticate, make_user
+
+URL = "/api/v1/notifications/unread-count/"
+
+
+class UnreadCounterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.other = make_user(email="other@example.com", username="other")
+
+    def _create(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_notification(
+                notification_type=NotificationType.REGULATION_OVERDUE,
+                push=False,
+                **kwargs,
+            )
+
+    def test_counted_once_then_cached(self):
+        self._create()
+        self.assertEqual(unread_count(self.user), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 1)
+
+        self._create()
+        self.assertEqual(unread_count(self.user), 2)
+
+    def test_mark_read_is_per_user(self):
+        notification = self._create()
+        unread_count(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(mark_read(notification, self.user))
+            self.assertFalse(mark_read(notification, self.user))
+        self.assertEqual(unread_count(self.user), 0)
+        self.assertEqual(unread_count(self.other), 1)
+
+    def test_mark_all_read_writes_one_row(self):
+        for _ in range(3):
+            self._create()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mark_all_read(self.user), 3)
+        self.assertEqual(NotificationReadState.objects.count(), 1)
+        self.assertEqual(get_read_state(self.user).read_ids, [])
+        self.assertEqual(unread_count(self.user), 0)
+
+        self._create()
+        self.assertEqual(unread_count(self.user), 1)
+        self.assertEqual(unread_count(self.other), 4)
+
+    def test_mark_all_read_watermark_is_the_newest_notification(self):
+        seen = self._create()
+        Notification.objects.filter(pk=seen.pk).update(
+            created_at=timezone.now() - timedelta(seconds=10)
+        )
+        mark_all_read(self.user)
+
+        # Inserted before the click, committed after it.
+        late = self._create()
+        Notification.objects.filter(pk=late.pk).update(
+            created_at=timezone.now() - timedelta(seconds=5)
+        )
+        late.refresh_from_db()
+        self.assertFalse(get_read_state(self.user).is_read(late))
+
+    def test_mark_all_read_without_notifications(self):
+        mark_all_read(self.user)
+        self.assertIsNone(get_read_state(self.user).read_up_to)
+        self.assertEqual(unread_count(self.user), 0)
+
+    def test_read_ids_are_compacted_into_the_watermark(self):
+        notifications = [self._create() for _ in range(4)]
+        with patch("notification.services.READ_IDS_COMPACT_AT", 2):
+            for notification in notifications[:3]:
+                mark_read(notification, self.user)
+
+        state = get_read_state(self.user)
+        self.assertEqual(state.read_ids, [])
+        self.assertLess(state.read_up_to, notifications[3].created_at)
+        self.assertEqual(
+            [n.pk for n in notifications if not state.is_read(n)],
+            [notifications[3].pk],
+        )
+
+    def test_resolve_reads_the_notification_for_the_resolver(self):
+        notification = self._create(status=NotificationStatus.PENDING)
+        unread_count(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            resolve_notification(notification, "reject", self.user)
+        self.assertTrue(get_read_state(self.user).is_read(notification))
+        self.assertEqual(unread_count(self.user), 0)
+
+    def test_reconcile_command_fixes_drift(self):
+        self._create()
+        unread_count(self.user)
+        cache_utils.set_unread_count(self.user.pk, 42)
+
+        out = StringIO()
+        call_command("reconcile_unread_count", stdout=out)
+
+        self.assertIn("invalidated", out.getvalue())
+        self.assertEqual(unread_count(self.user), 1)
+
+
+class UnreadCountAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        authenticate(self.client, make_user())
+
+    def test_badge_reads_are_served_from_the_counter(self):
+        Notification.objects.create(type=NotificationType.REGULATION_OVERDUE)
+        self.client.get(URL)
+        with self.assertNumQueries(0):  # user comes from the snapshot cache too
+            response = self.client.get(URL)
+        self.assertEqual(response.data["unread_count"], 1)
@@ -7,31 +7,55 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from config.archive import HistoryTierMixin
 from driver.models import Driver
 from vehicle.models import Vehicle
 
 from .constants import NotificationStatus, NotificationType
-from .models import Notification
+from .models import Notification, NotificationArchive
 from .serializers import (
     MileageSubmitSerializer,
+    NotificationArchiveSerializer,
     NotificationSerializer,
     ResolveNotificationSerializer,
 )
-from .services import create_notification, resolve_notification
+from .services import (
+    create_notification,
+    get_read_state,
+    mark_all_read,
+    mark_read,
+    resolve_notification,
+    unread_count,
+)
 
 logger = logging.getLogger(__name__)
 
 MILES_TO_KM = 1.60934
 
 
-class NotificationListView(generics.ListAPIView):
-    """List notifications with optional filters: type, status, is_read."""
+class NotificationListView(HistoryTierMixin, generics.ListAPIView):
+    """List notifications with optional filters: type, status, is_read.
+
+    is_read is per user, from the caller's NotificationReadState, and applies
+    to the hot tier only; ?tier=archive lists notifications moved out by
+    retention (see notification.retention).
+    """
 
     serializer_class = NotificationSerializer
+    archive_serializer_class = NotificationArchiveSerializer
+    history_model = Notification
+    archive_model = NotificationArchive
     permission_classes = [IsAuthenticated]
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["read_state"] = self.read_state
+        return context
+
     def get_queryset(self):
-        qs = Notification.objects.select_related("vehicle", "driver").all()
+        self.read_state = get_read_state(self.request.user)
+        model = self.get_history_model()
+        qs = model.objects.select_related("vehicle", "driver").all()
         n_type = self.request.query_params.get("type")
         n_status = self.request.query_params.get("status")
         is_read = self.request.query_params.get("is_read")
@@ -40,49 +64,48 @@ class NotificationListView(generics.ListAPIView):
             qs = qs.filter(type=n_type)
         if n_status:
             qs = qs.filter(status=n_status)
-        if is_read is not None:
-            qs = qs.filter(is_read=is_read.lower() == "true")
+        if is_read is not None and model is Notification:
+            unread = self.read_state.unread_q()
+            if is_read.lower() != "true":
+                qs = qs.filter(unread)
+            elif unread:
+                qs = qs.exclude(unread)
+            else:
+                qs = qs.none()  # never read anything; exclude(Q()) would keep all
         return qs
 
 
 class UnreadCountView(APIView):
-    """Return count of unread notifications."""
+    """Return count of notifications the caller has not read."""
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        count = Notification.objects.filter(is_read=False).count()
-        return Response({"unread_count": count})
+        return Response({"unread_count": unread_count(request.user)})
 
 
 class MarkReadView(APIView):
-    """Mark a single notification as read."""
+    """Mark a single notification as read for the caller."""
 
     permission_classes = [IsAuthenticated]
 
     def patch(self, request, pk):
         notification = get_object_or_404(Notification, pk=pk)
-        if not notification.is_read:
-            from django.utils import timezone
-
-            notification.is_read = True
-            notification.read_at = timezone.now()
-            notification.save(update_fields=["is_read", "read_at"])
-        return Response(NotificationSerializer(notification).data)
+        mark_read(notification, request.user)
+        return Response(
+            NotificationSerializer(
+                notification, context={"read_state": get_read_state(request.user)}
+            ).data
+        )
 
 
 class MarkAllReadView(APIView):
-    """Mark all unread notifications as read."""
+    """Mark all notifications as read for the caller."""
 
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        from django.utils import timezone
-
-        updated = Notification.objects.filter(is_read=False).update(
-            is_read=True, read_at=timezone.now()
-        )
-        return Response({"updated": updated})
+        return Response({"updated": mark_all_read(request.user)})
 
 
 class ResolveNotificationView(APIView):
@@ -107,7 +130,11 @@ class ResolveNotificationView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        return Response(NotificationSerializer(resolved).data)
+        return Response(
+            NotificationSerializer(
+                resolved, context={"read_state": get_read_state(request.user)}
+            ).data
+        )
 
 
 class MileageSubmitView(APIView):
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from expense import analytics
+
 from .models import MileageLog, OwnerHistory, TechnicalInspection, Vehicle, VehicleOwner
 
 
@@ -20,11 +22,31 @@ class TechnicalInspectionAdmin(admin.ModelAdmin):
 
 @admin.register(MileageLog)
 class MileageLogAdmin(admin.ModelAdmin):
+    """Edits and deletes refresh the fuel / cost analytics built from the logs."""
+
     list_display = ["vehicle", "km", "recorded_at", "created_by"]
     list_filter = ["recorded_at"]
     search_fields = ["vehicle__car_number"]
     raw_id_fields = ["vehicle"]
 
+    def save_model(self, request, obj, form, change):
+        changes = [(obj.vehicle_id, obj.recorded_at)]
+        if change:
+            changes += MileageLog.objects.filter(pk=obj.pk).values_list(
+                "vehicle_id", "recorded_at"
+            )
+        super().save_model(request, obj, form, change)
+        analytics.refresh_for_mileage_logs(changes)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        analytics.refresh_for_mileage(obj.vehicle_id, since=obj.recorded_at)
+
+    def delete_queryset(self, request, queryset):
+        changes = list(queryset.values_list("vehicle_id", "recorded_at"))
+        super().delete_queryset(request, queryset)
+        analytics.refresh_for_mileage_logs(changes)
+
 
 @admin.register(VehicleOwner)
 class VehicleOwnerAdmin(admin.ModelAdmin):
@@ -0,0 +1,25 @@
+"""
+Refit per-vehicle km/day estimates from recent mileage logs.
+New logs update the estimate incrementally; run this once after deploy and
+nightly so vehicles whose logs age out of the window are refitted too.
+Use: python manage.py refresh_mileage_velocity [--vehicle <uuid>]
+"""
+
+from django.core.management.base import BaseCommand
+
+from config import cache_utils
+from vehicle.velocity import refresh_velocities
+
+
+class Command(BaseCommand):
+    help = "Refit mileage velocity (km/day) for the whole fleet or one vehicle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vehicle", type=str, help="Vehicle id")
+
+    def handle(self, *args, **options):
+        vehicle_ids = [options["vehicle"]] if options.get("vehicle") else None
+        count = refresh_velocities(vehicle_ids)
+        # Predicted due dates on the board and calendar follow the estimates.
+        cache_utils.invalidate_due_board()
+        self.stdout.write(self.style.SUCCESS(f"Refitted {count} vehicles."))
@@ -1,8 +1,9 @@
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
+from expense.analytics import refresh_for_mileage
 from fleet_management.models import FleetVehicleRegulation
-from vehicle.models import MileageLog, Vehicle
+from vehicle.models import MileageLog, MileageLogArchive, Vehicle
 
 
 class Command(BaseCommand):
@@ -52,6 +53,7 @@ class Command(BaseCommand):
 
         # Delete mileage logs
         deleted_mileage, _ = MileageLog.objects.filter(vehicle=vehicle).delete()
+        MileageLogArchive.objects.filter(vehicle=vehicle).delete()
 
         # Delete regulations (CASCADE deletes entries, history, notifications)
         deleted_reg, details = FleetVehicleRegulation.objects.filter(
@@ -62,6 +64,7 @@ class Command(BaseCommand):
         old_km = vehicle.initial_km
         vehicle.initial_km = 0
         vehicle.save(update_fields=["initial_km"])
+        refresh_for_mileage(vehicle.pk, since=None)
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("driver", "0002_drivervehicledeal"),
+        ("vehicle", "0016_alter_vehicle_fuel_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ownerhistory",
+            index=models.Index(
+                fields=["vehicle", "assigned_at", "unassigned_at"],
+                name="idx_owner_history_interval",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("vehicle", "0017_ownerhistory_idx_owner_history_interval"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MileageVelocity",
+            fields=[
+                (
+                    "vehicle",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="mileage_velocity",
+                        serialize=False,
+                        to="vehicle.vehicle",
+                    ),
+                ),
+                ("km_per_day", models.DecimalField(decimal_places=2, max_digits=8)),
+                ("last_km", models.PositiveIntegerField()),
+                ("last_recorded_at", models.DateField()),
+                ("samples", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("vehicle", "0018_mileage_velocity"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="technicalinspection",
+            index=models.Index(
+                fields=["next_inspection_date"], name="idx_inspection_next_date"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="technicalinspection",
+            index=models.Index(
+                fields=["vehicle", "id"], name="idx_inspection_vehicle_id"
+            ),
+        ),
+    ]
@@ -0,0 +1,159 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("vehicle", "0019_calendar_date_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MileageLogArchive",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("km", models.PositiveIntegerField()),
+                ("recorded_at", models.DateField()),
+                ("note", models.CharField(blank=True, max_length=255)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-recorded_at", "-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="VehicleStatusHistoryArchive",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "old_status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("AUCTION", "Auction Selection"),
+                            ("FOCUS", "Focus"),
+                            ("GAS_INSTALL", "Gas Installation"),
+                            ("SERVICE", "Service"),
+                            ("CLEANING", "Cleaning"),
+                            ("PRE_DELIVERY", "Pre-delivery"),
+                            ("READY", "Ready for Delivery"),
+                            ("RENT", "Rent"),
+                            ("LEASING", "Leasing"),
+                            ("SELLING", "Report for Sale"),
+                            ("SOLD", "Sold"),
+                        ],
+                        max_length=20,
+                        null=True,
+                    ),
+                ),
+                (
+                    "new_status",
+                    models.CharField(
+                        choices=[
+                            ("AUCTION", "Auction Selection"),
+                            ("FOCUS", "Focus"),
+                            ("GAS_INSTALL", "Gas Installation"),
+                            ("SERVICE", "Service"),
+                            ("CLEANING", "Cleaning"),
+                            ("PRE_DELIVERY", "Pre-delivery"),
+                            ("READY", "Ready for Delivery"),
+                            ("RENT", "Rent"),
+                            ("LEASING", "Leasing"),
+                            ("SELLING", "Report for Sale"),
+                            ("SOLD", "Sold"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("MANUAL", "Manual update"),
+                            ("REORDER", "Batch reorder"),
+                            ("CREATION", "Vehicle creation"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("changed_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-changed_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="mileagelog",
+            index=models.Index(
+                fields=["vehicle", "-recorded_at", "-created_at"],
+                name="idx_mileage_vehicle_recorded",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mileagelog",
+            index=models.Index(fields=["recorded_at"], name="idx_mileage_recorded_at"),
+        ),
+        migrations.AddIndex(
+            model_name="vehiclestatushistory",
+            index=models.Index(
+                fields=["changed_at"], name="idx_status_hist_changed_at"
+            ),
+        ),
+        migrations.AddField(
+            model_name="mileagelogarchive",
+            name="created_by",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="mileagelogarchive",
+            name="vehicle",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="vehicle.vehicle",
+            ),
+        ),
+        migrations.AddField(
+            model_name="vehiclestatushistoryarchive",
+            name="changed_by",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="vehiclestatushistoryarchive",
+            name="vehicle",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="vehicle.vehicle",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mileagelogarchive",
+            index=models.Index(
+                fields=["vehicle", "-recorded_at", "-created_at"],
+                name="idx_mileage_arch_vehicle_rec",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="vehiclestatushistoryarchive",
+            index=models.Index(
+                fields=["vehicle", "-changed_at"], name="idx_status_arch_vehicle_date"
+            ),
+        ),
+    ]
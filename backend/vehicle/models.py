@@ -127,6 +127,12 @@ class OwnerHistory(models.Model):
 
     class Meta:
         ordering = ["-unassigned_at"]
+        indexes = [
+            models.Index(
+                fields=["vehicle", "assigned_at", "unassigned_at"],
+                name="idx_owner_history_interval",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.vehicle} \u2190 {self.driver} ({self.assigned_at} - {self.unassigned_at})"
@@ -202,6 +208,53 @@ class VehicleStatusHistory(models.Model):
                 fields=["vehicle", "-changed_at"],
                 name="idx_status_hist_vehicle_date",
             ),
+            models.Index(fields=["changed_at"], name="idx_status_hist_changed_at"),
+        ]
+
+    def __str__(self) -> str:
+        old = self.old_status or "—"
+        return f"{self.vehicle} {old} → {self.new_status} ({self.changed_at})"
+
+
+class VehicleStatusHistoryArchive(models.Model):
+    """Cold tier of VehicleStatusHistory (see archive_history)."""
+
+    id = models.BigIntegerField(primary_key=True)
+    vehicle = models.ForeignKey(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+    )
+    old_status = models.CharField(
+        max_length=20,
+        choices=VehicleStatus.choices,
+        null=True,
+        blank=True,
+    )
+    new_status = models.CharField(
+        max_length=20,
+        choices=VehicleStatus.choices,
+    )
+    source = models.CharField(
+        max_length=10,
+        choices=VehicleStatusHistory.ChangeSource.choices,
+    )
+    changed_by = models.ForeignKey(
+        "account.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+    )
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-changed_at"]
+        indexes = [
+            models.Index(
+                fields=["vehicle", "-changed_at"],
+                name="idx_status_arch_vehicle_date",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -228,11 +281,71 @@ class MileageLog(models.Model):
 
     class Meta:
         ordering = ["-recorded_at", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["vehicle", "-recorded_at", "-created_at"],
+                name="idx_mileage_vehicle_recorded",
+            ),
+            models.Index(fields=["recorded_at"], name="idx_mileage_recorded_at"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.vehicle} — {self.km} km ({self.recorded_at})"
+
+
+class MileageLogArchive(models.Model):
+    """Cold tier of MileageLog (see archive_history)."""
+
+    id = models.BigIntegerField(primary_key=True)
+    vehicle = models.ForeignKey(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+    )
+    km = models.PositiveIntegerField()
+    recorded_at = models.DateField()
+    note = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(
+        "account.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-recorded_at", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["vehicle", "-recorded_at", "-created_at"],
+                name="idx_mileage_arch_vehicle_rec",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.vehicle} — {self.km} km ({self.recorded_at})"
 
 
+class MileageVelocity(models.Model):
+    """Exponentially weighted km/day estimate per vehicle (see vehicle/velocity.py)."""
+
+    vehicle = models.OneToOneField(
+        "vehicle.Vehicle",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="mileage_velocity",
+    )
+    km_per_day = models.DecimalField(max_digits=8, decimal_places=2)
+    last_km = models.PositiveIntegerField()
+    last_recorded_at = models.DateField()
+    samples = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.vehicle_id} — {self.km_per_day} km/day"
+
+
 class TechnicalInspection(models.Model):
     vehicle = models.ForeignKey(
         "vehicle.Vehicle",
@@ -257,6 +370,13 @@ class TechnicalInspection(models.Model):
 
     class Meta:
         ordering = ["-inspection_date"]
+        indexes = [
+            models.Index(
+                fields=["next_inspection_date"], name="idx_inspection_next_date"
+            ),
+            # "Latest inspection per vehicle" anti-join.
+            models.Index(fields=["vehicle", "id"], name="idx_inspection_vehicle_id"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.vehicle} — inspection {self.inspection_date}"
@@ -0,0 +1,83 @@
+"""
+"Who drove this vehicle at time T" resolver.
+============================================
+Ownership intervals come from OwnerHistory (closed: assigned_at →
+unassigned_at) and VehicleOwner (open-ended since assigned_at). Intervals
+are half-open, so a handover instant belongs to the incoming driver.
+
+resolve_drivers() answers any number of (vehicle, timestamp) pairs with a
+single UNION query limited to the pairs' vehicles and time window, then
+bisects per vehicle in memory.
+
+DriverVehicleDeal is not used: it has no dates, so it cannot place a
+driver at a point in time.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+
+from django.db.models import DateTimeField, Value
+
+from .models import OwnerHistory, VehicleOwner
+
+
+def _intervals(vehicle_ids, start: datetime, end: datetime) -> dict:
+    """{str(vehicle_id): ([starts], [(start, end_or_None, driver_id)])} by start."""
+    closed = (
+        OwnerHistory.objects.filter(
+            vehicle_id__in=vehicle_ids,
+            assigned_at__lte=end,
+            unassigned_at__gt=start,
+        )
+        .order_by()
+        .values_list("vehicle_id", "driver_id", "assigned_at", "unassigned_at")
+    )
+    current = (
+        VehicleOwner.objects.filter(vehicle_id__in=vehicle_ids, assigned_at__lte=end)
+        .annotate(ended_at=Value(None, output_field=DateTimeField()))
+        .order_by()
+        .values_list("vehicle_id", "driver_id", "assigned_at", "ended_at")
+    )
+
+    by_vehicle = defaultdict(list)
+    for vehicle_id, driver_id, assigned_at, unassigned_at in closed.union(
+        current, all=True
+    ):
+        by_vehicle[str(vehicle_id)].append((assigned_at, unassigned_at, driver_id))
+
+    index = {}
+    for vehicle_id, rows in by_vehicle.items():
+        rows.sort(key=lambda r: r[0])
+        index[vehicle_id] = ([r[0] for r in rows], rows)
+    return index
+
+
+def resolve_drivers(pairs) -> dict:
+    """Map each (vehicle_id, timestamp) pair to the driver_id at that moment.
+
+    Pairs with no covering interval map to None. One query for the whole batch.
+    """
+    pairs = [(v, t) for v, t in pairs if v is not None and t is not None]
+    if not pairs:
+        return {}
+    times = [t for _, t in pairs]
+    index = _intervals({v for v, _ in pairs}, min(times), max(times))
+
+    resolved = {}
+    for vehicle_id, at in pairs:
+        driver_id = None
+        starts, rows = index.get(str(vehicle_id), ((), ()))
+        # Latest interval starting at/before `at` wins (handles overlaps).
+        pos = bisect_right(starts, at) - 1
+        if pos >= 0:
+            _, ended_at, candidate = rows[pos]
+            if ended_at is None or at < ended_at:
+                driver_id = candidate
+        resolved[(vehicle_id, at)] = driver_id
+    return resolved
+
+
+def resolve_driver(vehicle_id, at: datetime):
+    """Single-pair convenience wrapper around resolve_drivers()."""
+    return resolve_drivers([(vehicle_id, at)]).get((vehicle_id, at))
@@ -8,6 +8,7 @@ from driver.models import DriverVehicleDeal
 
 from .models import (
     MileageLog,
+    MileageLogArchive,
     TechnicalInspection,
     Vehicle,
     VehiclePhoto,
@@ -253,7 +254,7 @@ class VehicleSerializer(serializers.ModelSerializer):
             current_km = instance.initial_km
             for reg in regs:
                 for entry in reg.entries.all():
-                    if current_km >= entry.last_done_km + entry.effective_every_km:
+                    if current_km >= entry.next_due_km:
                         overdue += 1
             representation["regulation_overdue"] = overdue
 
@@ -283,3 +284,23 @@ class MileageLogSerializer(serializers.ModelSerializer):
                 f"Mileage must be greater than current value ({current_km} km)."
             )
         return value
+
+
+class MileageLogArchiveSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MileageLogArchive
+        fields = ["id", "km", "recorded_at", "created_by", "created_at"]
+        read_only_fields = fields
+
+
+class DriverAtTimeQuerySerializer(serializers.Serializer):
+    vehicle = serializers.UUIDField()
+    at = serializers.DateTimeField()
+
+
+class DriverAtTimeBatchSerializer(serializers.Serializer):
+    MAX_ITEMS = 5000
+
+    items = DriverAtTimeQuerySerializer(
+        many=True, allow_empty=False, max_length=MAX_ITEMS
+    )
@@ -0,0 +1,115 @@
+"""
+Driver-at-time resolver tests.
+==============================
+Covers: closed OwnerHistory intervals, open-ended current VehicleOwner,
+half-open handover boundary, gaps, batch resolution in one query,
+POST /vehicle/drivers-at/.
+"""
+
+from datetime import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from vehicle.models import OwnerHistory, VehicleOwner
+from vehicle.ownership import resolve_driver, resolve_drivers
+
+from .helpers import authenticate, make_driver, make_user, make_vehicle
+
+
+def _at(month, day, hour=12):
+    return timezone.make_aware(datetime(2026, month, day, hour))
+
+
+class OwnershipResolverTest(TestCase):
+    def setUp(self):
+        self.vehicle = make_vehicle()
+        self.first = make_driver(phone_number="48100000001")
+        self.second = make_driver(phone_number="48100000002")
+        self.current = make_driver(phone_number="48100000003")
+        OwnerHistory.objects.create(
+            vehicle=self.vehicle,
+            driver=self.first,
+            assigned_at=_at(1, 1),
+            unassigned_at=_at(2, 1),
+        )
+        OwnerHistory.objects.create(
+            vehicle=self.vehicle,
+            driver=self.second,
+            assigned_at=_at(2, 1),
+            unassigned_at=_at(3, 1),
+        )
+        VehicleOwner.objects.create(vehicle=self.vehicle, driver=self.current)
+        VehicleOwner.objects.filter(vehicle=self.vehicle).update(assigned_at=_at(4, 1))
+
+    def test_resolves_closed_intervals(self):
+        self.assertEqual(resolve_driver(self.vehicle.id, _at(1, 15)), self.first.id)
+        self.assertEqual(resolve_driver(self.vehicle.id, _at(2, 15)), self.second.id)
+
+    def test_handover_instant_belongs_to_incoming_driver(self):
+        self.assertEqual(resolve_driver(self.vehicle.id, _at(2, 1)), self.second.id)
+
+    def test_current_owner_is_open_ended(self):
+        self.assertEqual(resolve_driver(self.vehicle.id, _at(9, 1)), self.current.id)
+
+    def test_gap_and_before_first_assignment_resolve_to_none(self):
+        self.assertIsNone(resolve_driver(self.vehicle.id, _at(3, 15)))
+        self.assertIsNone(resolve_driver(self.vehicle.id, _at(1, 1, hour=0)))
+
+    def test_unknown_vehicle_resolves_to_none(self):
+        other = make_vehicle(vin_number="OTHERVIN000000001", car_number="BB0000BB")
+        self.assertIsNone(resolve_driver(other.id, _at(1, 15)))
+
+    def test_batch_is_a_single_query(self):
+        pairs = [(self.vehicle.id, _at(m, 15)) for m in range(1, 10)]
+        with CaptureQueriesContext(connection) as ctx:
+            result = resolve_drivers(pairs)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(result[pairs[0]], self.first.id)
+        self.assertEqual(result[pairs[-1]], self.current.id)
+
+    def test_string_vehicle_ids_are_accepted(self):
+        pair = (str(self.vehicle.id), _at(1, 15))
+        self.assertEqual(resolve_drivers([pair])[pair], self.first.id)
+
+
+class DriverAtTimeAPITest(TestCase):
+    URL = "/api/v1/vehicle/drivers-at/"
+
+    def setUp(self):
+        self.client = APIClient()
+        authenticate(self.client, make_user())
+        self.vehicle = make_vehicle()
+        self.driver = make_driver()
+        OwnerHistory.objects.create(
+            vehicle=self.vehicle,
+            driver=self.driver,
+            assigned_at=_at(1, 1),
+            unassigned_at=_at(2, 1),
+        )
+
+    def test_batch_resolution(self):
+        response = self.client.post(
+            self.URL,
+            {
+                "items": [
+                    {"vehicle": str(self.vehicle.id), "at": "2026-01-10T08:00:00Z"},
+                    {"vehicle": str(self.vehicle.id), "at": "2026-05-10T08:00:00Z"},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["driver"], str(self.driver.id))
+        self.assertIsNone(response.data[1]["driver"])
+
+    def test_empty_items_returns_400(self):
+        response = self.client.post(self.URL, {"items": []}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_auth(self):
+        response = APIClient().post(self.URL, {"items": []}, format="json")
+        self.assertEqual(response.status_code, 401)
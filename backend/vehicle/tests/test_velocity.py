@@ -0,0 +1,137 @@
+"""
+Mileage Velocity Tests
+======================
+Covers: EWMA km/day fit (batch + incremental), back-dated refit, window
+expiry, predicted due dates, hook on POST /vehicle/{pk}/mileage/.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from vehicle.models import MileageLog, MileageVelocity
+from vehicle.velocity import (
+    HALF_LIFE_DAYS,
+    WINDOW_DAYS,
+    predict_due_date,
+    record_mileage,
+    refresh_velocities,
+)
+
+from .helpers import authenticate, make_user, make_vehicle
+
+
+class MileageVelocityTest(TestCase):
+    def setUp(self):
+        self.vehicle = make_vehicle()
+        self.today = timezone.localdate()
+
+    def _log(self, km, days_ago):
+        return MileageLog.objects.create(
+            vehicle=self.vehicle, km=km, recorded_at=self.today - timedelta(days_ago)
+        )
+
+    def test_single_interval_is_plain_rate(self):
+        self._log(1_000, 20)
+        self._log(2_000, 10)
+        self.assertEqual(refresh_velocities(), 1)
+        velocity = MileageVelocity.objects.get(vehicle=self.vehicle)
+        self.assertEqual(velocity.km_per_day, Decimal("100.00"))
+        self.assertEqual(velocity.last_km, 2_000)
+        self.assertEqual(velocity.samples, 1)
+
+    def test_new_interval_is_blended_by_half_life(self):
+        self._log(0, 2 * HALF_LIFE_DAYS)
+        self._log(3_000, HALF_LIFE_DAYS)  # 100 km/day
+        self._log(9_000, 0)  # 200 km/day, weight 0.5 after one half-life
+        refresh_velocities()
+        velocity = MileageVelocity.objects.get(vehicle=self.vehicle)
+        self.assertEqual(velocity.km_per_day, Decimal("150.00"))
+        self.assertEqual(velocity.samples, 2)
+
+    def test_single_reading_has_no_estimate(self):
+        self._log(1_000, 5)
+        self.assertEqual(refresh_velocities(), 0)
+        self.assertFalse(MileageVelocity.objects.exists())
+
+    def test_logs_outside_window_are_ignored_and_stale_rows_removed(self):
+        self._log(1_000, WINDOW_DAYS + 20)
+        self._log(2_000, WINDOW_DAYS + 10)
+        MileageVelocity.objects.create(
+            vehicle=self.vehicle,
+            km_per_day=50,
+            last_km=2_000,
+            last_recorded_at=self.today - timedelta(WINDOW_DAYS + 10),
+        )
+        refresh_velocities()
+        self.assertFalse(MileageVelocity.objects.exists())
+
+    def test_incremental_matches_batch(self):
+        self._log(0, 60)
+        self._log(3_000, 30)
+        refresh_velocities()
+        log = self._log(9_000, 0)
+        record_mileage(self.vehicle.id, log.km, log.recorded_at)
+        incremental = MileageVelocity.objects.get(vehicle=self.vehicle).km_per_day
+        refresh_velocities()
+        batch = MileageVelocity.objects.get(vehicle=self.vehicle).km_per_day
+        self.assertEqual(incremental, batch)
+
+    def test_backdated_log_triggers_refit(self):
+        self._log(0, 40)
+        self._log(4_000, 0)
+        refresh_velocities()
+        log = self._log(1_000, 30)
+        record_mileage(self.vehicle.id, log.km, log.recorded_at)
+        velocity = MileageVelocity.objects.get(vehicle=self.vehicle)
+        self.assertEqual(velocity.last_km, 4_000)
+        self.assertEqual(velocity.samples, 2)
+
+    def test_odometer_rollback_restarts_interval(self):
+        self._log(5_000, 20)
+        self._log(500, 10)  # typo corrected downwards
+        self._log(1_500, 0)
+        refresh_velocities()
+        velocity = MileageVelocity.objects.get(vehicle=self.vehicle)
+        self.assertEqual(velocity.km_per_day, Decimal("100.00"))
+
+
+class PredictDueDateTest(TestCase):
+    def test_projects_remaining_km_from_last_reading(self):
+        self.assertEqual(
+            predict_due_date(11_000, Decimal("100"), 10_000, date(2026, 1, 1)),
+            date(2026, 1, 11),
+        )
+
+    def test_rounds_partial_days_up(self):
+        self.assertEqual(
+            predict_due_date(10_150, Decimal("100"), 10_000, date(2026, 1, 1)),
+            date(2026, 1, 3),
+        )
+
+    def test_none_when_already_due_or_no_velocity(self):
+        self.assertIsNone(predict_due_date(9_000, 100, 10_000, date(2026, 1, 1)))
+        self.assertIsNone(predict_due_date(11_000, 0, 10_000, date(2026, 1, 1)))
+        self.assertIsNone(predict_due_date(11_000, None, None, None))
+
+
+class MileageLogVelocityHookTest(TestCase):
+    def test_post_mileage_updates_velocity(self):
+        client = APIClient()
+        user = make_user()
+        authenticate(client, user)
+        vehicle = make_vehicle()
+        today = timezone.localdate()
+        url = f"/api/v1/vehicle/{vehicle.id}/mileage/"
+        for km, days_ago in ((1_000, 10), (2_000, 0)):
+            response = client.post(
+                url,
+                {"km": km, "recorded_at": str(today - timedelta(days_ago))},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 201, response.data)
+        velocity = MileageVelocity.objects.get(vehicle=vehicle)
+        self.assertEqual(velocity.km_per_day, Decimal("100.00"))
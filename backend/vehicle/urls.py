@@ -1,6 +1,11 @@
 from django.urls import path
 
-from expense.views import VehicleExpenseListCreateView, VehicleExpenseSummaryView
+from expense.views import (
+    VehicleCostTrendView,
+    VehicleExpenseListCreateView,
+    VehicleExpenseSummaryView,
+    VehicleFuelConsumptionView,
+)
 
 from . import views
 
@@ -11,6 +16,11 @@ urlpatterns = [
         views.VehicleReorderView.as_view(),
         name="vehicle-reorder",
     ),
+    path(
+        "drivers-at/",
+        views.DriverAtTimeView.as_view(),
+        name="vehicle-drivers-at",
+    ),
     path(
         "archive/",
         views.VehicleArchiveListView.as_view(),
@@ -76,4 +86,14 @@ urlpatterns = [
         VehicleExpenseSummaryView.as_view(),
         name="vehicle-expenses-summary",
     ),
+    path(
+        "<uuid:pk>/cost-trend/",
+        VehicleCostTrendView.as_view(),
+        name="vehicle-cost-trend",
+    ),
+    path(
+        "<uuid:pk>/fuel-consumption/",
+        VehicleFuelConsumptionView.as_view(),
+        name="vehicle-fuel-consumption",
+    ),
 ]
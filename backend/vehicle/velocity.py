@@ -0,0 +1,143 @@
+"""
+Mileage velocity (km/day) estimator.
+====================================
+A time-decayed EWMA over consecutive MileageLog readings. Each interval's
+rate (Δkm / Δdays) is blended in with weight 1 - 0.5 ** (Δdays / HALF_LIFE_DAYS),
+so one reading after a long gap counts as much as several same-week ones
+and anything older than a few half-lives barely matters.
+
+refresh_velocities() refits the whole fleet (or a subset) from one ordered
+query over the last WINDOW_DAYS of logs and upserts every row in a single
+statement. record_mileage() folds one new reading into the stored state and
+falls back to a per-vehicle refit for back-dated logs.
+
+numpy is not a dependency of this project, so the batch fit is one streamed
+pass in plain Python — O(logs), no per-vehicle queries.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+import math
+
+from django.utils import timezone
+
+from .models import MileageLog, MileageVelocity
+
+HALF_LIFE_DAYS = 30
+WINDOW_DAYS = 180
+
+
+def _fold(state, km: int, day: date):
+    """Fold one reading into (rate, last_km, last_day, samples)."""
+    rate, last_km, last_day, samples = state
+    if km < last_km:
+        # Odometer correction / typo — restart the interval from here.
+        return rate, km, day, samples
+    days = (day - last_day).days
+    if days <= 0:
+        # Same-day reading: the distance is credited to the next interval.
+        return state
+    instant = (km - last_km) / days
+    if rate is None:
+        rate = instant
+    else:
+        alpha = 1 - 0.5 ** (days / HALF_LIFE_DAYS)
+        rate = alpha * instant + (1 - alpha) * rate
+    return rate, km, day, samples + 1
+
+
+def _row(vehicle_id, state) -> MileageVelocity:
+    rate, last_km, last_day, samples = state
+    return MileageVelocity(
+        vehicle_id=vehicle_id,
+        km_per_day=Decimal(f"{rate:.2f}"),
+        last_km=last_km,
+        last_recorded_at=last_day,
+        samples=samples,
+    )
+
+
+def refresh_velocities(vehicle_ids=None) -> int:
+    """Refit velocities from recent logs; returns the number of rows written."""
+    since = timezone.localdate() - timedelta(days=WINDOW_DAYS)
+    logs = MileageLog.objects.filter(recorded_at__gte=since)
+    stale = MileageVelocity.objects.all()
+    if vehicle_ids is not None:
+        logs = logs.filter(vehicle_id__in=vehicle_ids)
+        stale = stale.filter(vehicle_id__in=vehicle_ids)
+
+    states = {}
+    ordered = logs.order_by("vehicle_id", "recorded_at", "created_at").values_list(
+        "vehicle_id", "km", "recorded_at"
+    )
+    for vehicle_id, km, day in ordered.iterator():
+        state = states.get(vehicle_id)
+        states[vehicle_id] = (
+            (None, km, day, 0) if state is None else _fold(state, km, day)
+        )
+    rows = [
+        _row(vehicle_id, state)
+        for vehicle_id, state in states.items()
+        if state[0] is not None
+    ]
+
+    # Vehicles whose window no longer yields an interval lose their estimate.
+    stale.exclude(vehicle_id__in=[row.vehicle_id for row in rows]).delete()
+    MileageVelocity.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["vehicle"],
+        update_fields=[
+            "km_per_day",
+            "last_km",
+            "last_recorded_at",
+            "samples",
+            "updated_at",
+        ],
+    )
+    return len(rows)
+
+
+def record_mileage(vehicle_id, km: int, recorded_at: date) -> None:
+    """Incrementally update one vehicle after a new MileageLog was saved."""
+    current = MileageVelocity.objects.filter(vehicle_id=vehicle_id).first()
+    if current is None or recorded_at < current.last_recorded_at:
+        refresh_velocities([vehicle_id])
+        return
+    state = _fold(
+        (
+            float(current.km_per_day),
+            current.last_km,
+            current.last_recorded_at,
+            current.samples,
+        ),
+        km,
+        recorded_at,
+    )
+    _row(vehicle_id, state).save()
+
+
+def predict_due_date(
+    next_due_km: int, km_per_day, last_km: int | None, last_recorded_at: date | None
+) -> date | None:
+    """Date the odometer is expected to reach next_due_km.
+
+    None when there is no usable estimate or the entry is already due.
+    """
+    if not km_per_day or km_per_day <= 0 or last_recorded_at is None:
+        return None
+    remaining = next_due_km - last_km
+    if remaining <= 0:
+        return None
+    return last_recorded_at + timedelta(days=math.ceil(remaining / float(km_per_day)))
+
+
+def predict_for(velocity: MileageVelocity | None, next_due_km: int) -> date | None:
+    if velocity is None:
+        return None
+    return predict_due_date(
+        next_due_km,
+        velocity.km_per_day,
+        velocity.last_km,
+        velocity.last_recorded_at,
+    )
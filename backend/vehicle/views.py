@@ -12,22 +12,28 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from config import cache_utils
+from config.archive import HistoryTierMixin
 from driver.models import DriverVehicleDeal
 
 from .models import (
     MileageLog,
+    MileageLogArchive,
     TechnicalInspection,
     Vehicle,
     VehiclePhoto,
     VehicleStatusHistory,
 )
+from .ownership import resolve_drivers
 from .serializers import (
+    DriverAtTimeBatchSerializer,
+    MileageLogArchiveSerializer,
     MileageLogSerializer,
     TechnicalInspectionSerializer,
     VehiclePhotoSerializer,
     VehicleSerializer,
 )
 from .services import create_vehicle, record_status_change
+from .velocity import record_mileage
 
 logger = logging.getLogger(__name__)
 
@@ -48,10 +54,7 @@ _VEHICLE_ANNOTATIONS = {
     ),
     "regulation_overdue_count": Count(
         "regulations__entries",
-        filter=Q(
-            initial_km__gte=F("regulations__entries__last_done_km")
-            + F("regulations__entries__item__every_km"),
-        ),
+        filter=Q(initial_km__gte=F("regulations__entries__next_due_km")),
         distinct=True,
     ),
     "has_regulation_flag": Case(
@@ -168,7 +171,10 @@ class VehicleRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     def perform_update(self, serializer):
         try:
             old_status = serializer.instance.status
+            old_km = serializer.instance.initial_km
             instance = serializer.save()
+            if instance.initial_km != old_km:
+                cache_utils.invalidate_due_board()
             if instance.status != old_status:
                 record_status_change(
                     instance,
@@ -562,12 +568,17 @@ class TechnicalInspectionUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView
         cache_utils.invalidate_vehicle(self.kwargs["pk"])
 
 
-class MileageLogListCreateView(generics.ListCreateAPIView):
+class MileageLogListCreateView(HistoryTierMixin, generics.ListCreateAPIView):
+    """GET: mileage logs of one vehicle (?tier=archive for older ones); POST: new log."""
+
     serializer_class = MileageLogSerializer
+    archive_serializer_class = MileageLogArchiveSerializer
+    history_model = MileageLog
+    archive_model = MileageLogArchive
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return MileageLog.objects.filter(vehicle_id=self.kwargs["pk"])
+        return self.get_history_model().objects.filter(vehicle_id=self.kwargs["pk"])
 
     def perform_create(self, serializer):
         vehicle_id = self.kwargs["pk"]
@@ -576,9 +587,43 @@ class MileageLogListCreateView(generics.ListCreateAPIView):
             created_by=self.request.user,
         )
         Vehicle.objects.filter(pk=vehicle_id).update(initial_km=instance.km)
+        record_mileage(vehicle_id, instance.km, instance.recorded_at)
         cache_utils.invalidate_vehicle(vehicle_id)
+        # New km and velocity move every due point / predicted date.
+        cache_utils.invalidate_regulation_plan(vehicle_id)
 
         instance.vehicle.initial_km = instance.km
+        from expense.analytics import refresh_for_mileage
         from notification.services import check_regulation_notifications
 
+        refresh_for_mileage(vehicle_id, since=instance.recorded_at)
         check_regulation_notifications(instance.vehicle)
+
+
+class DriverAtTimeView(generics.GenericAPIView):
+    """POST /vehicle/drivers-at/ — who drove each vehicle at the given moment.
+
+    Body: {"items": [{"vehicle": "<uuid>", "at": "<iso datetime>"}, ...]}
+    Resolved in one query regardless of batch size; unknown → driver null.
+    """
+
+    serializer_class = DriverAtTimeBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data["items"]
+
+        drivers = resolve_drivers((item["vehicle"], item["at"]) for item in items)
+        results = []
+        for item in items:
+            driver_id = drivers.get((item["vehicle"], item["at"]))
+            results.append(
+                {
+                    "vehicle": str(item["vehicle"]),
+                    "at": item["at"],
+                    "driver": str(driver_id) if driver_id else None,
+                }
+            )
+        return Response(results)